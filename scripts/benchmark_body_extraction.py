@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Body Extraction Benchmark
+
+Measures per-message cost of turning HTML email bodies into the short text
+snippets handed to the agents.
+
+Usage:
+    python scripts/benchmark_body_extraction.py [CORPUS_DIR] [--max-length 200] [--repeat 5]
+
+CORPUS_DIR may contain .html/.htm files or .eml messages (their text/html
+parts are used). Export a few dozen real newsletters from Gmail ("Show
+original" -> "Download original") for representative numbers. Without a
+corpus, synthetic newsletter-style HTML is generated.
+
+If BeautifulSoup is installed, the previous html.parser based cleanup is
+timed as a baseline.
+"""
+
+import argparse
+import email
+import importlib.util
+import os
+import re
+import statistics
+import sys
+import time
+from email import policy
+from typing import Callable, List
+
+# Load the module by path so the benchmark does not need CrewAI installed
+MODULE_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'gmail_crew_ai', 'tools', 'body_extraction.py')
+spec = importlib.util.spec_from_file_location('body_extraction', MODULE_PATH)
+body_extraction = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(body_extraction)
+
+
+def load_corpus(corpus_dir: str) -> List[str]:
+    """Load HTML documents from .html/.htm files and .eml messages."""
+    documents = []
+    for name in sorted(os.listdir(corpus_dir)):
+        path = os.path.join(corpus_dir, name)
+        lower = name.lower()
+        if lower.endswith(('.html', '.htm')):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                documents.append(f.read())
+        elif lower.endswith('.eml'):
+            with open(path, 'rb') as f:
+                message = email.message_from_binary_file(f, policy=policy.default)
+            for part in message.walk():
+                if part.get_content_type() == 'text/html':
+                    documents.append(part.get_content())
+    return documents
+
+
+def synthetic_corpus(count: int = 50) -> List[str]:
+    """Generate newsletter-style HTML: a large style block and nested layout tables."""
+    style = "<style>" + "".join(f".c{i}{{color:#{i:06x};padding:{i % 9}px}}" for i in range(800)) + "</style>"
+    documents = []
+    for n in range(count):
+        rows = "".join(
+            f"<tr><td class='c{i}'><table><tr><td><a href='https://example.com/{n}/{i}'>"
+            f"<img src='https://cdn.example.com/{i}.png' alt=''></a></td><td><p>Story {i}: "
+            f"Weekly update number {n} &amp; more news you can use&nbsp;today.</p></td></tr></table></td></tr>"
+            for i in range(300)
+        )
+        documents.append(
+            f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Issue {n}</title>{style}</head>"
+            f"<body><div style='display:none'>Preview text for issue {n}</div>"
+            f"<table width='100%'>{rows}</table></body></html>"
+        )
+    return documents
+
+
+def beautifulsoup_baseline(max_length: int) -> Callable[[str], str]:
+    """The previous cleanup: a full BeautifulSoup tree per part, then regex passes."""
+    from bs4 import BeautifulSoup
+
+    def clean(html: str) -> str:
+        text = BeautifulSoup(html, "html.parser").get_text(separator=" ")
+        text = re.sub(r'\s+', ' ', text).strip()
+        text = re.sub(r'[\u200c\u200d\u00ad]+', '', text)
+        text = re.sub(r'[^\x00-\x7F\u00A0-\u024F\u1E00-\u1EFF]+', ' ', text)
+        if len(text) > max_length:
+            text = text[:max_length] + "... [Content truncated for processing]"
+        return text
+
+    return clean
+
+
+def time_per_message(extract: Callable[[str], str], documents: List[str], repeat: int) -> List[float]:
+    """Best-of-``repeat`` wall time per document, in milliseconds."""
+    timings = []
+    for document in documents:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            extract(document)
+            best = min(best, time.perf_counter() - start)
+        timings.append(best * 1000)
+    return timings
+
+
+def report(label: str, timings: List[float]):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:<28} mean {statistics.mean(timings):8.3f} ms   p95 {p95:8.3f} ms   total {sum(timings):9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark email body extraction")
+    parser.add_argument('corpus_dir', nargs='?', help="Directory of .html/.htm/.eml files")
+    parser.add_argument('--max-length', type=int, default=200, help="Snippet length (default: 200)")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per document (default: 5)")
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus_dir) if args.corpus_dir else synthetic_corpus()
+    if not documents:
+        print("No HTML documents found")
+        return 1
+
+    sizes = [len(document) for document in documents]
+    print(f"{len(documents)} documents, mean size {statistics.mean(sizes) / 1024:.1f} KiB, "
+          f"max {max(sizes) / 1024:.1f} KiB, snippet length {args.max_length}")
+
+    report("streaming extractor", time_per_message(
+        lambda html: body_extraction.clean_email_body(html, max_length=args.max_length), documents, args.repeat))
+
+    try:
+        baseline = beautifulsoup_baseline(args.max_length)
+    except ImportError:
+        print("BeautifulSoup not installed; skipping baseline")
+    else:
+        report("BeautifulSoup html.parser", time_per_message(baseline, documents, args.repeat))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Import Time Benchmark
+
+Runs ``python -X importtime`` on the package entry points used by workers
+and command-line runs, and reports their import cost together with any
+heavy dependency they pulled in that they should not need.
+
+Usage:
+    python scripts/benchmark_importtime.py [--repeat 3] [--check] [--top 5]
+
+With --check the script exits with status 1 when a target imports one of
+its forbidden modules (e.g. ``gmail_crew_ai.auth`` loading Streamlit), so it
+can run as a regression gate. Targets whose own dependencies are not
+installed are reported and skipped.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Loaded only when the web app or an API call needs them
+UI_AND_CLIENT = ("streamlit", "googleapiclient", "google_auth_oauthlib")
+
+# Target module -> top-level modules importing it must not load
+TARGETS = {
+    "gmail_crew_ai.tools": UI_AND_CLIENT + ("crewai",),
+    "gmail_crew_ai.auth": UI_AND_CLIENT,
+    "gmail_crew_ai.auth.oauth2_manager": UI_AND_CLIENT,
+    "gmail_crew_ai.tools.date_tools": UI_AND_CLIENT,
+    "gmail_crew_ai.tools.gmail_oauth_tools": UI_AND_CLIENT,
+    "gmail_crew_ai.cli": UI_AND_CLIENT + ("crewai",),
+}
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, int, str]]:
+    """Parse ``-X importtime`` lines into (self us, cumulative us, module with indentation)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            rows.append((int(fields[0]), int(fields[1]), fields[2].rstrip()))
+        except ValueError:
+            continue  # header line
+    return rows
+
+
+def run_importtime(code: str) -> subprocess.CompletedProcess:
+    """Run ``code`` in a fresh interpreter with -X importtime."""
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, env=env, cwd=SRC)
+
+
+def startup_modules() -> Set[str]:
+    """Modules the interpreter imports before running any code (excluded from totals)."""
+    return {name.strip() for _, _, name in parse_importtime(run_importtime("pass").stderr)}
+
+
+def measure(target: str, baseline: Set[str]) -> Dict:
+    """Import ``target`` in a fresh interpreter and time everything it imported."""
+    completed = run_importtime(f"import {target}")
+    rows = [row for row in parse_importtime(completed.stderr) if row[2].strip() not in baseline]
+    if completed.returncode != 0:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        return {"error": errors[-1] if errors else f"exit status {completed.returncode}"}
+
+    modules = [name.strip() for _, _, name in rows]
+    top_level = [(cumulative, name.strip()) for _, cumulative, name in rows if not name.startswith("  ")]
+    return {
+        "total_us": sum(cumulative for cumulative, _ in top_level),
+        "modules": modules,
+        "slowest": sorted(top_level, reverse=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import cost of package entry points")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=3, help="Slowest top-level imports to list per target")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 on a forbidden import")
+    args = parser.parse_args()
+
+    baseline = startup_modules()
+    regressions = []
+    print(f"{'Target':<40} {'Median ms':>10} {'Modules':>8}  Forbidden imports")
+    for target, forbidden in TARGETS.items():
+        runs = [measure(target, baseline) for _ in range(max(args.repeat, 1))]
+        failed = next((run for run in runs if run.get("error")), None)
+        if failed:
+            print(f"{target:<40} {'-':>10} {'-':>8}  skipped: {failed['error']}")
+            continue
+
+        loaded = {name.split('.')[0] for name in runs[0]["modules"]}
+        found = sorted(module for module in forbidden if module in loaded)
+        if found:
+            regressions.append((target, found))
+        median_ms = statistics.median(run["total_us"] for run in runs) / 1000
+        print(f"{target:<40} {median_ms:>10.1f} {len(runs[0]['modules']):>8}  {', '.join(found) or '-'}")
+        for cumulative, name in runs[0]["slowest"][:args.top]:
+            print(f"    {cumulative / 1000:>8.1f} ms  {name}")
+
+    if regressions:
+        print("\nForbidden imports:")
+        for target, found in regressions:
+            print(f"  {target} imports {', '.join(found)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
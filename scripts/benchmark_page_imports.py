@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Page Import Benchmark
+
+Measures what each Streamlit page costs to import, so regressions in cold
+start (a heavy dependency creeping back into the startup path) show up as
+numbers instead of a slow first page load.
+
+Usage:
+    python scripts/benchmark_page_imports.py [--repeat 5] [--json]
+
+Every measurement runs in a fresh interpreter. The "startup" row is what
+streamlit_app.py imports before routing; each page row is the extra time
+to import that page once startup modules are loaded, together with the
+heavy dependencies the page pulled in.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from src.ui.pages import PAGE_MODULES
+
+# Imported by streamlit_app.py on every run, before any page
+STARTUP_MODULES = (
+    "streamlit",
+    "src.common.logger",
+    "src.gmail_crew_ai.auth",
+    "src.ui.common",
+    "src.ui.session",
+    "src.ui.styles",
+    "src.ui.users",
+)
+
+# Dependencies that should only load with the pages that use them
+HEAVY_MODULES = ("crewai", "googleapiclient", "stripe", "pandas", "litellm")
+
+# Runs in the child interpreter: import the preloaded modules, then time the target
+_PROBE = r"""
+import importlib, json, sys, time
+sys.path.insert(0, {root!r})
+preload, target, heavy = {preload!r}, {target!r}, {heavy!r}
+result = {{"error": None}}
+try:
+    for name in preload:
+        importlib.import_module(name)
+    before = set(sys.modules)
+    started = time.perf_counter()
+    for name in target:
+        importlib.import_module(name)
+    result["seconds"] = time.perf_counter() - started
+    result["modules"] = len(set(sys.modules) - before)
+    result["heavy"] = sorted(h for h in heavy if h in sys.modules and h not in before)
+except Exception as e:
+    result["error"] = f"{{type(e).__name__}}: {{e}}"
+print(json.dumps(result))
+"""
+
+
+def measure(target: List[str], preload: List[str]) -> Dict:
+    """Import ``target`` in a fresh interpreter after ``preload``; return timing and loaded modules."""
+    code = _PROBE.format(root=ROOT, preload=list(preload), target=list(target), heavy=list(HEAVY_MODULES))
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT)
+    lines = completed.stdout.strip().splitlines()
+    if not lines:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "no output"}
+    return json.loads(lines[-1])
+
+
+def benchmark(repeat: int) -> List[Dict]:
+    """Median import time of the startup modules and of each page."""
+    rows = []
+    targets = [("startup", list(STARTUP_MODULES), [])]
+    targets += [(name.rsplit('.', 1)[-1], [name], list(STARTUP_MODULES)) for name in PAGE_MODULES]
+    for label, target, preload in targets:
+        runs = [measure(target, preload) for _ in range(repeat)]
+        failed = next((run for run in runs if run.get("error")), None)
+        if failed:
+            rows.append({"page": label, "error": failed["error"]})
+            continue
+        rows.append({
+            "page": label,
+            "median_ms": statistics.median(run["seconds"] for run in runs) * 1000,
+            "modules": runs[0]["modules"],
+            "heavy": runs[0]["heavy"],
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import cost of each Streamlit page")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rows = benchmark(max(args.repeat, 1))
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'Page':<12} {'Median ms':>10} {'Modules':>8}  Heavy imports")
+    for row in rows:
+        if row.get("error"):
+            print(f"{row['page']:<12} {'-':>10} {'-':>8}  import failed: {row['error']}")
+            continue
+        heavy = ", ".join(row["heavy"]) or "-"
+        print(f"{row['page']:<12} {row['median_ms']:>10.1f} {row['modules']:>8}  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -81,7 +81,7 @@ def cleanup_archived_json_files(days_old: int = 30) -> int:
     Remove archived .json files older than specified days.
     
     This includes files like:
-    - error_logs_YYYYMMDD.json
+    - error_logs_YYYYMMDD.json / error_logs_YYYYMMDD.jsonl
     - Any other archived JSON files with date patterns
     
     Args:
@@ -96,6 +96,7 @@ def cleanup_archived_json_files(days_old: int = 30) -> int:
     # Define patterns for archived JSON files
     json_patterns = [
         "error_logs_[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9].json",  # error_logs_YYYYMMDD.json
+        "error_logs_[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9].jsonl", # error_logs_YYYYMMDD.jsonl
         "*_[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9].json",           # Any file with YYYYMMDD pattern
         "*_[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9].json",         # Any file with YYYY-MM-DD pattern
     ]
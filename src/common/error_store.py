@@ -0,0 +1,382 @@
+"""
+Append-only structured error storage.
+
+Errors are appended as one JSON object per line to ``error_logs.jsonl``.
+Mutable state (resolved / deleted flags) lives in a small sidecar index so
+that recording an error never rewrites existing entries. Reads walk the log
+backwards, newest first, and stop as soon as a page has been filled.
+
+Daily rotation and retention run at most once per day in a background thread.
+"""
+
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from datetime import datetime, date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_ROTATED_PATTERN = re.compile(r"_(\d{8})\.jsonl?$")
+
+# Guards maintenance scheduling and per-file locks across all stores in this process
+_maintenance_lock = threading.Lock()
+_maintenance_days: Dict[str, str] = {}
+_file_locks: Dict[str, threading.Lock] = {}
+
+
+def _get_file_lock(path: str) -> threading.Lock:
+    """Get the lock shared by every store writing to ``path``."""
+    key = os.path.abspath(path)
+    with _maintenance_lock:
+        return _file_locks.setdefault(key, threading.Lock())
+
+
+class ErrorLogStore:
+    """JSONL error log with a sidecar index for resolved and deleted state."""
+
+    def __init__(self, log_file: str = "error_logs.jsonl", retention_days: int = 30,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the error store.
+
+        Args:
+            log_file: Path of the current JSONL error log
+            retention_days: Days to keep rotated error logs
+            logger: Logger used for maintenance messages
+        """
+        self.log_file = log_file
+        self.index_file = f"{os.path.splitext(log_file)[0]}.index.json"
+        self.legacy_file = f"{os.path.splitext(log_file)[0]}.json"
+        self.retention_days = retention_days
+        self.logger = logger or logging.getLogger(__name__)
+        self.lock = _get_file_lock(log_file)
+        self._migrate_legacy_file()
+
+    # ------------------------------------------------------------------
+    # Sidecar index
+    # ------------------------------------------------------------------
+
+    def _load_index(self) -> Dict:
+        """Load the sidecar index."""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            index = {}
+        except Exception as e:
+            self.logger.warning(f"Failed to load error index {self.index_file}: {e}")
+            index = {}
+        index.setdefault('resolved', [])
+        index.setdefault('deleted', [])
+        index.setdefault('last_maintenance', None)
+        return index
+
+    def _save_index(self, index: Dict):
+        """Atomically save the sidecar index."""
+        temp_file = f"{self.index_file}.tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(temp_file, self.index_file)
+        except Exception as e:
+            self.logger.error(f"Error saving error index: {e}")
+
+    def _update_index(self, key: str, error_id: str):
+        """Add an error id to one of the index sets."""
+        with self.lock:
+            index = self._load_index()
+            if error_id not in index[key]:
+                index[key].append(error_id)
+                self._save_index(index)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append(self, error_type: str, message: str, details: str = "", user_id: str = "") -> Dict:
+        """Append a new error entry and return it."""
+        entry = {
+            "id": str(uuid.uuid4()),
+            "timestamp": datetime.now().isoformat(),
+            "type": error_type,
+            "message": message,
+            "details": details,
+            "user_id": user_id,
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self.lock:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(line)
+        entry["resolved"] = False
+        return entry
+
+    def mark_resolved(self, error_id: str):
+        """Mark an error as resolved."""
+        self._update_index('resolved', error_id)
+
+    def delete(self, error_id: str):
+        """Hide an error; it is dropped from disk when the log rotates."""
+        self._update_index('deleted', error_id)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _iter_lines_reversed(self, block_size: int = 65536) -> Iterator[bytes]:
+        """Yield raw lines of the log file from the end towards the start."""
+        try:
+            f = open(self.log_file, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b''
+            while position > 0:
+                read_size = min(block_size, position)
+                position -= read_size
+                f.seek(position)
+                chunk = f.read(read_size) + remainder
+                lines = chunk.split(b'\n')
+                remainder = lines[0]
+                for line in reversed(lines[1:]):
+                    if line.strip():
+                        yield line
+            if remainder.strip():
+                yield remainder
+
+    def iter_errors(self, index: Optional[Dict] = None) -> Iterator[Dict]:
+        """Yield live (non-deleted) errors, newest first, with resolved state applied."""
+        index = index or self._load_index()
+        resolved = set(index['resolved'])
+        deleted = set(index['deleted'])
+        for line in self._iter_lines_reversed():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            error_id = entry.get('id')
+            if error_id in deleted:
+                continue
+            entry['resolved'] = error_id in resolved
+            yield entry
+
+    def query(self, error_type: Optional[str] = None, include_resolved: bool = False,
+              offset: int = 0, limit: int = 20) -> Tuple[List[Dict], bool]:
+        """
+        Page through errors, newest first.
+
+        Args:
+            error_type: Only return errors of this type (None for all)
+            include_resolved: Whether resolved errors are included
+            offset: Number of matching errors to skip
+            limit: Maximum number of errors to return
+
+        Returns:
+            Tuple of (errors, has_more)
+        """
+        page = []
+        skipped = 0
+        for entry in self.iter_errors():
+            if error_type and entry.get('type', '') != error_type:
+                continue
+            if not include_resolved and entry['resolved']:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            if len(page) == limit:
+                return page, True
+            page.append(entry)
+        return page, False
+
+    def stats(self) -> Dict[str, int]:
+        """Get total, resolved, unresolved and last-24h counts without parsing every entry."""
+        index = self._load_index()
+        total_lines = 0
+        try:
+            with open(self.log_file, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    total_lines += block.count(b'\n')
+        except FileNotFoundError:
+            pass
+
+        deleted = set(index['deleted'])
+        resolved = len(set(index['resolved']) - deleted)
+        total = max(0, total_lines - len(deleted))
+
+        # The log is time ordered, so only the tail has to be read for the recent count
+        cutoff = (datetime.now() - timedelta(days=1)).isoformat()
+        recent = 0
+        for entry in self.iter_errors(index):
+            if entry.get('timestamp', '') < cutoff:
+                break
+            recent += 1
+
+        return {
+            "total": total,
+            "resolved": resolved,
+            "unresolved": max(0, total - resolved),
+            "last_24h": recent,
+        }
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def schedule_daily_maintenance(self) -> bool:
+        """
+        Start rotation and retention in a background thread if not yet run today.
+
+        Returns:
+            True if a maintenance run was started
+        """
+        today = date.today().isoformat()
+        key = os.path.abspath(self.log_file)
+        with _maintenance_lock:
+            if _maintenance_days.get(key) == today:
+                return False
+            _maintenance_days[key] = today
+
+        if self._load_index().get('last_maintenance') == today:
+            return False
+
+        thread = threading.Thread(target=self.run_maintenance, name="error-log-maintenance", daemon=True)
+        thread.start()
+        return True
+
+    def run_maintenance(self) -> int:
+        """Rotate entries from previous days out of the current log and apply retention."""
+        try:
+            self._rotate_if_needed()
+            removed = self.cleanup_rotated_logs()
+            with self.lock:
+                index = self._load_index()
+                index['last_maintenance'] = date.today().isoformat()
+                self._save_index(index)
+            return removed
+        except Exception as e:
+            self.logger.error(f"Error during daily maintenance: {e}")
+            return 0
+
+    def _first_entry_date(self) -> Optional[date]:
+        """Date of the oldest entry in the current log, or None if it is empty."""
+        try:
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        return date.fromisoformat(json.loads(line)['timestamp'][:10])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            pass
+        return None
+
+    def _rotate_if_needed(self):
+        """Move entries written on previous days from the current log to a dated file.
+
+        The decision is based on the entries' own timestamps rather than the
+        file's mtime, so an append made today before maintenance ran does not
+        keep yesterday's entries in the current log.
+        """
+        first_date = self._first_entry_date()
+        if first_date is None or first_date >= date.today():
+            return
+
+        today = date.today().isoformat()
+        base = os.path.splitext(self.log_file)[0]
+        temp_file = f"{self.log_file}.tmp"
+
+        with self.lock:
+            index = self._load_index()
+            deleted = set(index['deleted'])
+            resolved = set(index['resolved'])
+            archived, kept_ids, last_date = [], set(), first_date
+            try:
+                # Archive older entries with deleted ones dropped and resolved state baked in;
+                # today's entries stay in the current log untouched
+                with open(self.log_file, 'r', encoding='utf-8') as src, \
+                        open(temp_file, 'w', encoding='utf-8') as current:
+                    for line in src:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        entry_day = str(entry.get('timestamp', ''))[:10]
+                        if entry_day >= today:
+                            current.write(line)
+                            kept_ids.add(entry.get('id'))
+                            continue
+                        try:
+                            last_date = max(last_date, date.fromisoformat(entry_day))
+                        except ValueError:
+                            pass
+                        if entry.get('id') in deleted:
+                            continue
+                        entry['resolved'] = entry.get('id') in resolved
+                        archived.append(json.dumps(entry, ensure_ascii=False) + "\n")
+
+                dated_filename = f"{base}_{last_date.strftime('%Y%m%d')}.jsonl"
+                with open(dated_filename, 'a', encoding='utf-8') as dst:
+                    dst.writelines(archived)
+                if kept_ids:
+                    os.replace(temp_file, self.log_file)
+                else:
+                    os.remove(temp_file)
+                    os.remove(self.log_file)
+            except OSError as e:
+                self.logger.warning(f"Failed to rotate error logs: {e}")
+                return
+
+            index['resolved'] = [error_id for error_id in index['resolved'] if error_id in kept_ids]
+            index['deleted'] = [error_id for error_id in index['deleted'] if error_id in kept_ids]
+            self._save_index(index)
+        self.logger.info(f"Rotated error logs to {dated_filename}")
+
+    def cleanup_rotated_logs(self) -> int:
+        """Remove rotated error logs older than the retention period."""
+        base = os.path.splitext(self.log_file)[0]
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        removed = 0
+
+        for old_file in glob.glob(f"{base}_????????.json*"):
+            match = _ROTATED_PATTERN.search(old_file)
+            if not match:
+                continue
+            try:
+                if datetime.strptime(match.group(1), '%Y%m%d') < cutoff:
+                    os.remove(old_file)
+                    removed += 1
+                    self.logger.info(f"Removed old rotated error log: {old_file}")
+            except (ValueError, OSError) as e:
+                self.logger.warning(f"Failed to process old log file {old_file}: {e}")
+
+        return removed
+
+    def _migrate_legacy_file(self):
+        """Convert a legacy ``error_logs.json`` array into the JSONL log."""
+        if os.path.exists(self.log_file) or not os.path.exists(self.legacy_file):
+            return
+
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                errors = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Failed to read legacy error log {self.legacy_file}: {e}")
+            return
+
+        with self.lock:
+            index = self._load_index()
+            # Legacy file is stored newest first; the JSONL log is oldest first
+            with open(self.log_file, 'w', encoding='utf-8') as f:
+                for entry in reversed(errors or []):
+                    if entry.pop('resolved', False):
+                        index['resolved'].append(entry.get('id'))
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._save_index(index)
+            os.remove(self.legacy_file)
+
+        self.logger.info(f"Migrated {len(errors or [])} errors from {self.legacy_file} to {self.log_file}")
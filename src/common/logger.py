@@ -3,17 +3,35 @@ Project-wide logging utility.
 
 Provides centralized logging configuration with:
 - File rotation (daily rotation, 14-day retention)
-- Streamlit integration when running in Streamlit context
+- Asynchronous writes: loggers only enqueue records; a single background
+  thread writes them to the log files and console, flushing once per batch
+- Rate-limited Streamlit integration (warnings and errors only)
 - Integration with existing ErrorLogger for exceptions
-- Consistent formatting across the project
+- Consistent formatting across the project, or one JSON object per line
+  with LOG_FORMAT=json
+- run_id, user_id, agent and task fields taken from log_context()
+- LOG_LEVEL (default INFO) and LOG_DEBUG_SAMPLE_RATE to keep a fraction of
+  DEBUG records
+
+Call flush_logging() before reading log files written by this process.
 """
 
+import atexit
+import contextvars
+import copy
+import json
 import logging
 import os
+import queue
+import random
 import sys
 import platform
-from logging.handlers import TimedRotatingFileHandler
-from typing import Optional
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, TimedRotatingFileHandler
+from typing import Any, Dict, Iterator, List, Optional
 
 # Import Windows-safe handler if on Windows
 if platform.system() == 'Windows':
@@ -29,6 +47,137 @@ else:
 # Global flag to track if logging has been configured
 _logging_configured = False
 
+# Records written per batch before handlers are flushed
+MAX_BATCH_RECORDS = 500
+
+# Streamlit shows at most this many log messages per window
+UI_MAX_MESSAGES = 3
+UI_WINDOW_SECONDS = 10.0
+
+# Records waiting for the background writer, and the writer itself
+_log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_log_writer: Optional["_LogWriter"] = None
+
+# Formats tracebacks on the logging thread, while the exception is still alive
+_traceback_formatter = logging.Formatter()
+
+# Correlation fields added to every record (see log_context)
+CONTEXT_FIELDS = ('run_id', 'user_id', 'agent', 'task')
+
+_log_context: contextvars.ContextVar = contextvars.ContextVar('log_context', default={})
+
+
+@contextmanager
+def log_context(**fields) -> Iterator[Dict[str, Any]]:
+    """
+    Attach correlation fields (run_id, user_id, agent, task) to records logged in the block.
+    
+    Nested blocks add to the outer fields; None values are ignored. The fields
+    follow the current thread or asyncio task (contextvars).
+    
+    Args:
+        **fields: Field values for the block
+    """
+    context = {**_log_context.get(), **{key: value for key, value in fields.items() if value is not None}}
+    token = _log_context.set(context)
+    try:
+        yield context
+    finally:
+        _log_context.reset(token)
+
+
+def get_log_context() -> Dict[str, Any]:
+    """Correlation fields active in the current context."""
+    return dict(_log_context.get())
+
+
+class _ContextFilter(logging.Filter):
+    """Copies the active log context onto records (on the logging thread, before queueing)."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        for field in CONTEXT_FIELDS:
+            # Values passed with extra= win over the context
+            if not hasattr(record, field):
+                setattr(record, field, context.get(field))
+        return True
+
+
+class _DebugSampler(logging.Filter):
+    """Keeps only a fraction of DEBUG records; other levels always pass."""
+    
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = min(max(rate, 0.0), 1.0)
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+# LogRecord attributes that are not user data (anything else came in via extra=)
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {
+    'message', 'asctime', 'log_route', 'taskName', *CONTEXT_FIELDS}
+
+# Serializer built once and shared by every JSON record
+_encode_json = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str).encode
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, with context fields and extra= data."""
+    
+    # Timestamp prefix of the last second formatted (records arrive in bursts)
+    _second = None
+    _second_text = ""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        seconds = int(record.created)
+        if seconds != self._second:
+            self._second = seconds
+            self._second_text = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(seconds))
+        entry = {
+            'ts': f"{self._second_text}.{int(record.msecs):03d}",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        if record.stack_info:
+            entry['stack_info'] = record.stack_info
+        return _encode_json(entry)
+
+
+def _log_level() -> int:
+    """Level of the INFO-level log files and console, from LOG_LEVEL."""
+    level = logging.getLevelName(os.getenv('LOG_LEVEL', 'INFO').strip().upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def _debug_sample_rate() -> float:
+    """Fraction of DEBUG records kept, from LOG_DEBUG_SAMPLE_RATE."""
+    try:
+        return float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1.0'))
+    except ValueError:
+        return 1.0
+
+
+def _make_formatter() -> logging.Formatter:
+    """Formatter for log files and the console, chosen by LOG_FORMAT (text or json)."""
+    if os.getenv('LOG_FORMAT', 'text').strip().lower() == 'json':
+        return JsonFormatter()
+    return logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
 
 def get_logger(name: str) -> logging.Logger:
     """
@@ -56,6 +205,122 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+class _BatchedFileHandler(RotatingFileHandler):
+    """Rotating file handler whose writes the log writer flushes once per batch."""
+    
+    deferred = False
+    
+    def flush(self):
+        # StreamHandler.emit flushes after every record; skip that while a batch is written
+        if not self.deferred:
+            super().flush()
+
+
+class _RouteQueueHandler(QueueHandler):
+    """Enqueues records for the log writer, tagged with the handlers that should write them."""
+    
+    def __init__(self, log_queue, route: str):
+        super().__init__(log_queue)
+        self.route = route
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Resolve the message and traceback now; the writer formats the rest."""
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _traceback_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        record.log_route = self.route
+        return record
+
+
+class _FlushRequest:
+    """Queue marker; set once every record queued before it has been written and flushed."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class _LogWriter(threading.Thread):
+    """Single background thread that writes queued records and flushes once per batch."""
+    
+    def __init__(self, log_queue, routes: Dict[str, List[logging.Handler]]):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = log_queue
+        self.routes = routes
+    
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            # Take whatever else is already waiting, so bursts share one flush
+            while len(batch) < MAX_BATCH_RECORDS:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+    
+    def _write(self, batch: list):
+        used = {}
+        flush_requests = []
+        for item in batch:
+            if isinstance(item, _FlushRequest):
+                flush_requests.append(item)
+                continue
+            for handler in self.routes.get(getattr(item, 'log_route', ''), ()):
+                if item.levelno < handler.level:
+                    continue
+                if id(handler) not in used:
+                    used[id(handler)] = handler
+                    if isinstance(handler, _BatchedFileHandler):
+                        handler.deferred = True
+                try:
+                    handler.handle(item)
+                except Exception:
+                    handler.handleError(item)
+        
+        for handler in used.values():
+            try:
+                if isinstance(handler, _BatchedFileHandler):
+                    handler.deferred = False
+                handler.flush()
+            except Exception as e:
+                print(f"Log flush failed: {e}", file=sys.__stderr__)
+        for request in flush_requests:
+            request.done.set()
+
+
+def _start_log_writer(routes: Dict[str, List[logging.Handler]]):
+    """Start the background writer for the shared queue."""
+    global _log_writer
+    _log_writer = _LogWriter(_log_queue, routes)
+    _log_writer.start()
+
+
+def _restart_log_writer_after_fork():
+    """Threads do not survive fork(); give the child its own writer for the inherited queue."""
+    if _log_writer is not None:
+        _start_log_writer(_log_writer.routes)
+
+
+def flush_logging(timeout: float = 5.0) -> bool:
+    """
+    Wait until every record logged so far has been written and flushed.
+    
+    Args:
+        timeout: Seconds to wait at most
+        
+    Returns:
+        True if the writer caught up in time (or logging is not configured)
+    """
+    if _log_writer is None or not _log_writer.is_alive():
+        return True
+    request = _FlushRequest()
+    _log_queue.put(request)
+    return request.done.wait(timeout)
+
+
 def _configure_logging():
     """Configure the root logger with handlers and formatting."""
     # Create logs directory if it doesn't exist
@@ -74,7 +339,15 @@ def _configure_logging():
     logger.handlers.clear()
     
     # Create common formatter
-    formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+    formatter = _make_formatter()
+    base_level = _log_level()
+    logger.setLevel(min(base_level, logging.INFO))
+    
+    # Run on the logging thread, so context variables and sampling apply before queueing
+    record_filters = [_DebugSampler(_debug_sample_rate()), _ContextFilter()]
+    
+    # Handlers run on the writer thread; loggers only get queue handlers
+    routes: Dict[str, List[logging.Handler]] = {}
     
     # Define log files with their respective handlers
     log_files = {
@@ -86,6 +359,8 @@ def _configure_logging():
     
     # Add file handlers with rotation for each log file
     for log_file, level in log_files.items():
+        if level == logging.INFO:
+            level = base_level
         # Create a specific logger for this file
         log_name = log_file.replace('logs/', '').replace('.log', '')
         specific_logger = logging.getLogger(log_name)
@@ -95,7 +370,7 @@ def _configure_logging():
         specific_logger.propagate = False  # Don't propagate to root logger
         
         # Use delay=True to avoid file locking issues on Windows
-        file_handler = RotatingFileHandler(
+        file_handler = _BatchedFileHandler(
             filename=log_file,
             when='midnight',
             backupCount=14,  # Keep 14 days of logs
@@ -107,37 +382,58 @@ def _configure_logging():
         
         # Set suffix for rotated files (YYYY-MM-DD format)
         file_handler.suffix = "%Y-%m-%d"
+        routes[log_name] = [file_handler]
         
-        # Add handler to specific logger instead of root logger
-        specific_logger.addHandler(file_handler)
+        # Add queue handler to specific logger instead of root logger
+        queue_handler = _RouteQueueHandler(_log_queue, log_name)
+        queue_handler.setLevel(level)
+        for record_filter in record_filters:
+            queue_handler.addFilter(record_filter)
+        specific_logger.addHandler(queue_handler)
         specific_logger.setLevel(level)
     
     # Add a general handler to the root logger for catch-all logging
     # Use delay=True to avoid file locking issues on Windows
-    general_handler = RotatingFileHandler(
+    general_handler = _BatchedFileHandler(
         filename='logs/app.log',
         when='midnight',
         backupCount=14,
         encoding='utf-8',
         delay=True  # Don't open file until first write
     )
-    general_handler.setLevel(logging.INFO)
+    general_handler.setLevel(base_level)
     general_handler.setFormatter(formatter)
     general_handler.suffix = "%Y-%m-%d"
-    logger.addHandler(general_handler)
+    routes['app'] = [general_handler]
     
     # Add Streamlit handler if running in Streamlit context
     if _is_streamlit_running():
+        # Streamlit renders only from the script thread, so this handler stays
+        # on the logging thread; it is limited to a few warnings and errors
         streamlit_handler = StreamlitHandler()
-        streamlit_handler.setLevel(logging.INFO)
         streamlit_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
         logger.addHandler(streamlit_handler)
     else:
         # Add console handler when not in Streamlit
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
-        logger.addHandler(console_handler)
+        console_handler.setLevel(base_level)
+        console_handler.setFormatter(formatter)
+        routes['app'].append(console_handler)
+    
+    root_queue_handler = _RouteQueueHandler(_log_queue, 'app')
+    root_queue_handler.setLevel(base_level)
+    for record_filter in record_filters:
+        root_queue_handler.addFilter(record_filter)
+    logger.addHandler(root_queue_handler)
+    
+    if _log_writer is None:
+        _start_log_writer(routes)
+        # Write out pending records before the interpreter exits
+        atexit.register(flush_logging, 2.0)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_restart_log_writer_after_fork)
+    else:
+        _log_writer.routes = routes
 
 
 def _is_streamlit_running() -> bool:
@@ -171,27 +467,61 @@ def _is_streamlit_running() -> bool:
 
 
 class StreamlitHandler(logging.Handler):
-    """Custom logging handler that routes log messages to Streamlit."""
+    """
+    Custom logging handler that routes warnings and errors to Streamlit.
+    
+    At most max_messages are shown per window; the rest only go to the log
+    files, and the next message shown says how many were left out.
+    """
+    
+    def __init__(self, level: int = logging.WARNING, max_messages: int = UI_MAX_MESSAGES,
+                 window_seconds: float = UI_WINDOW_SECONDS):
+        super().__init__(level)
+        self.max_messages = max_messages
+        self.window_seconds = window_seconds
+        self._shown = deque()
+        self.suppressed = 0
+    
+    def _allow(self) -> bool:
+        """Whether the rate limit leaves room for another message."""
+        now = time.monotonic()
+        while self._shown and now - self._shown[0] >= self.window_seconds:
+            self._shown.popleft()
+        if len(self._shown) >= self.max_messages:
+            return False
+        self._shown.append(now)
+        return True
     
     def emit(self, record):
         """Emit a log record to Streamlit."""
+        if not self._allow():
+            self.suppressed += 1
+            return
+        
+        msg = self.format(record)
+        if self.suppressed:
+            msg += f" ({self.suppressed} more log messages not shown)"
+            self.suppressed = 0
+        
         try:
             import streamlit as st
-            msg = self.format(record)
+            from streamlit.runtime.scriptrunner import get_script_run_ctx
+            
+            # Only the script thread can render; other threads' records stay in the files
+            if get_script_run_ctx() is None:
+                return
             
             # Route different log levels to appropriate Streamlit methods
             if record.levelno >= logging.ERROR:
                 st.error(msg)
             elif record.levelno >= logging.WARNING:
                 st.warning(msg)
-            elif record.levelno >= logging.INFO:
-                st.info(msg)
             else:
-                st.write(msg)
+                st.info(msg)
                 
         except Exception:
             # Fallback to print if Streamlit is not available
-            print(self.format(record))
+            print(msg)
 
 
 def get_auth_logger():
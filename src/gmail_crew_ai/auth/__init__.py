@@ -1,5 +1,18 @@
 """Authentication module for Gmail OAuth2 access."""
 
-from .oauth2_manager import OAuth2Manager
+import importlib
 
-__all__ = ['OAuth2Manager'] 
\ No newline at end of file
+__all__ = ['OAuth2Manager']
+
+
+def __getattr__(name):
+    """Import the OAuth2 manager (and the Google auth libraries) on first use."""
+    if name != 'OAuth2Manager':
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = importlib.import_module(".oauth2_manager", __name__).OAuth2Manager
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
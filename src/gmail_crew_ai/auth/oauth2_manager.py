@@ -1,16 +1,34 @@
 """OAuth2 authentication manager for Gmail access."""
 
 import os
+import sys
 import json
 import pickle
-from typing import Optional, Dict, Any
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-import streamlit as st
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from pathlib import Path
 
+# Google client libraries are imported where they are used, so importing the
+# manager stays cheap for workers and command-line runs.
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
+
+def _streamlit():
+    """The Streamlit module if the web app already loaded it, else None (never imports it)."""
+    return sys.modules.get("streamlit")
+
+
+def _notify(level: str, message):
+    """Show a message in the web app (st.error, st.warning, ...) or print it outside of it."""
+    st = _streamlit()
+    if st is not None:
+        try:
+            getattr(st, level)(message)
+            return
+        except Exception:
+            pass
+    print(message)
+
 
 class OAuth2Manager:
     """Manages OAuth2 authentication for Gmail access."""
@@ -39,6 +57,42 @@ class OAuth2Manager:
             self.credentials_file = credentials_file
             self.tokens_dir = Path("tokens")
         self.tokens_dir.mkdir(exist_ok=True)
+        # OAuth flows waiting for their callback when there is no Streamlit session
+        self._pending_flows: Dict[str, Any] = {}
+    
+    def _store_flow(self, key: str, flow):
+        """Keep an OAuth flow until its callback (in the Streamlit session when available)."""
+        st = _streamlit()
+        if st is not None:
+            try:
+                st.session_state[key] = flow
+                return
+            except Exception:
+                pass
+        self._pending_flows[key] = flow
+    
+    def _get_flow(self, key: str):
+        """The stored OAuth flow for a key, or None."""
+        st = _streamlit()
+        if st is not None:
+            try:
+                flow = st.session_state.get(key)
+                if flow is not None:
+                    return flow
+            except Exception:
+                pass
+        return self._pending_flows.get(key)
+    
+    def _drop_flow(self, key: str):
+        """Forget a stored OAuth flow."""
+        self._pending_flows.pop(key, None)
+        st = _streamlit()
+        if st is not None:
+            try:
+                if key in st.session_state:
+                    del st.session_state[key]
+            except Exception:
+                pass
         
     def get_authorization_url(self, user_id: str) -> str:
         """Get authorization URL for OAuth2 flow."""
@@ -51,6 +105,8 @@ class OAuth2Manager:
         # Use environment variable for redirect URI, fallback to default
         redirect_uri = os.getenv('OAUTH_REDIRECT_URI', 'http://localhost:8505')
         
+        from google_auth_oauthlib.flow import Flow
+        
         flow = Flow.from_client_secrets_file(
             self.credentials_file,
             scopes=self.SCOPES,
@@ -58,7 +114,7 @@ class OAuth2Manager:
         )
         
         # Store flow in session state for later use
-        st.session_state[f'oauth_flow_{user_id}'] = flow
+        self._store_flow(f'oauth_flow_{user_id}', flow)
         
         auth_url, _ = flow.authorization_url(
             access_type='offline',
@@ -74,7 +130,7 @@ class OAuth2Manager:
         try:
             print(f"🔐 Processing OAuth callback for user: {user_id}")
             flow_key = f'oauth_flow_{user_id}'
-            flow = st.session_state.get(flow_key)
+            flow = self._get_flow(flow_key)
             
             if not flow:
                 print(f"⚠️ No cached OAuth flow found for {user_id}, recreating...")
@@ -83,6 +139,8 @@ class OAuth2Manager:
                     # Use environment variable for redirect URI, fallback to default
                     redirect_uri = os.getenv('OAUTH_REDIRECT_URI', 'http://localhost:8505')
                     
+                    from google_auth_oauthlib.flow import Flow
+                    
                     flow = Flow.from_client_secrets_file(
                         self.credentials_file,
                         scopes=self.SCOPES,
@@ -91,7 +149,7 @@ class OAuth2Manager:
                     print("✅ OAuth flow recreated successfully")
                 except Exception as recreate_error:
                     print(f"❌ Failed to recreate OAuth flow: {recreate_error}")
-                    st.error(f"Failed to recreate OAuth flow: {recreate_error}")
+                    _notify('error', f"Failed to recreate OAuth flow: {recreate_error}")
                     return False
             else:
                 print("✅ Using cached OAuth flow")
@@ -108,14 +166,14 @@ class OAuth2Manager:
             # Validate credentials have essential fields
             if not hasattr(credentials, 'token') or credentials.token is None:
                 print("OAuth credentials missing access token")
-                st.error("🚫 OAuth authentication failed: No access token received")
+                _notify('error', "🚫 OAuth authentication failed: No access token received")
                 return False
             
             # Check for refresh token (warn but don't fail)
             if not hasattr(credentials, 'refresh_token') or credentials.refresh_token is None:
                 print("⚠️ OAuth credentials missing refresh token - token won't auto-refresh")
-                st.warning("⚠️ Login successful, but refresh token missing. You may need to re-authenticate more frequently.")
-                st.info("For better experience, revoke app access in Google Account settings and re-authenticate.")
+                _notify('warning', "⚠️ Login successful, but refresh token missing. You may need to re-authenticate more frequently.")
+                _notify('info', "For better experience, revoke app access in Google Account settings and re-authenticate.")
                 # Continue with authentication even without refresh token
             
             # Log warnings for optional fields that are missing (but don't fail)
@@ -146,12 +204,11 @@ class OAuth2Manager:
             # Verify saved credentials can be loaded
             loaded_creds = self.load_credentials(user_id)
             if not loaded_creds:
-                st.error("Failed to save OAuth credentials properly")
+                _notify('error', "Failed to save OAuth credentials properly")
                 return False
             
             # Clean up session state
-            if flow_key in st.session_state:
-                del st.session_state[flow_key]
+            self._drop_flow(flow_key)
             
             print(f"✅ OAuth credentials saved successfully for user: {user_id}")
             return True
@@ -162,30 +219,30 @@ class OAuth2Manager:
             
             # Provide more specific error messages
             if "invalid_grant" in error_msg.lower():
-                st.error("🔑 Authorization code expired or already used. Please try logging in again.")
+                _notify('error', "🔑 Authorization code expired or already used. Please try logging in again.")
             elif "credentials" in error_msg.lower():
-                st.error("🔐 OAuth credentials file issue. Please check your credentials.json file.")
+                _notify('error', "🔐 OAuth credentials file issue. Please check your credentials.json file.")
             elif "client_id" in error_msg.lower() or "client_secret" in error_msg.lower():
-                st.error("🔧 OAuth client configuration error. Please check your Google Cloud Console settings.")
+                _notify('error', "🔧 OAuth client configuration error. Please check your Google Cloud Console settings.")
             elif "redirect_uri" in error_msg.lower():
-                st.error("🌐 OAuth redirect URI mismatch. Please check your OAuth configuration.")
+                _notify('error', "🌐 OAuth redirect URI mismatch. Please check your OAuth configuration.")
             else:
-                st.error(f"🚫 Authentication failed: {error_msg}")
+                _notify('error', f"🚫 Authentication failed: {error_msg}")
             
             # Only show full exception in debug mode
             if os.getenv("DEBUG") == "true":
-                st.exception(e)
+                _notify('exception', e)
             
             return False
     
-    def save_credentials(self, user_id: str, credentials: Credentials):
+    def save_credentials(self, user_id: str, credentials: "Credentials"):
         """Save user credentials securely."""
         token_file = self.tokens_dir / f"{user_id}_token.pickle"
         
         with open(token_file, 'wb') as token:
             pickle.dump(credentials, token)
     
-    def load_credentials(self, user_id: str) -> Optional[Credentials]:
+    def load_credentials(self, user_id: str) -> Optional["Credentials"]:
         """Load user credentials."""
         # First try the standard pattern
         token_file = self.tokens_dir / f"{user_id}_token.pickle"
@@ -247,6 +304,7 @@ class OAuth2Manager:
             # Refresh credentials if expired
             if credentials and credentials.expired and credentials.refresh_token:
                 try:
+                    from google.auth.transport.requests import Request
                     credentials.refresh(Request())
                     self.save_credentials(user_id, credentials)
                 except Exception as refresh_error:
@@ -282,6 +340,8 @@ class OAuth2Manager:
         if not credentials:
             raise ValueError(f"No valid credentials found for user: {user_id}")
         
+        from googleapiclient.discovery import build
+        
         return build('gmail', 'v1', credentials=credentials, cache_discovery=False)
     
     def get_user_email(self, user_id: str) -> str:
@@ -311,6 +371,7 @@ class OAuth2Manager:
                 # Try to revoke the credentials
                 try:
                     if hasattr(credentials, 'revoke'):
+                        from google.auth.transport.requests import Request
                         credentials.revoke(Request())
                 except Exception:
                     pass  # Continue with token deletion even if revoke fails
@@ -3,12 +3,14 @@
 from .stripe_service import StripeService
 from .subscription_manager import SubscriptionManager
 from .usage_tracker import UsageTracker
+from .usage_ledger import UsageLedger
 from .models import SubscriptionPlan, UserSubscription, UsageRecord
 
 __all__ = [
     'StripeService',
     'SubscriptionManager', 
     'UsageTracker',
+    'UsageLedger',
     'SubscriptionPlan',
     'UserSubscription',
     'UsageRecord'
@@ -78,6 +78,27 @@ def show_usage_dashboard(usage_tracker: UsageTracker, user_id: str):
     else:
         st.success("✅ You have plenty of emails remaining for today.")
 
+    # Monthly totals and history come straight from the ledger rollups
+    monthly_usage = usage_tracker.get_monthly_usage(user_id)
+
+    st.markdown("### 📅 This Month")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric("Emails Processed", monthly_usage['emails'])
+
+    with col2:
+        st.metric("Tokens Used", f"{monthly_usage['tokens']:,}")
+
+    with col3:
+        st.metric("Processing Runs", monthly_usage['events'])
+
+    history = usage_tracker.get_usage_history(user_id, days=30)
+    if history:
+        st.markdown("### 📊 Last 30 Active Days")
+        st.bar_chart({day['date']: day['emails'] for day in history})
+
 
 def show_plan_comparison():
     """Show plan comparison table."""
@@ -0,0 +1,253 @@
+"""Append-only usage ledger with materialized daily and monthly rollups."""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, date
+from typing import Dict, List, Optional
+
+
+class UsageLedger:
+    """Append-only log of usage events with daily and monthly rollups.
+
+    Every usage event is appended as one JSON line to the event log. The rollup
+    file is only a checkpoint of the aggregated totals together with the byte
+    offset of the event log it covers, so it is rewritten periodically instead
+    of on every event and is brought up to date by replaying the log tail.
+    """
+
+    def __init__(self, events_file: str = "usage_events.jsonl",
+                 rollups_file: str = "usage_rollups.json",
+                 flush_interval: float = 30.0):
+        """
+        Initialize the ledger.
+
+        Args:
+            events_file: Path of the append-only JSONL event log
+            rollups_file: Path of the rollup checkpoint file
+            flush_interval: Minimum seconds between rollup checkpoints
+        """
+        self.events_file = events_file
+        self.rollups_file = rollups_file
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+
+        self._rollups: Dict[str, Dict] = {}
+        self._offset = 0
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+        self._load_rollups()
+        with self.lock:
+            self._catch_up()
+
+    def _load_rollups(self):
+        """Load the rollup checkpoint, discarding it if it does not match the log."""
+        try:
+            with open(self.rollups_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            offset = int(data.get('offset', 0))
+            log_size = os.path.getsize(self.events_file) if os.path.exists(self.events_file) else 0
+            if offset > log_size:
+                # Event log was truncated or replaced; rebuild from scratch
+                return
+            self._rollups = data.get('users', {})
+            self._offset = offset
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading usage rollups, rebuilding from event log: {e}")
+            self._rollups = {}
+            self._offset = 0
+
+    def _catch_up(self):
+        """Fold events appended since the last known offset into the rollups.
+
+        Must be called with ``self.lock`` held. This also picks up events
+        written by other processes sharing the same event log.
+        """
+        try:
+            if os.path.getsize(self.events_file) <= self._offset:
+                return
+        except OSError:
+            return
+
+        with open(self.events_file, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Partially written line; pick it up on the next pass
+                    break
+                self._offset += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(event)
+                self._dirty = True
+
+    def _apply(self, event: Dict):
+        """Apply a single event to the in-memory rollups."""
+        user_id = event.get('user_id', '')
+        timestamp = event.get('ts', '')
+        day = timestamp[:10]
+        month = timestamp[:7]
+        emails = int(event.get('emails', 0) or 0)
+        tokens = int(event.get('tokens', 0) or 0)
+        model = event.get('model') or ''
+
+        user = self._rollups.setdefault(user_id, {'daily': {}, 'monthly': {}})
+
+        daily = user['daily'].get(day)
+        if daily is None:
+            daily = {
+                'emails': 0,
+                'tokens': 0,
+                'events': 0,
+                'models': {},
+                'plan_type': event.get('plan_type', 'free'),
+                'daily_limit': event.get('daily_limit', 0),
+                'first_ts': timestamp,
+                'last_ts': timestamp,
+            }
+            user['daily'][day] = daily
+        daily['emails'] += emails
+        daily['tokens'] += tokens
+        daily['events'] += 1
+        daily['last_ts'] = timestamp
+        if not daily.get('daily_limit'):
+            daily['daily_limit'] = event.get('daily_limit', 0)
+        if model:
+            daily['models'][model] = daily['models'].get(model, 0) + tokens
+
+        monthly = user['monthly'].setdefault(month, {'emails': 0, 'tokens': 0, 'events': 0})
+        monthly['emails'] += emails
+        monthly['tokens'] += tokens
+        monthly['events'] += 1
+
+    def _maybe_flush(self):
+        """Checkpoint the rollups if the flush interval has elapsed."""
+        if self._dirty and time.monotonic() - self._last_flush >= self.flush_interval:
+            self._write_rollups()
+
+    def _write_rollups(self):
+        """Atomically write the rollup checkpoint. Requires ``self.lock``."""
+        temp_file = f"{self.rollups_file}.tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'offset': self._offset, 'users': self._rollups}, f)
+            os.replace(temp_file, self.rollups_file)
+            self._dirty = False
+            self._last_flush = time.monotonic()
+        except Exception as e:
+            print(f"Error saving usage rollups: {e}")
+
+    def append(self, user_id: str, emails: int = 0, tokens: int = 0, model: str = "",
+               plan_type: str = "free", daily_limit: int = 0,
+               timestamp: Optional[datetime] = None):
+        """
+        Append a usage event to the ledger.
+
+        Args:
+            user_id: User the usage belongs to
+            emails: Number of emails processed
+            tokens: Number of LLM tokens consumed
+            model: Model that consumed the tokens
+            plan_type: Plan type value at the time of the event
+            daily_limit: Daily email limit at the time of the event
+            timestamp: Event time, defaults to now
+        """
+        event = {
+            'user_id': user_id,
+            'ts': (timestamp or datetime.now()).isoformat(),
+            'emails': emails,
+            'tokens': tokens,
+            'model': model,
+            'plan_type': plan_type,
+            'daily_limit': daily_limit,
+        }
+        line = json.dumps(event, ensure_ascii=False) + '\n'
+
+        with self.lock:
+            try:
+                with open(self.events_file, 'a', encoding='utf-8') as f:
+                    f.write(line)
+            except Exception as e:
+                print(f"Error appending usage event: {e}")
+                return
+            self._catch_up()
+            self._maybe_flush()
+
+    def get_daily(self, user_id: str, day: Optional[str] = None) -> Optional[Dict]:
+        """Get the daily rollup for a user, defaulting to today."""
+        day = day or date.today().isoformat()
+        with self.lock:
+            self._catch_up()
+            daily = self._rollups.get(user_id, {}).get('daily', {}).get(day)
+            return dict(daily) if daily else None
+
+    def get_monthly(self, user_id: str, month: Optional[str] = None) -> Dict:
+        """Get the monthly rollup for a user, defaulting to the current month."""
+        month = month or date.today().isoformat()[:7]
+        with self.lock:
+            self._catch_up()
+            monthly = self._rollups.get(user_id, {}).get('monthly', {}).get(month)
+            return dict(monthly) if monthly else {'emails': 0, 'tokens': 0, 'events': 0}
+
+    def get_daily_history(self, user_id: str, days: int = 30) -> List[Dict]:
+        """Get the most recent daily rollups for a user, oldest first."""
+        with self.lock:
+            self._catch_up()
+            daily = self._rollups.get(user_id, {}).get('daily', {})
+            recent_days = sorted(daily)[-days:]
+            return [dict(daily[day], date=day) for day in recent_days]
+
+    def flush(self):
+        """Write the rollup checkpoint immediately if it has pending changes."""
+        with self.lock:
+            self._catch_up()
+            if self._dirty:
+                self._write_rollups()
+
+    def is_empty(self) -> bool:
+        """Check whether the ledger has recorded any events."""
+        with self.lock:
+            return not self._rollups and not os.path.exists(self.events_file)
+
+    def import_legacy_usage(self, usage_file: str) -> int:
+        """
+        Seed the ledger from a legacy ``usage.json`` snapshot.
+
+        Args:
+            usage_file: Path of the legacy usage file
+
+        Returns:
+            Number of daily records imported
+        """
+        try:
+            with open(usage_file, 'r', encoding='utf-8') as f:
+                usage = json.load(f)
+        except Exception:
+            return 0
+
+        imported = 0
+        for user_id, days in usage.items():
+            for day, record in sorted(days.items()):
+                created_at = record.get('created_at') or ''
+                if not created_at.startswith(day):
+                    created_at = f"{day}T00:00:00"
+                try:
+                    timestamp = datetime.fromisoformat(created_at)
+                except ValueError:
+                    timestamp = datetime.fromisoformat(f"{day}T00:00:00")
+                self.append(
+                    user_id=user_id,
+                    emails=record.get('emails_processed', 0),
+                    plan_type=record.get('plan_type', 'free'),
+                    daily_limit=record.get('daily_limit', 0),
+                    timestamp=timestamp,
+                )
+                imported += 1
+        self.flush()
+        return imported
@@ -1,77 +1,44 @@
 """Usage Tracker for monitoring email processing limits."""
 
-import json
 import os
 from datetime import datetime, date
-from typing import Dict
+from typing import Dict, List, Optional
 from .models import UsageRecord, PlanType
+from .usage_ledger import UsageLedger
 
 
 class UsageTracker:
     """Tracks user email processing usage."""
 
-    def __init__(self):
+    def __init__(self, ledger: Optional[UsageLedger] = None):
+        # Legacy snapshot file, imported into the ledger on first run
         self.usage_file = "usage.json"
-        self.ensure_usage_file()
-
-    def ensure_usage_file(self):
-        """Ensure usage file exists."""
-        if not os.path.exists(self.usage_file):
-            self.save_usage({})
-
-    def load_usage(self) -> Dict:
-        """Load usage records from file."""
-        try:
-            with open(self.usage_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return {}
-
-    def save_usage(self, usage: Dict):
-        """Save usage records to file."""
-        try:
-            with open(self.usage_file, 'w', encoding='utf-8') as f:
-                json.dump(usage, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error saving usage: {e}")
-
-    def record_usage(self, user_id: str, plan_type: PlanType, emails_processed: int, user_manager=None):
+        self.ledger = ledger or UsageLedger()
+        self.ensure_ledger()
+
+    def ensure_ledger(self):
+        """Seed an empty ledger from the legacy usage file if one exists."""
+        if self.ledger.is_empty() and os.path.exists(self.usage_file):
+            imported = self.ledger.import_legacy_usage(self.usage_file)
+            if imported:
+                print(f"Imported {imported} legacy usage records into the usage ledger")
+
+    def record_usage(self, user_id: str, plan_type: PlanType, emails_processed: int, user_manager=None,
+                     tokens_used: int = 0, model: str = ""):
         """Record usage for a user."""
-        usage = self.load_usage()
-        today_str = date.today().isoformat()
-
-        if user_id not in usage:
-            usage[user_id] = {}
-
-        if today_str not in usage[user_id]:
-            # Set daily limit (unlimited for admins)
-            daily_limit = self.determine_daily_limit(plan_type)
-            if user_manager and user_manager.is_admin(user_id):
-                daily_limit = 999999  # Effectively unlimited
-                
-            usage[user_id][today_str] = UsageRecord(
-                user_id=user_id,
-                date=today_str,
-                emails_processed=0,
-                daily_limit=daily_limit,
-                plan_type=plan_type,
-                created_at=datetime.now(),
-                updated_at=datetime.now()
-            ).to_dict()
-
-        record = UsageRecord.from_dict(usage[user_id][today_str])
-        record.emails_processed += emails_processed
-        
-        # Ensure daily limit is set correctly (including for admin users)
-        if not record.daily_limit or record.daily_limit == 0:
-            record.daily_limit = self.determine_daily_limit(plan_type)
-            if user_manager and user_manager.is_admin(user_id):
-                record.daily_limit = 999999  # Effectively unlimited
-                
-        record.updated_at = datetime.now()
+        # Set daily limit (unlimited for admins)
+        daily_limit = self.determine_daily_limit(plan_type)
+        if user_manager and user_manager.is_admin(user_id):
+            daily_limit = 999999  # Effectively unlimited
 
-        usage[user_id][today_str] = record.to_dict()
-        self.save_usage(usage)
+        self.ledger.append(
+            user_id=user_id,
+            emails=emails_processed,
+            tokens=tokens_used,
+            model=model,
+            plan_type=plan_type.value,
+            daily_limit=daily_limit
+        )
 
     def determine_daily_limit(self, plan_type: PlanType) -> int:
         """Determine daily limit based on plan type."""
@@ -90,11 +57,19 @@ class UsageTracker:
 
     def get_usage_for_today(self, user_id: str, user_manager=None) -> UsageRecord:
         """Get today's usage record for a user."""
-        usage = self.load_usage()
         today_str = date.today().isoformat()
+        daily = self.ledger.get_daily(user_id, today_str)
 
-        if user_id in usage and today_str in usage[user_id]:
-            record = UsageRecord.from_dict(usage[user_id][today_str])
+        if daily:
+            record = UsageRecord(
+                user_id=user_id,
+                date=today_str,
+                emails_processed=daily['emails'],
+                daily_limit=daily.get('daily_limit') or self.determine_daily_limit(PlanType(daily.get('plan_type', 'free'))),
+                plan_type=PlanType(daily.get('plan_type', 'free')),
+                created_at=datetime.fromisoformat(daily['first_ts']),
+                updated_at=datetime.fromisoformat(daily['last_ts'])
+            )
             # Set unlimited limit for admin users
             if user_manager and user_manager.is_admin(user_id):
                 record.daily_limit = 999999  # Effectively unlimited
@@ -120,7 +95,18 @@ class UsageTracker:
         # Check if user is admin (unlimited emails)
         if user_manager and user_manager.is_admin(user_id):
             return True
-        
-        usage_record = self.get_usage_for_today(user_id)
-        return usage_record.emails_processed < usage_record.daily_limit
 
+        daily = self.ledger.get_daily(user_id)
+        if not daily:
+            return self.determine_daily_limit(PlanType.FREE) > 0
+
+        daily_limit = daily.get('daily_limit') or self.determine_daily_limit(PlanType.FREE)
+        return daily['emails'] < daily_limit
+
+    def get_monthly_usage(self, user_id: str, month: Optional[str] = None) -> Dict:
+        """Get the monthly usage rollup (emails, tokens, events) for a user."""
+        return self.ledger.get_monthly(user_id, month)
+
+    def get_usage_history(self, user_id: str, days: int = 30) -> List[Dict]:
+        """Get daily usage rollups for the most recent active days, oldest first."""
+        return self.ledger.get_daily_history(user_id, days)
@@ -0,0 +1,235 @@
+"""Headless command-line runner for scheduled email processing.
+
+Runs the OAuth2 crew for one user, several users or every approved user
+without the Streamlit UI, prints a JSON summary with timings to stdout and
+exits non-zero when a run fails. Progress and crew output go to stderr, so
+stdout carries nothing but the summary. Run it from the app's working
+directory, where users.json and tokens/ live.
+
+Usage:
+    python -m gmail_crew_ai.cli --user USER_ID_OR_EMAIL [--user ...] [--query is:unread] [--limit 10]
+    python -m gmail_crew_ai.cli --all-approved --model openai/gpt-4.1
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .jobs import COMPLETED, JobSpec, execute_job, format_event, run_crew_job
+from .utils.run_workspace import collect_garbage
+
+
+# Exit codes
+EXIT_OK = 0
+EXIT_RUN_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+# API keys a user can store in users.json
+API_KEY_TYPES = ('anthropic', 'openai', 'do_ai')
+
+
+class CliError(Exception):
+    """Invalid arguments or user selection; reported with EXIT_USAGE."""
+
+
+class _ProgressPrinter:
+    """Event sink for execute_job that writes progress lines to stderr."""
+
+    def __init__(self, quiet: bool = False):
+        self.quiet = quiet
+
+    def put(self, event: Dict[str, Any]):
+        if not self.quiet:
+            print(format_event(event), file=sys.stderr, flush=True)
+
+
+def load_users(users_file: str) -> Dict[str, Dict[str, Any]]:
+    """Load the user registry written by the web app."""
+    try:
+        with open(users_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise CliError(f"Users file not found: {users_file}")
+    except json.JSONDecodeError as e:
+        raise CliError(f"Users file {users_file} is not valid JSON: {e}")
+
+
+def resolve_users(users: Dict[str, Dict[str, Any]], requested: List[str], all_approved: bool = False) -> List[str]:
+    """
+    Turn --user values (IDs or email addresses) and --all-approved into user IDs.
+
+    Raises:
+        CliError: If a user is unknown or not approved, or nobody was selected
+    """
+    by_email = {data.get('email', '').lower(): user_id for user_id, data in users.items()}
+    selected = []
+    for value in requested:
+        user_id = value if value in users else by_email.get(value.lower())
+        if user_id is None:
+            raise CliError(f"Unknown user: {value}")
+        if users[user_id].get('status') != 'approved':
+            raise CliError(f"User {value} is not approved (status: {users[user_id].get('status')})")
+        if user_id not in selected:
+            selected.append(user_id)
+
+    if all_approved:
+        selected += [user_id for user_id, data in users.items()
+                     if data.get('status') == 'approved' and user_id not in selected]
+
+    if not selected:
+        raise CliError("No users selected")
+    return selected
+
+
+def _api_key_manager():
+    """The app's API key decryption, if importable from this process."""
+    for module in ('common.security', 'src.common.security'):
+        try:
+            return __import__(module, fromlist=['APIKeyManager']).APIKeyManager()
+        except ImportError:
+            continue
+        except Exception as e:
+            print(f"Could not initialize API key decryption: {e}", file=sys.stderr)
+            return None
+    return None
+
+
+def user_api_keys(user_data: Dict[str, Any], key_manager=None) -> Dict[str, str]:
+    """
+    API keys a user stored in the web app, decrypted where needed.
+
+    Keys that cannot be decrypted are left out, so the crew falls back to the
+    environment's keys just like the web app does.
+    """
+    stored = user_data.get('api_keys') or {}
+    keys = {}
+    for key_type in API_KEY_TYPES:
+        value = stored.get(key_type)
+        if not value:
+            continue
+        if not stored.get(f"{key_type}_encrypted", True):
+            keys[key_type] = value
+            continue
+        if key_manager is None:
+            print(f"Skipping encrypted {key_type} key: decryption unavailable", file=sys.stderr)
+            continue
+        try:
+            decrypted = key_manager.retrieve_api_key(value)
+            if decrypted:
+                keys[key_type] = decrypted
+        except Exception as e:
+            print(f"Could not decrypt {key_type} key: {e}", file=sys.stderr)
+    return keys
+
+
+def run_user(spec: JobSpec, quiet: bool = False,
+             target: Callable[..., Dict[str, Any]] = run_crew_job) -> Dict[str, Any]:
+    """Run one user's crew in this process; returns the job outcome with its duration."""
+    # Drop old run workspaces; runs here are sequential, so only this one is active
+    try:
+        collect_garbage(protect=[spec.output_dir])
+    except Exception as e:
+        print(f"Error cleaning up old run workspaces: {e}", file=sys.stderr)
+
+    started = time.perf_counter()
+    # Crew verbose output and prints would otherwise land in the JSON on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        final = execute_job(spec.to_dict(), _ProgressPrinter(quiet), {}, target=target)
+    outcome = {
+        'user_id': spec.user_id,
+        'job_id': spec.job_id,
+        'status': final['status'],
+        'error': final['error'],
+        'seconds': round(time.perf_counter() - started, 3),
+        'result': final['result'],
+    }
+    if final.get('traceback') and not quiet:
+        print(final['traceback'], file=sys.stderr)
+    return outcome
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="gmail_crew_cli",
+        description="Process Gmail for one or more users without the web UI and print a JSON summary.")
+    parser.add_argument("--user", action="append", default=[], metavar="USER",
+                        help="User ID or email address (repeatable)")
+    parser.add_argument("--all-approved", action="store_true", help="Process every approved user")
+    parser.add_argument("--query", default="is:unread", help="Gmail search query (default: is:unread)")
+    parser.add_argument("--limit", type=int, default=10, help="Maximum emails per user (default: 10)")
+    parser.add_argument("--model", default=None,
+                        help=f"LLM model (default: $MODEL or {JobSpec.model})")
+    parser.add_argument("--users-file", default="users.json", help="User registry (default: users.json)")
+    parser.add_argument("--fail-fast", action="store_true", help="Stop after the first failed user")
+    parser.add_argument("--quiet", action="store_true", help="Do not print progress to stderr")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, target: Callable[..., Dict[str, Any]] = run_crew_job) -> int:
+    """
+    Command-line entry point.
+
+    Returns:
+        EXIT_OK if every run completed, EXIT_RUN_FAILED if any failed,
+        EXIT_USAGE for invalid arguments, EXIT_INTERRUPTED on Ctrl+C
+    """
+    args = build_parser().parse_args(argv)
+
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    try:
+        if args.limit <= 0:
+            raise CliError("--limit must be positive")
+        users = load_users(args.users_file)
+        user_ids = resolve_users(users, args.user, args.all_approved)
+    except CliError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    model = args.model or os.getenv("MODEL") or JobSpec.model
+    key_manager = _api_key_manager() if any(users[user_id].get('api_keys') for user_id in user_ids) else None
+
+    started = time.perf_counter()
+    runs = []
+    interrupted = False
+    try:
+        for user_id in user_ids:
+            spec = JobSpec(user_id=user_id, model=model, search_query=args.query, max_emails=args.limit,
+                           user_api_keys=user_api_keys(users[user_id], key_manager))
+            runs.append(run_user(spec, quiet=args.quiet, target=target))
+            if args.fail_fast and runs[-1]['status'] != COMPLETED:
+                break
+    except KeyboardInterrupt:
+        interrupted = True
+
+    failed = [run for run in runs if run['status'] != COMPLETED]
+    summary = {
+        'model': model,
+        'query': args.query,
+        'limit': args.limit,
+        'users': len(user_ids),
+        'completed': len(runs) - len(failed),
+        'failed': len(failed),
+        'skipped': len(user_ids) - len(runs),
+        'interrupted': interrupted,
+        'seconds': round(time.perf_counter() - started, 3),
+        'runs': runs,
+    }
+    print(json.dumps(summary, indent=2, default=str))
+
+    if interrupted:
+        return EXIT_INTERRUPTED
+    return EXIT_RUN_FAILED if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 import os
 import json
-from datetime import datetime, date
 from typing import Dict, Any
 from crewai import Agent, Crew, Process, Task, LLM
 from crewai.project import CrewBase, agent, crew, task, before_kickoff
@@ -15,6 +14,7 @@ from gmail_crew_ai.tools import (
 )
 from gmail_crew_ai.tools.file_tools import FileReadTool
 from gmail_crew_ai.tools.enhanced_tools_config import basic_tools_config
+from gmail_crew_ai.utils.email_wire import dumps_compact, encode_emails
 from gmail_crew_ai.models import EmailDetails, CategorizedEmailsList, OrganizedEmailsList, EmailResponsesList, EmailCleanupReport
 
 @CrewBase
@@ -68,6 +68,8 @@ class GmailCrewAi():
 	@before_kickoff
 	def fetch_emails(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
 		"""Fetch emails before starting the crew and calculate ages."""
+		# Task prompts read their input files from {output_dir}
+		inputs.setdefault('output_dir', 'output')
 		# Fetching emails and calculating ages
 		
 		try:
@@ -81,21 +83,11 @@ class GmailCrewAi():
 			else:
 				emails = emails_data
 			
-			# Calculate email ages
-			for email in emails:
-				if 'date' in email:
-					try:
-						email_date = datetime.fromisoformat(email['date'].replace('Z', '+00:00'))
-						age_days = (datetime.now().replace(tzinfo=email_date.tzinfo) - email_date).days
-						email['age_days'] = age_days
-					except Exception as e:
-						pass  # Error calculating age
-						email['age_days'] = 0
-			
-			# Save to file for agents to read
+			# Save in the compact format the task prompts describe; ages are calculated by the encoder
+			wire_emails, _ = encode_emails([tuple(email) for email in emails or []])
 			os.makedirs('output', exist_ok=True)
-			with open('output/fetched_emails.json', 'w') as f:
-				json.dump(emails, f, indent=2)
+			with open('output/fetched_emails.json', 'w', encoding='utf-8') as f:
+				f.write(dumps_compact(wire_emails))
 			
 			# Fetched emails with age calculations
 			return inputs
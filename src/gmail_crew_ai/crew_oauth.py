@@ -1,9 +1,6 @@
 #!/usr/bin/env python
 import sys
 import os
-import json
-from datetime import datetime, date
-from pathlib import Path
 from typing import Dict, Any, Optional
 
 from dotenv import load_dotenv
@@ -34,12 +31,33 @@ except ImportError:
     OAuth2Manager = None  # type: ignore
     OAUTH2_AVAILABLE = False
 
+# Shared rate limiting with per-model backoff
+try:
+    from .utils.adaptive_limiter import install_litellm_callbacks, select_model
+except ImportError:
+    install_litellm_callbacks = None  # type: ignore
+    select_model = None  # type: ignore
+
+# Token and cost accounting per session, agent and task
+try:
+    from .utils.token_tracker import install_token_tracking
+except ImportError:
+    install_token_tracking = None  # type: ignore
+
+# Typed progress events (agents, tasks, tools, LLM calls) for the activity log
+try:
+    from .utils.progress_events import install_progress_events
+except ImportError:
+    install_progress_events = None  # type: ignore
+
 from crewai import LLM
 from .tools.date_tools import (
     DateCalculationTool
 )
-from .tools.file_tools import FileReadTool, JsonFileReadTool, JsonFileSaveTool
-from .models import EmailDetails
+from .tools.file_tools import FileReadTool, JsonFileReadTool, JsonFileSaveTool, UserFactsReadTool
+from .utils.email_wire import encode_emails, dumps_compact
+from .utils.context_projection import PROJECTION_KEY, get_task_projection
+from .utils.run_workspace import RunWorkspace
 
 
 @CrewBase
@@ -49,16 +67,24 @@ class OAuth2GmailCrewAi:
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
 
-    def __init__(self, user_id=None, oauth_manager=None, user_api_keys=None):
+    def __init__(self, user_id=None, oauth_manager=None, user_api_keys=None, run_id=None,
+                 model=None, search_query=None):
         """Initialize crew with OAuth2 authentication."""
         # Use provided parameters or fall back to environment variable
         self.user_id = user_id or os.environ.get("CURRENT_USER_ID")
         self.oauth_manager = oauth_manager
         self.user_api_keys = user_api_keys or {}
+        # Per-run settings are passed explicitly; the environment is only a fallback
+        self.model = model
+        self.search_query = search_query
         
         if not self.user_id:
             raise ValueError("User ID must be provided either as parameter or CURRENT_USER_ID environment variable")
         
+        # Reports of this run go to their own workspace so concurrent runs never collide
+        self.workspace = RunWorkspace(self.user_id, run_id).create()
+        self.run_id = self.workspace.run_id
+        
         # Initialize email tracker for this user
         self.email_tracker = EmailTracker(self.user_id) if EmailTracker else None
             
@@ -94,14 +120,24 @@ class OAuth2GmailCrewAi:
             OAuth2EmptyTrashTool(user_id=self.user_id, oauth_manager=self.oauth_manager)
         ]
 
+    def _read_tool(self, task_name: str) -> FileReadTool:
+        """FileReadTool limited to the fields the task declares in its context_projection."""
+        return FileReadTool(projection=get_task_projection(self.tasks_config.get(task_name, {}), self.workspace.dir))
+
+    def _task_config(self, task_name: str) -> Dict[str, Any]:
+        """Task config without the projection, which is only read by the tools."""
+        return {key: value for key, value in self.tasks_config[task_name].items() if key != PROJECTION_KEY}
+
     @before_kickoff
     def prepare_emails(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """Fetch emails using OAuth2 authentication."""
         # Fetching emails using OAuth2
         
-        # Ensure output directory exists
-        output_dir = Path("output")
-        output_dir.mkdir(exist_ok=True)
+        # Task prompts read and write files under {output_dir}
+        inputs['output_dir'] = self.workspace.dir
+        inputs['run_id'] = self.run_id
+        fetched_file = self.workspace.path('fetched_emails.json')
+        self._write_fetched_emails(fetched_file, [])
         
         # Get email limit from inputs (default to 10 for OAuth2)
         email_limit = inputs.get('email_limit', 10)
@@ -115,7 +151,7 @@ class OAuth2GmailCrewAi:
             tool = OAuth2GetUnreadEmailsTool(user_id=self.user_id, oauth_manager=self.oauth_manager)
 
             # Fetch emails
-            raw_emails = tool._run(max_emails=email_limit)
+            raw_emails = tool._run(max_emails=email_limit, search_query=self.search_query)
             
             if not raw_emails:
                 # No unread emails found
@@ -145,68 +181,53 @@ class OAuth2GmailCrewAi:
                 print("ℹ️  All fetched emails have been previously processed")
                 return inputs
 
-            # Process emails into EmailDetails format
-            emails = []
-            processed_ids = []
-            for subject, sender, body, email_id, thread_info in emails_to_process:
-                processed_ids.append(email_id)
-                # Limit body content to optimize token usage (targeting 500-1000 tokens per email)
-                # Keep only first 200 characters which should contain the most important content
-                limited_body = body[:200] + "... [Body truncated for efficiency]" if len(body) > 200 else body
-                
-                email_detail = EmailDetails(
-                    email_id=email_id,
-                    subject=subject,
-                    sender=sender,
-                    body=f"EMAIL DATE: {thread_info.get('date', '')}\n\n{limited_body}",
-                    date=thread_info.get('date', ''),
-                    thread_info=thread_info,
-                    age_days=None,
-                    is_part_of_thread=thread_info.get('is_part_of_thread', False),
-                    thread_size=thread_info.get('thread_size', 1),
-                    thread_position=thread_info.get('thread_position', 1)
-                )
-
-                # Calculate age
-                try:
-                    if email_detail.date:
-                        email_date = datetime.strptime(email_detail.date, "%Y-%m-%d")
-                        today = datetime.now()
-                        email_detail.age_days = (today - email_date).days
-                except Exception as e:
-                    # Error calculating age for email date
-                    email_detail.age_days = None
-
-                emails.append(email_detail.dict())
+            # Write the compact agent-facing format: short keys, true flags only,
+            # no indentation (see utils/email_wire.py for the key legend)
+            emails, token_report = encode_emails(emails_to_process)
+            processed_ids = [email['id'] for email in emails]
+            for entry in token_report:
+                print(f"📏 Email {entry['email_id']}: ~{entry['tokens']} tokens (was ~{entry['verbose_tokens']})")
+            total_tokens = sum(entry['tokens'] for entry in token_report)
+            verbose_tokens = sum(entry['verbose_tokens'] for entry in token_report)
+            print(f"📏 fetched_emails.json: ~{total_tokens} tokens for {len(emails)} emails (was ~{verbose_tokens})")
 
             # Save emails to file with UTF-8 encoding
-            with open('output/fetched_emails.json', 'w', encoding='utf-8') as f:
-                json.dump(emails, f, indent=2, ensure_ascii=False)
+            self._write_fetched_emails(fetched_file, emails)
 
             # Store processed email IDs for later tracking
             inputs['processed_email_ids'] = processed_ids
             
-            # Fetched and saved emails to output/fetched_emails.json
+            # Fetched and saved emails to the run workspace
             return inputs
 
         except Exception as e:
             # Error fetching emails
             return inputs
 
+    def _write_fetched_emails(self, file_path: str, emails: list):
+        """Write the agent-facing email list, UTF-8 encoded."""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(dumps_compact(emails))
+
     def _setup_llm(self):
         """Setup LLM with user-specific API keys and environment fallback."""
         # Ensure environment variables are loaded with override
         load_dotenv(override=True)
         
-        # Get model from environment with smart fallback
-        model = os.getenv("MODEL", "openai/gpt-4.1")
+        # Use the model chosen for this run, else the environment with smart fallback
+        model = self.model or os.getenv("MODEL", "openai/gpt-4.1")
+        
+        # Pace LLM calls through the shared limiter and adapt to provider headers
+        if install_litellm_callbacks:
+            install_litellm_callbacks()
+        if install_token_tracking:
+            install_token_tracking()
+        if install_progress_events:
+            install_progress_events()
         
-        # Check if we're in a rate limit retry scenario
-        if os.getenv("RATE_LIMIT_FALLBACK") == "true":
-            # Switch to OpenAI model as fallback
-            if "claude" in model.lower() or "anthropic" in model.lower():
-                model = "openai/gpt-4-turbo-preview"
-                print(f"Rate limit detected, switching to fallback model: {model}")
+        # Switch to the OpenAI fallback after repeated rate limits on this model
+        if select_model:
+            model = select_model(model)
         
         # Helper function to get API key with user preference and environment fallback
         def get_api_key_with_fallback(key_type: str) -> str:
@@ -328,7 +349,7 @@ class OAuth2GmailCrewAi:
             goal=config['goal'],
             backstory=config['backstory'],
             memory=config.get('memory', True),
-            tools=[FileReadTool()],
+            tools=[self._read_tool('categorization_task')],
             llm=self.llm
         )
 
@@ -342,7 +363,7 @@ class OAuth2GmailCrewAi:
             goal=config['goal'],
             backstory=config['backstory'],
             memory=config.get('memory', True),
-            tools=[*gmail_tools, FileReadTool()],
+            tools=[*gmail_tools, self._read_tool('organization_task')],
             llm=self.llm
         )
 
@@ -358,7 +379,7 @@ class OAuth2GmailCrewAi:
             goal=config['goal'], 
             backstory=config['backstory'],
             memory=config.get('memory', True),
-            tools=[*gmail_tools, search_tool, FileReadTool()],
+            tools=[*gmail_tools, search_tool, self._read_tool('response_task'), UserFactsReadTool(user_id=self.user_id)],
             llm=self.llm,
             allow_delegation=False,  # Explicitly disable delegation to ensure tools are used directly
             verbose=True,  # Enable verbose mode to see tool execution
@@ -376,7 +397,7 @@ class OAuth2GmailCrewAi:
             goal=config['goal'],
             backstory=config['backstory'],
             memory=config.get('memory', True),
-            tools=[*gmail_tools, DateCalculationTool(), FileReadTool()],
+            tools=[*gmail_tools, DateCalculationTool(), self._read_tool('cleanup_task')],
             llm=self.llm
         )
 
@@ -384,36 +405,36 @@ class OAuth2GmailCrewAi:
     def categorization_task(self) -> Task:
         """The email categorization task."""
         return Task(
-            config=self.tasks_config['categorization_task'],
+            config=self._task_config('categorization_task'),
             agent=self.categorizer(),
-            output_file="output/categorization_report.json"
+            output_file=self.workspace.path('categorization_report.json')
         )
 
     @task
     def organization_task(self) -> Task:
         """The email organization task."""
         return Task(
-            config=self.tasks_config['organization_task'],
+            config=self._task_config('organization_task'),
             agent=self.organizer(),
-            output_file="output/organization_report.json"
+            output_file=self.workspace.path('organization_report.json')
         )
 
     @task
     def response_task(self) -> Task:
         """The email response task."""
         return Task(
-            config=self.tasks_config['response_task'],
+            config=self._task_config('response_task'),
             agent=self.response_generator(),
-            output_file="output/response_report.json"
+            output_file=self.workspace.path('response_report.json')
         )
 
     @task
     def cleanup_task(self) -> Task:
         """The email cleanup task."""
         return Task(
-            config=self.tasks_config['cleanup_task'],
+            config=self._task_config('cleanup_task'),
             agent=self.cleaner(),
-            output_file="output/cleanup_report.json"
+            output_file=self.workspace.path('cleanup_report.json')
         )
 
     @crew
@@ -448,18 +469,23 @@ class OAuth2GmailCrewAi:
             return "unknown@user.com"
 
 
-def create_crew_for_user(user_id: str, oauth_manager, user_api_keys: dict = None) -> OAuth2GmailCrewAi:
+def create_crew_for_user(user_id: str, oauth_manager, user_api_keys: dict = None, run_id: str = None,
+                         model: str = None, search_query: str = None) -> OAuth2GmailCrewAi:
     """Create and configure a crew for a specific user with OAuth2 authentication.
     
     Args:
         user_id: The unique identifier for the user
         oauth_manager: The OAuth2Manager instance for the user
         user_api_keys: Optional dict with user-specific API keys {'anthropic': 'key', 'openai': 'key'}
+        run_id: Optional run identifier; names the run's output workspace
+        model: Optional LLM model for this run (default: $MODEL)
+        search_query: Optional Gmail search query (default: $GMAIL_SEARCH_QUERY or 'is:unread')
         
     Returns:
         OAuth2GmailCrewAi: Configured crew instance for the user
     """
     # Create a new crew instance with the user_id, oauth_manager, and user API keys
-    crew_instance = OAuth2GmailCrewAi(user_id=user_id, oauth_manager=oauth_manager, user_api_keys=user_api_keys)
+    crew_instance = OAuth2GmailCrewAi(user_id=user_id, oauth_manager=oauth_manager, user_api_keys=user_api_keys,
+                                      run_id=run_id, model=model, search_query=search_query)
     
     return crew_instance 
\ No newline at end of file
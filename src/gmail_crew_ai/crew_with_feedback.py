@@ -17,6 +17,7 @@ from gmail_crew_ai.tools import (
 )
 from gmail_crew_ai.tools.file_tools import FileReadTool
 from gmail_crew_ai.tools.enhanced_tools_config import basic_tools_config
+from gmail_crew_ai.utils.email_wire import dumps_compact, encode_emails
 from gmail_crew_ai.models import EmailDetails, CategorizedEmailsList, OrganizedEmailsList, EmailResponsesList, EmailCleanupReport
 
 
@@ -61,6 +62,8 @@ class GmailCrewAiWithFeedback():
     @before_kickoff
     def fetch_emails_and_prepare(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """Fetch emails and prepare system for processing."""
+        # Task prompts read their input files from {output_dir}
+        inputs.setdefault('output_dir', 'output')
         print("🔍 Fetching emails and preparing system...")
         
         try:
@@ -74,21 +77,11 @@ class GmailCrewAiWithFeedback():
             else:
                 emails = emails_data
             
-            # Calculate email ages
-            for email in emails:
-                if 'date' in email:
-                    try:
-                        email_date = datetime.fromisoformat(email['date'].replace('Z', '+00:00'))
-                        age_days = (datetime.now().replace(tzinfo=email_date.tzinfo) - email_date).days
-                        email['age_days'] = age_days
-                    except Exception as e:
-                        print(f"Error calculating age for email: {e}")
-                        email['age_days'] = 0
-            
-            # Save to file for agents to read
+            # Save in the compact format the task prompts describe; ages are calculated by the encoder
+            wire_emails, _ = encode_emails([tuple(email) for email in emails or []])
             os.makedirs('output', exist_ok=True)
-            with open('output/fetched_emails.json', 'w') as f:
-                json.dump(emails, f, indent=2)
+            with open('output/fetched_emails.json', 'w', encoding='utf-8') as f:
+                f.write(dumps_compact(wire_emails))
             
             # Load and apply learned rules
             self._apply_learned_rules()
@@ -0,0 +1,450 @@
+"""Background execution of crew runs in worker processes.
+
+The UI submits a serializable JobSpec and polls the JobManager for status and
+progress events; the crew itself runs in a separate process, so its stdout,
+environment and event loop never touch the Streamlit script thread and
+several users can process mail at the same time.
+"""
+
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .utils.run_workspace import RunWorkspace, collect_garbage, new_run_id
+
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TERMINAL_STATES = frozenset({COMPLETED, FAILED, CANCELLED})
+
+# Worker processes shared by all users of one deployment
+DEFAULT_MAX_WORKERS = int(os.environ.get("CREW_MAX_WORKERS", "2"))
+
+# Events kept per job; older ones are dropped
+MAX_EVENTS_PER_JOB = 2000
+
+# Crew attempts when the provider rate limits the run
+MAX_ATTEMPTS = 3
+
+
+@dataclass
+class JobSpec:
+    """Everything a worker needs to run one crew, passed explicitly instead of via os.environ."""
+    user_id: str
+    model: str = "openai/gpt-4.1"
+    search_query: str = "is:unread"
+    max_emails: int = 10
+    user_api_keys: Dict[str, str] = field(default_factory=dict)
+    filters: Dict[str, Any] = field(default_factory=dict)
+    rule_instructions: str = ""
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    # Known before the run starts, so its workspace can be protected from cleanup
+    run_id: str = field(default_factory=new_run_id)
+    # Forward every line the worker prints; progress otherwise comes from typed events
+    capture_output: bool = False
+
+    @property
+    def output_dir(self) -> str:
+        """Workspace directory the run writes its reports to."""
+        return RunWorkspace(self.user_id, self.run_id).dir
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dictionary for the worker process."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "JobSpec":
+        """Create a JobSpec from a dictionary."""
+        return cls(**{key: value for key, value in data.items() if key in cls.__dataclass_fields__})
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when the user stopped the job."""
+
+
+def make_event(job_id: str, kind: str, message: str = "", **data) -> Dict[str, Any]:
+    """Build a progress event: kind is 'status', 'log' or 'result'."""
+    return {"job_id": job_id, "time": time.time(), "kind": kind, "message": message, **data}
+
+
+class _JobReporter:
+    """Sends progress events for one job from the worker process."""
+
+    def __init__(self, job_id: str, events, cancelled):
+        self.job_id = job_id
+        self.events = events
+        self.cancelled = cancelled
+        # Agent and task currently running, added to every event for log correlation
+        self.stage: Dict[str, str] = {}
+
+    def emit(self, kind: str, message: str = "", **data):
+        if kind in ('agent', 'task') and data.get(kind):
+            if data.get('state') == 'started':
+                self.stage[kind] = data[kind]
+            elif kind == 'agent' and data.get('state') == 'finished':
+                self.stage.pop('agent', None)
+        try:
+            self.events.put(make_event(self.job_id, kind, message, **{**self.stage, **data}))
+        except Exception:
+            # The manager went away; keep running so the crew's own side effects complete
+            pass
+
+    def log(self, message: str):
+        self.emit("log", message)
+
+    def status(self, status: str, message: str = ""):
+        self.emit("status", message, status=status)
+
+    def check_cancelled(self):
+        try:
+            if self.cancelled.get(self.job_id):
+                raise JobCancelled("Processing stopped by user")
+        except JobCancelled:
+            raise
+        except Exception:
+            pass
+
+
+class _OutputForwarder:
+    """Tee for the worker's stdout/stderr that forwards complete lines as log events."""
+
+    def __init__(self, reporter: _JobReporter, stream):
+        self.reporter = reporter
+        self.stream = stream
+        self.buffer = ""
+
+    def write(self, text: str) -> int:
+        if self.stream:
+            self.stream.write(text)
+        self.buffer += text
+        while "\n" in self.buffer:
+            line, self.buffer = self.buffer.split("\n", 1)
+            if line.strip():
+                self.reporter.log(line.strip())
+        return len(text)
+
+    def flush(self):
+        if self.stream:
+            self.stream.flush()
+
+
+def run_crew_job(spec: JobSpec, reporter: _JobReporter) -> Dict[str, Any]:
+    """
+    Run the email processing crew for a job spec.
+
+    Rate-limited attempts are retried after the model's backoff, switching to
+    the fallback model when the crew's LLM setup decides to.
+
+    Returns:
+        Summary with the run workspace and the processed email IDs
+    """
+    from .auth import OAuth2Manager
+    from .crew_oauth import create_crew_for_user
+    from .utils.adaptive_limiter import get_retry_after, is_rate_limit_error
+    from .utils.progress_events import progress_sink
+    from .utils.rate_limiter import rate_limiter
+    from .utils.token_tracker import token_tracker
+
+    reporter.check_cancelled()
+    crew = create_crew_for_user(spec.user_id, OAuth2Manager(), spec.user_api_keys, run_id=spec.run_id,
+                                model=spec.model, search_query=spec.search_query)
+    reporter.log(f"🤖 AI crew initialized with model {crew.llm.model}")
+    reporter.log(f"📧 Processing up to {spec.max_emails} emails with search: {spec.search_query}")
+
+    inputs: Dict[str, Any] = {'email_limit': spec.max_emails}
+    for attempt in range(MAX_ATTEMPTS):
+        reporter.check_cancelled()
+        try:
+            # Each LLM call waits for and reserves its own budget in the LiteLLM callback
+            crew_instance = crew.crew()
+            crew_instance.step_callback = lambda step: reporter.check_cancelled()
+
+            # Attribute token usage and cost of this run to the user
+            with token_tracker.session(spec.user_id, crew.llm.model) as token_session, progress_sink(reporter.emit):
+                crew_instance.kickoff(inputs=inputs)
+                token_session['emails_processed'] = len(inputs.get('processed_email_ids', []))
+            break
+        except JobCancelled:
+            raise
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt == MAX_ATTEMPTS - 1:
+                raise
+            # Back off only the model that was rate limited, honouring the provider's retry-after
+            current_model = crew.llm.model
+            remaining, _ = rate_limiter.get_backoff(current_model)
+            retry_delay = remaining or rate_limiter.record_rate_limit(current_model, get_retry_after(e))
+            reporter.log(f"⚠️ Rate limit reached for {current_model}, waiting {retry_delay:.0f} seconds before retry...")
+            time.sleep(retry_delay)
+
+            # Rebuild the LLM so a model still in backoff switches to its fallback
+            crew.llm = crew._setup_llm()
+            if crew.llm.model != current_model:
+                reporter.log(f"🔄 Switching to fallback model {crew.llm.model}...")
+            reporter.log(f"🔄 Retrying (attempt {attempt + 2}/{MAX_ATTEMPTS})...")
+
+    processed_ids = inputs.get('processed_email_ids', [])
+    if crew.email_tracker and processed_ids:
+        crew.email_tracker.mark_batch_as_processed(processed_ids, metadata={'job_id': spec.job_id})
+        stats = crew.email_tracker.get_statistics()
+        reporter.log(f"📝 Marked {len(processed_ids)} emails as processed "
+                     f"(total tracked: {stats['total_tracked']}, duplicates avoided: {stats['duplicates_skipped']})")
+
+    return {'run_id': crew.run_id, 'output_dir': crew.workspace.dir, 'processed_email_ids': processed_ids}
+
+
+def execute_job(spec_data: Dict[str, Any], events, cancelled,
+                target: Callable[[JobSpec, _JobReporter], Dict[str, Any]] = run_crew_job) -> Dict[str, Any]:
+    """
+    Worker-process entry point.
+
+    Never raises, so the final state always reaches the manager. The
+    worker's stdout/stderr is forwarded as log events only when the spec
+    asks for it.
+
+    Returns:
+        Final state: status, error and the target's result
+    """
+    spec = JobSpec.from_dict(spec_data)
+    reporter = _JobReporter(spec.job_id, events, cancelled)
+    reporter.status(RUNNING)
+
+    original_stdout, original_stderr = sys.stdout, sys.stderr
+    if spec.capture_output:
+        sys.stdout = _OutputForwarder(reporter, original_stdout)
+        sys.stderr = _OutputForwarder(reporter, original_stderr)
+    try:
+        result = target(spec, reporter)
+        final = {'status': COMPLETED, 'error': None, 'result': result}
+    except JobCancelled as e:
+        final = {'status': CANCELLED, 'error': str(e), 'result': None}
+    except Exception as e:
+        final = {'status': FAILED, 'error': str(e), 'result': None,
+                 'traceback': traceback.format_exc(limit=20)}
+    finally:
+        sys.stdout, sys.stderr = original_stdout, original_stderr
+
+    reporter.status(final['status'], final['error'] or "")
+    return final
+
+
+class _JobState:
+    """Manager-side record of one job."""
+
+    def __init__(self, spec: JobSpec):
+        self.spec = spec
+        self.status = QUEUED
+        self.error: Optional[str] = None
+        self.traceback: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self.events_dropped = 0
+        self.future = None
+
+    def add_event(self, event: Dict[str, Any]):
+        self.events.append(event)
+        overflow = len(self.events) - MAX_EVENTS_PER_JOB
+        if overflow > 0:
+            del self.events[:overflow]
+            self.events_dropped += overflow
+
+    def set_status(self, status: str):
+        # Never leave a terminal state once reached
+        if self.status not in TERMINAL_STATES:
+            self.status = status
+            if status in TERMINAL_STATES:
+                self.finished_at = time.time()
+
+
+class JobManager:
+    """Runs crew jobs in a process pool and collects their progress events."""
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 target: Callable[[JobSpec, _JobReporter], Dict[str, Any]] = run_crew_job):
+        """
+        Initialize the job manager.
+
+        Args:
+            max_workers: Number of worker processes (default: $CREW_MAX_WORKERS or 2)
+            target: Function run in the worker for each job
+        """
+        self.target = target
+        self.lock = threading.Lock()
+        self.jobs: Dict[str, _JobState] = {}
+
+        # Spawned workers do not inherit the UI's threads, stdout redirection or event loop
+        context = multiprocessing.get_context("spawn")
+        self._manager = context.Manager()
+        self._events = self._manager.Queue()
+        self._cancelled = self._manager.dict()
+        self._executor = ProcessPoolExecutor(max_workers=max_workers or DEFAULT_MAX_WORKERS, mp_context=context)
+
+        self._running = True
+        self._pump = threading.Thread(target=self._pump_events, name="job-events", daemon=True)
+        self._pump.start()
+
+    def submit(self, spec: JobSpec) -> str:
+        """Queue a job; returns its ID."""
+        state = _JobState(spec)
+        with self.lock:
+            self.jobs[spec.job_id] = state
+        # Drop old run workspaces, never those of queued or running jobs
+        try:
+            collect_garbage(protect=self.active_output_dirs())
+        except Exception as e:
+            print(f"Error cleaning up old run workspaces: {e}")
+        state.future = self._executor.submit(execute_job, spec.to_dict(), self._events, self._cancelled, self.target)
+        state.future.add_done_callback(lambda future, job_id=spec.job_id: self._finish(job_id, future))
+        return spec.job_id
+
+    def _finish(self, job_id: str, future):
+        """Record the final state returned by the worker (or why it never returned)."""
+        with self.lock:
+            state = self.jobs.get(job_id)
+            if state is None:
+                return
+            if future.cancelled():
+                state.set_status(CANCELLED)
+                return
+            error = future.exception()
+            if error is not None:
+                state.error = f"Worker failed: {error}"
+                state.set_status(FAILED)
+                return
+            final = future.result()
+            state.result = final.get('result')
+            state.error = final.get('error')
+            state.traceback = final.get('traceback')
+            state.set_status(final['status'])
+
+    def _pump_events(self):
+        """Move events from the worker queue into the per-job state."""
+        while self._running:
+            try:
+                event = self._events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            with self.lock:
+                state = self.jobs.get(event.get('job_id'))
+                if state is None:
+                    continue
+                state.add_event(event)
+                if event['kind'] == 'status' and event.get('status') == RUNNING:
+                    state.set_status(RUNNING)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job's state, or None if unknown."""
+        with self.lock:
+            state = self.jobs.get(job_id)
+            if state is None:
+                return None
+            return {
+                'job_id': job_id,
+                'user_id': state.spec.user_id,
+                'status': state.status,
+                'error': state.error,
+                'traceback': state.traceback,
+                'result': state.result,
+                'submitted_at': state.submitted_at,
+                'finished_at': state.finished_at,
+                'event_count': state.events_dropped + len(state.events),
+            }
+
+    def events_since(self, job_id: str, cursor: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Events of a job after ``cursor``.
+
+        Returns:
+            Tuple of (new events, cursor to pass on the next poll)
+        """
+        with self.lock:
+            state = self.jobs.get(job_id)
+            if state is None:
+                return [], cursor
+            start = max(cursor - state.events_dropped, 0)
+            return list(state.events[start:]), state.events_dropped + len(state.events)
+
+    def cancel(self, job_id: str) -> bool:
+        """Stop a job: queued jobs never start, running ones stop at the next agent step."""
+        with self.lock:
+            state = self.jobs.get(job_id)
+            if state is None or state.status in TERMINAL_STATES:
+                return False
+        self._cancelled[job_id] = True
+        if state.future is not None and state.future.cancel():
+            with self.lock:
+                state.set_status(CANCELLED)
+        return True
+
+    def active_job(self, user_id: str) -> Optional[str]:
+        """ID of the user's queued or running job, if any."""
+        with self.lock:
+            for job_id, state in self.jobs.items():
+                if state.spec.user_id == user_id and state.status not in TERMINAL_STATES:
+                    return job_id
+        return None
+
+    def active_output_dirs(self, user_id: Optional[str] = None) -> List[str]:
+        """Workspace directories of queued or running jobs, optionally of one user only."""
+        with self.lock:
+            return [state.spec.output_dir for state in self.jobs.values()
+                    if state.status not in TERMINAL_STATES and user_id in (None, state.spec.user_id)]
+
+    def forget(self, job_id: str):
+        """Drop a finished job's state."""
+        with self.lock:
+            state = self.jobs.get(job_id)
+            if state is not None and state.status in TERMINAL_STATES:
+                del self.jobs[job_id]
+        try:
+            self._cancelled.pop(job_id, None)
+        except Exception:
+            pass
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool and the event pump."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._running = False
+        self._pump.join(timeout=2)
+        self._manager.shutdown()
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Process-wide job manager, created on first use."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+        return _job_manager
+
+
+def format_event(event: Dict[str, Any]) -> str:
+    """Render an event as an activity log line."""
+    timestamp = datetime.fromtimestamp(event['time']).strftime('%H:%M:%S')
+    if event['kind'] == 'status':
+        icons = {RUNNING: "🚀", COMPLETED: "✅", FAILED: "❌", CANCELLED: "🛑"}
+        text = f"Job {event.get('status')}"
+        if event.get('message'):
+            text += f": {event['message']}"
+        return f"[{timestamp}] {icons.get(event.get('status'), 'ℹ️')} {text}"
+    return f"[{timestamp}] {event.get('message', '')}"
@@ -1,11 +1,27 @@
 # Custom Gmail Tools
-from .gmail_tools import GetUnreadEmailsTool, SaveDraftTool, GmailOrganizeTool, GmailDeleteTool, EmptyTrashTool
-from .date_tools import DateCalculationTool
-from .file_tools import FileReadTool, JsonFileReadTool, JsonFileSaveTool
+#
+# Tools are imported on first attribute access (PEP 562), so importing one
+# tool module does not load CrewAI, the Gmail API client and Streamlit for
+# all of the others.
+import importlib
 
 # Note: CrewAI tools removed due to embedchain dependency conflicts
 # Only using custom tools that don't require external dependencies
 
+# Exported tool -> submodule that defines it
+_TOOL_MODULES = {
+    'GetUnreadEmailsTool': 'gmail_tools',
+    'SaveDraftTool': 'gmail_tools',
+    'GmailOrganizeTool': 'gmail_tools',
+    'GmailDeleteTool': 'gmail_tools',
+    'EmptyTrashTool': 'gmail_tools',
+    'DateCalculationTool': 'date_tools',
+    'FileReadTool': 'file_tools',
+    'JsonFileReadTool': 'file_tools',
+    'JsonFileSaveTool': 'file_tools',
+    'UserFactsReadTool': 'file_tools',
+}
+
 __all__ = [
     'GetUnreadEmailsTool',
     'SaveDraftTool', 
@@ -15,5 +31,20 @@ __all__ = [
     'DateCalculationTool',
     'FileReadTool',
     'JsonFileReadTool',
-    'JsonFileSaveTool'
+    'JsonFileSaveTool',
+    'UserFactsReadTool'
 ]
+
+
+def __getattr__(name):
+    """Import a tool's module the first time the tool is requested."""
+    module_name = _TOOL_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
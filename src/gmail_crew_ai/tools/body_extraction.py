@@ -0,0 +1,282 @@
+"""Shared email body extraction: MIME traversal, bounded decoding and HTML-to-text cleanup."""
+
+import base64
+import binascii
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+# Precompiled cleanup passes applied to extracted text
+_WHITESPACE = re.compile(r'\s+')
+_INVISIBLE_CHARS = re.compile(r'[\u200c\u200d\u00ad]+')  # Zero-width and soft hyphen chars
+_NON_LATIN = re.compile(r'[^\x00-\x7F\u00A0-\u024F\u1E00-\u1EFF]+')  # Keep basic Latin chars
+_CHARSET = re.compile(r'charset\s*=\s*("[^"]+"|[^;\s]+)', re.IGNORECASE)
+
+# Elements whose content is never visible text
+_SKIPPED_TAGS = frozenset({'script', 'style', 'head', 'title', 'noscript', 'template'})
+
+# Characters of markup fed to the parser between budget checks
+FEED_CHUNK_SIZE = 4096
+
+# Base64 characters decoded at a time when streaming a part
+DECODE_CHUNK_SIZE = 8192
+
+# Extra characters collected beyond the budget so cleanup cannot shrink the
+# text back under max_length
+_BUDGET_MARGIN = 64
+
+TRUNCATION_MARKER = "... [Content truncated for processing]"
+PART_TRUNCATION_MARKER = "... [Part truncated]"
+EMAIL_TRUNCATION_MARKER = "... [Email truncated]"
+
+
+class _VisibleTextParser(HTMLParser):
+    """Collect visible text until a character budget is reached."""
+
+    def __init__(self, budget: int):
+        super().__init__(convert_charrefs=True)
+        self.budget = budget
+        self.pieces: List[str] = []
+        self.length = 0
+        self.skip_depth = 0
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag == 'body':
+            # Tolerate a <head> that was never closed
+            self.skip_depth = 0
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if self.done or self.skip_depth:
+            return
+        text = _WHITESPACE.sub(' ', data).strip()
+        if text:
+            self.pieces.append(text)
+            self.length += len(text) + 1
+            if self.length >= self.budget:
+                self.done = True
+
+
+def _text_chunks(text: str) -> Iterator[str]:
+    """Split a string into parser-sized chunks."""
+    for position in range(0, len(text), FEED_CHUNK_SIZE):
+        yield text[position:position + FEED_CHUNK_SIZE]
+
+
+def html_to_text(html: Union[str, Iterable[str]], max_chars: int) -> Tuple[str, bool]:
+    """
+    Extract visible text from HTML, stopping once ``max_chars`` are collected.
+
+    Markup is fed to the parser in chunks, so the work done is bounded by the
+    output budget rather than the size of the document.
+
+    Args:
+        html: HTML (or plain text) content, or an iterable of its chunks
+        max_chars: Number of visible characters to collect
+
+    Returns:
+        Tuple of (text with whitespace collapsed, whether the budget was reached)
+    """
+    chunks = _text_chunks(html) if isinstance(html, str) else html
+    parser = _VisibleTextParser(max_chars)
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            if parser.done:
+                break
+        else:
+            parser.close()
+    except Exception as e:
+        print(f"Error parsing HTML: {e}")
+        if not isinstance(html, str):
+            return ' '.join(parser.pieces), parser.done
+        return _WHITESPACE.sub(' ', html[:max_chars * 4]).strip(), len(html) > max_chars * 4
+
+    return ' '.join(parser.pieces), parser.done
+
+
+def clean_email_body(email_body: Union[str, Iterable[str]], max_length: int = 300) -> str:
+    """
+    Clean the email body by removing HTML tags, excessive whitespace, and limit length.
+
+    Args:
+        email_body: The raw email body content (HTML or plain text), or an
+            iterable of its chunks
+        max_length: Maximum length of the cleaned body (default: 300)
+
+    Returns:
+        Cleaned and truncated email body text
+    """
+    if not email_body:
+        return ""
+
+    text, stopped_early = html_to_text(email_body, max_length + _BUDGET_MARGIN)
+
+    # Remove common problematic unicode characters
+    text = _INVISIBLE_CHARS.sub('', text)
+    text = _NON_LATIN.sub(' ', text)
+
+    # Truncate if too long, keeping first part which usually has most important content
+    if len(text) > max_length or stopped_early:
+        text = text[:max_length] + TRUNCATION_MARKER
+
+    return text
+
+
+def get_part_charset(part: Dict[str, Any]) -> str:
+    """Get the charset declared in a Gmail API part's Content-Type header."""
+    for header in part.get('headers') or []:
+        if header.get('name', '').lower() == 'content-type':
+            match = _CHARSET.search(header.get('value', ''))
+            if match:
+                charset = match.group(1).strip('"\'').lower()
+                try:
+                    return codecs.lookup(charset).name
+                except LookupError:
+                    break
+    return 'utf-8'
+
+
+def iter_decoded_text(data: str, charset: str = 'utf-8', chunk_size: int = DECODE_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Decode base64url part data lazily, a bounded chunk at a time.
+
+    Callers that stop iterating never decode the rest of the part.
+    """
+    decoder = codecs.getincrementaldecoder(charset)(errors='replace')
+    chunk_size -= chunk_size % 4
+    for position in range(0, len(data), chunk_size):
+        chunk = data[position:position + chunk_size]
+        chunk += '=' * (-len(chunk) % 4)
+        try:
+            raw = base64.urlsafe_b64decode(chunk)
+        except (binascii.Error, ValueError):
+            return
+        text = decoder.decode(raw)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def decode_text_prefix(data: str, charset: str, max_chars: int) -> Tuple[str, bool]:
+    """
+    Decode at most ``max_chars`` characters of base64url part data.
+
+    Only as many base64 characters as can hold ``max_chars + 1`` characters
+    (four bytes each in the worst case) are decoded.
+
+    Returns:
+        Tuple of (decoded text, whether the part holds more text)
+    """
+    needed = ((max_chars + 1) * 4 + 2) // 3 * 4
+    text = ''.join(iter_decoded_text(data[:needed], charset, chunk_size=needed or 4))
+    if len(text) > max_chars:
+        return text[:max_chars], True
+    return text, len(data) > needed
+
+
+class _PayloadWalk:
+    """State of a single traversal of a Gmail API payload."""
+
+    __slots__ = ('part_length', 'max_length', 'texts', 'length', 'has_attachment')
+
+    def __init__(self, part_length: int, max_length: int):
+        self.part_length = part_length
+        self.max_length = max_length
+        self.texts: List[str] = []
+        self.length = 0
+        self.has_attachment = False
+
+    @property
+    def body_full(self) -> bool:
+        return self.length > self.max_length
+
+    @property
+    def finished(self) -> bool:
+        return self.body_full and self.has_attachment
+
+    def add_text_part(self, part: Dict[str, Any], mime_type: str, data: str):
+        """Decode just enough of a text part to fill its share of the body."""
+        charset = get_part_charset(part)
+        if mime_type == 'text/plain':
+            text, truncated = decode_text_prefix(data, charset, self.part_length)
+            if truncated:
+                text += PART_TRUNCATION_MARKER
+        else:
+            text = clean_email_body(iter_decoded_text(data, charset), max_length=self.part_length)
+        self.texts.append(text)
+        self.length += len(text)
+
+    def walk(self, part: Dict[str, Any], extract: bool = True):
+        """Visit a part and its children, collecting body text and attachments."""
+        if self.finished:
+            return
+
+        body = part.get('body') or {}
+        if part.get('filename') or body.get('attachmentId'):
+            self.has_attachment = True
+            return
+
+        mime_type = (part.get('mimeType') or '').lower()
+        children = part.get('parts') or []
+        if children:
+            preferred = _preferred_alternative(children) if mime_type == 'multipart/alternative' else None
+            for child in children:
+                # Only one representation of an alternative group becomes body text
+                self.walk(child, extract and (preferred is None or child is preferred))
+            return
+
+        data = body.get('data')
+        if extract and data and not self.body_full and mime_type in ('text/plain', 'text/html'):
+            self.add_text_part(part, mime_type, data)
+
+
+def _preferred_alternative(children: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Pick the text/plain representation of an alternative group, else text/html."""
+    fallback = None
+    for child in children:
+        mime_type = (child.get('mimeType') or '').lower()
+        has_data = bool((child.get('body') or {}).get('data'))
+        if mime_type == 'text/plain' and has_data:
+            return child
+        if fallback is None and ((mime_type == 'text/html' and has_data) or child.get('parts')):
+            fallback = child
+    return fallback
+
+
+def extract_payload_content(payload: Dict[str, Any], max_length: int = 250,
+                            part_length: int = 200) -> Tuple[str, bool]:
+    """
+    Extract the body text and attachment flag from a Gmail API payload in one pass.
+
+    The MIME tree is walked recursively; in each multipart/alternative group
+    text/plain is preferred over text/html. Parts are decoded using their
+    declared charset and only as far as the character budget requires.
+
+    Args:
+        payload: Gmail API message payload
+        max_length: Maximum length of the combined body
+        part_length: Maximum length taken from each text part
+
+    Returns:
+        Tuple of (body text, whether the message has attachments)
+    """
+    payload = payload or {}
+    # A single-part message may use the whole body budget
+    walk = _PayloadWalk(part_length if payload.get('parts') else max_length, max_length)
+    walk.walk(payload)
+
+    body = ''.join(walk.texts)
+    if len(body) > max_length:
+        body = body[:max_length] + EMAIL_TRUNCATION_MARKER
+    return body.strip(), walk.has_attachment
@@ -1,10 +1,10 @@
 """Email utility functions for parsing and formatting email content from Gmail API."""
 
-import re
 from typing import Optional, List, Dict, Any
-from bs4 import BeautifulSoup
 import base64
 
+from .body_extraction import clean_email_body, extract_payload_content
+
 
 def extract_header_value(headers: List[Dict[str, str]], header_name: str) -> str:
     """
@@ -24,43 +24,6 @@ def extract_header_value(headers: List[Dict[str, str]], header_name: str) -> str
     return ''
 
 
-def clean_email_body(email_body: str, max_length: int = 300) -> str:
-    """
-    Clean the email body by removing HTML tags, excessive whitespace, and limit length.
-    
-    Args:
-        email_body: The raw email body content
-        max_length: Maximum length of the cleaned body (default: 300)
-        
-    Returns:
-        Cleaned and truncated email body text
-    """
-    if not email_body:
-        return ""
-    
-    try:
-        # Handle encoding issues by replacing problematic characters
-        email_body = email_body.encode('utf-8', errors='replace').decode('utf-8')
-        
-        soup = BeautifulSoup(email_body, "html.parser")
-        text = soup.get_text(separator=" ")  # Get text with spaces instead of <br/>
-    except Exception:
-        text = email_body  # Fallback to raw body if parsing fails
-
-    # Remove excessive whitespace and newlines
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    # Remove common problematic unicode characters
-    text = re.sub(r'[\u200c\u200d\u00ad]+', '', text)  # Remove zero-width and soft hyphen chars
-    text = re.sub(r'[^\x00-\x7F\u00A0-\u024F\u1E00-\u1EFF]+', ' ', text)  # Keep basic Latin chars
-    
-    # Truncate if too long, keeping first part which usually has most important content
-    if len(text) > max_length:
-        text = text[:max_length] + "... [Content truncated for processing]"
-    
-    return text
-
-
 def decode_base64_content(encoded_data: str) -> str:
     """
     Decode base64 encoded content from Gmail API.
@@ -88,42 +51,8 @@ def extract_body_from_payload(payload: Dict[str, Any], max_length: int = 250) ->
     Returns:
         Extracted email body text
     """
-    body = ""
-    
-    if 'parts' in payload:
-        for part in payload['parts']:
-            mime_type = part.get('mimeType', '')
-            body_data = part.get('body', {}).get('data', '')
-            
-            if not body_data:
-                continue
-                
-            if mime_type == 'text/plain':
-                decoded_body = decode_base64_content(body_data)
-                if len(decoded_body) > 200:
-                    decoded_body = decoded_body[:200] + "... [Part truncated]"
-                body += decoded_body
-            elif mime_type == 'text/html':
-                html_body = decode_base64_content(body_data)
-                cleaned_body = clean_email_body(html_body, max_length=200)
-                body += cleaned_body
-    else:
-        # Single part message
-        mime_type = payload.get('mimeType', '')
-        body_data = payload.get('body', {}).get('data', '')
-        
-        if body_data:
-            if mime_type == 'text/plain':
-                body = decode_base64_content(body_data)
-            elif mime_type == 'text/html':
-                html_body = decode_base64_content(body_data)
-                body = clean_email_body(html_body, max_length=200)
-    
-    # Final safety check
-    if len(body) > max_length:
-        body = body[:max_length] + "... [Email truncated]"
-    
-    return body.strip()
+    body, _ = extract_payload_content(payload, max_length=max_length)
+    return body
 
 
 def format_thread_body(current_body: str, thread_messages: List[str], 
@@ -6,7 +6,7 @@ from typing import List, Any, Optional, Type
 from . import (
     # Custom Gmail Tools
     GetUnreadEmailsTool, SaveDraftTool, GmailOrganizeTool, GmailDeleteTool, EmptyTrashTool,
-    DateCalculationTool, FileReadTool, JsonFileReadTool, JsonFileSaveTool
+    DateCalculationTool, FileReadTool, JsonFileReadTool, JsonFileSaveTool, UserFactsReadTool
 )
 
 # Note: CrewAI tools removed due to embedchain dependency conflicts
@@ -42,18 +42,22 @@ class BasicToolsConfig:
         return tools
     
     @staticmethod
-    def get_response_generator_tools() -> List[Any]:
+    def get_response_generator_tools(user_id: Optional[str] = None) -> List[Any]:
         """Get tools for the response generator agent."""
         tools = []
         
         # Add file tools (instantiate them)
         tools.extend([FileReadTool(), JsonFileReadTool(), JsonFileSaveTool()])
         
+        # The response prompt reads the persona first; without a user this is
+        # the shared knowledge/user_facts.txt the single-user crews use
+        tools.append(UserFactsReadTool(user_id=user_id))
+        
         # Add Gmail tools - using OAuth2 versions directly  
         from .gmail_oauth_tools import OAuth2SaveDraftTool, OAuth2GetUnreadEmailsTool
         tools.extend([OAuth2SaveDraftTool(), OAuth2GetUnreadEmailsTool()])
         
-        print("🔧 Response Generator tools: Email drafting + Email search + File operations")
+        print("🔧 Response Generator tools: Email drafting + Email search + File operations + User persona")
         return tools
     
     @staticmethod
@@ -4,7 +4,10 @@ import json
 import os
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
+
+from ..utils.knowledge_store import KnowledgeStore, NO_FACTS_MESSAGE
+from ..utils.context_projection import read_projected
 
 
 class FileSaveTool(BaseTool):
@@ -35,13 +38,15 @@ class FileReadTool(BaseTool):
     
     name: str = "FileReadTool"
     description: str = "Read files with UTF-8 encoding support"
+    projection: Dict[str, List[str]] = Field(
+        default_factory=dict,
+        description="Fields returned per JSON file path, from the task's context_projection"
+    )
 
     def _run(self, file_path: str) -> str:
-        """Read a file with UTF-8 encoding."""
+        """Read a file with UTF-8 encoding, limited to the task's projected fields."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            return content
+            return read_projected(file_path, self.projection)
         except Exception as e:
             return f"Error reading file {file_path}: {str(e)}"
 
@@ -79,4 +84,20 @@ class JsonFileSaveTool(BaseTool):
             
             return f"Successfully saved JSON data to {file_path}"
         except Exception as e:
-            return f"Error saving JSON file {file_path}: {str(e)}" 
\ No newline at end of file
+            return f"Error saving JSON file {file_path}: {str(e)}" 
+
+
+class UserFactsReadTool(BaseTool):
+    """Tool for reading the current user's persona from their own knowledge files."""
+    
+    name: str = "UserFactsReadTool"
+    description: str = "Read the current user's persona and facts (writing style, contacts, interests). Takes no arguments."
+    user_id: Optional[str] = Field(default=None, description="User whose persona is read; the shared legacy persona if not set")
+
+    def _run(self) -> str:
+        """Read the user's persona, served from cache unless it changed."""
+        try:
+            store = KnowledgeStore(self.user_id) if self.user_id else KnowledgeStore.legacy()
+            return store.read_facts() or NO_FACTS_MESSAGE
+        except Exception as e:
+            return f"Error reading user persona: {str(e)}"
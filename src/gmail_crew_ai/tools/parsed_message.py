@@ -0,0 +1,152 @@
+"""Parsed representation of a Gmail API message shared by the Gmail tools."""
+
+from email.header import decode_header
+from email.utils import getaddresses, parsedate_to_datetime
+from typing import Any, Dict, List, Tuple
+
+
+# Label flags stored in ParsedMessage.label_flags
+STARRED = 1 << 0
+IMPORTANT = 1 << 1
+UNREAD = 1 << 2
+INBOX = 1 << 3
+SENT = 1 << 4
+DRAFT = 1 << 5
+SPAM = 1 << 6
+TRASH = 1 << 7
+CATEGORY_PERSONAL = 1 << 8
+CATEGORY_SOCIAL = 1 << 9
+CATEGORY_PROMOTIONS = 1 << 10
+CATEGORY_UPDATES = 1 << 11
+CATEGORY_FORUMS = 1 << 12
+
+SYSTEM_LABEL_FLAGS: Dict[str, int] = {
+    'STARRED': STARRED,
+    'IMPORTANT': IMPORTANT,
+    'UNREAD': UNREAD,
+    'INBOX': INBOX,
+    'SENT': SENT,
+    'DRAFT': DRAFT,
+    'SPAM': SPAM,
+    'TRASH': TRASH,
+    'CATEGORY_PERSONAL': CATEGORY_PERSONAL,
+    'CATEGORY_SOCIAL': CATEGORY_SOCIAL,
+    'CATEGORY_PROMOTIONS': CATEGORY_PROMOTIONS,
+    'CATEGORY_UPDATES': CATEGORY_UPDATES,
+    'CATEGORY_FORUMS': CATEGORY_FORUMS,
+}
+
+
+def decode_header_value(value: str) -> str:
+    """Decode RFC 2047 encoded words in a header value."""
+    if not value or '=?' not in value:
+        return value or ''
+    try:
+        decoded_parts = []
+        for decoded, charset in decode_header(value):
+            if isinstance(decoded, bytes):
+                decoded_parts.append(decoded.decode(charset or 'utf-8', errors='replace'))
+            else:
+                decoded_parts.append(decoded)
+        return ''.join(decoded_parts)
+    except Exception:
+        return value
+
+
+def parse_address_list(value: str) -> List[Tuple[str, str]]:
+    """
+    Parse an address header into (display name, address) pairs.
+
+    Display names are decoded; entries without an address are dropped.
+    """
+    if not value:
+        return []
+    return [(decode_header_value(name), address.strip())
+            for name, address in getaddresses([value]) if '@' in address]
+
+
+class ParsedMessage:
+    """
+    A Gmail API message with its headers indexed once.
+
+    Header names are stored lower-cased, keeping the first value of repeated
+    headers. Labels are folded into a bitmask of the system label flags
+    above; labels without a flag are kept as custom labels.
+    """
+
+    __slots__ = ('id', 'thread_id', 'payload', 'headers', 'label_ids', 'label_flags',
+                 'custom_labels', 'internal_date', '_addresses')
+
+    def __init__(self, message: Dict[str, Any]):
+        self.id: str = message.get('id', '')
+        self.thread_id: str = message.get('threadId', '')
+        self.payload: Dict[str, Any] = message.get('payload') or {}
+
+        self.headers: Dict[str, str] = {}
+        for header in self.payload.get('headers') or []:
+            self.headers.setdefault(header.get('name', '').lower(), header.get('value', ''))
+
+        self.label_ids: List[str] = message.get('labelIds') or []
+        self.label_flags = 0
+        self.custom_labels: List[str] = []
+        for label in self.label_ids:
+            flag = SYSTEM_LABEL_FLAGS.get(label)
+            if flag:
+                self.label_flags |= flag
+            else:
+                self.custom_labels.append(label)
+
+        # Gmail reports internalDate as a string of epoch milliseconds
+        try:
+            self.internal_date = int(message.get('internalDate') or 0)
+        except (TypeError, ValueError):
+            self.internal_date = 0
+
+        self._addresses: Dict[str, List[Tuple[str, str]]] = {}
+
+    def header(self, name: str, default: str = '') -> str:
+        """Get a header value by case-insensitive name."""
+        return self.headers.get(name.lower(), default)
+
+    def has_label(self, flag: int) -> bool:
+        """Check a system label flag, e.g. ``message.has_label(UNREAD)``."""
+        return bool(self.label_flags & flag)
+
+    def addresses(self, name: str) -> List[Tuple[str, str]]:
+        """(display name, address) pairs of an address header, parsed on first use."""
+        name = name.lower()
+        if name not in self._addresses:
+            self._addresses[name] = parse_address_list(self.headers.get(name, ''))
+        return self._addresses[name]
+
+    @property
+    def subject(self) -> str:
+        return self.headers.get('subject', '')
+
+    @property
+    def sender(self) -> str:
+        return self.headers.get('from', '')
+
+    @property
+    def sender_address(self) -> str:
+        """Address of the From header, or the raw header when it cannot be parsed."""
+        senders = self.addresses('from')
+        return senders[0][1] if senders else self.sender
+
+    @property
+    def to_addresses(self) -> List[str]:
+        return [address for _, address in self.addresses('to')]
+
+    @property
+    def cc_addresses(self) -> List[str]:
+        return [address for _, address in self.addresses('cc')]
+
+    @property
+    def timestamp_ms(self) -> int:
+        """Receive time in epoch milliseconds, falling back to the Date header."""
+        if self.internal_date:
+            return self.internal_date
+        try:
+            return int(parsedate_to_datetime(self.headers.get('date', '')).timestamp() * 1000)
+        except (TypeError, ValueError, IndexError):
+            return 0
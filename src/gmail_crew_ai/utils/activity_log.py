@@ -0,0 +1,118 @@
+"""Bounded, structured activity log shown while emails are processed."""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+
+# Events kept per session; older ones are dropped
+DEFAULT_CAPACITY = 500
+
+# Default icon per event kind
+KIND_ICONS = {
+    'info': "ℹ️",
+    'status': "🚀",
+    'agent': "👤",
+    'task': "📋",
+    'tool': "🔧",
+    'llm': "🧠",
+    'warning': "⚠️",
+    'error': "❌",
+}
+
+# Icons of job status events
+STATUS_ICONS = {
+    'queued': "📨",
+    'running': "🚀",
+    'completed': "✅",
+    'failed': "❌",
+    'cancelled': "🛑",
+}
+
+
+@dataclass
+class ActivityEvent:
+    """One entry of the activity log."""
+    seq: int
+    time: float
+    kind: str
+    message: str
+    icon: str = ""
+    data: Dict[str, Any] = field(default_factory=dict)
+    _line: Optional[str] = field(default=None, repr=False, compare=False)
+
+    def format(self) -> str:
+        """Render as '[HH:MM:SS] icon message'; formatted once per event."""
+        if self._line is None:
+            timestamp = datetime.fromtimestamp(self.time).strftime('%H:%M:%S')
+            icon = self.icon or KIND_ICONS.get(self.kind, "")
+            self._line = f"[{timestamp}] {icon} {self.message}" if icon else f"[{timestamp}] {self.message}"
+        return self._line
+
+
+class ActivityLog:
+    """Fixed-capacity ring buffer of activity events with sequence numbers for incremental reads."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        Initialize the activity log.
+
+        Args:
+            capacity: Maximum number of events kept
+        """
+        self.capacity = capacity
+        self.events: Deque[ActivityEvent] = deque(maxlen=capacity)
+        self.last_seq = 0
+
+    def append(self, message: str, kind: str = 'info', icon: str = "",
+               when: Optional[float] = None, **data) -> ActivityEvent:
+        """Add an event; the oldest one is dropped when the log is full."""
+        self.last_seq += 1
+        event = ActivityEvent(self.last_seq, when or time.time(), kind, message, icon, data)
+        self.events.append(event)
+        return event
+
+    def add_job_event(self, event: Dict[str, Any]) -> ActivityEvent:
+        """Add a progress event sent by a background job."""
+        kind = event.get('kind', 'info')
+        data = {key: value for key, value in event.items() if key not in ('kind', 'message', 'time')}
+        if kind == 'status':
+            status = event.get('status', '')
+            message = f"Job {status}: {event['message']}" if event.get('message') else f"Job {status}"
+            return self.append(message, 'status', STATUS_ICONS.get(status, ""), event.get('time'), **data)
+        if kind == 'log':
+            kind = 'info'
+        return self.append(event.get('message', ''), kind, event.get('icon', ''), event.get('time'), **data)
+
+    def since(self, seq: int = 0) -> List[ActivityEvent]:
+        """Events added after sequence number ``seq`` that are still in the buffer."""
+        new_count = min(self.last_seq - seq, len(self.events))
+        if new_count <= 0:
+            return []
+        return list(self.events)[-new_count:]
+
+    @property
+    def dropped(self) -> int:
+        """Number of events that no longer fit in the buffer."""
+        return self.last_seq - len(self.events)
+
+    def lines(self, limit: Optional[int] = None) -> List[str]:
+        """Formatted events, oldest first; only the newest ``limit`` if given."""
+        events = list(self.events) if limit is None else self.since(self.last_seq - limit)
+        return [event.format() for event in events]
+
+    def text(self, limit: Optional[int] = None) -> str:
+        """Formatted log as a single string."""
+        return "\n".join(self.lines(limit))
+
+    def clear(self):
+        """Remove all events; sequence numbers keep increasing."""
+        self.events.clear()
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[ActivityEvent]:
+        return iter(list(self.events))
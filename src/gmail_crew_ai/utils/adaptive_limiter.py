@@ -0,0 +1,320 @@
+"""Adaptive rate limiting driven by provider rate-limit headers and 429 responses.
+
+A LiteLLM callback paces every completion through the shared token buckets in
+``rate_limiter``, then feeds the provider's remaining-request/remaining-token
+headers back into those buckets so the local budget tracks real headroom.
+Rate-limit errors put only the affected model into backoff.
+"""
+
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from .rate_limiter import RateLimiter, rate_limiter
+
+try:
+    from litellm.integrations.custom_logger import CustomLogger
+except ImportError:
+    # LiteLLM is optional; header parsing and backoff helpers still work without it
+    CustomLogger = object
+
+
+# Output tokens reserved for a call when the request does not set max_tokens
+DEFAULT_OUTPUT_RESERVE = 1024
+
+# Anthropic models switch to this model after repeated rate limits
+FALLBACK_MODEL = "openai/gpt-4-turbo-preview"
+FALLBACK_AFTER_FAILURES = 2
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a rate-limit reset header into seconds from now.
+
+    Handles OpenAI durations ("6m0s", "20ms", "1.5s"), plain seconds and
+    Anthropic RFC 3339 timestamps.
+    """
+    if not value:
+        return None
+    value = str(value).strip()
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(f"{n}{u}" for n, u in parts) == value:
+        factors = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+        return sum(float(number) * factors[unit] for number, unit in parts)
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if reset_at.tzinfo is None:
+            reset_at = reset_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+    except ValueError:
+        return None
+
+
+def parse_retry_after(headers: Dict[str, str]) -> Optional[float]:
+    """Get the provider's requested retry delay in seconds, if any."""
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000.0
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_headers(headers: Any) -> Dict[str, str]:
+    """Lower-case header names and strip LiteLLM's ``llm_provider-`` prefix."""
+    if not headers:
+        return {}
+    normalized = {}
+    for name, value in dict(headers).items():
+        name = str(name).lower()
+        if name.startswith("llm_provider-"):
+            name = name[len("llm_provider-"):]
+        normalized.setdefault(name, value)
+    return normalized
+
+
+def parse_rate_limit_headers(headers: Any) -> Dict[str, Optional[float]]:
+    """
+    Extract request/token limits, remaining budget and reset times.
+
+    Supports the OpenAI ``x-ratelimit-*`` and Anthropic
+    ``anthropic-ratelimit-*`` header families.
+
+    Returns:
+        Dictionary with rpm_limit, rpm_remaining, rpm_reset, tpm_limit,
+        tpm_remaining, tpm_reset and retry_after (values may be None)
+    """
+    headers = normalize_headers(headers)
+
+    def number(*names) -> Optional[float]:
+        for name in names:
+            if headers.get(name) not in (None, ""):
+                try:
+                    return float(headers[name])
+                except ValueError:
+                    continue
+        return None
+
+    def reset(*names) -> Optional[float]:
+        for name in names:
+            if headers.get(name):
+                return parse_reset(headers[name])
+        return None
+
+    return {
+        "rpm_limit": number("x-ratelimit-limit-requests", "anthropic-ratelimit-requests-limit"),
+        "rpm_remaining": number("x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining"),
+        "rpm_reset": reset("x-ratelimit-reset-requests", "anthropic-ratelimit-requests-reset"),
+        "tpm_limit": number("x-ratelimit-limit-tokens", "anthropic-ratelimit-tokens-limit",
+                            "anthropic-ratelimit-input-tokens-limit"),
+        "tpm_remaining": number("x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining",
+                                "anthropic-ratelimit-input-tokens-remaining"),
+        "tpm_reset": reset("x-ratelimit-reset-tokens", "anthropic-ratelimit-tokens-reset",
+                           "anthropic-ratelimit-input-tokens-reset"),
+        "retry_after": parse_retry_after(headers),
+    }
+
+
+def get_error_headers(error: BaseException) -> Dict[str, str]:
+    """Get the HTTP response headers attached to a provider exception."""
+    headers = getattr(error, "litellm_response_headers", None)
+    if not headers:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+    try:
+        return normalize_headers(headers)
+    except (TypeError, ValueError):
+        return {}
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Check whether an exception (or its cause) is a provider rate-limit error."""
+    while error is not None:
+        if getattr(error, "status_code", None) == 429 or "RateLimit" in type(error).__name__:
+            return True
+        text = str(error).lower()
+        if "rate_limit_error" in text or "rate limit" in text or "ratelimit" in text:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Get the retry delay a provider sent with a rate-limit error, if any."""
+    return parse_retry_after(get_error_headers(error))
+
+
+class AdaptiveRateLimitHandler(CustomLogger):
+    """LiteLLM callback that paces calls and adapts budgets to provider headers."""
+
+    def __init__(self, limiter: Optional[RateLimiter] = None):
+        if CustomLogger is not object:
+            super().__init__()
+        self.limiter = limiter or rate_limiter
+        self._reservations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _model_key(model: Optional[str], kwargs: Dict) -> str:
+        """Build the ``provider/model`` key used by the rate limiter."""
+        model = model or kwargs.get("model") or ""
+        provider = (kwargs.get("litellm_params") or {}).get("custom_llm_provider") or kwargs.get("custom_llm_provider")
+        if provider and not model.startswith(f"{provider}/"):
+            return f"{provider}/{model}"
+        return model
+
+    @staticmethod
+    def _estimate_tokens(messages: Any, kwargs: Dict) -> int:
+        """Estimate prompt plus completion tokens (about 4 characters per token)."""
+        characters = 0
+        for message in messages or []:
+            content = message.get("content") if isinstance(message, dict) else message
+            characters += len(str(content or ""))
+        optional_params = kwargs.get("optional_params") or {}
+        output_reserve = optional_params.get("max_tokens") or DEFAULT_OUTPUT_RESERVE
+        return characters // 4 + int(output_reserve)
+
+    def apply_headers(self, model: str, headers: Any):
+        """Update the shared budget for a model from provider response headers."""
+        limits = parse_rate_limit_headers(headers)
+        if all(value is None for value in limits.values()):
+            return
+
+        self.limiter.update_budget(
+            model,
+            rpm_limit=limits["rpm_limit"],
+            rpm_remaining=limits["rpm_remaining"],
+            tpm_limit=limits["tpm_limit"],
+            tpm_remaining=limits["tpm_remaining"],
+        )
+
+        # Budget exhausted: hold this model until the provider's reset time
+        waits = []
+        if limits["rpm_remaining"] is not None and limits["rpm_remaining"] < 1 and limits["rpm_reset"]:
+            waits.append(limits["rpm_reset"])
+        if limits["tpm_remaining"] is not None and limits["tpm_remaining"] < 1 and limits["tpm_reset"]:
+            waits.append(limits["tpm_reset"])
+        if waits:
+            self.limiter.pause(model, max(waits))
+
+    def log_pre_api_call(self, model, messages, kwargs):
+        """Block until the shared budget has room for this call."""
+        try:
+            key = self._model_key(model, kwargs)
+            estimate = self._estimate_tokens(messages, kwargs)
+            self.limiter.acquire_blocking(estimate, key)
+            call_id = kwargs.get("litellm_call_id")
+            if call_id:
+                with self._lock:
+                    self._reservations[call_id] = estimate
+        except Exception as e:
+            print(f"Rate limiter pre-call check failed: {e}")
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        """Reconcile token usage and adopt the provider's reported budget."""
+        try:
+            key = self._model_key(None, kwargs)
+            with self._lock:
+                estimate = self._reservations.pop(kwargs.get("litellm_call_id"), 0)
+
+            usage = getattr(response_obj, "usage", None)
+            total_tokens = getattr(usage, "total_tokens", None) if usage else None
+            if total_tokens is not None:
+                self.limiter.record_usage(int(total_tokens), estimate, key)
+
+            hidden_params = getattr(response_obj, "_hidden_params", None) or {}
+            self.apply_headers(key, hidden_params.get("additional_headers"))
+            self.limiter.record_success(key)
+        except Exception as e:
+            print(f"Rate limiter success callback failed: {e}")
+
+    def log_failure_event(self, kwargs, response_obj, start_time, end_time):
+        """Back off the model that was rate limited."""
+        try:
+            key = self._model_key(None, kwargs)
+            with self._lock:
+                self._reservations.pop(kwargs.get("litellm_call_id"), None)
+
+            error = kwargs.get("exception")
+            if error is None:
+                return
+            self.apply_headers(key, get_error_headers(error))
+            if is_rate_limit_error(error):
+                delay = self.limiter.record_rate_limit(key, get_retry_after(error))
+                print(f"⏳ Rate limit from {key}, backing off {delay:.1f} seconds")
+        except Exception as e:
+            print(f"Rate limiter failure callback failed: {e}")
+
+    async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+        self.log_success_event(kwargs, response_obj, start_time, end_time)
+
+    async def async_log_failure_event(self, kwargs, response_obj, start_time, end_time):
+        self.log_failure_event(kwargs, response_obj, start_time, end_time)
+
+
+_handler: Optional[AdaptiveRateLimitHandler] = None
+_install_lock = threading.Lock()
+
+
+def install_litellm_callbacks(limiter: Optional[RateLimiter] = None) -> bool:
+    """
+    Register the adaptive rate-limit handler with LiteLLM once per process.
+
+    Returns:
+        True if the handler is registered, False if LiteLLM is unavailable
+    """
+    global _handler
+    if CustomLogger is object:
+        return False
+
+    import litellm
+
+    with _install_lock:
+        if _handler is None:
+            _handler = AdaptiveRateLimitHandler(limiter)
+        if _handler not in litellm.callbacks:
+            litellm.callbacks.append(_handler)
+    return True
+
+
+def select_model(model: str, limiter: Optional[RateLimiter] = None) -> str:
+    """Get the model to use, switching Anthropic models to the fallback after repeated rate limits."""
+    limiter = limiter or rate_limiter
+    _, failures = limiter.get_backoff(model)
+    if failures >= FALLBACK_AFTER_FAILURES and ("claude" in model.lower() or "anthropic" in model.lower()):
+        print(f"Rate limit detected, switching to fallback model: {FALLBACK_MODEL}")
+        return FALLBACK_MODEL
+    return model
+
+
+def wait_for_model(model: Optional[str], limiter: Optional[RateLimiter] = None) -> float:
+    """Sleep through any remaining backoff for a model and return the time waited."""
+    limiter = limiter or rate_limiter
+    remaining, _ = limiter.get_backoff(model)
+    if remaining > 0:
+        time.sleep(remaining)
+    return remaining
@@ -0,0 +1,102 @@
+"""Per-task views of the JSON files agents read, limited to the fields each task declares."""
+
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from .email_wire import dumps_compact
+from .run_workspace import OUTPUT_DIR_PLACEHOLDER
+
+
+# Report files written from LLM output are sometimes wrapped in a code fence
+_CODE_FENCE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.DOTALL)
+
+# Task config key holding {file path: [fields]}
+PROJECTION_KEY = 'context_projection'
+
+
+def normalize_path(file_path: str) -> str:
+    """Normalize a file path so './output/x.json' and absolute paths match 'output/x.json'."""
+    path = os.path.normpath(file_path.strip().strip('"\''))
+    if os.path.isabs(path):
+        try:
+            path = os.path.relpath(path)
+        except ValueError:
+            pass
+    return path.replace(os.sep, '/')
+
+
+def get_task_projection(task_config: Dict[str, Any], output_dir: str = "output") -> Dict[str, List[str]]:
+    """
+    Read the context projection declared for a task in tasks.yaml.
+
+    Args:
+        task_config: The task's entry in tasks.yaml
+        output_dir: Run workspace substituted for the {output_dir} placeholder
+
+    Returns:
+        Mapping of normalized file path to the fields the task may see
+    """
+    projection = (task_config or {}).get(PROJECTION_KEY) or {}
+    return {normalize_path(path.replace(OUTPUT_DIR_PLACEHOLDER, output_dir)): list(fields)
+            for path, fields in projection.items() if fields}
+
+
+def project_json(data: Any, fields: List[str]) -> Any:
+    """
+    Keep only the declared fields.
+
+    Records in a top-level list, and records in lists held by a top-level
+    object (e.g. a report's "emails" array), are reduced to ``fields``.
+    Other top-level keys are kept only when listed.
+    """
+    keep = set(fields)
+
+    def project_records(records: List[Any]) -> List[Any]:
+        return [{key: value for key, value in record.items() if key in keep} if isinstance(record, dict) else record
+                for record in records]
+
+    if isinstance(data, list):
+        return project_records(data)
+    if isinstance(data, dict):
+        projected = {}
+        for key, value in data.items():
+            if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+                projected[key] = project_records(value)
+            elif key in keep:
+                projected[key] = value
+        return projected
+    return data
+
+
+def parse_json_content(content: str) -> Optional[Any]:
+    """Parse JSON file content, tolerating a surrounding code fence; None if it is not JSON."""
+    candidates = [content]
+    fenced = _CODE_FENCE.match(content)
+    if fenced:
+        candidates.append(fenced.group(1))
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            continue
+    return None
+
+
+def read_projected(file_path: str, projection: Dict[str, List[str]]) -> str:
+    """
+    Read a file, returning only the projected fields when the task declared any for it.
+
+    Files without a projection, and files that are not JSON, are returned unchanged.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    fields = projection.get(normalize_path(file_path)) if projection else None
+    if not fields:
+        return content
+    data = parse_json_content(content)
+    if data is None:
+        return content
+    return dumps_compact(project_json(data, fields))
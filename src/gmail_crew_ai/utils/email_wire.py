@@ -0,0 +1,168 @@
+"""Compact agent-facing serialization of fetched emails."""
+
+import json
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# thread_info flag -> short name listed under "flags" when true
+FLAG_NAMES = {
+    'is_unread': 'unread',
+    'is_starred': 'starred',
+    'is_important': 'important',
+    'has_attachment': 'attachment',
+    'is_sent': 'sent',
+    'is_draft': 'draft',
+    'is_spam': 'spam',
+    'is_trash': 'trash',
+}
+
+# Short key -> meaning; the task descriptions in tasks.yaml use the same legend
+WIRE_KEYS = {
+    'id': 'Gmail message ID (email_id)',
+    'subj': 'subject',
+    'from': 'sender',
+    'date': 'sent date, YYYY-MM-DD',
+    'age': 'age in days',
+    'body': 'first part of the body text',
+    'flags': 'true attributes: unread, starred, important, attachment, ...',
+    'labels': 'custom Gmail labels',
+    'tid': 'thread ID',
+    'mid': 'Message-ID header (use as in_reply_to)',
+    'refs': 'References header',
+}
+
+# Characters of body text kept per email
+BODY_LENGTH = 200
+BODY_TRUNCATION_MARKER = "..."
+
+# Compact separators; no indentation or ASCII escaping
+_SEPARATORS = (',', ':')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for prompt budgeting (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _parse_date(date_header: str) -> Optional[datetime]:
+    """Parse an RFC 2822 Date header, or None when it is missing or malformed."""
+    if not date_header:
+        return None
+    try:
+        parsed = parsedate_to_datetime(date_header)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def encode_email(email: Tuple[str, str, str, str, Dict], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Convert a fetched email tuple into its compact wire dict.
+
+    False flags, empty fields and fields derivable from others (raw_date,
+    the system label list, the duplicate email_id) are left out.
+
+    Args:
+        email: (subject, sender, body, email_id, thread_info) tuple from the Gmail tools
+        now: Reference time for the age calculation (default: current time)
+
+    Returns:
+        Dict using the short keys in WIRE_KEYS
+    """
+    subject, sender, body, email_id, thread_info = email
+    thread_info = thread_info if isinstance(thread_info, dict) else {}
+
+    wire: Dict[str, Any] = {'id': email_id, 'subj': subject or '', 'from': sender or ''}
+
+    sent_at = _parse_date(thread_info.get('date', ''))
+    if sent_at:
+        now = now or datetime.now(timezone.utc)
+        wire['date'] = sent_at.strftime('%Y-%m-%d')
+        wire['age'] = max((now - sent_at).days, 0)
+
+    body = (body or '').strip()
+    if len(body) > BODY_LENGTH:
+        body = body[:BODY_LENGTH] + BODY_TRUNCATION_MARKER
+    if body:
+        wire['body'] = body
+
+    flags = [name for key, name in FLAG_NAMES.items() if thread_info.get(key)]
+    if flags:
+        wire['flags'] = flags
+    if thread_info.get('custom_labels'):
+        wire['labels'] = thread_info['custom_labels']
+
+    for key, field in (('tid', 'thread_id'), ('mid', 'message_id'), ('refs', 'references')):
+        if thread_info.get(field):
+            wire[key] = thread_info[field]
+    return wire
+
+
+def dumps_compact(data: Any) -> str:
+    """Serialize with compact separators, keeping non-ASCII text readable."""
+    return json.dumps(data, separators=_SEPARATORS, ensure_ascii=False)
+
+
+def _verbose_record(email: Tuple[str, str, str, str, Dict]) -> Dict[str, Any]:
+    """The record previously written per email, used as the report baseline."""
+    subject, sender, body, email_id, thread_info = email
+    thread_info = thread_info if isinstance(thread_info, dict) else {}
+    body = body or ''
+    limited_body = body[:200] + "... [Body truncated for efficiency]" if len(body) > 200 else body
+    return {
+        'email_id': email_id, 'subject': subject, 'sender': sender,
+        'body': f"EMAIL DATE: {thread_info.get('date', '')}\n\n{limited_body}",
+        'date': thread_info.get('date', ''), 'age_days': None, 'thread_info': thread_info,
+        'is_part_of_thread': False, 'thread_size': 1, 'thread_position': 1,
+    }
+
+
+def encode_emails(emails: Sequence[Tuple[str, str, str, str, Dict]],
+                  now: Optional[datetime] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Encode fetched emails and report the prompt size of each.
+
+    Returns:
+        Tuple of (wire dicts, per-email report with email_id, tokens and
+        verbose_tokens - the estimate for the previous indented format)
+    """
+    encoded = []
+    report = []
+    for email in emails:
+        wire = encode_email(email, now)
+        verbose = json.dumps(_verbose_record(email), indent=2, ensure_ascii=False, default=str)
+        encoded.append(wire)
+        report.append({
+            'email_id': wire['id'],
+            'tokens': estimate_tokens(dumps_compact(wire)),
+            'verbose_tokens': estimate_tokens(verbose),
+        })
+    return encoded, report
+
+
+def decode_email(wire: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a wire dict into the long field names used by the UI."""
+    if 'email_id' in wire or 'id' not in wire:
+        # Already in the verbose format written by older versions
+        return wire
+    flags = set(wire.get('flags', []))
+    thread_info = {key: name in flags for key, name in FLAG_NAMES.items()}
+    thread_info.update({
+        'thread_id': wire.get('tid', ''),
+        'message_id': wire.get('mid', ''),
+        'references': wire.get('refs', ''),
+        'custom_labels': wire.get('labels', []),
+    })
+    return {
+        'email_id': wire['id'],
+        'subject': wire.get('subj', ''),
+        'sender': wire.get('from', ''),
+        'date': wire.get('date', ''),
+        'age_days': wire.get('age'),
+        'body': wire.get('body', ''),
+        'thread_info': thread_info,
+    }
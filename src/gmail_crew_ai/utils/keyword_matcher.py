@@ -0,0 +1,147 @@
+"""Single-pass, multi-category keyword matching for email text analysis.
+
+All category vocabularies are compiled into one trie-shaped regular
+expression, so every text is scanned once regardless of how many keyword
+lists the caller checks. Matching is case-insensitive substring matching,
+the same semantics as ``keyword in text.lower()``.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+_SENTENCE_BOUNDARY = re.compile(r"\.")
+
+
+def _build_trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation that shares common prefixes between words."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A word ends here; longer words are tried first (greedy)
+            pattern = "(?:" + pattern + ")?"
+        return pattern
+
+    return build(trie)
+
+
+class KeywordScan:
+    """Keyword occurrences found in one text by a single pass of a KeywordMatcher."""
+
+    __slots__ = ("text", "_matcher", "_positions", "_boundaries")
+
+    def __init__(self, text: str, matcher: "KeywordMatcher", positions: Dict[str, List[int]]):
+        self.text = text
+        self._matcher = matcher
+        self._positions = positions
+        self._boundaries: Optional[List[int]] = None
+
+    def has(self, keyword: str) -> bool:
+        """Check whether a keyword occurs in the text."""
+        return keyword.lower() in self._positions
+
+    def count(self, keyword: str) -> int:
+        """Number of occurrences of a keyword in the text."""
+        return len(self._positions.get(keyword.lower(), ()))
+
+    def matched(self, category: str) -> List[str]:
+        """Keywords of a category found in the text, in vocabulary order and original spelling."""
+        return [keyword for keyword in self._matcher.categories[category]
+                if keyword.lower() in self._positions]
+
+    def has_any(self, category: str) -> bool:
+        """Check whether any keyword of a category occurs in the text."""
+        return any(keyword.lower() in self._positions for keyword in self._matcher.categories[category])
+
+    def matched_between(self, category: str, start: int, end: int) -> List[str]:
+        """Keywords of a category with an occurrence lying entirely within ``text[start:end]``."""
+        found = []
+        for keyword in self._matcher.categories[category]:
+            length = len(keyword)
+            positions = self._positions.get(keyword.lower(), ())
+            if any(start <= position and position + length <= end for position in positions):
+                found.append(keyword)
+        return found
+
+    def sentence(self, keyword: str, min_length: int = 0) -> Optional[str]:
+        """
+        Get the first sentence containing a keyword.
+
+        Sentences are the pieces of ``text.split('.')``; the sentence is
+        returned stripped and must be longer than ``min_length`` characters.
+        """
+        positions = self._positions.get(keyword.lower())
+        if not positions:
+            return None
+
+        if self._boundaries is None:
+            # Sentence boundaries are located once per text and shared by all keywords
+            self._boundaries = [match.start() for match in _SENTENCE_BOUNDARY.finditer(self.text)]
+        boundaries = self._boundaries
+
+        length = len(keyword)
+        last_index = -1
+        for position in positions:
+            index = bisect_right(boundaries, position - 1)
+            if index == last_index:
+                continue
+            end = boundaries[index] if index < len(boundaries) else len(self.text)
+            if position + length > end:
+                # The match spans a sentence boundary
+                continue
+            last_index = index
+            start = boundaries[index - 1] + 1 if index > 0 else 0
+            sentence = self.text[start:end].strip()
+            if len(sentence) > min_length:
+                return sentence
+        return None
+
+
+class KeywordMatcher:
+    """Match many categorised keyword lists against text in a single pass."""
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        """
+        Compile all category vocabularies into one pattern.
+
+        Args:
+            categories: Mapping of category name to keywords; a keyword may
+                appear in several categories
+        """
+        self.categories: Dict[str, Tuple[str, ...]] = {
+            name: tuple(keywords) for name, keywords in categories.items()
+        }
+        vocabulary = sorted({keyword.lower() for keywords in self.categories.values() for keyword in keywords})
+
+        # The scan reports the longest keyword starting at each position, so
+        # credit the keywords that are prefixes of it as well
+        self._prefixes: Dict[str, Tuple[str, ...]] = {
+            word: tuple(other for other in vocabulary if other != word and word.startswith(other))
+            for word in vocabulary
+        }
+        self._pattern = re.compile("(?=(" + _build_trie_pattern(vocabulary) + "))", re.IGNORECASE)
+
+    def scan(self, text: Optional[str]) -> KeywordScan:
+        """Find every keyword occurrence in a text with one pass over it."""
+        text = text or ""
+        positions: Dict[str, List[int]] = {}
+        if text:
+            prefixes = self._prefixes
+            for match in self._pattern.finditer(text):
+                word = match.group(1).lower()
+                position = match.start()
+                positions.setdefault(word, []).append(position)
+                for prefix in prefixes.get(word, ()):
+                    positions.setdefault(prefix, []).append(position)
+        return KeywordScan(text, self, positions)
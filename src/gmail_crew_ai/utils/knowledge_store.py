@@ -0,0 +1,110 @@
+"""Per-user knowledge files (persona and facts) with a cached reader."""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+# Cached facts per file: path -> ((mtime_ns, size), text)
+_facts_cache: Dict[str, Tuple[Tuple[int, int], str]] = {}
+_cache_lock = threading.Lock()
+
+# Shared persona file used before personas were stored per user
+LEGACY_FACTS_FILE = "knowledge/user_facts.txt"
+
+NO_FACTS_MESSAGE = "No user persona is available yet. Write responses in a neutral, professional voice."
+
+
+def get_knowledge_dir(user_id: str) -> str:
+    """Knowledge directory for one user."""
+    if os.path.exists("/app/data"):
+        return f"/app/data/knowledge/users/{user_id}"
+    return f"knowledge/users/{user_id}"
+
+
+class KnowledgeStore:
+    """Knowledge files of a single user, kept apart from other users."""
+
+    FACTS_FILENAME = "user_facts.txt"
+
+    def __init__(self, user_id: str, knowledge_dir: Optional[str] = None):
+        """
+        Initialize the knowledge store for a specific user.
+
+        Args:
+            user_id: Unique identifier for the user
+            knowledge_dir: Optional custom directory for the user's files
+        """
+        if not user_id:
+            raise ValueError("A user ID is required for the knowledge store")
+        self.user_id = user_id
+        self.knowledge_dir = knowledge_dir or get_knowledge_dir(user_id)
+        self.facts_file = os.path.join(self.knowledge_dir, self.FACTS_FILENAME)
+
+    def write_facts(self, text: str) -> str:
+        """
+        Replace the user's persona text.
+
+        The file is swapped in atomically so a crew reading it never sees a
+        partial write, and the cached copy is refreshed.
+
+        Returns:
+            Path of the facts file
+        """
+        Path(self.knowledge_dir).mkdir(parents=True, exist_ok=True)
+        temp_file = f"{self.facts_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_file, self.facts_file)
+
+        stat = os.stat(self.facts_file)
+        with _cache_lock:
+            _facts_cache[self.facts_file] = ((stat.st_mtime_ns, stat.st_size), text)
+        return self.facts_file
+
+    def read_facts(self) -> str:
+        """
+        Get the user's persona text, reading the file only when it changed.
+
+        Returns:
+            The persona text, or an empty string if none has been built
+        """
+        try:
+            stat = os.stat(self.facts_file)
+        except FileNotFoundError:
+            with _cache_lock:
+                _facts_cache.pop(self.facts_file, None)
+            return ""
+
+        version = (stat.st_mtime_ns, stat.st_size)
+        with _cache_lock:
+            cached = _facts_cache.get(self.facts_file)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        with open(self.facts_file, 'r', encoding='utf-8') as f:
+            text = f.read()
+        with _cache_lock:
+            _facts_cache[self.facts_file] = (version, text)
+        return text
+
+    def has_facts(self, min_length: int = 50) -> bool:
+        """Check whether a non-trivial persona exists for the user."""
+        return len(self.read_facts()) > min_length
+
+    @classmethod
+    def legacy(cls) -> "KnowledgeStore":
+        """Store for the shared persona file used by the single-user crews."""
+        return cls("legacy", os.path.dirname(LEGACY_FACTS_FILE))
+
+    def has_legacy_facts(self) -> bool:
+        """Check whether a persona text exists for the user or in the shared legacy file."""
+        return self.has_facts() or os.path.exists(LEGACY_FACTS_FILE)
+
+    def clear_facts(self) -> None:
+        """Remove the user's persona text."""
+        if os.path.exists(self.facts_file):
+            os.remove(self.facts_file)
+        with _cache_lock:
+            _facts_cache.pop(self.facts_file, None)
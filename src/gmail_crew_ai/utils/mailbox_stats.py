@@ -0,0 +1,221 @@
+"""Cached mailbox statistics for the dashboard.
+
+Counts come from exact label counters (labels.get messagesTotal /
+messagesUnread) and the profile where Gmail keeps them; only counts that
+need a search fall back to messages.list resultSizeEstimate. All requests
+for one view go out in a single batch, and results are cached per user for
+a short time so tab switches and reruns do not hit Gmail again.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Seconds a user's statistics are reused
+DEFAULT_TTL_SECONDS = 120
+
+# Inbox categories shown in the breakdown, by system label
+CATEGORY_LABELS = {
+    "Promotions": "CATEGORY_PROMOTIONS",
+    "Social": "CATEGORY_SOCIAL",
+    "Updates": "CATEGORY_UPDATES",
+    "Forums": "CATEGORY_FORUMS",
+    "Primary": "CATEGORY_PERSONAL",
+}
+
+# Search queries shown for each category (for reference in the breakdown table)
+CATEGORY_QUERIES = {
+    "Promotions": "category:promotions",
+    "Social": "category:social",
+    "Updates": "category:updates",
+    "Forums": "category:forums",
+    "Primary": "category:primary",
+}
+
+# Advanced analytics: (metric, label ID or None, search query)
+ANALYTICS_METRICS = [
+    (" Starred", "STARRED", "is:starred"),
+    (" Important", "IMPORTANT", "is:important"),
+    (" With Attachments", None, "has:attachment"),
+    (" From Me", None, "from:me"),
+    (" Last 7 Days", None, "newer_than:7d"),
+    (" Last 30 Days", None, "newer_than:30d"),
+    (" Unread Important", None, "is:unread is:important"),
+]
+
+# Gmail accepts up to 100 calls per batch request
+_MAX_BATCH_SIZE = 100
+
+
+def execute_batch(service, requests: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Execute Gmail API requests in one batch HTTP request.
+
+    Falls back to executing them one by one when the service does not
+    support batching. A failed request yields None.
+
+    Args:
+        service: Gmail API service
+        requests: Mapping of request ID to an unexecuted API request
+
+    Returns:
+        Mapping of request ID to response (or None)
+    """
+    responses: Dict[str, Any] = {request_id: None for request_id in requests}
+    if not requests:
+        return responses
+
+    def callback(request_id, response, exception):
+        if exception is not None:
+            print(f"Mailbox statistics request {request_id} failed: {exception}")
+            return
+        responses[request_id] = response
+
+    items = list(requests.items())
+    try:
+        for start in range(0, len(items), _MAX_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=callback)
+            for request_id, request in items[start:start + _MAX_BATCH_SIZE]:
+                batch.add(request, request_id=request_id)
+            batch.execute()
+    except AttributeError:
+        for request_id, request in items:
+            try:
+                callback(request_id, request.execute(), None)
+            except Exception as e:
+                callback(request_id, None, e)
+    return responses
+
+
+class MailboxStatsService:
+    """Computes and caches per-user mailbox counts."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the statistics service.
+
+        Args:
+            ttl_seconds: Seconds cached statistics stay valid
+        """
+        self.ttl_seconds = ttl_seconds
+        self._cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, user_id: str, key: str, compute: Callable[[], Any]) -> Any:
+        """Return a cached value or compute and cache it."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get((user_id, key))
+            if entry and entry[0] > now:
+                return entry[1]
+        value = compute()
+        with self._lock:
+            self._cache[(user_id, key)] = (now + self.ttl_seconds, value)
+        return value
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop cached statistics of a user, or of everyone."""
+        with self._lock:
+            if user_id is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == user_id]:
+                    del self._cache[key]
+
+    @staticmethod
+    def _label_counts(responses: Dict[str, Any], label_id: str) -> Tuple[int, int]:
+        label = responses.get(f"label:{label_id}") or {}
+        return int(label.get('messagesTotal', 0) or 0), int(label.get('messagesUnread', 0) or 0)
+
+    @staticmethod
+    def _estimate(responses: Dict[str, Any], query: str) -> int:
+        result = responses.get(f"query:{query}") or {}
+        return int(result.get('resultSizeEstimate', 0) or 0)
+
+    def _fetch(self, service, label_ids: Iterable[str] = (), queries: Iterable[str] = (),
+               profile: bool = False) -> Dict[str, Any]:
+        """Fetch label counters, search estimates and the profile in one batch."""
+        messages, labels = service.users().messages(), service.users().labels()
+        requests = {f"label:{label_id}": labels.get(userId='me', id=label_id) for label_id in label_ids}
+        requests.update({f"query:{query}": messages.list(userId='me', q=query, maxResults=1) for query in queries})
+        if profile:
+            requests['profile'] = service.users().getProfile(userId='me')
+        return execute_batch(service, requests)
+
+    def get_overview(self, user_id: str, service_factory: Callable[[], Any]) -> Dict[str, int]:
+        """
+        Total, unread and read message counts.
+
+        Args:
+            user_id: User the statistics belong to
+            service_factory: Returns the user's Gmail service; only called on a cache miss
+
+        Returns:
+            Dictionary with total, unread and read counts
+        """
+        def compute():
+            responses = self._fetch(service_factory(), label_ids=['UNREAD'], profile=True)
+            if responses['profile'] is None:
+                raise RuntimeError("Could not read the mailbox profile")
+            total = int(responses['profile'].get('messagesTotal', 0) or 0)
+            unread, _ = self._label_counts(responses, 'UNREAD')
+            return {'total': total, 'unread': unread, 'read': max(total - unread, 0)}
+
+        return self._cached(user_id, 'overview', compute)
+
+    def get_category_breakdown(self, user_id: str, service_factory: Callable[[], Any],
+                               email_type: str = "total") -> List[Dict[str, Any]]:
+        """
+        Message counts per inbox category.
+
+        Args:
+            user_id: User the statistics belong to
+            service_factory: Returns the user's Gmail service; only called on a cache miss
+            email_type: 'total', 'unread' or 'read'
+
+        Returns:
+            Rows with Category, Count and Query
+        """
+        def compute():
+            responses = self._fetch(service_factory(), label_ids=list(CATEGORY_LABELS.values()))
+            counts = {}
+            for category, label_id in CATEGORY_LABELS.items():
+                counts[category] = self._label_counts(responses, label_id)
+            return counts
+
+        counts = self._cached(user_id, 'categories', compute)
+        rows = []
+        for category, (total, unread) in counts.items():
+            query = CATEGORY_QUERIES[category]
+            if email_type == "unread":
+                count, query = unread, query + " is:unread"
+            elif email_type == "read":
+                count, query = max(total - unread, 0), query + " is:read"
+            else:
+                count = total
+            rows.append({"Category": category, "Count": count, "Query": query})
+        return rows
+
+    def get_advanced_analytics(self, user_id: str, service_factory: Callable[[], Any]) -> List[Dict[str, Any]]:
+        """
+        Counts for the advanced analytics view.
+
+        Returns:
+            Rows with Metric and Count
+        """
+        def compute():
+            label_ids = [label_id for _, label_id, _ in ANALYTICS_METRICS if label_id]
+            queries = [query for _, label_id, query in ANALYTICS_METRICS if not label_id]
+            responses = self._fetch(service_factory(), label_ids=label_ids, queries=queries)
+            rows = []
+            for metric, label_id, query in ANALYTICS_METRICS:
+                count = self._label_counts(responses, label_id)[0] if label_id else self._estimate(responses, query)
+                rows.append({"Metric": metric, "Count": count})
+            return rows
+
+        return self._cached(user_id, 'analytics', compute)
+
+
+# Global mailbox statistics instance
+mailbox_stats = MailboxStatsService()
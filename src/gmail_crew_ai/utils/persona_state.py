@@ -0,0 +1,458 @@
+"""Persisted per-user persona statistics built incrementally from sent mail."""
+
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from email.utils import getaddresses
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .keyword_matcher import KeywordMatcher
+
+
+# Every keyword list used by the persona analysis, compiled once so each
+# subject and body is scanned a single time
+PERSONA_KEYWORDS = KeywordMatcher({
+    'formal': ['dear', 'sincerely', 'regards', 'best regards', 'yours truly'],
+    'casual': ['hey', 'thanks!', 'cheers', 'talk soon', 'catch up'],
+    'professional': ['meeting', 'project', 'deadline', 'proposal', 'contract', 'business', 'schedule', 'agenda'],
+    'personal': ['family', 'weekend', 'vacation', 'birthday', 'dinner', 'lunch', 'personal'],
+    'professional_topics': [
+        'project', 'meeting', 'deadline', 'proposal', 'contract', 'budget', 'team', 'client',
+        'strategy', 'planning', 'development', 'marketing', 'sales', 'revenue', 'growth',
+        'management', 'leadership', 'innovation', 'technology', 'software', 'product'
+    ],
+    'location': ['located in', 'based in', 'live in', 'from', 'california', 'new york', 'texas', 'florida'],
+    'family': ['wife', 'husband', 'kids', 'children', 'son', 'daughter', 'family', 'parents'],
+    'interests': ['hobby', 'enjoy', 'love', 'passion', 'interested in', 'fan of'],
+    'lifestyle': ['weekend', 'vacation', 'travel', 'exercise', 'gym', 'fitness'],
+    'greetings': ['hi', 'hello', 'hey', 'dear'],
+    'closings': ['thanks', 'regards', 'best', 'sincerely'],
+    'topics_of_interest': [
+        'AI', 'artificial intelligence', 'machine learning', 'technology', 'innovation',
+        'startup', 'entrepreneurship', 'business', 'investment', 'venture',
+        'health', 'fitness', 'travel', 'education', 'learning', 'development'
+    ],
+    'titles': ['CEO', 'CTO', 'manager', 'director', 'lead', 'senior', 'developer', 'engineer', 'analyst'],
+    'family_life': ['wife', 'husband', 'spouse', 'kids', 'children', 'son', 'daughter', 'family', 'parents', 'mom', 'dad'],
+})
+
+# Industry indicators matched against recipient domains
+INDUSTRY_DOMAINS = {
+    'tech': ['.io', 'github.com', 'google.com', 'microsoft.com', 'apple.com'],
+    'finance': ['.bank', 'financial', 'capital', 'investment'],
+    'healthcare': ['health', 'medical', 'hospital', 'clinic'],
+    'education': ['.edu', 'university', 'school', 'college']
+}
+
+# Insight sentences kept in the state; the rendered persona shows the newest
+MAX_STORED_INSIGHTS = 50
+
+COUNTER_FIELDS = ('recipients', 'domains', 'professional_topics', 'topics_of_interest',
+                  'titles', 'greetings', 'closings')
+
+
+def parse_recipient_addresses(*headers: str) -> List[str]:
+    """
+    Parse address headers into normalized recipient addresses.
+
+    Uses RFC 5322 parsing, so display names containing commas or angle
+    brackets are handled. Addresses are lower-cased and de-duplicated.
+    """
+    addresses = []
+    for _, address in getaddresses([header for header in headers if header]):
+        address = address.strip().lower()
+        if '@' in address and address not in addresses:
+            addresses.append(address)
+    return addresses
+
+
+def sent_email_recipients(to_header: str, thread_info: Dict) -> List[str]:
+    """Recipients of a sent email, preferring the To/Cc headers kept in thread_info."""
+    if isinstance(thread_info, dict) and 'to' in thread_info:
+        return parse_recipient_addresses(thread_info.get('to', ''), thread_info.get('cc', ''))
+    return parse_recipient_addresses(to_header)
+
+
+class PersonaState:
+    """
+    Contact, topic and style statistics for one user's sent mail.
+
+    The state remembers the newest message it has analyzed (the watermark),
+    so refreshing the persona only processes mail sent since then. The
+    persona text in the knowledge files is rendered from this state.
+    """
+
+    def __init__(self, user_id: str, state_file: Optional[str] = None):
+        """
+        Initialize persona state for a specific user.
+
+        Args:
+            user_id: Unique identifier for the user
+            state_file: Optional custom path for the state file
+        """
+        self.user_id = user_id
+        self.lock = threading.Lock()
+
+        if state_file:
+            self.state_file = state_file
+        elif os.path.exists("/app/data"):
+            self.state_file = f"/app/data/persona/persona_state_{user_id}.json"
+        else:
+            self.state_file = f"persona/persona_state_{user_id}.json"
+
+        Path(os.path.dirname(self.state_file) or ".").mkdir(parents=True, exist_ok=True)
+        self.data = self._load_state()
+
+    def _get_default_data(self) -> Dict[str, Any]:
+        """Get default persona state structure."""
+        data = {
+            "user_id": self.user_id,
+            "user_email": "",
+            "total_emails": 0,
+            "total_length": 0,
+            "style": {
+                "formal_count": 0,
+                "casual_count": 0,
+                "professional_count": 0,
+                "personal_count": 0
+            },
+            "personal_insights": [],
+            "family_insights": [],
+            "watermark": {"internal_date": 0, "message_ids": []},
+            "last_update": None,
+            "created_at": datetime.now().isoformat(),
+            "last_updated": None
+        }
+        for field in COUNTER_FIELDS:
+            data[field] = Counter()
+        return data
+
+    def _load_state(self) -> Dict[str, Any]:
+        """Load persona state from file."""
+        data = self._get_default_data()
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    data.update(json.load(f))
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Warning: Could not load persona state, starting fresh: {e}")
+                return self._get_default_data()
+        for field in COUNTER_FIELDS:
+            data[field] = Counter(data.get(field) or {})
+        return data
+
+    def save(self) -> None:
+        """Write the state atomically so readers never see a partial file."""
+        with self.lock:
+            self.data["last_updated"] = datetime.now().isoformat()
+            temp_file = f"{self.state_file}.tmp"
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.data, f, indent=2)
+                os.replace(temp_file, self.state_file)
+            except IOError as e:
+                print(f"Warning: Could not save persona state: {e}")
+
+    def reset(self, user_email: str = "") -> None:
+        """Discard all statistics, e.g. before a full rebuild."""
+        with self.lock:
+            self.data = self._get_default_data()
+            self.data["user_email"] = user_email or ""
+
+    def clear(self) -> None:
+        """Remove the persisted state."""
+        self.reset()
+        if os.path.exists(self.state_file):
+            os.remove(self.state_file)
+
+    def has_data(self) -> bool:
+        """Check whether any sent mail has been analyzed."""
+        return self.data["total_emails"] > 0
+
+    @property
+    def watermark_seconds(self) -> Optional[int]:
+        """Send time of the newest analyzed message in epoch seconds, if known."""
+        internal_date = self.data["watermark"]["internal_date"]
+        return internal_date // 1000 if internal_date else None
+
+    def _is_new(self, internal_date: int, message_id: str) -> bool:
+        """Check whether a message is newer than the watermark."""
+        if not internal_date:
+            # No send time to compare against (e.g. emails passed in by an agent)
+            return True
+        watermark = self.data["watermark"]
+        if internal_date != watermark["internal_date"]:
+            return internal_date > watermark["internal_date"]
+        return message_id not in watermark["message_ids"]
+
+    def _advance_watermark(self, internal_date: int, message_id: str) -> None:
+        """Move the watermark forward to a newly analyzed message."""
+        watermark = self.data["watermark"]
+        if internal_date > watermark["internal_date"]:
+            self.data["watermark"] = {"internal_date": internal_date, "message_ids": [message_id]}
+        elif internal_date == watermark["internal_date"] and message_id not in watermark["message_ids"]:
+            watermark["message_ids"].append(message_id)
+
+    def new_update(self) -> Dict[str, Any]:
+        """Empty summary of one update run, filled in by add_emails."""
+        return {
+            "emails": 0,
+            "new_contacts": [],
+            "topics": Counter(),
+            "style": {key: 0 for key in self.data["style"]},
+            "insights": []
+        }
+
+    def record_update(self, update: Dict[str, Any]) -> None:
+        """Keep a finished update as the "recent updates" shown in the persona."""
+        if update["emails"]:
+            update["analyzed_at"] = datetime.now().isoformat()
+            self.data["last_update"] = update
+
+    def add_emails(self, sent_emails: List[Tuple[str, str, str, str, Dict]], user_email: Optional[str] = None,
+                   update: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Fold sent emails newer than the watermark into the statistics.
+
+        Args:
+            sent_emails: Emails in the (subject, sender, body, id, thread_info) format
+            user_email: The user's own address, excluded from the contact counts
+            update: Summary from new_update() to accumulate into across several
+                calls; the caller then passes it to record_update(). Without it
+                the emails of this call are recorded as the latest update.
+
+        Returns:
+            Number of emails that were new and got analyzed
+        """
+        with self.lock:
+            if user_email:
+                self.data["user_email"] = user_email
+            own_address = (self.data["user_email"] or "").lower()
+            single_call = update is None
+            if single_call:
+                update = self.new_update()
+            analyzed_before = update["emails"]
+
+            for subject, to_header, body, email_id, thread_info in sent_emails:
+                internal_date = 0
+                if isinstance(thread_info, dict):
+                    try:
+                        internal_date = int(thread_info.get('internal_date') or 0)
+                    except (TypeError, ValueError):
+                        internal_date = 0
+                if not self._is_new(internal_date, email_id):
+                    continue
+
+                recipients = sent_email_recipients(to_header, thread_info)
+                self._add_email(subject or "", body or "", recipients, own_address, update)
+                if internal_date:
+                    self._advance_watermark(internal_date, email_id)
+
+            if single_call:
+                self.record_update(update)
+            return update["emails"] - analyzed_before
+
+    def rebuild(self, sent_emails: List[Tuple[str, str, str, str, Dict]], user_email: Optional[str] = None) -> int:
+        """Replace the statistics with a full analysis of the given sent emails."""
+        self.reset(user_email or self.data["user_email"])
+        analyzed = self.add_emails(sent_emails, user_email)
+        self.data["last_update"] = None
+        return analyzed
+
+    def _add_email(self, subject: str, body: str, recipients: List[str], own_address: str, update: Dict) -> None:
+        """Add one email's contacts, keywords and style to the statistics."""
+        data = self.data
+        subject_scan = PERSONA_KEYWORDS.scan(subject)
+        body_scan = PERSONA_KEYWORDS.scan(body)
+
+        data["total_emails"] += 1
+        data["total_length"] += len(body)
+        update["emails"] += 1
+
+        # Contacts and their domains, once per email
+        for address in recipients:
+            if address == own_address:
+                continue
+            if address not in data["recipients"]:
+                update["new_contacts"].append(address)
+            data["recipients"][address] += 1
+            data["domains"][address.rsplit('@', 1)[-1]] += 1
+
+        # Communication style tallies
+        styles = {
+            "formal_count": body_scan.has_any('formal'),
+            "casual_count": body_scan.has_any('casual'),
+            "professional_count": body_scan.has_any('professional') or subject_scan.has_any('professional'),
+            "personal_count": body_scan.has_any('personal') or subject_scan.has_any('personal')
+        }
+        for key, matched in styles.items():
+            if matched:
+                data["style"][key] += 1
+                update["style"][key] += 1
+
+        # Topics and titles, counted per subject and per body
+        for scan in (subject_scan, body_scan):
+            for field in ('professional_topics', 'topics_of_interest', 'titles'):
+                matched = scan.matched(field)
+                data[field].update(matched)
+                if field != 'titles':
+                    update["topics"].update(matched)
+
+        # Greeting and closing lines
+        first_lines = body.split('\n', 3)[:3]
+        if body_scan.matched_between('greetings', 0, len('\n'.join(first_lines))):
+            data["greetings"][' '.join(first_lines).lower()[:50]] += 1
+        last_lines = body.rsplit('\n', 3)[-3:]
+        if body_scan.matched_between('closings', len(body) - len('\n'.join(last_lines)), len(body)):
+            data["closings"][' '.join(last_lines).lower()[:50]] += 1
+
+        # Sentences that reveal personal details
+        for category in ('location', 'family', 'interests', 'lifestyle'):
+            for keyword in body_scan.matched(category):
+                sentence = body_scan.sentence(keyword)
+                if sentence and self._remember(data["personal_insights"], f"- {sentence}"):
+                    update["insights"].append(f"- {sentence}")
+        for keyword in body_scan.matched('family_life'):
+            sentence = body_scan.sentence(keyword, min_length=10)
+            if sentence:
+                self._remember(data["family_insights"], f"- {sentence}")
+
+    @staticmethod
+    def _remember(insights: List[str], line: str) -> bool:
+        """Append a new insight line, keeping only the newest ones."""
+        if line in insights:
+            return False
+        insights.append(line)
+        del insights[:-MAX_STORED_INSIGHTS]
+        return True
+
+    def _primary_style(self) -> str:
+        """Determine primary communication style."""
+        patterns = self.data["style"]
+        max_count = max(patterns.values())
+        for style, count in patterns.items():
+            if count == max_count:
+                return style.replace('_count', '').title()
+        return "Professional"
+
+    def _industries(self, domains: List[str]) -> List[str]:
+        """Industries suggested by the most frequent recipient domains."""
+        industries = []
+        for domain in domains:
+            for industry, indicators in INDUSTRY_DOMAINS.items():
+                if any(indicator in domain for indicator in indicators) and industry not in industries:
+                    industries.append(industry)
+        return industries
+
+    def render_facts(self) -> str:
+        """Render the persona text read by the response agents."""
+        data = self.data
+        style = data["style"]
+        total = data["total_emails"]
+        top_domains = [domain for domain, _ in data["domains"].most_common(10)]
+        contacts = '\n'.join(f"- {address}" for address, _ in data["recipients"].most_common(10))
+        professional_topics = '\n'.join(f"- {topic.title()}: mentioned {count} times"
+                                        for topic, count in data["professional_topics"].most_common(8))
+        interests = '\n'.join(f"- {topic}: mentioned {count} times"
+                              for topic, count in data["topics_of_interest"].most_common(10))
+        personal = '\n'.join(data["personal_insights"][-10:]) or "- Limited personal information detected in sent emails"
+        family = '\n'.join(data["family_insights"][-8:]) or "- Limited family/personal information detected in sent emails"
+
+        style_analysis = [f"- Average email length: {int(data['total_length'] / total) if total else 0} characters"]
+        if data["greetings"]:
+            style_analysis.append(f"- Common greetings: {', '.join(g for g, _ in data['greetings'].most_common(3))}")
+        if data["closings"]:
+            style_analysis.append(f"- Common closings: {', '.join(c for c, _ in data['closings'].most_common(3))}")
+
+        work_analysis = []
+        industries = self._industries(top_domains)
+        if industries:
+            work_analysis.append(f"- Likely industries: {', '.join(industries)}")
+        if data["titles"]:
+            titles = [title for title, _ in data["titles"].most_common(5)]
+            work_analysis.append(f"- Potential roles/titles mentioned: {', '.join(titles)}")
+        style_text = '\n'.join(style_analysis)
+        work_text = '\n'.join(work_analysis) or "- Work/industry information not clearly detected"
+
+        persona = f"""USER PERSONA AND FACTS
+Generated from analysis of {total} sent emails
+
+=== BASIC INFORMATION ===
+Email Address: {data['user_email'] or 'Unknown'}
+Primary Communication Style: {self._primary_style()}
+
+=== PROFESSIONAL PROFILE ===
+Top Business Domains: {', '.join(top_domains[:5])}
+Professional Communication: {style['professional_count']} professional emails
+Formal Communication: {style['formal_count']} formal emails
+
+Key Professional Topics:
+{professional_topics}
+
+=== RELATIONSHIPS AND CONTACTS ===
+Frequent Email Contacts:
+{contacts}
+
+Communication Patterns:
+- Professional: {style['professional_count']} emails
+- Personal: {style['personal_count']} emails
+- Formal: {style['formal_count']} emails
+- Casual: {style['casual_count']} emails
+
+=== PERSONAL INSIGHTS ===
+{personal}
+
+=== COMMUNICATION STYLE ANALYSIS ===
+{style_text}
+
+=== TOPICS OF INTEREST ===
+{interests}
+
+=== WORK AND INDUSTRY ===
+{work_text}
+
+=== FAMILY AND PERSONAL LIFE ===
+{family}
+"""
+        persona += self._render_recent_update()
+        persona += f"""
+Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Total Emails Analyzed: {total}
+"""
+        return persona
+
+    def _render_recent_update(self) -> str:
+        """Render what the latest incremental update added, if any."""
+        update = self.data.get("last_update")
+        if not update:
+            return ""
+
+        new_contacts = '\n'.join(f"- {address}" for address in update["new_contacts"][:10])
+        topics = '\n'.join(f"- {topic}: mentioned {count} times"
+                           for topic, count in Counter(update["topics"]).most_common(8))
+        insights = '\n'.join(update["insights"][:5])
+        analyzed_at = datetime.fromisoformat(update["analyzed_at"]).strftime('%Y-%m-%d %H:%M:%S')
+
+        return f"""
+=== RECENT UPDATES ===
+Last Update Analysis: {analyzed_at}
+Recent Emails Analyzed: {update['emails']}
+
+New Contacts:
+{new_contacts or "- No new contacts in recent emails"}
+
+Recent Topics of Activity:
+{topics or "- No significant topics detected in recent emails"}
+
+Recent Communication Pattern:
+- Professional: {update['style']['professional_count']} emails
+- Personal: {update['style']['personal_count']} emails
+- Formal: {update['style']['formal_count']} emails
+- Casual: {update['style']['casual_count']} emails
+
+Recent Personal Insights:
+{insights or "- No new personal insights detected"}
+"""
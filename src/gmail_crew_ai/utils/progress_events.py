@@ -0,0 +1,199 @@
+"""Typed progress events from the CrewAI event bus and LiteLLM callbacks.
+
+Agent and task boundaries, tool calls (with latency) and LLM calls (with
+tokens and latency) are reported to the active progress sink, so the UI can
+follow a run without scraping stdout.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+try:
+    from litellm.integrations.custom_logger import CustomLogger
+except ImportError:
+    # LiteLLM is optional; CrewAI events are still reported without it
+    CustomLogger = object
+
+
+# Receives (kind, message, **data); kinds are agent, task, tool, llm, warning
+ProgressSink = Callable[..., None]
+
+_sink: Optional[ProgressSink] = None
+_sink_lock = threading.Lock()
+
+
+def set_progress_sink(sink: Optional[ProgressSink]) -> Optional[ProgressSink]:
+    """Set the process-wide progress sink; returns the previous one."""
+    global _sink
+    with _sink_lock:
+        previous, _sink = _sink, sink
+    return previous
+
+
+@contextmanager
+def progress_sink(sink: ProgressSink) -> Iterator[None]:
+    """Report progress events to ``sink`` while the block runs."""
+    previous = set_progress_sink(sink)
+    try:
+        yield
+    finally:
+        set_progress_sink(previous)
+
+
+def emit_progress(kind: str, message: str, **data):
+    """Send an event to the active sink; a no-op when nobody listens."""
+    sink = _sink
+    if sink is None:
+        return
+    try:
+        sink(kind, message, **data)
+    except Exception as e:
+        print(f"Progress event failed: {e}")
+
+
+def _agent_name(event) -> str:
+    agent = getattr(event, "agent", None)
+    return getattr(agent, "role", None) or getattr(event, "agent_role", None) or "agent"
+
+
+def _task_name(event) -> str:
+    task = getattr(event, "task", None)
+    name = getattr(task, "name", None) or (getattr(task, "description", "") or "")[:60]
+    return name or "task"
+
+
+def _elapsed_ms(started_at, finished_at) -> Optional[float]:
+    try:
+        return (finished_at - started_at).total_seconds() * 1000
+    except Exception:
+        return None
+
+
+class ProgressCallbackHandler(CustomLogger):
+    """LiteLLM callback that reports each completion with tokens and latency."""
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        """Report tokens and latency of a successful call."""
+        if _sink is None:
+            return
+        usage = getattr(response_obj, "usage", None)
+        input_tokens = int(getattr(usage, "prompt_tokens", 0) or 0)
+        output_tokens = int(getattr(usage, "completion_tokens", 0) or 0)
+        latency_ms = _elapsed_ms(start_time, end_time) or 0.0
+        model = kwargs.get("model") or getattr(response_obj, "model", "") or ""
+        emit_progress("llm", f"LLM call {model}: {input_tokens}+{output_tokens} tokens in {latency_ms / 1000:.1f}s",
+                      model=model, input_tokens=input_tokens, output_tokens=output_tokens, latency_ms=latency_ms)
+
+    def log_failure_event(self, kwargs, response_obj, start_time, end_time):
+        """Report a failed call."""
+        if _sink is None:
+            return
+        model = kwargs.get("model") or ""
+        error = kwargs.get("exception") or response_obj
+        emit_progress("warning", f"LLM call {model} failed: {str(error)[:200]}", model=model)
+
+    async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+        self.log_success_event(kwargs, response_obj, start_time, end_time)
+
+    async def async_log_failure_event(self, kwargs, response_obj, start_time, end_time):
+        self.log_failure_event(kwargs, response_obj, start_time, end_time)
+
+
+_handler: Optional[ProgressCallbackHandler] = None
+_crewai_listeners_installed = False
+_install_lock = threading.Lock()
+
+# Start times of running tools, for CrewAI versions whose events carry no timestamps
+_tool_started: Dict[Any, float] = {}
+
+
+def _install_crewai_listeners():
+    """Report agent, task and tool events from the CrewAI event bus."""
+    global _crewai_listeners_installed
+    if _crewai_listeners_installed:
+        return
+    try:
+        from crewai.utilities.events import (
+            crewai_event_bus,
+            AgentExecutionStartedEvent,
+            AgentExecutionCompletedEvent,
+            TaskStartedEvent,
+            TaskCompletedEvent,
+            TaskFailedEvent,
+            ToolUsageStartedEvent,
+            ToolUsageFinishedEvent,
+            ToolUsageErrorEvent,
+        )
+    except ImportError:
+        return
+
+    @crewai_event_bus.on(AgentExecutionStartedEvent)
+    def _on_agent_started(source, event):
+        emit_progress("agent", f"{_agent_name(event)} started", agent=_agent_name(event), state="started")
+
+    @crewai_event_bus.on(AgentExecutionCompletedEvent)
+    def _on_agent_completed(source, event):
+        emit_progress("agent", f"{_agent_name(event)} finished", agent=_agent_name(event), state="finished")
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def _on_task_started(source, event):
+        emit_progress("task", f"Task started: {_task_name(event)}", task=_task_name(event), state="started")
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def _on_task_completed(source, event):
+        emit_progress("task", f"Task completed: {_task_name(event)}", task=_task_name(event), state="finished")
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def _on_task_failed(source, event):
+        error = str(getattr(event, "error", ""))[:200]
+        emit_progress("warning", f"Task failed: {_task_name(event)}: {error}", task=_task_name(event), state="failed")
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def _on_tool_started(source, event):
+        _tool_started[(threading.get_ident(), event.tool_name)] = time.perf_counter()
+
+    def _tool_latency(event) -> Optional[float]:
+        started = _tool_started.pop((threading.get_ident(), event.tool_name), None)
+        latency_ms = _elapsed_ms(getattr(event, "started_at", None), getattr(event, "finished_at", None))
+        if latency_ms is None and started is not None:
+            latency_ms = (time.perf_counter() - started) * 1000
+        return latency_ms
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _on_tool_finished(source, event):
+        latency_ms = _tool_latency(event)
+        took = f" in {latency_ms / 1000:.1f}s" if latency_ms is not None else ""
+        emit_progress("tool", f"{event.tool_name}{took}", tool=event.tool_name, latency_ms=latency_ms,
+                      from_cache=bool(getattr(event, "from_cache", False)))
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def _on_tool_error(source, event):
+        latency_ms = _tool_latency(event)
+        error = str(getattr(event, "error", ""))[:200]
+        emit_progress("warning", f"{event.tool_name} failed: {error}", tool=event.tool_name, latency_ms=latency_ms)
+
+    _crewai_listeners_installed = True
+
+
+def install_progress_events() -> bool:
+    """
+    Register progress reporting with CrewAI and LiteLLM once per process.
+
+    Returns:
+        True if the LiteLLM callback is registered, False if LiteLLM is unavailable
+    """
+    global _handler
+    with _install_lock:
+        _install_crewai_listeners()
+        if CustomLogger is object:
+            return False
+
+        import litellm
+
+        if _handler is None:
+            _handler = ProgressCallbackHandler()
+        if _handler not in litellm.callbacks:
+            litellm.callbacks.append(_handler)
+    return True
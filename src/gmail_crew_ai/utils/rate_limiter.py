@@ -1,90 +1,537 @@
-"""Rate limiter for CrewAI to prevent API rate limits."""
+"""Rate limiter for CrewAI to prevent API rate limits.
 
+Budgets are token buckets per provider/model for both requests per minute
+(RPM) and tokens per minute (TPM). Bucket state lives in a SQLite database so
+every worker process on the host draws from the same budget, and waiters are
+served in FIFO order through a shared ticket queue. Models that hit a 429 are
+put into a per-model backoff that every process honours.
+
+The database is opened on first use, so importing this module does not
+create files. It lives at ``$RATE_LIMITER_DB`` if set, else under
+``/app/data`` in containers, else next to the working directory at first use.
+"""
+
+import asyncio
 import os
+import sqlite3
 import time
-import json
-from datetime import datetime, timedelta
-from typing import Dict
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+
+# Conservative per-provider defaults, used until limits are configured explicitly
+DEFAULT_LIMITS = {
+    "anthropic": {"rpm": 50, "tpm": 20000},
+    "openai": {"rpm": 500, "tpm": 30000},
+    "default": {"rpm": 60, "tpm": 20000},
+}
+
+# Waiters that have not refreshed their ticket for this long are considered gone
+WAITER_TIMEOUT_SECONDS = 30.0
+
+# Upper bound on a single sleep while waiting, so the queue is re-checked regularly
+MAX_POLL_SECONDS = 1.0
+
+# Consecutive 429s are forgotten once a model's backoff expired this long ago
+BACKOFF_MEMORY_SECONDS = 300.0
+
+
+def split_model(model: str) -> Tuple[str, str]:
+    """Split a LiteLLM model string into (provider, model)."""
+    model = (model or "").strip()
+    if "/" in model:
+        provider, name = model.split("/", 1)
+        return provider.lower(), name
+    lowered = model.lower()
+    if "claude" in lowered:
+        return "anthropic", model
+    if lowered.startswith(("gpt", "o1", "o3", "o4", "chatgpt")):
+        return "openai", model
+    return "default", model
 
 
 class RateLimiter:
-    """Intelligent rate limiter for API calls."""
-    
-    def __init__(self, max_tokens_per_minute: int = 20000):
+    """Process-shared token-bucket rate limiter for LLM API calls."""
+
+    def __init__(self, max_tokens_per_minute: int = 20000, db_path: Optional[str] = None,
+                 default_model: Optional[str] = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            max_tokens_per_minute: TPM limit for providers without an explicit default
+            db_path: Optional custom path of the shared SQLite database
+            default_model: Model used when callers do not pass one (defaults to $MODEL)
+        """
         self.max_tokens_per_minute = max_tokens_per_minute
-        self.usage_window = []  # Track usage in sliding window
-        self.usage_file = "rate_limiter_usage.json"
-        
-    def load_recent_usage(self):
-        """Load recent API usage from file."""
+        self.default_model = default_model
+        self._db_path = db_path
+        self._schema_ready = False
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    @property
+    def db_path(self) -> str:
+        """Path of the shared database, resolved to an absolute path on first use."""
+        if self._db_path is None:
+            if os.getenv("RATE_LIMITER_DB"):
+                path = os.getenv("RATE_LIMITER_DB")
+            elif os.path.exists("/app/data"):
+                path = "/app/data/rate_limiter.db"
+            else:
+                path = "rate_limiter.db"
+            self._db_path = os.path.abspath(path)
+        return self._db_path
+
+    @contextmanager
+    def _transaction(self):
+        """Open a connection and hold the database write lock for the block."""
+        if not self._schema_ready:
+            self._ensure_schema()
+            self._schema_ready = True
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
         try:
-            if os.path.exists(self.usage_file):
-                with open(self.usage_file, 'r') as f:
-                    data = json.load(f)
-                # Filter to last minute
-                cutoff = datetime.now() - timedelta(minutes=1)
-                self.usage_window = [
-                    entry for entry in data 
-                    if datetime.fromisoformat(entry['timestamp']) > cutoff
-                ]
-        except:
-            self.usage_window = []
-    
-    def save_usage(self):
-        """Save current usage window."""
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def _ensure_schema(self):
+        """Create the bucket, waiter and backoff tables if needed."""
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
         try:
-            with open(self.usage_file, 'w') as f:
-                json.dump(self.usage_window, f)
-        except:
-            pass
-    
-    def get_current_usage(self) -> int:
-        """Get token usage in current minute."""
-        self.load_recent_usage()
-        return sum(entry.get('tokens', 0) for entry in self.usage_window)
-    
-    def can_make_request(self, estimated_tokens: int) -> bool:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    key TEXT PRIMARY KEY,
+                    rpm_capacity REAL NOT NULL,
+                    tpm_capacity REAL NOT NULL,
+                    rpm_available REAL NOT NULL,
+                    tpm_available REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS waiters (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    heartbeat REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS waiters_key ON waiters (key, id)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS backoff (
+                    key TEXT PRIMARY KEY,
+                    until REAL NOT NULL,
+                    failures INTEGER NOT NULL
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _bucket_key(self, model: Optional[str]) -> str:
+        """Get the bucket key for a model."""
+        provider, name = split_model(model or self.default_model or os.getenv("MODEL", ""))
+        return f"{provider}/{name}"
+
+    def _default_limits(self, key: str) -> Dict[str, float]:
+        """Get the default RPM/TPM limits for a bucket key."""
+        provider = key.split("/", 1)[0]
+        limits = dict(DEFAULT_LIMITS.get(provider, DEFAULT_LIMITS["default"]))
+        if provider not in DEFAULT_LIMITS:
+            limits["tpm"] = self.max_tokens_per_minute
+        return limits
+
+    def _load_bucket(self, conn: sqlite3.Connection, key: str, now: float) -> Dict[str, float]:
+        """Load a bucket and refill it for the time elapsed since its last update."""
+        row = conn.execute(
+            "SELECT rpm_capacity, tpm_capacity, rpm_available, tpm_available, updated_at "
+            "FROM buckets WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            limits = self._default_limits(key)
+            bucket = {
+                "rpm_capacity": float(limits["rpm"]),
+                "tpm_capacity": float(limits["tpm"]),
+                "rpm_available": float(limits["rpm"]),
+                "tpm_available": float(limits["tpm"]),
+            }
+            conn.execute(
+                "INSERT INTO buckets VALUES (?, ?, ?, ?, ?, ?)",
+                (key, bucket["rpm_capacity"], bucket["tpm_capacity"],
+                 bucket["rpm_available"], bucket["tpm_available"], now)
+            )
+            return bucket
+
+        rpm_capacity, tpm_capacity, rpm_available, tpm_available, updated_at = row
+        elapsed = max(0.0, now - updated_at)
+        return {
+            "rpm_capacity": rpm_capacity,
+            "tpm_capacity": tpm_capacity,
+            "rpm_available": min(rpm_capacity, rpm_available + elapsed * rpm_capacity / 60.0),
+            "tpm_available": min(tpm_capacity, tpm_available + elapsed * tpm_capacity / 60.0),
+        }
+
+    def _store_bucket(self, conn: sqlite3.Connection, key: str, bucket: Dict[str, float], now: float):
+        """Persist a bucket's current level."""
+        conn.execute(
+            "UPDATE buckets SET rpm_capacity = ?, tpm_capacity = ?, rpm_available = ?, "
+            "tpm_available = ?, updated_at = ? WHERE key = ?",
+            (bucket["rpm_capacity"], bucket["tpm_capacity"], bucket["rpm_available"],
+             bucket["tpm_available"], now, key)
+        )
+
+    def _head_of_queue(self, conn: sqlite3.Connection, key: str, now: float) -> Optional[int]:
+        """Drop abandoned waiters and return the ticket at the head of the queue."""
+        conn.execute("DELETE FROM waiters WHERE heartbeat < ?", (now - WAITER_TIMEOUT_SECONDS,))
+        row = conn.execute("SELECT MIN(id) FROM waiters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _attempt(self, key: str, tokens: int, ticket: Optional[int],
+                 reserve: bool = True) -> Tuple[bool, float]:
+        """
+        Try to take one request and ``tokens`` tokens from a bucket.
+
+        Args:
+            key: Bucket key
+            tokens: Estimated tokens for the request
+            ticket: Waiter ticket, or None for a non-queued attempt
+            reserve: Take the budget when it is available; False only checks
+
+        Returns:
+            Tuple of (granted, seconds until the request could be granted)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            bucket = self._load_bucket(conn, key, now)
+            head = self._head_of_queue(conn, key, now)
+
+            # Requests larger than the bucket would never fit; cap them at capacity
+            tokens = min(float(tokens), bucket["tpm_capacity"])
+
+            rpm_wait = max(0.0, 1.0 - bucket["rpm_available"]) * 60.0 / bucket["rpm_capacity"]
+            tpm_wait = max(0.0, tokens - bucket["tpm_available"]) * 60.0 / bucket["tpm_capacity"]
+            backoff = conn.execute("SELECT until FROM backoff WHERE key = ?", (key,)).fetchone()
+            backoff_wait = max(0.0, backoff[0] - now) if backoff else 0.0
+            wait = max(rpm_wait, tpm_wait, backoff_wait)
+
+            # Only the head of the queue may take budget while others are waiting
+            if head is not None and head != ticket:
+                self._store_bucket(conn, key, bucket, now)
+                if ticket is not None:
+                    conn.execute("UPDATE waiters SET heartbeat = ? WHERE id = ?", (now, ticket))
+                return False, max(wait, 0.05)
+
+            if wait > 0:
+                self._store_bucket(conn, key, bucket, now)
+                if ticket is not None:
+                    conn.execute("UPDATE waiters SET heartbeat = ? WHERE id = ?", (now, ticket))
+                return False, wait
+
+            if not reserve:
+                self._store_bucket(conn, key, bucket, now)
+                return True, 0.0
+
+            bucket["rpm_available"] -= 1.0
+            bucket["tpm_available"] -= tokens
+            self._store_bucket(conn, key, bucket, now)
+            if ticket is not None:
+                conn.execute("DELETE FROM waiters WHERE id = ?", (ticket,))
+            return True, 0.0
+
+    def _enqueue(self, key: str, tokens: int) -> int:
+        """Take a ticket in the waiter queue for a bucket."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO waiters (key, tokens, heartbeat) VALUES (?, ?, ?)",
+                (key, tokens, time.time())
+            )
+            return cursor.lastrowid
+
+    def _dequeue(self, ticket: int):
+        """Give up a ticket in the waiter queue."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM waiters WHERE id = ?", (ticket,))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def set_limits(self, model: Optional[str] = None, rpm: Optional[float] = None,
+                   tpm: Optional[float] = None):
+        """Set the RPM and/or TPM capacity of a model's bucket."""
+        key = self._bucket_key(model)
+        now = time.time()
+        with self._transaction() as conn:
+            bucket = self._load_bucket(conn, key, now)
+            if rpm:
+                bucket["rpm_available"] = min(float(rpm), bucket["rpm_available"])
+                bucket["rpm_capacity"] = float(rpm)
+            if tpm:
+                bucket["tpm_available"] = min(float(tpm), bucket["tpm_available"])
+                bucket["tpm_capacity"] = float(tpm)
+            self._store_bucket(conn, key, bucket, now)
+
+    def update_budget(self, model: Optional[str] = None,
+                      rpm_limit: Optional[float] = None, rpm_remaining: Optional[float] = None,
+                      tpm_limit: Optional[float] = None, tpm_remaining: Optional[float] = None):
+        """
+        Align a bucket with the budget reported by the provider.
+
+        Limits replace the configured capacity; remaining counts can only lower
+        the local level, since other hosts may share the same API key.
+        """
+        key = self._bucket_key(model)
+        now = time.time()
+        with self._transaction() as conn:
+            bucket = self._load_bucket(conn, key, now)
+            if rpm_limit:
+                bucket["rpm_capacity"] = float(rpm_limit)
+            if tpm_limit:
+                bucket["tpm_capacity"] = float(tpm_limit)
+            bucket["rpm_available"] = min(bucket["rpm_available"], bucket["rpm_capacity"])
+            bucket["tpm_available"] = min(bucket["tpm_available"], bucket["tpm_capacity"])
+            if rpm_remaining is not None:
+                bucket["rpm_available"] = min(bucket["rpm_available"], float(rpm_remaining))
+            if tpm_remaining is not None:
+                bucket["tpm_available"] = min(bucket["tpm_available"], float(tpm_remaining))
+            self._store_bucket(conn, key, bucket, now)
+
+    def record_rate_limit(self, model: Optional[str] = None, retry_after: Optional[float] = None,
+                          base_delay: float = 5.0, max_delay: float = 300.0) -> float:
+        """
+        Put a model into backoff after a 429 response.
+
+        Args:
+            model: Model that was rate limited
+            retry_after: Delay requested by the provider, if any
+            base_delay: First backoff delay when the provider gives none
+            max_delay: Upper bound on the backoff delay
+
+        Returns:
+            Seconds until the model may be called again
+        """
+        key = self._bucket_key(model)
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT until, failures FROM backoff WHERE key = ?", (key,)).fetchone()
+            failures = 1
+            if row and now - row[0] < BACKOFF_MEMORY_SECONDS:
+                failures = row[1] + 1
+            if retry_after is not None and retry_after > 0:
+                delay = min(float(retry_after), max_delay)
+            else:
+                delay = min(base_delay * (2 ** (failures - 1)), max_delay)
+            conn.execute(
+                "INSERT OR REPLACE INTO backoff (key, until, failures) VALUES (?, ?, ?)",
+                (key, now + delay, failures)
+            )
+            # The provider says the budget is exhausted; drain the local bucket too
+            bucket = self._load_bucket(conn, key, now)
+            bucket["rpm_available"] = min(bucket["rpm_available"], 0.0)
+            bucket["tpm_available"] = min(bucket["tpm_available"], 0.0)
+            self._store_bucket(conn, key, bucket, now)
+        return delay
+
+    def record_success(self, model: Optional[str] = None):
+        """Clear a model's backoff after a successful call."""
+        key = self._bucket_key(model)
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM backoff WHERE key = ? AND until <= ?", (key, time.time()))
+
+    def pause(self, model: Optional[str] = None, seconds: float = 0.0):
+        """Hold a model until its provider budget resets, without counting a failure."""
+        if seconds <= 0:
+            return
+        key = self._bucket_key(model)
+        until = time.time() + seconds
+        with self._transaction() as conn:
+            row = conn.execute("SELECT until, failures FROM backoff WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute("UPDATE backoff SET until = ? WHERE key = ?", (max(row[0], until), key))
+            else:
+                conn.execute("INSERT INTO backoff (key, until, failures) VALUES (?, ?, 0)", (key, until))
+
+    def get_backoff(self, model: Optional[str] = None) -> Tuple[float, int]:
+        """Get (seconds of backoff remaining, consecutive 429s) for a model."""
+        key = self._bucket_key(model)
+        with self._transaction() as conn:
+            row = conn.execute("SELECT until, failures FROM backoff WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if not row or now - row[0] >= BACKOFF_MEMORY_SECONDS:
+            return 0.0, 0
+        return max(0.0, row[0] - now), row[1]
+
+    def try_acquire(self, estimated_tokens: int = 5000, model: Optional[str] = None) -> bool:
+        """
+        Take budget for one request without waiting.
+
+        Fails when the bucket is short or other callers are already queued.
+
+        Args:
+            estimated_tokens: Estimated tokens for the request
+            model: Model the request is for (defaults to the limiter's model)
+
+        Returns:
+            True if the request may be sent now
+        """
+        granted, _ = self._attempt(self._bucket_key(model), estimated_tokens, None)
+        return granted
+
+    async def acquire(self, estimated_tokens: int = 5000, model: Optional[str] = None,
+                      timeout: Optional[float] = None) -> bool:
+        """
+        Wait in the shared FIFO queue until budget is available, then take it.
+
+        Args:
+            estimated_tokens: Estimated tokens for the request
+            model: Model the request is for (defaults to the limiter's model)
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if budget was acquired, False on timeout
+        """
+        key = self._bucket_key(model)
+        ticket = self._enqueue(key, estimated_tokens)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                granted, wait = self._attempt(key, estimated_tokens, ticket)
+                if granted:
+                    ticket = None
+                    return True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                await asyncio.sleep(min(wait, MAX_POLL_SECONDS))
+        finally:
+            if ticket is not None:
+                self._dequeue(ticket)
+
+    def acquire_blocking(self, estimated_tokens: int = 5000, model: Optional[str] = None,
+                         timeout: Optional[float] = None) -> bool:
+        """Blocking counterpart of ``acquire`` for synchronous callers."""
+        key = self._bucket_key(model)
+        ticket = self._enqueue(key, estimated_tokens)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        announced = False
+        try:
+            while True:
+                granted, wait = self._attempt(key, estimated_tokens, ticket)
+                if granted:
+                    ticket = None
+                    return True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                if not announced and wait >= 1.0:
+                    print(f"⏳ Rate limit protection: waiting about {wait:.1f} seconds...")
+                    announced = True
+                time.sleep(min(wait, MAX_POLL_SECONDS))
+        finally:
+            if ticket is not None:
+                self._dequeue(ticket)
+
+    def can_make_request(self, estimated_tokens: int, model: Optional[str] = None) -> bool:
         """Check if request can be made without hitting rate limit."""
-        current_usage = self.get_current_usage()
-        return (current_usage + estimated_tokens) <= self.max_tokens_per_minute
-    
-    def wait_if_needed(self, estimated_tokens: int = 5000):
-        """Wait if needed to avoid rate limits."""
-        current_usage = self.get_current_usage()
-        
-        if (current_usage + estimated_tokens) > self.max_tokens_per_minute:
-            # Calculate wait time based on oldest entry in window
-            if self.usage_window:
-                oldest_entry = min(self.usage_window, key=lambda x: x['timestamp'])
-                oldest_time = datetime.fromisoformat(oldest_entry['timestamp'])
-                wait_until = oldest_time + timedelta(minutes=1)
-                wait_seconds = max(0, (wait_until - datetime.now()).total_seconds())
-                
-                if wait_seconds > 0:
-                    print(f"⏳ Rate limit protection: waiting {wait_seconds:.1f} seconds...")
-                    time.sleep(wait_seconds)
-    
-    def record_usage(self, tokens_used: int):
-        """Record API usage."""
-        self.usage_window.append({
-            'timestamp': datetime.now().isoformat(),
-            'tokens': tokens_used
-        })
-        self.save_usage()
-    
-    def get_usage_stats(self) -> Dict:
+        key = self._bucket_key(model)
+        now = time.time()
+        with self._transaction() as conn:
+            bucket = self._load_bucket(conn, key, now)
+            queued = self._head_of_queue(conn, key, now) is not None
+        return (not queued and bucket["rpm_available"] >= 1.0
+                and bucket["tpm_available"] >= min(estimated_tokens, bucket["tpm_capacity"]))
+
+    def wait_for_capacity(self, estimated_tokens: int = 5000, model: Optional[str] = None,
+                          timeout: Optional[float] = None) -> bool:
+        """
+        Wait until a request would fit in the shared budget, without taking it.
+
+        Use this to hold off work before it starts; the LLM calls themselves
+        still reserve their budget through ``acquire``/``acquire_blocking``.
+
+        Returns:
+            True once the budget is available, False on timeout
+        """
+        key = self._bucket_key(model)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        announced = False
+        while True:
+            available, wait = self._attempt(key, estimated_tokens, None, reserve=False)
+            if available:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            if not announced and wait >= 1.0:
+                print(f"⏳ Rate limit protection: waiting about {wait:.1f} seconds...")
+                announced = True
+            time.sleep(min(wait, MAX_POLL_SECONDS))
+
+    def wait_if_needed(self, estimated_tokens: int = 5000, model: Optional[str] = None):
+        """Wait until the request fits in the shared budget. Nothing is reserved."""
+        self.wait_for_capacity(estimated_tokens, model)
+
+    def record_usage(self, tokens_used: int, estimated_tokens: int = 0, model: Optional[str] = None):
+        """
+        Reconcile actual token usage with what was reserved up front.
+
+        Args:
+            tokens_used: Tokens the request actually consumed
+            estimated_tokens: Tokens reserved when the request was acquired
+            model: Model the request was for
+        """
+        difference = tokens_used - estimated_tokens
+        if not difference:
+            return
+        key = self._bucket_key(model)
+        now = time.time()
+        with self._transaction() as conn:
+            bucket = self._load_bucket(conn, key, now)
+            # Going negative is allowed; the debt is paid back by the refill
+            bucket["tpm_available"] = min(bucket["tpm_capacity"], bucket["tpm_available"] - difference)
+            self._store_bucket(conn, key, bucket, now)
+
+    def get_usage_stats(self, model: Optional[str] = None) -> Dict:
         """Get current usage statistics."""
-        self.load_recent_usage()
-        current_usage = sum(entry.get('tokens', 0) for entry in self.usage_window)
-        
+        key = self._bucket_key(model)
+        now = time.time()
+        with self._transaction() as conn:
+            bucket = self._load_bucket(conn, key, now)
+            self._head_of_queue(conn, key, now)
+            waiting = conn.execute("SELECT COUNT(*) FROM waiters WHERE key = ?", (key,)).fetchone()[0]
+
+        current_usage = int(max(0.0, bucket["tpm_capacity"] - bucket["tpm_available"]))
+        max_limit = int(bucket["tpm_capacity"])
+
         return {
+            'model': key,
             'current_usage': current_usage,
-            'max_limit': self.max_tokens_per_minute,
-            'percentage_used': (current_usage / self.max_tokens_per_minute) * 100,
-            'requests_in_window': len(self.usage_window),
-            'can_make_request': current_usage < self.max_tokens_per_minute * 0.8  # 80% threshold
+            'max_limit': max_limit,
+            'percentage_used': (current_usage / max_limit) * 100 if max_limit else 0.0,
+            'requests_in_window': int(max(0.0, bucket["rpm_capacity"] - bucket["rpm_available"])),
+            'requests_limit': int(bucket["rpm_capacity"]),
+            'waiting': waiting,
+            'backoff_seconds': self.get_backoff(model)[0],
+            'can_make_request': current_usage < max_limit * 0.8  # 80% threshold
         }
 
 
 # Global rate limiter instance
-rate_limiter = RateLimiter(max_tokens_per_minute=20000)  # Conservative limit
\ No newline at end of file
+rate_limiter = RateLimiter(max_tokens_per_minute=20000)  # Conservative limit
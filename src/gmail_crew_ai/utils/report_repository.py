@@ -0,0 +1,161 @@
+"""Indexed, memoized access to processing report files.
+
+Reports are listed from directory metadata only (name, mtime, size); file
+content is read and parsed the first time it is viewed and reused until the
+file changes on disk. Viewers render large reports one page at a time.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from .context_projection import parse_json_content
+
+
+# Parsed reports kept in memory across reruns
+MAX_CACHED_REPORTS = 64
+
+# Records shown per page in formatted report viewers
+DEFAULT_PAGE_SIZE = 50
+
+# Marks cached text whose JSON has not been parsed yet
+_UNPARSED = object()
+
+
+@dataclass(frozen=True)
+class ReportInfo:
+    """Metadata of a report file."""
+    name: str
+    path: str
+    mtime: float
+    size: int
+
+    @property
+    def modified(self) -> datetime:
+        return datetime.fromtimestamp(self.mtime)
+
+    @property
+    def version(self) -> Tuple[str, float, int]:
+        """Changes whenever the file is rewritten."""
+        return (self.path, self.mtime, self.size)
+
+
+def report_info(path: str) -> Optional[ReportInfo]:
+    """Metadata of a report file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return ReportInfo(os.path.basename(path), path, stat.st_mtime, stat.st_size)
+
+
+def page_slice(count: int, page: int = 0, page_size: int = DEFAULT_PAGE_SIZE) -> Tuple[slice, int]:
+    """
+    Bounds of one page of ``count`` records; out-of-range pages are clamped.
+
+    Returns:
+        Tuple of (slice of the records on the page, number of pages)
+    """
+    page_count = max((count + page_size - 1) // page_size, 1)
+    page = min(max(page, 0), page_count - 1)
+    return slice(page * page_size, min((page + 1) * page_size, count)), page_count
+
+
+class ReportRepository:
+    """Lists report files and memoizes their content keyed on (path, mtime, size)."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_REPORTS):
+        """
+        Initialize the repository.
+
+        Args:
+            max_entries: Number of reports kept in memory (least recently used are dropped)
+        """
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[Tuple[str, float, int], str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.parse_count = 0
+
+    def list_reports(self, report_dir: str, suffix: str = ".json") -> List[ReportInfo]:
+        """Reports in a directory, newest first, without reading their content."""
+        try:
+            entries = [entry for entry in os.scandir(report_dir) if entry.is_file() and entry.name.endswith(suffix)]
+        except FileNotFoundError:
+            return []
+        reports = []
+        for entry in entries:
+            stat = entry.stat()
+            reports.append(ReportInfo(entry.name, os.path.join(report_dir, entry.name), stat.st_mtime, stat.st_size))
+        reports.sort(key=lambda report: (report.mtime, report.name), reverse=True)
+        return reports
+
+    def _entry(self, path: str, parse: bool) -> Optional[Tuple[str, Any]]:
+        """Cached (text, data) of a file; re-read only when its mtime or size changed."""
+        info = report_info(path)
+        if info is None:
+            return None
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached and cached[0] == info.version:
+                self._cache.move_to_end(path)
+                if not parse or cached[2] is not _UNPARSED:
+                    return cached[1], cached[2]
+                text = cached[1]
+            else:
+                text = None
+
+        if text is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        data = _UNPARSED
+        if parse:
+            data = parse_json_content(text)
+            if data is None:
+                raise ValueError(f"{info.name} is not valid JSON")
+            self.parse_count += 1
+
+        with self._lock:
+            self._cache[path] = (info.version, text, data)
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return text, data
+
+    def load(self, path: str) -> Any:
+        """
+        Parsed content of a report.
+
+        Raises:
+            FileNotFoundError: If the report does not exist
+            ValueError: If the report is not JSON
+        """
+        entry = self._entry(path, parse=True)
+        if entry is None:
+            raise FileNotFoundError(path)
+        return entry[1]
+
+    def load_optional(self, path: str) -> Optional[Any]:
+        """Parsed content of a report, or None if it is missing or unreadable."""
+        try:
+            return self.load(path)
+        except (OSError, ValueError):
+            return None
+
+    def read_text(self, path: str) -> str:
+        """Raw content of a report (e.g. for downloads), without parsing it."""
+        entry = self._entry(path, parse=False)
+        if entry is None:
+            raise FileNotFoundError(path)
+        return entry[0]
+
+    def clear(self):
+        """Forget all cached reports."""
+        with self._lock:
+            self._cache.clear()
+
+
+# Global report repository instance
+report_repository = ReportRepository()
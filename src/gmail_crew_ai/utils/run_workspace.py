@@ -0,0 +1,144 @@
+"""Per-run output workspaces so concurrent crews never share report files."""
+
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+
+# Relative on purpose: CrewAI strips the leading '/' from absolute output_file paths
+RUNS_ROOT = "output/runs"
+
+# Placeholder in task prompts and context projections, filled per run
+OUTPUT_DIR_PLACEHOLDER = "{output_dir}"
+
+# Garbage collection limits per user
+KEEP_RUNS_PER_USER = 20
+MAX_RUN_AGE_DAYS = 14
+
+_UNSAFE_PATH_CHARS = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+def new_run_id() -> str:
+    """Sortable, unique run ID: timestamp plus a random suffix."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def _path_component(value: str) -> str:
+    """Make a user or run ID safe to use as a single directory name."""
+    component = _UNSAFE_PATH_CHARS.sub('_', str(value)).strip('.')
+    if not component:
+        raise ValueError(f"Invalid workspace name: {value!r}")
+    return component
+
+
+class RunWorkspace:
+    """Output directory of a single crew run: <root>/<user_id>/<run_id>."""
+
+    def __init__(self, user_id: str, run_id: Optional[str] = None, root: Optional[str] = None):
+        """
+        Initialize the workspace for one run.
+
+        Args:
+            user_id: User the run belongs to
+            run_id: Run identifier; a new one is generated if omitted
+            root: Optional custom root for all workspaces (default: RUNS_ROOT)
+        """
+        self.user_id = user_id
+        self.run_id = run_id or new_run_id()
+        self.root = root or RUNS_ROOT
+        self.dir = "/".join([self.root.rstrip("/"), _path_component(user_id), _path_component(self.run_id)])
+
+    def create(self) -> "RunWorkspace":
+        """Create the workspace directory."""
+        os.makedirs(self.dir, exist_ok=True)
+        return self
+
+    def path(self, filename: str) -> str:
+        """Path of a file inside the workspace."""
+        return f"{self.dir}/{filename}"
+
+    def resolve(self, text: str) -> str:
+        """Replace the {output_dir} placeholder with this workspace's directory."""
+        return text.replace(OUTPUT_DIR_PLACEHOLDER, self.dir)
+
+
+def list_runs(user_id: str, root: Optional[str] = None) -> List[str]:
+    """Workspace directories of a user, newest first."""
+    user_dir = os.path.join(root or RUNS_ROOT, _path_component(user_id))
+    try:
+        entries = [entry for entry in os.scandir(user_dir) if entry.is_dir()]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda entry: (entry.stat().st_mtime, entry.name), reverse=True)
+    return [entry.path.replace(os.sep, "/") for entry in entries]
+
+
+def latest_run_dir(user_id: str, root: Optional[str] = None, required_file: Optional[str] = None) -> Optional[str]:
+    """
+    The user's most recent workspace.
+
+    Args:
+        user_id: User whose runs are searched
+        root: Optional custom workspace root
+        required_file: Only consider runs that contain this file
+
+    Returns:
+        Workspace directory, or None if the user has no matching run
+    """
+    for run_dir in list_runs(user_id, root):
+        if required_file is None or os.path.exists(os.path.join(run_dir, required_file)):
+            return run_dir
+    return None
+
+
+def remove_user_runs(user_id: str, root: Optional[str] = None, protect: Iterable[str] = ()) -> int:
+    """Delete all workspaces of a user except the protected ones. Returns the number removed."""
+    protected = {os.path.normpath(path) for path in protect}
+    runs = [run_dir for run_dir in list_runs(user_id, root) if os.path.normpath(run_dir) not in protected]
+    for run_dir in runs:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return len(runs)
+
+
+def collect_garbage(root: Optional[str] = None, keep_per_user: int = KEEP_RUNS_PER_USER,
+                    max_age_days: float = MAX_RUN_AGE_DAYS, protect: Iterable[str] = ()) -> int:
+    """
+    Remove old workspaces of every user.
+
+    A user's newest ``keep_per_user`` runs are kept unless older than
+    ``max_age_days``; the most recent run is always kept.
+
+    Args:
+        root: Optional custom workspace root
+        keep_per_user: Number of recent runs kept per user
+        max_age_days: Runs not modified for this long are removed
+        protect: Workspace directories that must not be removed (e.g. active runs)
+
+    Returns:
+        Number of workspaces removed
+    """
+    root = root or RUNS_ROOT
+    protected = {os.path.normpath(path) for path in protect}
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    try:
+        user_dirs = [entry.name for entry in os.scandir(root) if entry.is_dir()]
+    except FileNotFoundError:
+        return 0
+
+    for user_dir in user_dirs:
+        for position, run_dir in enumerate(list_runs(user_dir, root)):
+            if position == 0 or os.path.normpath(run_dir) in protected:
+                continue
+            try:
+                expired = os.path.getmtime(run_dir) < cutoff
+            except OSError:
+                continue
+            if position >= keep_per_user or expired:
+                shutil.rmtree(run_dir, ignore_errors=True)
+                removed += 1
+    return removed
@@ -0,0 +1,411 @@
+"""Token and cost accounting for LLM calls.
+
+A LiteLLM callback records input/output tokens, cost, latency and model for
+every completion. Calls are attributed to the processing session, agent and
+task that were active when the call was made (agents and tasks come from the
+CrewAI event bus). Everything is stored in SQLite with a per-user daily rollup
+that is updated as calls are recorded.
+"""
+
+import contextvars
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    from litellm.integrations.custom_logger import CustomLogger
+except ImportError:
+    # LiteLLM is optional; the store and summaries still work without it
+    CustomLogger = object
+
+
+# Attribution for the LLM call currently being made
+_current_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("token_session", default=None)
+_current_agent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("token_agent", default=None)
+_current_task: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("token_task", default=None)
+
+
+class TokenUsageTracker:
+    """Records LLM token usage per session, agent and task in SQLite."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the token tracker.
+
+        Args:
+            db_path: Optional custom path of the SQLite database
+        """
+        self._db_path = db_path
+        self._schema_ready = False
+
+        self.lock = threading.Lock()
+        # Session used when a call is made outside any session context
+        self._active_session: Optional[str] = None
+        self._session_users: Dict[str, str] = {}
+
+    @property
+    def db_path(self) -> str:
+        """Path of the database, resolved to an absolute path on first use."""
+        if self._db_path is None:
+            path = "/app/data/token_usage.db" if os.path.exists("/app/data") else "token_usage.db"
+            self._db_path = os.path.abspath(path)
+        return self._db_path
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success, creating the schema on first use."""
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            if not self._schema_ready:
+                self._ensure_schema(conn)
+                self._schema_ready = True
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        """Create the sessions, calls and rollup tables if needed."""
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                model TEXT,
+                start_time TEXT NOT NULL,
+                end_time TEXT,
+                emails_processed INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_user ON sessions (user_id, start_time)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_calls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT,
+                user_id TEXT,
+                agent TEXT,
+                task TEXT,
+                model TEXT,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                cost REAL NOT NULL,
+                latency_ms REAL NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS llm_calls_session ON llm_calls (session_id)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_daily_usage (
+                user_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                model TEXT NOT NULL,
+                calls INTEGER NOT NULL,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                cost REAL NOT NULL,
+                latency_ms REAL NOT NULL,
+                PRIMARY KEY (user_id, day, model)
+            )
+        """)
+
+    # ------------------------------------------------------------------
+    # Sessions and attribution
+    # ------------------------------------------------------------------
+
+    def start_session(self, user_id: str, model: Optional[str] = None) -> str:
+        """Start a processing session and make it the target for new calls."""
+        session_id = str(uuid.uuid4())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, user_id, model, start_time) VALUES (?, ?, ?, ?)",
+                (session_id, user_id, model or os.getenv("MODEL", ""), datetime.now().isoformat())
+            )
+        with self.lock:
+            self._session_users[session_id] = user_id
+            self._active_session = session_id
+        _current_session.set(session_id)
+        return session_id
+
+    def end_session(self, session_id: str, emails_processed: int = 0):
+        """Close a session and record how many emails it processed."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sessions SET end_time = ?, emails_processed = ? WHERE session_id = ?",
+                (datetime.now().isoformat(), emails_processed, session_id)
+            )
+        with self.lock:
+            if self._active_session == session_id:
+                self._active_session = None
+        if _current_session.get() == session_id:
+            _current_session.set(None)
+
+    @contextmanager
+    def session(self, user_id: str, model: Optional[str] = None):
+        """Context manager around start_session/end_session; yields a dict for the email count."""
+        session_id = self.start_session(user_id, model)
+        result = {"session_id": session_id, "emails_processed": 0}
+        try:
+            yield result
+        finally:
+            self.end_session(session_id, result["emails_processed"])
+
+    def set_agent(self, agent: Optional[str]):
+        """Attribute subsequent calls in this context to an agent."""
+        _current_agent.set(agent)
+
+    def set_task(self, task: Optional[str]):
+        """Attribute subsequent calls in this context to a task."""
+        _current_task.set(task)
+
+    def current_context(self) -> Dict[str, Optional[str]]:
+        """Get the session, user, agent and task new calls are attributed to."""
+        session_id = _current_session.get() or self._active_session
+        return {
+            "session_id": session_id,
+            "user_id": self._session_users.get(session_id) if session_id else None,
+            "agent": _current_agent.get(),
+            "task": _current_task.get(),
+        }
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record_call(self, model: str, input_tokens: int, output_tokens: int, cost: float = 0.0,
+                    latency_ms: float = 0.0, context: Optional[Dict[str, Optional[str]]] = None):
+        """
+        Record a completed LLM call and update the per-user rollup.
+
+        Args:
+            model: Model that served the call
+            input_tokens: Prompt tokens
+            output_tokens: Completion tokens
+            cost: Cost in USD
+            latency_ms: Wall-clock latency of the call
+            context: Attribution captured when the call started (defaults to the current one)
+        """
+        context = context or self.current_context()
+        user_id = context.get("user_id") or ""
+        now = datetime.now()
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO llm_calls (session_id, user_id, agent, task, model, input_tokens, "
+                "output_tokens, cost, latency_ms, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (context.get("session_id"), user_id, context.get("agent") or "Unattributed",
+                 context.get("task"), model, input_tokens, output_tokens, cost, latency_ms, now.isoformat())
+            )
+            conn.execute(
+                """
+                INSERT INTO user_daily_usage VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+                ON CONFLICT (user_id, day, model) DO UPDATE SET
+                    calls = calls + 1,
+                    input_tokens = input_tokens + excluded.input_tokens,
+                    output_tokens = output_tokens + excluded.output_tokens,
+                    cost = cost + excluded.cost,
+                    latency_ms = latency_ms + excluded.latency_ms
+                """,
+                (user_id, now.date().isoformat(), model, input_tokens, output_tokens, cost, latency_ms)
+            )
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def get_usage_summary(self, user_id: str, recent_limit: int = 10) -> Dict[str, Any]:
+        """
+        Get token usage totals and recent sessions for a user.
+
+        Returns:
+            Dictionary with total_sessions, total_tokens, total_cost,
+            avg_cost_per_session and recent_sessions (oldest first, each with
+            a per-agent breakdown)
+        """
+        with self._connect() as conn:
+            total_sessions = conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+            total_tokens, total_cost = conn.execute(
+                "SELECT COALESCE(SUM(input_tokens + output_tokens), 0), COALESCE(SUM(cost), 0) "
+                "FROM user_daily_usage WHERE user_id = ?", (user_id,)
+            ).fetchone()
+
+            sessions = conn.execute(
+                "SELECT session_id, model, start_time, end_time, emails_processed FROM sessions "
+                "WHERE user_id = ? ORDER BY start_time DESC LIMIT ?", (user_id, recent_limit)
+            ).fetchall()
+
+            recent_sessions = []
+            for session_id, model, start_time, end_time, emails_processed in reversed(sessions):
+                agents = {}
+                session_tokens = 0
+                session_cost = 0.0
+                for agent, calls, input_tokens, output_tokens, cost, latency_ms in conn.execute(
+                    "SELECT agent, COUNT(*), SUM(input_tokens), SUM(output_tokens), SUM(cost), SUM(latency_ms) "
+                    "FROM llm_calls WHERE session_id = ? GROUP BY agent", (session_id,)
+                ):
+                    agents[agent] = {
+                        "calls": calls,
+                        "input_tokens": input_tokens,
+                        "output_tokens": output_tokens,
+                        "total_tokens": input_tokens + output_tokens,
+                        "cost": cost,
+                        "avg_latency_ms": latency_ms / calls if calls else 0.0,
+                    }
+                    session_tokens += input_tokens + output_tokens
+                    session_cost += cost
+
+                recent_sessions.append({
+                    "session_id": session_id,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "model": model,
+                    "emails_processed": emails_processed,
+                    "total_tokens": session_tokens,
+                    "total_cost": session_cost,
+                    "avg_cost_per_email": session_cost / emails_processed if emails_processed else 0.0,
+                    "agents": agents,
+                })
+
+        return {
+            "total_sessions": total_sessions,
+            "total_tokens": int(total_tokens),
+            "total_cost": float(total_cost),
+            "avg_cost_per_session": float(total_cost) / total_sessions if total_sessions else 0.0,
+            "recent_sessions": recent_sessions,
+        }
+
+    def get_daily_usage(self, user_id: str, days: int = 30) -> List[Dict[str, Any]]:
+        """Get the per-day, per-model rollup for a user over the last ``days`` days."""
+        since = (datetime.now() - timedelta(days=days)).date().isoformat()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT day, model, calls, input_tokens, output_tokens, cost, latency_ms "
+                "FROM user_daily_usage WHERE user_id = ? AND day >= ? ORDER BY day", (user_id, since)
+            ).fetchall()
+        return [
+            {
+                "day": day, "model": model, "calls": calls, "input_tokens": input_tokens,
+                "output_tokens": output_tokens, "cost": cost,
+                "avg_latency_ms": latency_ms / calls if calls else 0.0,
+            }
+            for day, model, calls, input_tokens, output_tokens, cost, latency_ms in rows
+        ]
+
+
+class TokenTrackingHandler(CustomLogger):
+    """LiteLLM callback that records every completion with the token tracker."""
+
+    def __init__(self, tracker: TokenUsageTracker):
+        if CustomLogger is not object:
+            super().__init__()
+        self.tracker = tracker
+        self._contexts: Dict[str, Dict[str, Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def log_pre_api_call(self, model, messages, kwargs):
+        """Capture attribution in the calling thread; success callbacks may run elsewhere."""
+        call_id = kwargs.get("litellm_call_id")
+        if call_id:
+            with self._lock:
+                self._contexts[call_id] = self.tracker.current_context()
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        """Record tokens, cost and latency for a successful call."""
+        try:
+            with self._lock:
+                context = self._contexts.pop(kwargs.get("litellm_call_id"), None)
+
+            usage = getattr(response_obj, "usage", None)
+            input_tokens = int(getattr(usage, "prompt_tokens", 0) or 0)
+            output_tokens = int(getattr(usage, "completion_tokens", 0) or 0)
+
+            cost = kwargs.get("response_cost")
+            if cost is None:
+                try:
+                    import litellm
+                    cost = litellm.completion_cost(completion_response=response_obj)
+                except Exception:
+                    cost = 0.0
+
+            latency_ms = 0.0
+            if start_time and end_time:
+                latency_ms = (end_time - start_time).total_seconds() * 1000
+
+            model = kwargs.get("model") or getattr(response_obj, "model", "") or ""
+            self.tracker.record_call(model, input_tokens, output_tokens, float(cost or 0.0), latency_ms, context)
+        except Exception as e:
+            print(f"Token tracking failed: {e}")
+
+    def log_failure_event(self, kwargs, response_obj, start_time, end_time):
+        """Drop the captured attribution for a failed call."""
+        with self._lock:
+            self._contexts.pop(kwargs.get("litellm_call_id"), None)
+
+    async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+        self.log_success_event(kwargs, response_obj, start_time, end_time)
+
+    async def async_log_failure_event(self, kwargs, response_obj, start_time, end_time):
+        self.log_failure_event(kwargs, response_obj, start_time, end_time)
+
+
+_handler: Optional[TokenTrackingHandler] = None
+_crewai_listeners_installed = False
+_install_lock = threading.Lock()
+
+
+def _install_crewai_listeners(tracker: TokenUsageTracker):
+    """Track the running agent and task from the CrewAI event bus."""
+    global _crewai_listeners_installed
+    if _crewai_listeners_installed:
+        return
+    try:
+        from crewai.utilities.events import (
+            crewai_event_bus,
+            AgentExecutionStartedEvent,
+            TaskStartedEvent,
+        )
+    except ImportError:
+        return
+
+    @crewai_event_bus.on(AgentExecutionStartedEvent)
+    def _on_agent_started(source, event):
+        tracker.set_agent(getattr(event.agent, "role", None) or str(event.agent))
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def _on_task_started(source, event):
+        task = getattr(event, "task", None)
+        tracker.set_task(getattr(task, "name", None) or getattr(task, "description", "")[:60] or None)
+
+    _crewai_listeners_installed = True
+
+
+def install_token_tracking(tracker: Optional[TokenUsageTracker] = None) -> bool:
+    """
+    Register token tracking with LiteLLM and CrewAI once per process.
+
+    Returns:
+        True if the LiteLLM callback is registered, False if LiteLLM is unavailable
+    """
+    global _handler
+    if CustomLogger is object:
+        return False
+
+    import litellm
+
+    tracker = tracker or token_tracker
+    with _install_lock:
+        if _handler is None:
+            _handler = TokenTrackingHandler(tracker)
+        if _handler not in litellm.callbacks:
+            litellm.callbacks.append(_handler)
+        _install_crewai_listeners(tracker)
+    return True
+
+
+# Global token tracker instance
+token_tracker = TokenUsageTracker()
@@ -0,0 +1,7 @@
+"""Streamlit user interface for Gmail Crew AI.
+
+``streamlit_app.py`` only routes between pages; each page lives in
+``src.ui.pages`` and is imported the first time it is shown, so heavy
+dependencies (CrewAI, the Gmail API client, pandas) load with the page that
+needs them instead of on cold start.
+"""
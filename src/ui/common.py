@@ -0,0 +1,294 @@
+"""Helpers shared by the app pages."""
+
+import os
+from typing import Dict, Optional
+
+import streamlit as st
+
+from src.common.error_store import ErrorLogStore
+from src.common.logger import get_logger
+
+log = get_logger(__name__)
+
+
+def get_activity_log():
+    """The session's bounded activity log, created on first use."""
+    from src.gmail_crew_ai.utils.activity_log import ActivityLog
+    
+    activity_log = st.session_state.get('activity_logs')
+    if not isinstance(activity_log, ActivityLog):
+        # Sessions started before the ring buffer kept a plain list of lines
+        previous = activity_log or []
+        activity_log = ActivityLog()
+        for line in previous:
+            activity_log.append(str(line))
+        st.session_state.activity_logs = activity_log
+    return activity_log
+
+
+def safe_add_activity_log(message: str, kind: str = 'info', icon: str = ""):
+    """Safely add an event to the activity log with initialization check."""
+    get_activity_log().append(message, kind, icon)
+
+
+def init_session_state():
+    """Initialize session state variables."""
+    defaults = {
+        'authentication_step': 'login',
+        'authenticated_user_id': None,
+        'current_user': None,
+        'processing_active': False,
+        'email_rules': [],
+        'session_initialized': False,
+        'gmail_search': 'is:unread',
+        'filter_max_emails': 3,
+        'selected_model': os.getenv('MODEL', 'openai/gpt-4.1')
+    }
+    
+    for key, value in defaults.items():
+        if key not in st.session_state:
+            st.session_state[key] = value
+
+
+def get_report_dir(user_id: str = None) -> str:
+    """Directory holding the user's latest processing reports (per-run workspace)."""
+    from src.gmail_crew_ai.utils.run_workspace import latest_run_dir
+    user_id = user_id or st.session_state.get('authenticated_user_id')
+    if not user_id:
+        return "output"
+    return (latest_run_dir(user_id, required_file="categorization_report.json")
+            or latest_run_dir(user_id)
+            or "output")
+
+
+def check_and_fix_oauth_credentials(user_id: str, oauth_manager) -> bool:
+    """Check OAuth credentials and fix if invalid."""
+    try:
+        # Get OAuth user ID from session state
+        oauth_user_id = st.session_state.get('current_user')
+        if not oauth_user_id:
+            return False
+            
+        # Test if credentials work by attempting to get user email
+        oauth_manager.get_user_email(oauth_user_id)
+        return True
+    except Exception as e:
+        if "No valid credentials found" in str(e):
+            st.error(f"🔑 OAuth credentials invalid for user {user_id}. Clearing...")
+            try:
+                oauth_manager.revoke_credentials(user_id)
+                st.success("✅ Invalid credentials cleared. Please re-authenticate.")
+                return False
+            except Exception as revoke_error:
+                st.warning(f"Could not clear credentials: {revoke_error}")
+                return False
+        else:
+            st.error(f"OAuth error: {e}")
+            return False
+
+
+class GmailSearchParser:
+    """Parses Gmail search syntax into filter criteria."""
+    
+    def __init__(self):
+        self.operators = {
+            'from:', 'to:', 'subject:', 'has:', 'is:', 'label:', 'category:',
+            'older_than:', 'newer_than:', 'larger:', 'smaller:', 'filename:'
+        }
+    
+    def parse_search(self, search_query: str) -> Dict:
+        """Parse Gmail search query into structured filters."""
+        filters = {
+            'max_emails': 10,
+            'gmail_search': search_query,
+            'from_sender': '',
+            'to_recipient': '',
+            'subject_filter': '',
+            'keyword': '',
+            'unread_only': False,
+            'starred_only': False,
+            'important_only': False,
+            'has_attachment': False,
+            'labels': [],
+            'categories': [],
+            'date_filters': [],
+            'size_filters': [],
+            'filename_filters': [],
+            'exclude_terms': []
+        }
+        
+        if not search_query:
+            return filters
+        
+        # Split by spaces but preserve quoted strings
+        import re
+        tokens = re.findall(r'"[^"]*"|\S+', search_query.lower())
+        
+        i = 0
+        while i < len(tokens):
+            token = tokens[i].strip()
+            
+            # Handle negation
+            if token.startswith('-'):
+                filters['exclude_terms'].append(token[1:])
+                i += 1
+                continue
+            
+            # Handle operators
+            if ':' in token:
+                operator, value = token.split(':', 1)
+                operator = operator + ':'
+                
+                if operator == 'from:':
+                    filters['from_sender'] = value
+                elif operator == 'to:':
+                    filters['to_recipient'] = value
+                elif operator == 'subject:':
+                    filters['subject_filter'] = value
+                elif operator == 'is:':
+                    if value == 'unread':
+                        filters['unread_only'] = True
+                    elif value == 'starred':
+                        filters['starred_only'] = True
+                    elif value == 'important':
+                        filters['important_only'] = True
+                elif operator == 'has:':
+                    if value == 'attachment':
+                        filters['has_attachment'] = True
+                elif operator == 'label:':
+                    filters['labels'].append(value)
+                elif operator == 'category:':
+                    filters['categories'].append(value)
+                elif operator in ['older_than:', 'newer_than:']:
+                    filters['date_filters'].append({'type': operator[:-1], 'value': value})
+                elif operator in ['larger:', 'smaller:']:
+                    filters['size_filters'].append({'type': operator[:-1], 'value': value})
+                elif operator == 'filename:':
+                    filters['filename_filters'].append(value)
+            
+            # Handle OR operator
+            elif token.upper() == 'OR' and i > 0 and i < len(tokens) - 1:
+                # This is a simple implementation - in a full parser you'd want to handle precedence
+                pass
+            
+            # Handle quoted strings and regular keywords
+            else:
+                if token.startswith('"') and token.endswith('"'):
+                    filters['keyword'] += token[1:-1] + ' '
+                else:
+                    filters['keyword'] += token + ' '
+            
+            i += 1
+        
+        filters['keyword'] = filters['keyword'].strip()
+        return filters
+    
+    def filters_to_gmail_search(self, filters: Dict) -> str:
+        """Convert structured filters back to Gmail search syntax."""
+        parts = []
+        
+        if filters.get('from_sender'):
+            parts.append(f"from:{filters['from_sender']}")
+        if filters.get('to_recipient'):
+            parts.append(f"to:{filters['to_recipient']}")
+        if filters.get('subject_filter'):
+            parts.append(f"subject:{filters['subject_filter']}")
+        if filters.get('unread_only'):
+            parts.append("is:unread")
+        if filters.get('starred_only'):
+            parts.append("is:starred")
+        if filters.get('important_only'):
+            parts.append("is:important")
+        if filters.get('has_attachment'):
+            parts.append("has:attachment")
+        
+        for label in filters.get('labels', []):
+            parts.append(f"label:{label}")
+        
+        for category in filters.get('categories', []):
+            parts.append(f"category:{category}")
+        
+        for date_filter in filters.get('date_filters', []):
+            parts.append(f"{date_filter['type']}:{date_filter['value']}")
+        
+        for size_filter in filters.get('size_filters', []):
+            parts.append(f"{size_filter['type']}:{size_filter['value']}")
+        
+        for filename in filters.get('filename_filters', []):
+            parts.append(f"filename:{filename}")
+        
+        if filters.get('keyword'):
+            parts.append(filters['keyword'])
+        
+        for exclude in filters.get('exclude_terms', []):
+            parts.append(f"-{exclude}")
+        
+        return ' '.join(parts)
+
+
+class ErrorLogger:
+    """Manages error logging with daily rotation and 30-day retention."""
+    
+    def __init__(self):
+        self.error_log_file = "error_logs.jsonl"
+        self.logger = log  # Use centralized logger instead of print calls
+        self.store = ErrorLogStore(self.error_log_file, retention_days=30, logger=self.logger)
+        # Rotation and retention run at most once per day, off the request path
+        self.store.schedule_daily_maintenance()
+    
+    def query_errors(self, error_type: Optional[str] = None, include_resolved: bool = False,
+                     offset: int = 0, limit: int = 20):
+        """Load one page of errors, newest first. Returns (errors, has_more)."""
+        try:
+            return self.store.query(error_type, include_resolved, offset, limit)
+        except Exception as e:
+            self.logger.warning(f"Failed to load errors from {self.error_log_file}: {e}")
+            return [], False
+    
+    def get_error_stats(self) -> Dict[str, int]:
+        """Get error counts for the dashboard metrics."""
+        try:
+            return self.store.stats()
+        except Exception as e:
+            self.logger.warning(f"Failed to compute error stats: {e}")
+            return {"total": 0, "resolved": 0, "unresolved": 0, "last_24h": 0}
+    
+    def cleanup_old_errors(self):
+        """Rotate the current log if needed and remove rotated logs older than 30 days."""
+        return self.store.run_maintenance()
+    
+    def log_error(self, error_type: str, message: str, details: str = "", user_id: str = ""):
+        """Log a new error to both structured storage and centralized logger."""
+        try:
+            # Log to centralized logger first
+            log_message = f"[{error_type}] {message}"
+            if user_id:
+                log_message += f" (User: {user_id})"
+            
+            self.logger.error(log_message)
+            if details:
+                self.logger.error(f"Details: {details}")
+            
+            # Append to structured error storage
+            self.store.append(error_type, message, details, user_id)
+            
+        except Exception as e:
+            # Fallback to basic logging if structured logging fails
+            self.logger.error(f"Failed to log structured error, fallback: [{error_type}] {message}")
+            self.logger.error(f"ErrorLogger failure details: {e}")
+    
+    def mark_resolved(self, error_id: str):
+        """Mark an error as resolved."""
+        try:
+            self.store.mark_resolved(error_id)
+            self.logger.info(f"Marked error {error_id} as resolved")
+        except Exception as e:
+            self.logger.error(f"Failed to mark error {error_id} as resolved: {e}")
+    
+    def delete_error(self, error_id: str):
+        """Delete a specific error."""
+        try:
+            self.store.delete(error_id)
+            self.logger.info(f"Deleted error {error_id}")
+        except Exception as e:
+            self.logger.error(f"Failed to delete error {error_id}: {e}")
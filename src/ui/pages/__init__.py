@@ -0,0 +1,12 @@
+"""Pages of the Streamlit app, imported on demand by the router and dashboard."""
+
+# Page modules, in the order the app shows them (used by scripts/benchmark_page_imports.py)
+PAGE_MODULES = (
+    "src.ui.pages.login",
+    "src.ui.pages.dashboard",
+    "src.ui.pages.processing",
+    "src.ui.pages.rules",
+    "src.ui.pages.reports",
+    "src.ui.pages.settings",
+    "src.ui.pages.admin",
+)
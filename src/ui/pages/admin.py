@@ -0,0 +1,592 @@
+"""Administration pages: user management and error logs."""
+
+import json
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from src.gmail_crew_ai.auth import OAuth2Manager
+from src.ui.common import ErrorLogger
+from src.ui.session import session_manager
+
+
+def show_admin_panel_tab(user_id: str, oauth_manager):
+    """Show admin panel for managing users and system."""
+    st.markdown("## 👑 Admin Panel")
+    st.markdown("Administrative controls and user management")
+    
+    # User management
+    st.markdown("### 👥 User Management")
+    
+    user_manager = st.session_state.user_manager
+    all_users = user_manager.load_users()
+    
+    if not all_users:
+        st.info("No users in the system.")
+        return
+    
+    # Display users in a table format
+    user_data = []
+    for uid, data in all_users.items():
+        user_data.append({
+            "ID": uid,
+            "Email": data.get('email', 'Unknown'),
+            "Status": data.get('status', 'Unknown'),
+            "Role": "👑 Admin" if data.get('is_admin', False) else "User",
+            "Last Login": data.get('last_login', 'Never'),
+            "Created": data.get('created_at', 'Unknown')
+        })
+    
+    df = pd.DataFrame(user_data)
+    st.dataframe(df, use_container_width=True)
+    
+    st.markdown("---")
+    
+    # User Statistics
+    st.markdown("### 📈 User Statistics")
+    
+    # Get primary user
+    primary_user = user_manager.get_primary_user()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### Primary Owner")
+        if primary_user:
+            st.markdown(f"**Email:** {primary_user.get('email', 'Unknown')}")
+            
+            # Debug: Check what user_id we're using
+            debug_user_id = primary_user['user_id']
+            debug_current_user = st.session_state.get('authenticated_user_id')
+            
+            # Check if we should use the current authenticated user instead
+            # If the current user is the primary owner, use their session user_id
+            user_id_to_check = debug_current_user if debug_current_user else debug_user_id
+            
+            # Also check if the primary owner email matches the current authenticated user
+            if debug_current_user and oauth_manager:
+                try:
+                    current_user_email = oauth_manager.get_user_email(debug_current_user)
+                    if current_user_email == primary_user.get('email'):
+                        user_id_to_check = debug_current_user
+                except Exception as e:
+                    pass  # Use fallback user_id
+            
+            is_oauth_authenticated = oauth_manager and oauth_manager.is_authenticated(user_id_to_check)
+            auth_status = "✅ OAuth2 Connected" if is_oauth_authenticated else "❌ OAuth2 Not Connected"
+            
+            if is_oauth_authenticated:
+                st.success(f"**Status:** {auth_status}")
+            else:
+                st.error(f"**Status:** {auth_status}")
+                st.info("Primary owner needs to authenticate with OAuth2 to send approval emails automatically.")
+        else:
+            st.warning("No primary owner found.")
+    
+    with col2:
+        # System statistics
+        total_users = len(all_users)
+        approved_users = len([u for u in all_users.values() if u.get('status') == 'approved'])
+        pending_users = len([u for u in all_users.values() if u.get('status') == 'pending'])
+        admin_users = len([u for u in all_users.values() if u.get('is_admin', False)])
+        
+        st.metric("Total Users", total_users)
+        st.metric("Approved", approved_users)
+        st.metric("Pending", pending_users)
+        st.metric("Admins", admin_users)
+    
+    st.markdown("---")
+    
+    # Admin actions
+    st.markdown("### ⚙️ Admin Actions")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown("#### Make User Admin")
+        admin_email = st.text_input("Email to promote:", placeholder="user@example.com")
+        if st.button("👑 Make Admin"):
+            if admin_email:
+                if user_manager.make_user_admin(admin_email):
+                    st.success(f"✅ Made {admin_email} an admin user")
+                    st.rerun()
+                else:
+                    st.error(f"❌ Could not make {admin_email} an admin (user not found)")
+    
+    with col2:
+        st.markdown("#### Approve User")
+        if pending_users > 0:
+            pending_list = [(uid, data['email']) for uid, data in all_users.items() if data.get('status') == 'pending']
+            selected_pending = st.selectbox(
+                "Select user to approve:",
+                options=[f"{email} ({uid})" for uid, email in pending_list],
+                format_func=lambda x: x.split(" (")[0]
+            )
+            
+            if st.button("✅ Approve User") and selected_pending:
+                selected_uid = selected_pending.split(" (")[1].rstrip(")")
+                if user_manager.approve_user(selected_uid):
+                    st.success("User approved successfully!")
+                    st.rerun()
+        else:
+            st.info("No pending users")
+    
+    with col3:
+        st.markdown("#### System Maintenance")
+        if st.button("🧹 Cleanup Sessions"):
+            session_manager.cleanup_expired_sessions()
+            st.success("Expired sessions cleaned up!")
+        
+        if st.button("📊 Show System Status"):
+            st.info("System is running normally")
+            
+        # Debug Mode Toggle (Admin Only)
+        st.markdown("#### 🐛 Debug Settings")
+        debug_enabled = st.checkbox(
+            "Enable Debug Mode", 
+            value=st.session_state.get('debug_mode', False),
+            help="Show activity logs and debug information during email processing"
+        )
+        
+        if debug_enabled != st.session_state.get('debug_mode', False):
+            st.session_state.debug_mode = debug_enabled
+            if debug_enabled:
+                st.success("🐛 Debug mode enabled - activity logs will be visible")
+            else:
+                st.success("✅ Debug mode disabled - UI cleaned up")
+            st.rerun()
+    
+    st.markdown("---")
+    
+    # Error logs for admins
+    st.markdown("### 🚨 Error Logs")
+    show_error_logs_tab(user_id, oauth_manager)
+
+
+def show_error_logs_tab(user_id: str, oauth_manager: OAuth2Manager):
+    """Show error logs interface."""
+    st.markdown("##  Error Logs")
+    st.markdown("View and manage system errors from CrewAI agents and processing.")
+    
+    # Initialize error logger
+    error_logger = ErrorLogger()
+    
+    # Header controls
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    
+    with col1:
+        error_filter = st.selectbox(
+            "Filter by Type",
+            ["All", "CrewAI", "Agent", "Processing", "Authentication", "System"],
+            key="error_filter"
+        )
+    
+    with col2:
+        show_resolved = st.checkbox("Show Resolved", value=False, key="show_resolved")
+    
+    with col3:
+        if st.button(" Clean Old Errors"):
+            cleaned = error_logger.cleanup_old_errors()
+            if cleaned > 0:
+                st.success(f" Cleaned up {cleaned} old error logs")
+                st.rerun()
+            else:
+                st.info("No old errors to clean")
+    
+    with col4:
+        if st.button(" Test Error"):
+            error_logger.log_error(
+                "System", 
+                "Test error message", 
+                "This is a test error for demonstration purposes",
+                user_id
+            )
+            st.success("Test error added!")
+            st.rerun()
+    
+    # Reset paging whenever the filter changes
+    page_size = 20
+    filter_key = (error_filter, show_resolved)
+    if st.session_state.get('error_page_filter') != filter_key:
+        st.session_state.error_page_filter = filter_key
+        st.session_state.error_page_limit = page_size
+    
+    # Only read as many entries as the visible pages need
+    filtered_errors, has_more = error_logger.query_errors(
+        error_type=None if error_filter == "All" else error_filter,
+        include_resolved=show_resolved,
+        limit=st.session_state.error_page_limit
+    )
+    
+    # Display statistics
+    if filtered_errors:
+        stats = error_logger.get_error_stats()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Errors", stats['total'])
+        with col2:
+            st.metric("Unresolved", stats['unresolved'])
+        with col3:
+            st.metric("Resolved", stats['resolved'])
+        with col4:
+            st.metric("Last 24h", stats['last_24h'])
+        
+        st.markdown("---")
+    
+    # Display errors
+    if not filtered_errors:
+        if error_filter == "All" and not show_resolved:
+            st.info(" No unresolved errors found!")
+        else:
+            st.info("No errors match the current filter criteria.")
+    else:
+        for error in filtered_errors:
+            error_id = error.get('id', '')
+            timestamp = error.get('timestamp', '')
+            error_type = error.get('type', 'Unknown')
+            message = error.get('message', 'No message')
+            details = error.get('details', '')
+            resolved = error.get('resolved', False)
+            
+            # Format timestamp
+            try:
+                dt = datetime.fromisoformat(timestamp)
+                formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
+                time_ago = pd.Timestamp.now() - pd.Timestamp(dt)
+                time_ago_str = f"({time_ago.days}d {time_ago.seconds//3600}h ago)" if time_ago.days > 0 else f"({time_ago.seconds//3600}h {(time_ago.seconds%3600)//60}m ago)"
+            except:
+                formatted_time = timestamp
+                time_ago_str = ""
+            
+            # Color coding
+            if resolved:
+                status_color = ""
+                border_color = "#28a745"
+            else:
+                if error_type in ["CrewAI", "Agent"]:
+                    status_color = ""
+                    border_color = "#dc3545"
+                elif error_type == "Processing":
+                    status_color = ""
+                    border_color = "#ffc107"
+                else:
+                    status_color = ""
+                    border_color = "#fd7e14"
+            
+            # Error card
+            with st.container():
+                st.markdown(f"""
+                <div style="border-left: 4px solid {border_color}; padding: 10px; margin: 10px 0; background-color: #f8f9fa;">
+                    <div style="display: flex; justify-content: space-between; align-items: center;">
+                        <h4 style="margin: 0; color: {border_color};">{status_color} {error_type} Error</h4>
+                        <small style="color: #6c757d;">{formatted_time} {time_ago_str}</small>
+                    </div>
+                    <p style="margin: 5px 0; font-weight: bold;">{message}</p>
+                    {f'<p style="margin: 5px 0; color: #6c757d;">{details}</p>' if details else ''}
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Action buttons
+                col1, col2, col3, col4 = st.columns([1, 1, 1, 2])
+                
+                with col1:
+                    if not resolved:
+                        if st.button(" Resolve", key=f"resolve_{error_id}"):
+                            error_logger.mark_resolved(error_id)
+                            st.success("Error marked as resolved!")
+                            st.rerun()
+                    else:
+                        st.markdown(" *Resolved*")
+                
+                with col2:
+                    if st.button(" Delete", key=f"delete_{error_id}"):
+                        error_logger.delete_error(error_id)
+                        st.success("Error deleted!")
+                        st.rerun()
+                
+                with col3:
+                    if st.button(" Copy", key=f"copy_{error_id}"):
+                        error_text = f"Error Type: {error_type}\nTime: {formatted_time}\nMessage: {message}\nDetails: {details}"
+                        st.code(error_text)
+                
+                st.markdown("---")
+        
+        if has_more:
+            if st.button("Load more errors", key="load_more_errors"):
+                st.session_state.error_page_limit += page_size
+                st.rerun()
+
+
+def show_admin_panel():
+    """Show admin panel for user management."""
+    st.markdown("##  Admin Panel")
+    
+    user_manager = st.session_state.user_manager
+    
+    # Check admin permissions
+    authenticated_user_id = st.session_state.authenticated_user_id
+    if not user_manager.is_admin(authenticated_user_id):
+        st.error(" Access denied. Admin privileges required.")
+        return
+    
+    tab1, tab2, tab3, tab4 = st.tabs([" Pending Approvals", " All Users", " User Stats", " Approval Emails"])
+    
+    with tab1:
+        st.markdown("###  Pending User Approvals")
+        
+        pending_users = user_manager.get_pending_users()
+        
+        if pending_users:
+            for user in pending_users:
+                with st.container():
+                    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+                    
+                    with col1:
+                        st.markdown(f"**{user['email']}**")
+                        st.markdown(f"*Requested: {user['created_at'][:16]}*")
+                        
+                        # Show registration reason if available
+                        try:
+                            with open("registration_requests.json", 'r') as f:
+                                requests = json.load(f)
+                                if user['email'] in requests:
+                                    reason = requests[user['email']]['reason']
+                                    st.markdown(f"**Reason:** {reason}")
+                        except Exception:
+                            pass
+                    
+                    with col2:
+                        st.markdown(f"**Role:** {user['role']}")
+                        st.markdown(f"**Status:** {user['status']}")
+                    
+                    with col3:
+                        if st.button(" Approve", key=f"approve_{user['user_id']}", type="primary"):
+                            if user_manager.approve_user(user['user_id']):
+                                st.success(f" Approved {user['email']}")
+                                st.rerun()
+                    
+                    with col4:
+                        if st.button(" Reject", key=f"reject_{user['user_id']}"):
+                            if user_manager.reject_user(user['user_id']):
+                                st.success(f" Rejected {user['email']}")
+                                st.rerun()
+                    
+                    st.divider()
+        else:
+            st.info(" No pending approvals")
+    
+    with tab2:
+        st.markdown("###  All Users")
+        
+        all_users = user_manager.get_all_users()
+        
+        if all_users:
+            # Convert to DataFrame for better display
+            df_users = pd.DataFrame(all_users)
+            df_users['created_at'] = pd.to_datetime(df_users['created_at']).dt.strftime('%Y-%m-%d %H:%M')
+            
+            # Add primary owner indicator
+            df_users['primary_owner'] = df_users.apply(
+                lambda row: " Primary Owner" if row.get('is_primary', False) or row.get('role') == 'owner' else "",
+                axis=1
+            )
+            
+            # Display as interactive table
+            edited_df = st.data_editor(
+                df_users[['email', 'status', 'role', 'primary_owner', 'created_at', 'last_login']],
+                column_config={
+                    "status": st.column_config.SelectboxColumn(
+                        "Status",
+                        options=["pending", "approved", "rejected"],
+                    ),
+                    "role": st.column_config.SelectboxColumn(
+                        "Role", 
+                        options=["user", "admin", "owner"],
+                    ),
+                    "primary_owner": st.column_config.TextColumn(
+                        "Primary Owner",
+                        disabled=True
+                    )
+                },
+                use_container_width=True,
+                key="user_management_table"
+            )
+            
+            # User deletion section
+            st.markdown("####  Delete User")
+            user_to_delete = st.selectbox(
+                "Select user to delete:",
+                options=[user['user_id'] for user in all_users],
+                format_func=lambda x: next(user['email'] for user in all_users if user['user_id'] == x),
+                key="delete_user_selector"
+            )
+            
+            if st.button(" Delete User", type="secondary"):
+                if user_to_delete and user_to_delete != authenticated_user_id:
+                    if user_manager.delete_user(user_to_delete):
+                        st.success(" User deleted successfully")
+                        st.rerun()
+                else:
+                    st.error(" Cannot delete your own account or invalid selection")
+    
+    with tab3:
+        st.markdown("###  User Statistics")
+        
+        # Show primary user info first
+        primary_user = user_manager.get_primary_user()
+        if primary_user:
+            st.markdown("####  Primary Owner")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.info(f"**Email:** {primary_user['email']}")
+            with col2:
+                oauth_manager = st.session_state.get('oauth_manager')
+                
+                # Debug: Check what user_id we're using
+                debug_user_id = primary_user['user_id']
+                debug_current_user = st.session_state.get('authenticated_user_id')
+                
+                # Check if we should use the current authenticated user instead
+                # If the current user is the primary owner, use their session user_id
+                user_id_to_check = debug_current_user if debug_current_user else debug_user_id
+                
+                # Also check if the primary owner email matches the current authenticated user
+                if debug_current_user and oauth_manager:
+                    try:
+                        current_user_email = oauth_manager.get_user_email(debug_current_user)
+                        if current_user_email == primary_user.get('email'):
+                            user_id_to_check = debug_current_user
+                    except Exception as e:
+                        pass  # If we can't get email, continue with original logic
+                
+                is_oauth_authenticated = oauth_manager and oauth_manager.is_authenticated(user_id_to_check)
+                auth_status = " OAuth2 Connected" if is_oauth_authenticated else " OAuth2 Not Connected"
+                
+                # Show debug info in admin panel
+                st.info(f"**Status:** {auth_status}")
+                
+                # Add debug information for admin
+                with st.expander("Debug Info", expanded=False):
+                    st.text(f"Primary user_id: {debug_user_id}")
+                    st.text(f"Current authenticated user_id: {debug_current_user}")
+                    st.text(f"Checking authentication for: {user_id_to_check}")
+                    st.text(f"OAuth manager available: {oauth_manager is not None}")
+                    if oauth_manager:
+                        # Check what token files exist
+                        import glob
+                        token_files = glob.glob("tokens/*_token.pickle")
+                        st.text(f"Available token files: {token_files}")
+                        # Check if this specific user has a token file
+                        expected_token_file = f"tokens/{user_id_to_check}_token.pickle"
+                        has_token_file = expected_token_file in token_files
+                        st.text(f"Has token file for {user_id_to_check}: {has_token_file}")
+            
+            if not is_oauth_authenticated:
+                st.warning(" Primary owner needs to authenticate with OAuth2 to send approval emails automatically.")
+        else:
+            st.warning(" No primary owner found!")
+        
+        st.divider()
+        
+        all_users = user_manager.get_all_users()
+        
+        if all_users:
+            # User status breakdown
+            status_counts = {}
+            role_counts = {}
+            
+            for user in all_users:
+                status = user['status']
+                role = user['role']
+                status_counts[status] = status_counts.get(status, 0) + 1
+                role_counts[role] = role_counts.get(role, 0) + 1
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric(" Total Users", len(all_users))
+            
+            with col2:
+                st.metric(" Approved", status_counts.get('approved', 0))
+            
+            with col3:
+                st.metric(" Pending", status_counts.get('pending', 0))
+            
+            with col4:
+                admin_count = role_counts.get('admin', 0) + role_counts.get('owner', 0)
+                st.metric(" Admins/Owner", admin_count)
+            
+            # Charts
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                if status_counts:
+                    st.markdown("#### Status Distribution")
+                    status_df = pd.DataFrame(list(status_counts.items()), columns=['Status', 'Count'])
+                    st.bar_chart(status_df.set_index('Status'))
+            
+            with col2:
+                if role_counts:
+                    st.markdown("#### Role Distribution")
+                    role_df = pd.DataFrame(list(role_counts.items()), columns=['Role', 'Count'])
+                    st.bar_chart(role_df.set_index('Role'))
+    
+    with tab4:
+        st.markdown("###  Approval Emails")
+        st.markdown("This shows the approval emails that would be sent to articulatedesigns@gmail.com")
+        
+        # Display pending approval emails
+        if 'pending_approval_emails' in st.session_state and st.session_state.pending_approval_emails:
+            for idx, email_info in enumerate(st.session_state.pending_approval_emails):
+                with st.expander(f" Approval Request for {email_info['user_email']} - {email_info['created_at'][:16]}"):
+                    col1, col2 = st.columns([2, 1])
+                    
+                    with col1:
+                        st.markdown("**Email Content Preview:**")
+                        st.markdown(email_info['html_body'], unsafe_allow_html=True)
+                    
+                    with col2:
+                        st.markdown("**Quick Actions:**")
+                        st.markdown(f"**User:** {email_info['user_email']}")
+                        st.markdown(f"**User ID:** {email_info['user_id']}")
+                        
+                        # Direct approval/rejection buttons
+                        col_approve, col_reject = st.columns(2)
+                        
+                        with col_approve:
+                            if st.button(" Approve", key=f"direct_approve_{idx}", type="primary"):
+                                if user_manager.approve_user(email_info['user_id']):
+                                    st.success(f" Approved {email_info['user_email']}")
+                                    # Remove from pending emails
+                                    st.session_state.pending_approval_emails.pop(idx)
+                                    st.rerun()
+                        
+                        with col_reject:
+                            if st.button(" Reject", key=f"direct_reject_{idx}"):
+                                if user_manager.reject_user(email_info['user_id']):
+                                    st.success(f" Rejected {email_info['user_email']}")
+                                    # Remove from pending emails
+                                    st.session_state.pending_approval_emails.pop(idx)
+                                    st.rerun()
+                        
+                        st.markdown("---")
+                        st.markdown("**Approval Links:**")
+                        st.markdown(f"**Approve:** {email_info['approve_url']}")
+                        st.markdown(f"**Reject:** {email_info['reject_url']}")
+                        
+                        st.info(" Copy these links to test the approval flow!")
+                        
+            # Clear all processed emails button
+            if st.button(" Clear All Email Previews", type="secondary"):
+                st.session_state.pending_approval_emails = []
+                st.success("All email previews cleared!")
+                st.rerun()
+        else:
+            st.info(" No approval emails pending. When users register, their approval emails will appear here.")
+            
+        st.markdown("---")
+        st.markdown("###  Email Configuration")
+        st.markdown("**Approver Email:** articulatedesigns@gmail.com")
+        st.markdown("**App URL:** http://localhost:8505")
+        st.info(" In production, configure SMTP settings to actually send emails.")
@@ -0,0 +1,149 @@
+"""Dashboard shell; each tab's page module is imported when the tab is rendered."""
+
+import streamlit as st
+
+from src.common.logger import get_logger
+from src.ui.session import session_manager
+
+log = get_logger(__name__)
+
+
+def show_dashboard():
+    """Show the main dashboard with tabbed interface."""
+    # Get current user information
+    user_id = st.session_state.authenticated_user_id
+    oauth_user_id = st.session_state.current_user
+    oauth_manager = st.session_state.oauth_manager
+    user_manager = st.session_state.user_manager
+    
+    # Get user email for display
+    try:
+        user_email = oauth_manager.get_user_email(oauth_user_id)
+        user_data = user_manager.get_user_by_id(user_id)
+        is_admin = user_manager.is_admin(user_id)
+    except Exception as e:
+        # Check if this is an OAuth credentials issue
+        if "No valid credentials found" in str(e):
+            st.error("🔑 Your authentication session has expired. Please log in again.")
+            st.info("Click the 'Logout' button and then log in with your Gmail account to restore access.")
+            
+            # Clear the invalid OAuth credentials
+            try:
+                oauth_manager.revoke_credentials(oauth_user_id)
+                log.info(f"Cleared invalid OAuth credentials for user: {oauth_user_id}")
+            except Exception as revoke_error:
+                log.warning(f"Could not revoke invalid credentials: {revoke_error}")
+            
+            # Clear the invalid session
+            browser_token = session_manager.get_browser_session()
+            if browser_token:
+                session_manager.invalidate_session(browser_token)
+            session_manager.clear_browser_session()
+            
+            # Reset to login state
+            st.session_state.current_user = None
+            st.session_state.authenticated_user_id = None
+            st.session_state.authentication_step = 'login'
+            
+            # Add a rerun to immediately show login page
+            if st.button("🔄 Go to Login"):
+                st.rerun()
+            return
+        else:
+            st.error(f"Error loading user information: {e}")
+            return
+    
+    # Header with user info and logout
+    col1, col2, col3 = st.columns([2, 2, 1])
+    
+    with col1:
+        st.markdown(f"# 📧 Gmail CrewAI")
+        if is_admin:
+            st.markdown(f"**👑 Admin:** {user_email}")
+        else:
+            st.markdown(f"**User:** {user_email}")
+    
+    with col2:
+        st.markdown("### Welcome to Gmail Automation")
+        st.markdown("*AI-powered email management*")
+    
+    with col3:
+        if st.button("🚪 Logout"):
+            # Clear persistent session
+            browser_token = session_manager.get_browser_session()
+            if browser_token:
+                session_manager.invalidate_session(browser_token)
+            session_manager.clear_browser_session()
+            
+            # Clear sensitive data first
+            session_manager.clear_sensitive_session_data()
+            
+            # Clear all session state variables
+            session_keys_to_clear = [
+                'current_user', 'authenticated_user_id', 'authentication_step',
+                'persistent_user_id', 'oauth_user_id', 'session_restored_on_load',
+                'session_initialized', 'user_manager', 'selected_model',
+                'api_keys_updated', 'processing_active', 'processing_started',
+                'processing_stopped', 'activity_logs', 'processing_logs',
+                'processing_job_id', 'processing_job_cursor', 'processing_error'
+            ]
+            
+            for key in session_keys_to_clear:
+                if key in st.session_state:
+                    del st.session_state[key]
+            
+            # Reset authentication step
+            st.session_state.authentication_step = 'login'
+            
+            # Clear any browser storage via JavaScript
+            st.markdown("""
+            <script>
+            // Clear browser storage
+            localStorage.clear();
+            sessionStorage.clear();
+            
+            // Clear cookies
+            document.cookie.split(";").forEach(function(c) { 
+                document.cookie = c.replace(/^ +/, "").replace(/=.*/, "=;expires=" + new Date().toUTCString() + ";path=/"); 
+            });
+            </script>
+            """, unsafe_allow_html=True)
+            
+            log.info(f"User {user_id} logged out successfully")
+            st.rerun()
+    
+    st.markdown("---")
+    
+    # Create tabs - admin tab only visible to admin users (removed billing)
+    if is_admin:
+        tab_names = ["📧 Email Processing", "📋 Rules", "📊 Reports", "⚙️ Settings", "👑 Admin Panel"]
+        tabs = st.tabs(tab_names)
+    else:
+        tab_names = ["📧 Email Processing", "📋 Rules", "📊 Reports", "⚙️ Settings"]
+        tabs = st.tabs(tab_names)
+    
+    # Email Processing Tab
+    with tabs[0]:
+        from src.ui.pages.processing import show_email_processing_tab
+        show_email_processing_tab(user_id, oauth_manager)
+    
+    # Rules Tab
+    with tabs[1]:
+        from src.ui.pages.rules import show_rules_tab
+        show_rules_tab(user_id, oauth_manager)
+    
+    # Reports Tab
+    with tabs[2]:
+        from src.ui.pages.reports import show_reports_tab
+        show_reports_tab(user_id, oauth_manager)
+    
+    # Settings Tab
+    with tabs[3]:
+        from src.ui.pages.settings import show_settings_tab
+        show_settings_tab(user_id, oauth_manager)
+    
+    # Admin Panel Tab (only for admin users)
+    if is_admin:
+        with tabs[4]:
+            from src.ui.pages.admin import show_admin_panel_tab
+            show_admin_panel_tab(user_id, oauth_manager)
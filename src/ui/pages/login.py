@@ -0,0 +1,434 @@
+"""Login, registration and account selection pages."""
+
+import json
+import os
+import uuid
+from datetime import datetime
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+
+def show_login_page():
+    """Show the main login page with Google authentication."""
+    # Create centered layout with shadcn styling
+    st.markdown("""
+    <div class="login-container">
+        <div class="login-card">
+            <div class="login-header">
+                <h1 class="login-title"> Gmail CrewAI</h1>
+                <p class="login-subtitle">Secure email automation with AI</p>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Center the login form
+    col1, col2, col3 = st.columns([1, 1, 1])
+    
+    with col2:
+        # Check if we have a primary user
+        user_manager = st.session_state.user_manager
+        has_primary = user_manager.has_primary_user()
+        
+        if not has_primary:
+            # No primary user yet - show first-time setup
+            st.info("🎉 Welcome to Gmail CrewAI! This appears to be a fresh installation.")
+            st.markdown("**First Time Setup**")
+            st.markdown("The first person to authenticate will become the **primary owner** with full administrative access.")
+            
+            st.markdown("**Why do you need access?**")
+            reason = st.text_area("Brief explanation", placeholder="I need to automate my work email management...", key="setup_reason")
+            
+            if st.button("🔗 Setup as Primary Owner with Gmail", type="primary", use_container_width=True):
+                if reason.strip():
+                    handle_direct_primary_setup(reason)
+                else:
+                    st.error("Please provide a brief explanation")
+        else:
+            # Normal login/registration flow when primary user exists
+            tab1, tab2 = st.tabs([" Login", " Register"])
+            
+            with tab1:
+                st.markdown("**Existing Users**")
+                st.markdown("Click below to authenticate with your Gmail account:")
+                
+                # Gmail login button with icon
+                if st.button("🔗 Login with Gmail", type="primary", use_container_width=True):
+                    handle_direct_google_login()
+                
+                # Help section
+                st.markdown("---")
+                if st.button("❓ Need Help?", use_container_width=True):
+                    primary_user = user_manager.get_primary_user()
+                    if primary_user:
+                        st.info(f"📧 Contact the primary owner ({primary_user['email']}) if you need access or have login issues.")
+                    else:
+                        st.info("📧 Contact your administrator if you need access or have login issues.")
+            
+            with tab2:
+                st.markdown("**New Users**")
+                st.markdown("Authenticate with your Gmail account to request access:")
+                
+                st.markdown("**Why do you need access?**")
+                reason = st.text_area("Brief explanation", placeholder="I need to automate my work email management...", key="register_reason")
+                
+                # Gmail registration button with icon
+                if st.button("🔗 Sign up with Gmail", type="primary", use_container_width=True):
+                    if reason.strip():
+                        handle_direct_gmail_registration(reason)
+                    else:
+                        st.error("Please provide a brief explanation")
+                
+                # Help section
+                st.markdown("---")
+                st.info("💡 After Gmail authentication, your request will be sent to the primary owner for approval.")
+    
+    # Footer
+    st.markdown("""
+    <div style="text-align: center; margin-top: 2rem; color: hsl(var(--muted-foreground)); font-size: 0.875rem;">
+        Powered by Gmail CrewAI - AI-powered email automation
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def handle_direct_google_login():
+    """Handle direct Google login without pre-entering email."""
+    try:
+        # Generate unique OAuth user ID for this session
+        oauth_user_id = f"login_{uuid.uuid4().hex[:8]}"
+        auth_url = st.session_state.oauth_manager.get_authorization_url(oauth_user_id)
+        
+        st.session_state.pending_oauth_user_id = oauth_user_id
+        st.session_state.authentication_step = 'google_oauth'
+        
+        # Automatically redirect to Google OAuth
+        components.html(
+            f"""
+            <script>
+                window.open('{auth_url}', '_blank');
+            </script>
+            """,
+            height=0,
+        )
+        st.success("🔗 Opening Google authentication in a new tab...")
+        st.info("📋 After authentication, we'll check if your account is registered and approved.")
+        
+    except Exception as e:
+        st.error(f"❌ Error starting Google authentication: {e}")
+
+
+def handle_direct_primary_setup(reason):
+    """Handle primary owner setup with OAuth2 authentication."""
+    try:
+        # Generate unique OAuth user ID for primary setup
+        oauth_user_id = f"primary_setup_{uuid.uuid4().hex[:8]}"
+        auth_url = st.session_state.oauth_manager.get_authorization_url(oauth_user_id)
+        
+        # Store the reason for the callback handler
+        st.session_state.pending_primary_reason = reason
+        st.session_state.pending_oauth_user_id = oauth_user_id
+        st.session_state.authentication_step = 'google_oauth'
+        
+        # Automatically redirect to Google OAuth
+        components.html(
+            f"""
+            <script>
+                window.open('{auth_url}', '_blank');
+            </script>
+            """,
+            height=0,
+        )
+        st.success("🔗 Opening Google authentication in a new tab...")
+        st.info("👑 After authentication, you'll be set up as the primary owner.")
+        
+    except Exception as e:
+        st.error(f"❌ Error starting Google authentication: {e}")
+
+
+def handle_direct_gmail_registration(reason):
+    """Handle Gmail registration with OAuth2 authentication."""
+    try:
+        # Generate unique OAuth user ID for registration
+        oauth_user_id = f"register_{uuid.uuid4().hex[:8]}"
+        auth_url = st.session_state.oauth_manager.get_authorization_url(oauth_user_id)
+        
+        # Store the reason for the callback handler
+        st.session_state.pending_register_reason = reason
+        st.session_state.pending_oauth_user_id = oauth_user_id
+        st.session_state.authentication_step = 'google_oauth'
+        
+        # Automatically redirect to Google OAuth
+        components.html(
+            f"""
+            <script>
+                window.open('{auth_url}', '_blank');
+            </script>
+            """,
+            height=0,
+        )
+        st.success("🔗 Opening Google authentication in a new tab...")
+        st.info("📝 After authentication, your registration request will be sent for approval.")
+        
+    except Exception as e:
+        st.error(f"❌ Error starting Google authentication: {e}")
+
+
+def handle_google_login(email: str):
+    """Handle Google login process (legacy function for compatibility)."""
+    user_manager = st.session_state.user_manager
+    user_id, user_data = user_manager.get_user_by_email(email)
+    
+    if not user_data:
+        st.error(" User not found. Please register first or contact the primary owner.")
+        return
+    
+    if user_data['status'] != 'approved':
+        if user_data['status'] == 'pending':
+            primary_user = user_manager.get_primary_user()
+            if primary_user:
+                st.warning(" Your account is pending approval from the primary owner.")
+                
+                # Add resend approval email button (without nested columns to avoid Streamlit nesting error)
+                if st.button(" Resend Approval Email", use_container_width=True):
+                    handle_resend_approval_email(email)
+                
+                if st.button(" Help", use_container_width=True):
+                    st.info(f"If you haven't received approval, click 'Resend Approval Email' to send another request to the primary owner: {primary_user['email']}")
+            else:
+                st.error(" No primary owner found. Please contact your system administrator.")
+        else:
+            st.error(" Your account has been rejected. Contact the primary owner.")
+        return
+    
+    # Start Google OAuth flow
+    try:
+        # Generate unique user ID for OAuth
+        oauth_user_id = f"{user_id}_{uuid.uuid4().hex[:8]}"
+        auth_url = st.session_state.oauth_manager.get_authorization_url(oauth_user_id)
+        
+        st.session_state.pending_login_user_id = user_id
+        st.session_state.pending_oauth_user_id = oauth_user_id
+        st.session_state.authentication_step = 'google_oauth'
+        
+        # Automatically redirect to Google OAuth
+        components.html(
+            f"""
+            <script>
+                window.open('{auth_url}', '_blank');
+            </script>
+            """,
+            height=0,
+        )
+        st.success(" Opening Google authentication in a new tab...")
+        
+    except Exception as e:
+        st.error(f" Error starting Google authentication: {e}")
+
+
+def handle_registration_request(email: str, reason: str):
+    """Handle new user registration request."""
+    user_manager = st.session_state.user_manager
+    
+    # Check if user already exists
+    existing_user_id, existing_user_data = user_manager.get_user_by_email(email)
+    if existing_user_data:
+        if existing_user_data['status'] == 'pending':
+            st.warning(" You already have a pending registration request.")
+        elif existing_user_data['status'] == 'approved':
+            st.info(" You already have an approved account. Please use the Login tab.")
+        else:
+            st.error(" Your previous registration was rejected. Contact your administrator.")
+        return
+    
+    # Check if this would be the first user
+    is_first_user = not user_manager.has_primary_user()
+    
+    # Register new user
+    if user_manager.register_user(email):
+        # Save registration reason for admin review
+        registration_file = "registration_requests.json"
+        requests_data = {}
+        
+        if os.path.exists(registration_file):
+            try:
+                with open(registration_file, 'r', encoding='utf-8') as f:
+                    requests_data = json.load(f)
+            except Exception:
+                requests_data = {}
+        
+        requests_data[email] = {
+            "reason": reason,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        try:
+            with open(registration_file, 'w', encoding='utf-8') as f:
+                json.dump(requests_data, f, indent=2, ensure_ascii=False)
+        except Exception:
+            pass
+        
+        if is_first_user:
+            # First user - automatically approved as primary owner
+            st.success(" Welcome! You've been registered as the primary owner of this Gmail CrewAI system!")
+            st.info(" Your account has been automatically approved since you're the first user.")
+            st.info(" You can now log in with your Google account and start using the system.")
+            st.info(" As the primary owner, you have full administrative access and will receive all approval emails for future users.")
+            st.markdown("**Next Steps:**")
+            st.markdown("1.  Click 'Login' tab above")
+            st.markdown("2.  Authenticate with your Google account")
+            st.markdown("3.  Start automating your Gmail with AI!")
+        else:
+            # Subsequent user - needs approval
+            primary_user = user_manager.get_primary_user()
+            if primary_user:
+                st.success(" Registration request submitted successfully!")
+                st.info(f" An approval email has been sent to the primary owner: {primary_user['email']}")
+                st.info(" Your request is pending approval. You'll be able to log in once the owner approves your request.")
+                st.markdown("**Next Steps:**")
+                st.markdown("1.  Primary owner will receive an approval email with your request details")
+                st.markdown("2.  Owner will approve or reject your request") 
+                st.markdown("3.  Once approved, you can log in with your Google account")
+            else:
+                st.warning(" No primary owner found. Please contact your system administrator.")
+    else:
+        st.error(" Registration failed. Please try again or contact support.")
+
+
+def handle_resend_approval_email(email: str):
+    """Handle resending approval email for a pending user."""
+    user_manager = st.session_state.user_manager
+    
+    # Check if we have a primary user to send the email
+    primary_user = user_manager.get_primary_user()
+    if not primary_user:
+        st.error(" No primary owner found. Cannot send approval email.")
+        return
+    
+    if user_manager.resend_approval_email(email):
+        st.success(" Approval email request has been processed!")
+        
+        # Check if primary user is authenticated with OAuth2
+        oauth_manager = st.session_state.get('oauth_manager')
+        if oauth_manager and oauth_manager.is_authenticated(primary_user['user_id']):
+            st.info(f" An approval email has been sent to the primary owner: {primary_user['email']}")
+            st.info(" Please wait for the owner to review and approve your request.")
+        else:
+            st.warning(" Email stored for owner review (primary owner not authenticated with OAuth2)")
+            st.info(" The primary owner can view pending approval requests in the admin panel")
+            st.info(" Primary owner needs to authenticate with Google OAuth2 to enable automatic email sending")
+    else:
+        st.error(" Failed to resend approval email. Please contact the primary owner.")
+
+
+def show_user_selection():
+    """Show user selection interface."""
+    st.markdown("###  User Authentication")
+    
+    # List existing authenticated users
+    authenticated_users = st.session_state.oauth_manager.list_authenticated_users()
+    
+    if authenticated_users:
+        # Use columns for compact layout
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("** Select User**")
+            user_options = [f"{email}" for user_id, email in authenticated_users.items()]
+            selected_user = st.selectbox(
+                "Account:",
+                options=user_options,
+                key="existing_user_select",
+                label_visibility="collapsed"
+            )
+            
+            if st.button(" Login", type="primary", use_container_width=True):
+                # Find user_id by email
+                selected_email = selected_user
+                user_id = next(uid for uid, email in authenticated_users.items() if email == selected_email)
+                st.session_state.current_user = user_id
+                st.session_state.authentication_step = 'dashboard'
+                st.rerun()
+        
+        with col2:
+            st.markdown("** Add New**")
+            new_user_name = st.text_input(
+                "Account name:",
+                placeholder="e.g., work_email",
+                label_visibility="collapsed"
+            )
+            
+            if st.button(" Authenticate", disabled=not new_user_name, use_container_width=True):
+                # Generate unique user ID
+                user_id = f"{new_user_name}_{uuid.uuid4().hex[:8]}"
+                st.session_state.new_user_id = user_id
+                st.session_state.authentication_step = 'oauth_flow'
+                st.rerun()
+        
+        # Compact management in expander
+        with st.expander(" Manage"):
+            user_to_remove = st.selectbox(
+                "Remove:",
+                options=list(authenticated_users.keys()),
+                format_func=lambda x: f"{authenticated_users[x]}",
+                label_visibility="collapsed"
+            )
+            
+            if st.button(" Remove", type="secondary"):
+                if st.session_state.oauth_manager.revoke_credentials(user_to_remove):
+                    st.success(f" Removed access for {authenticated_users[user_to_remove]}")
+                    st.rerun()
+    
+    else:
+        # No existing users - simplified form
+        st.markdown("** Add Your First Account**")
+        
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            new_user_name = st.text_input(
+                "Account name:",
+                placeholder="e.g., work_email",
+                label_visibility="collapsed"
+            )
+        
+        with col2:
+            if st.button(" Authenticate", disabled=not new_user_name, use_container_width=True):
+                # Generate unique user ID
+                user_id = f"{new_user_name}_{uuid.uuid4().hex[:8]}"
+                st.session_state.new_user_id = user_id
+                st.session_state.authentication_step = 'oauth_flow'
+                st.rerun()
+
+
+def show_oauth_flow():
+    """Show OAuth2 authentication flow."""
+    st.markdown("#  Gmail Authentication")
+    
+    user_id = st.session_state.new_user_id
+    
+    if 'auth_url' not in st.session_state:
+        try:
+            auth_url = st.session_state.oauth_manager.get_authorization_url(user_id)
+            st.session_state.auth_url = auth_url
+        except Exception as e:
+            st.error(f"Error generating auth URL: {e}")
+            if st.button(" Back to User Selection"):
+                st.session_state.authentication_step = 'select_user'
+                st.rerun()
+            return
+    
+    st.markdown("### Step 1: Authorize Gmail Access")
+    st.markdown(f"Click the link below to authorize access to Gmail:")
+    
+    st.markdown(f" **[Authorize Gmail Access]({st.session_state.auth_url})**")
+    
+    st.markdown("###  Waiting for Authentication")
+    st.info("After clicking the link above, you'll be redirected back automatically.")
+    st.markdown("**Note:** Make sure popup blockers are disabled for this site.")
+    
+    if st.button(" Back to User Selection"):
+        st.session_state.authentication_step = 'select_user'
+        if 'auth_url' in st.session_state:
+            del st.session_state.auth_url
+        st.rerun()
@@ -0,0 +1,860 @@
+"""Email processing page: filters, crew jobs and the live activity feed."""
+
+import io
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+
+import streamlit as st
+
+from src.common.logger import get_logger, get_crew_logger, log_context
+from src.gmail_crew_ai.auth import OAuth2Manager
+from src.ui.common import (
+    ErrorLogger,
+    GmailSearchParser,
+    check_and_fix_oauth_credentials,
+    get_activity_log,
+    get_report_dir,
+    safe_add_activity_log,
+)
+
+log = get_logger(__name__)
+
+
+# Seconds between activity feed refreshes while a job runs
+ACTIVITY_REFRESH_SECONDS = 1.0
+
+# Newest activity events shown in the feed
+ACTIVITY_DISPLAY_LINES = 200
+
+
+def show_email_processing_tab(user_id: str, oauth_manager: OAuth2Manager):
+    """Show email processing interface."""
+    
+    st.markdown("## 📧 Email Processing")
+    st.markdown("*Configure filters and process your emails with AI*")
+    st.markdown("---")
+    
+    # Stats overview - only show when not processing to avoid duplication
+    if not st.session_state.get('processing_active', False):
+        # Load processing results to show stats
+        total_processed = 0
+        high_priority = 0
+        medium_priority = 0
+        low_priority = 0
+        
+        categorization_file = os.path.join(get_report_dir(user_id), "categorization_report.json")
+        if os.path.exists(categorization_file):
+            try:
+                from src.gmail_crew_ai.utils.report_repository import report_repository
+                results = report_repository.load(categorization_file)
+                
+                if isinstance(results, dict) and 'emails' in results:
+                    import pandas as pd
+                    df = pd.DataFrame(results['emails'])
+                    total_processed = len(df)
+                    high_priority = len(df[df['priority'] == 'HIGH']) if 'priority' in df.columns else 0
+                    medium_priority = len(df[df['priority'] == 'MEDIUM']) if 'priority' in df.columns else 0
+                    low_priority = len(df[df['priority'] == 'LOW']) if 'priority' in df.columns else 0
+            except:
+                pass
+        
+        # Compact stats display with custom styling
+        stats_html = f"""
+        <style>
+        .stats-container {{
+            display: flex;
+            justify-content: space-around;
+            background: linear-gradient(90deg, #f8f9fa 0%, #e9ecef 100%);
+            border-radius: 10px;
+            padding: 20px;
+            margin: 20px 0;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }}
+        .stat-item {{
+            text-align: center;
+            flex: 1;
+            padding: 0 15px;
+        }}
+        .stat-number {{
+            font-size: 28px;
+            font-weight: 600;
+            margin: 0;
+            color: #2c3e50;
+        }}
+        .stat-label {{
+            font-size: 13px;
+            color: #6c757d;
+            margin: 5px 0 0 0;
+            font-weight: 500;
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
+        }}
+        .stat-high {{ color: #dc3545; }}
+        .stat-medium {{ color: #fd7e14; }}
+        .stat-low {{ color: #28a745; }}
+        .stat-total {{ color: #007bff; }}
+        </style>
+        
+        <div class="stats-container">
+            <div class="stat-item">
+                <div class="stat-number stat-total">{total_processed}</div>
+                <div class="stat-label">Total Processed</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number stat-high">{high_priority}</div>
+                <div class="stat-label">High Priority</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number stat-medium">{medium_priority}</div>
+                <div class="stat-label">Medium Priority</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number stat-low">{low_priority}</div>
+                <div class="stat-label">Low Priority</div>
+            </div>
+        </div>
+        """
+        st.markdown(stats_html, unsafe_allow_html=True)
+    
+    # Initialize session state if not exists
+    if 'gmail_search' not in st.session_state:
+        st.session_state.gmail_search = 'is:unread'
+    
+    st.markdown("### 🔍 Email Filters & Search")
+    # Single row layout: Quick Filters + Search + Max Emails + Processing Controls
+    col1, col2, col3, col4, col5, col6, col7, col8, col9, col10 = st.columns([0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 3, 0.8, 0.8, 0.8])
+    
+    # Quick filter buttons - compact icon-only design
+    with col1:
+        if st.button("📧", key="filter_unread"):
+            st.session_state.gmail_search = "is:unread"
+    
+    with col2:
+        if st.button("⭐", key="filter_starred"):
+            st.session_state.gmail_search = "is:starred"
+    
+    with col3:
+        if st.button("📎", key="filter_attachment"):
+            st.session_state.gmail_search = "has:attachment"
+    
+    with col4:
+        if st.button("🔴", key="filter_important"):
+            st.session_state.gmail_search = "is:important"
+    
+    with col5:
+        if st.button("📅", key="filter_today"):
+            st.session_state.gmail_search = "newer_than:1d"
+    
+    with col6:
+        if st.button("🗂️", key="filter_primary"):
+            st.session_state.gmail_search = "category:primary"
+    
+    # Gmail search input - use session state value directly to avoid widget conflicts
+    with col7:
+        gmail_search = st.text_input(
+            "Gmail Search Query",
+            value=st.session_state.gmail_search,
+            placeholder="e.g., from:example.com is:unread subject:(urgent OR important)",
+            key="gmail_search_input",
+            label_visibility="collapsed"
+        )
+        # Update session state when input changes
+        if gmail_search != st.session_state.gmail_search:
+            st.session_state.gmail_search = gmail_search
+    
+    # Max emails input
+    with col8:
+        # Initialize session state if not exists
+        if 'filter_max_emails' not in st.session_state:
+            st.session_state.filter_max_emails = 3
+            
+        max_emails = st.number_input(
+            "Max Emails", 
+            min_value=1, 
+            max_value=100, 
+            key="filter_max_emails", 
+            label_visibility="collapsed"
+        )
+    
+    # Processing control buttons
+    with col9:
+        if not st.session_state.processing_active:
+            if st.button(" Start", type="primary", key="start_processing"):
+                # Initialize processing state
+                st.session_state.processing_active = True
+                st.session_state.processing_started = False
+                st.session_state.processing_stopped = False
+                st.session_state.processing_error = None
+                st.session_state.processing_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}]  Starting email processing...")
+                st.rerun()
+        else:
+            st.button(" Running", disabled=True, key="processing_status")
+    
+    with col10:
+        if st.session_state.processing_active:
+            if st.button(" Stop", type="secondary", key="stop_processing"):
+                # The worker stops at its next agent step; the poll below records the final state
+                job_id = st.session_state.get('processing_job_id')
+                if job_id:
+                    from src.gmail_crew_ai.jobs import get_job_manager
+                    get_job_manager().cancel(job_id)
+                else:
+                    st.session_state.processing_active = False
+                    st.session_state.processing_started = False
+                st.session_state.processing_stopped = True
+                st.session_state.processing_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}]  Processing stopped by user")
+                st.warning(" Processing stopped by user")
+                st.rerun()
+        else:
+            st.button(" Stop", disabled=True, key="stop_disabled")
+    
+
+    # Always show status section, with different detail levels based on debug mode
+    st.markdown("---")
+    
+    # Initialize activity window state
+    activity_log = get_activity_log()
+    if 'debug_mode' not in st.session_state:
+        st.session_state.debug_mode = False
+    
+    if st.session_state.get('debug_mode', False):
+        st.markdown("### 📺 Activity Window (Debug Mode)")
+        st.markdown("*Real-time AI processing updates*")
+        # Real-time activity container
+        activity_container = st.container()
+    else:
+        st.markdown("### 📊 Processing Status")
+        # Simplified status container
+        activity_container = st.container()
+    
+    with activity_container:
+        # Always show detailed activity logs (removed debug mode restriction)
+        if st.session_state.processing_active:
+            if st.session_state.get('processing_started', False):
+                pass  # Processing status shown in activity logs
+            else:
+                pass  # Starting status shown in activity logs
+        elif st.session_state.get('processing_error'):
+            show_processing_error(st.session_state.processing_error)
+        elif activity_log:
+            st.success("✅ **Processing completed!** Review the activity log below.")
+        else:
+            pass  # No status needed when ready
+        
+        # Live activity log - only this fragment reruns while a job is active
+        processing = st.session_state.processing_active and bool(st.session_state.get('processing_job_id'))
+        st.fragment(show_activity_feed, run_every=ACTIVITY_REFRESH_SECONDS if processing else None)(user_id)
+    
+    # Start processing if needed
+    if st.session_state.processing_active and not st.session_state.get('processing_started', False):
+        st.session_state.processing_started = True
+        
+        # Add initial log entry
+        safe_add_activity_log("Starting email processing...", 'status')
+        safe_add_activity_log("Initializing AI crew with OAuth2 authentication...", icon="📧")
+        
+        # Hand the crew to a background worker; the script thread only polls it
+        if not process_emails_with_filters(user_id, oauth_manager):
+            finish_processing_job()
+        st.rerun()
+    
+    # Clear logs button (only in debug mode)
+    if st.session_state.get('debug_mode', False) and activity_log:
+        if st.button("🗑️ Clear Activity Log"):
+            activity_log.clear()
+            st.rerun()
+
+
+def show_activity_feed(user_id: str):
+    """
+    Render the activity log and follow the running job.
+
+    Runs as a fragment: while processing, only this feed is refreshed; the
+    full page reruns once when the job finishes.
+    """
+    if st.session_state.processing_active and st.session_state.get('processing_job_id'):
+        if not poll_processing_job(user_id):
+            st.rerun()
+    
+    activity_log = get_activity_log()
+    if activity_log:
+        logs_text = activity_log.text(limit=ACTIVITY_DISPLAY_LINES)
+        if activity_log.dropped:
+            logs_text = f"... {activity_log.dropped} earlier events not shown\n" + logs_text
+        
+        # Add current activity indicator if processing
+        if st.session_state.processing_active:
+            current_time = datetime.now().strftime('%H:%M:%S')
+            logs_text += f"\n[{current_time}] 🔄 Processing in progress..."
+        
+        st.text_area(
+            "Activity Log",
+            value=logs_text,
+            height=200,
+            disabled=True,
+            key="activity_display"
+        )
+    else:
+        st.text_area(
+            "Activity Log", 
+            value="Ready to start processing. Click 'Start' above to begin email automation.",
+            height=200,
+            disabled=True,
+            key="activity_empty"
+        )
+
+
+def process_emails_with_filters(user_id: str, oauth_manager) -> Optional[str]:
+    """
+    Submit an email processing job with the applied filters.
+
+    The crew runs in a background worker; show_email_processing_tab polls
+    the job for progress. Settings are passed to the worker in a JobSpec
+    instead of process-wide environment variables, so concurrent users
+    never see each other's model or search query.
+
+    Returns:
+        The job ID, or None if the job could not be started
+    """
+    from src.gmail_crew_ai.jobs import JobSpec, get_job_manager
+
+    # Check OAuth credentials first
+    if not check_and_fix_oauth_credentials(user_id, oauth_manager):
+        st.error("❌ OAuth authentication required. Please log in again to continue.")
+        if st.button("🔐 Go to Login"):
+            st.session_state.authentication_step = 'login'
+            st.rerun()
+        return None
+    
+    # Parse Gmail search query into structured filters
+    gmail_search = st.session_state.get('gmail_search', 'is:unread')
+    max_emails = st.session_state.get('filter_max_emails', 3)
+    
+    parser = GmailSearchParser()
+    filters = parser.parse_search(gmail_search)
+    filters['max_emails'] = max_emails
+    
+    # Apply rules to generate additional instructions
+    rule_instructions = generate_rule_instructions()
+    
+    # Get OAuth user email from session state for the activity log
+    oauth_user_id = st.session_state.get('current_user')
+    user_email = oauth_manager.get_user_email(oauth_user_id) if oauth_user_id else "Unknown"
+    safe_add_activity_log(f"Processing for user: {user_email}", icon="👤")
+    safe_add_activity_log(f"Applied filters: {len([k for k, v in filters.items() if v])} active", icon="⚙️")
+    safe_add_activity_log(f"Using Gmail search: '{gmail_search}'", icon="🔍")
+    
+    selected_model = st.session_state.get('selected_model') or "openai/gpt-4.1"
+    safe_add_activity_log(f"AI model: {selected_model}", icon="🤖")
+    
+    # Get user's API keys for the crew
+    user_manager = st.session_state.user_manager
+    user_api_keys = {}
+    for key_type in ('anthropic', 'openai', 'do_ai'):
+        if user_manager.has_user_api_key(user_id, key_type):
+            user_api_keys[key_type] = user_manager.get_user_api_key(user_id, key_type)
+    
+    spec = JobSpec(
+        user_id=user_id,
+        model=selected_model,
+        search_query=gmail_search,
+        max_emails=max_emails,
+        user_api_keys=user_api_keys,
+        filters=filters,
+        rule_instructions=rule_instructions,
+        # Raw crew output is only forwarded in debug mode; typed progress events are always on
+        capture_output=st.session_state.get('debug_mode', False),
+    )
+    
+    try:
+        job_id = get_job_manager().submit(spec)
+    except Exception as e:
+        log.error(f"Failed to submit processing job for user {user_id}: {e}")
+        st.session_state.processing_error = {
+            'error': str(e),
+            'context': {'user_email': user_email, 'search': gmail_search, 'max_emails': max_emails},
+        }
+        return None
+    
+    with log_context(run_id=job_id, user_id=user_id):
+        get_crew_logger().info(f"Submitted job {job_id} for user {user_id} (model: {selected_model}, filters: {filters})")
+    st.session_state.processing_job_id = job_id
+    st.session_state.processing_job_cursor = 0
+    st.session_state.processing_job_context = {
+        'user_email': user_email,
+        'search': gmail_search,
+        'max_emails': max_emails,
+        'filters': filters,
+        'rule_instructions': rule_instructions,
+    }
+    safe_add_activity_log(f"Processing job {job_id} queued", icon="📨")
+    return job_id
+
+
+def poll_processing_job(user_id: str) -> bool:
+    """
+    Copy new progress events of the user's job into the activity log.
+
+    Returns:
+        True while the job is still queued or running
+    """
+    from src.gmail_crew_ai.jobs import TERMINAL_STATES, CANCELLED, COMPLETED, get_job_manager
+
+    job_id = st.session_state.get('processing_job_id')
+    if not job_id:
+        return False
+    
+    manager = get_job_manager()
+    events, cursor = manager.events_since(job_id, st.session_state.get('processing_job_cursor', 0))
+    st.session_state.processing_job_cursor = cursor
+    activity_log = get_activity_log()
+    for event in events:
+        activity_log.add_job_event(event)
+    log_job_events(job_id, user_id, events)
+    
+    job = manager.get(job_id)
+    if job is None:
+        # The worker pool was restarted; the job is lost
+        safe_add_activity_log(f"Processing job {job_id} is no longer available", 'warning')
+        finish_processing_job()
+        return False
+    if job['status'] not in TERMINAL_STATES:
+        return True
+    
+    context = st.session_state.get('processing_job_context', {})
+    crew_log = logging.LoggerAdapter(get_crew_logger(), {'run_id': job_id, 'user_id': user_id})
+    if job['status'] == COMPLETED:
+        # Processing changed labels and read state; refresh the dashboard counts
+        from src.gmail_crew_ai.utils.mailbox_stats import mailbox_stats
+        mailbox_stats.invalidate(user_id)
+        safe_add_activity_log("All tasks completed: emails categorized, organized, responses generated, cleanup performed", 'status', "🎉")
+        crew_log.info(f"CrewAI execution completed successfully for user {user_id}")
+    elif job['status'] == CANCELLED:
+        safe_add_activity_log("Processing stopped by user", 'status', "🛑")
+        ErrorLogger().log_error(
+            "Processing",
+            "Email processing was stopped by user",
+            f"Processing was manually stopped during execution for user {context.get('user_email', 'Unknown')}",
+            user_id
+        )
+    else:
+        error_str = job['error'] or "Unknown error"
+        error_analysis = analyze_crew_error(error_str)
+        crew_log.error(f"CrewAI execution failed for user {user_id}: {error_str}")
+        if job.get('traceback'):
+            crew_log.error(job['traceback'])
+        ErrorLogger().log_error(
+            "CrewAI",
+            f"CrewAI execution failed: {error_str}",
+            f"Error during crew execution for user {context.get('user_email', 'Unknown')}. Filters: {json.dumps(context.get('filters', {}))}. Rules: {context.get('rule_instructions', '')}. Analysis: {error_analysis['category']}",
+            user_id
+        )
+        safe_add_activity_log("CrewAI execution failed", 'error')
+        safe_add_activity_log(f"Error type: {error_analysis['category']}", icon="🔍")
+        safe_add_activity_log(error_analysis['user_message'], icon="💡")
+        st.session_state.processing_error = {'error': error_str, 'context': context}
+    
+    manager.forget(job_id)
+    finish_processing_job()
+    return False
+
+
+# Log level of each job event kind in crew.log; raw output lines are DEBUG (and sampled)
+JOB_EVENT_LOG_LEVELS = {
+    'status': logging.INFO,
+    'agent': logging.INFO,
+    'task': logging.INFO,
+    'tool': logging.INFO,
+    'llm': logging.INFO,
+    'warning': logging.WARNING,
+    'log': logging.DEBUG,
+}
+
+
+def log_job_events(job_id: str, user_id: str, events: list):
+    """Write job progress events to crew.log with run, user, agent and task fields."""
+    crew_log = get_crew_logger()
+    for event in events:
+        level = JOB_EVENT_LOG_LEVELS.get(event.get('kind'), logging.INFO)
+        if not crew_log.isEnabledFor(level):
+            continue
+        # Latency, tokens, tool and model become JSON fields with LOG_FORMAT=json
+        extra = {key: value for key, value in event.items()
+                 if key not in ('job_id', 'kind', 'message', 'time', 'agent', 'task')}
+        extra['event'] = event.get('kind')
+        with log_context(run_id=job_id, user_id=user_id, agent=event.get('agent'), task=event.get('task')):
+            crew_log.log(level, event.get('message') or f"Job {event.get('status', '')}", extra=extra)
+
+
+def finish_processing_job():
+    """Reset the processing state once the job is done."""
+    st.session_state.processing_active = False
+    st.session_state.processing_started = False
+    st.session_state.processing_stopped = False
+    st.session_state.processing_job_id = None
+    st.session_state.processing_job_cursor = 0
+
+
+def show_processing_error(processing_error: dict):
+    """Show the error notification and troubleshooting steps of a failed job."""
+    error_analysis = analyze_crew_error(processing_error['error'])
+    context = processing_error.get('context', {})
+    
+    st.error("🚨 **Email Processing Failed**")
+    
+    with st.expander("📋 Error Details & Troubleshooting", expanded=True):
+        st.markdown(f"**Error Category:** {error_analysis['category']}")
+        st.markdown(f"**What happened:** {error_analysis['user_message']}")
+        
+        if error_analysis['solutions']:
+            st.markdown("**🛠️ Recommended Solutions:**")
+            for i, solution in enumerate(error_analysis['solutions'], 1):
+                st.markdown(f"{i}. {solution}")
+        
+        if error_analysis['technical_details']:
+            with st.expander("🔧 Technical Details (for advanced users)"):
+                st.code(error_analysis['technical_details'])
+        
+        # Show processing context
+        st.markdown("**📊 Processing Context:**")
+        st.markdown(f"- **User:** {context.get('user_email', 'Unknown')}")
+        st.markdown(f"- **Search Query:** `{context.get('search', 'is:unread')}`")
+        st.markdown(f"- **Max Emails:** {context.get('max_emails', 10)}")
+        if context.get('rule_instructions'):
+            st.markdown(f"- **Active Rules:** {len(st.session_state.get('email_rules', []))} rules applied")
+        
+        # Provide immediate action buttons
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("🔄 Retry Processing", key="retry_processing"):
+                st.session_state.processing_error = None
+                st.session_state.processing_active = True
+                st.session_state.processing_started = False
+                st.rerun()
+        with col2:
+            if st.button("🔧 Check Settings", key="settings_processing"):
+                st.session_state.selected_main_tab = "⚙️ Settings"
+                st.rerun()
+        with col3:
+            if st.button("📞 Get Help", key="help_processing"):
+                st.session_state.selected_main_tab = "❓ Help"
+                st.rerun()
+
+
+def analyze_crew_error(error_message: str) -> dict:
+    """Analyze crew error and provide user-friendly explanations and solutions."""
+    error_message_lower = error_message.lower()
+    
+    # Default analysis
+    analysis = {
+        'category': 'Unknown Error',
+        'user_message': 'An unexpected error occurred during email processing.',
+        'solutions': ['Try processing again', 'Check your internet connection', 'Contact support if the problem persists'],
+        'technical_details': error_message
+    }
+    
+    # API Key Issues
+    if any(phrase in error_message_lower for phrase in ['api_key', 'authentication', 'openai_api_key', 'anthropic_api_key', 'invalid x-api-key']):
+        if 'anthropic' in error_message_lower or 'claude' in error_message_lower:
+            analysis.update({
+                'category': 'Anthropic API Key Issue',
+                'user_message': 'Your Anthropic API key is invalid, expired, or missing. Claude models cannot function without a valid key.',
+                'solutions': [
+                    'Go to Settings → API Key Configuration and update your Anthropic API key',
+                    'Get a new API key from https://console.anthropic.com/',
+                    'Check if your Anthropic account has sufficient credits',
+                    'Switch to OpenAI models if you have a valid OpenAI API key',
+                    'Contact Anthropic support if you believe your key should be working'
+                ]
+            })
+        elif 'openai' in error_message_lower or 'gpt' in error_message_lower:
+            analysis.update({
+                'category': 'OpenAI API Key Issue',
+                'user_message': 'Your OpenAI API key is invalid, expired, or missing. GPT models cannot function without a valid key.',
+                'solutions': [
+                    'Go to Settings → API Key Configuration and update your OpenAI API key',
+                    'Get a new API key from https://platform.openai.com/api-keys',
+                    'Check if your OpenAI account has sufficient credits',
+                    'Switch to Anthropic models if you have a valid Anthropic API key',
+                    'Contact OpenAI support if you believe your key should be working'
+                ]
+            })
+        else:
+            analysis.update({
+                'category': 'API Key Configuration',
+                'user_message': 'The AI model API key is missing or invalid. This prevents the AI agents from working.',
+                'solutions': [
+                    'Go to Settings → API Key Configuration and verify your API key is set',
+                    'Check that you selected the correct model for your available API keys',
+                    'Ensure your API key has sufficient credits/quota',
+                    'Try switching to a different AI model if you have multiple API keys configured'
+                ]
+            })
+    
+    # OAuth/Gmail Issues
+    elif any(phrase in error_message_lower for phrase in ['oauth', 'gmail', 'credentials', 'token']):
+        analysis.update({
+            'category': 'Gmail Authentication',
+            'user_message': 'There was an issue accessing your Gmail account. Your authentication may have expired.',
+            'solutions': [
+                'Go to Settings → Authentication Settings and click "Refresh Authentication"',
+                'Try logging out and logging back in',
+                'Check that your Google account has Gmail API access enabled',
+                'Ensure you granted all required permissions during OAuth setup'
+            ]
+        })
+    
+    # Rate Limiting
+    elif any(phrase in error_message_lower for phrase in ['rate limit', 'quota', 'too many requests']):
+        analysis.update({
+            'category': 'Rate Limiting',
+            'user_message': 'You have hit API rate limits. This happens when too many requests are made too quickly.',
+            'solutions': [
+                'Wait a few minutes before trying again',
+                'Reduce the number of emails being processed at once',
+                'Check your API provider dashboard for quota information',
+                'Consider upgrading your API plan if you frequently hit limits'
+            ]
+        })
+    
+    # Network Issues
+    elif any(phrase in error_message_lower for phrase in ['network', 'connection', 'timeout', 'unreachable']):
+        analysis.update({
+            'category': 'Network Connection',
+            'user_message': 'There was a network connectivity issue preventing communication with required services.',
+            'solutions': [
+                'Check your internet connection',
+                'Try refreshing the page and running again',
+                'Verify that your firewall/proxy allows access to Gmail and AI APIs',
+                'Wait a moment and retry - this might be a temporary service issue'
+            ]
+        })
+    
+    # Model/LLM Issues
+    elif any(phrase in error_message_lower for phrase in ['model', 'llm', 'litellm', 'completion']):
+        analysis.update({
+            'category': 'AI Model Issue',
+            'user_message': 'The AI model encountered an error while processing your emails.',
+            'solutions': [
+                'Try switching to a different AI model in Settings',
+                'Reduce the number of emails being processed at once',
+                'Check that your selected model is available and working',
+                'Verify your API key has access to the selected model'
+            ]
+        })
+    
+    # Email Processing Issues
+    elif any(phrase in error_message_lower for phrase in ['fetch', 'email', 'organize', 'categorize']):
+        analysis.update({
+            'category': 'Email Processing',
+            'user_message': 'An error occurred while fetching or processing your emails.',
+            'solutions': [
+                'Try using a simpler search query (e.g., just "is:unread")',
+                'Reduce the maximum number of emails to process',
+                'Check that your Gmail account is accessible',
+                'Verify your search query syntax is correct'
+            ]
+        })
+    
+    # Permission Issues
+    elif any(phrase in error_message_lower for phrase in ['permission', 'forbidden', 'unauthorized', 'access denied']):
+        analysis.update({
+            'category': 'Permission Error',
+            'user_message': 'The app does not have sufficient permissions to access the required services.',
+            'solutions': [
+                'Re-authenticate with Google to grant fresh permissions',
+                'Check that Gmail API is enabled in your Google Cloud project',
+                'Verify OAuth consent screen includes required scopes',
+                'Contact your administrator if using a work/school account'
+            ]
+        })
+    
+    return analysis
+
+
+def generate_rule_instructions() -> str:
+    """Generate additional instructions based on active rules."""
+    if not st.session_state.email_rules:
+        return ""
+    
+    active_rules = [rule for rule in st.session_state.email_rules if rule['enabled']]
+    if not active_rules:
+        return ""
+    
+    instructions = ["Additional processing rules:"]
+    
+    for rule in active_rules:
+        # Handle both old format (for backward compatibility) and new Gmail search format
+        if 'gmail_search' in rule:
+            # New Gmail search format
+            rule_text = f"- For emails matching Gmail search '{rule['gmail_search']}', then {rule['action_type']}"
+        else:
+            # Old format (backward compatibility)
+            rule_text = f"- When {rule.get('condition_field', 'email')} {rule.get('condition_operator', 'contains')} '{rule.get('condition_value', '')}', then {rule['action_type']}"
+        
+        if rule.get('action_value'):
+            rule_text += f" '{rule['action_value']}'"
+        if rule.get('ai_instructions'):
+            rule_text += f". {rule['ai_instructions']}"
+        if rule.get('priority'):
+            rule_text += f" (Priority: {rule['priority']})"
+        
+        instructions.append(rule_text)
+    
+    # Add explanation of Gmail search syntax for the AI
+    instructions.append("\nGmail search syntax guide for AI:")
+    instructions.append("- from:email@domain.com = emails from specific sender")
+    instructions.append("- to:email@domain.com = emails to specific recipient")
+    instructions.append("- subject:keyword = emails with keyword in subject")
+    instructions.append("- is:unread = unread emails")
+    instructions.append("- is:starred = starred emails")
+    instructions.append("- has:attachment = emails with attachments")
+    instructions.append("- label:name = emails with specific label")
+    instructions.append("- category:primary = emails in primary category")
+    instructions.append("- older_than:7d / newer_than:1d = date-based filters")
+    
+    return "\n".join(instructions)
+
+
+class StreamCapture:
+    """Capture stdout/stderr and forward to Streamlit logs."""
+    
+    def __init__(self, original_stream, log_callback):
+        self.original_stream = original_stream
+        self.log_callback = log_callback
+        self.buffer = io.StringIO()
+        
+    def write(self, text):
+        # Write to original stream (terminal)
+        if hasattr(self.original_stream, 'write'):
+            self.original_stream.write(text)
+            
+        # Also capture for Streamlit
+        if text.strip():  # Only log non-empty lines
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            # Clean up the text and add to logs
+            clean_text = text.strip().replace('\n', ' ')
+            if clean_text and not clean_text.isspace():
+                self.log_callback(f"[{timestamp}] {clean_text}")
+    
+    def flush(self):
+        if hasattr(self.original_stream, 'flush'):
+            self.original_stream.flush()
+    
+    def isatty(self):
+        return False
+
+
+def log_to_activity_window(message):
+    """Add message to processing logs."""
+    if 'processing_logs' not in st.session_state:
+        st.session_state.processing_logs = []
+    st.session_state.processing_logs.append(message)
+    # Keep only last 100 messages to prevent memory issues
+    if len(st.session_state.processing_logs) > 100:
+        st.session_state.processing_logs = st.session_state.processing_logs[-100:]
+
+
+def send_reply_draft(user_id: str, oauth_manager: OAuth2Manager, reply_content: str, original_subject: str):
+    """Send a reply draft."""
+    try:
+        service = oauth_manager.get_gmail_service(user_id)
+        # Implementation for sending reply would go here
+        st.success(f" Reply sent for: {original_subject}")
+        st.session_state.processing_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}]  Reply sent for: {original_subject}")
+    except Exception as e:
+        st.error(f" Error sending reply: {e}")
+        st.session_state.processing_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}]  Error sending reply: {e}")
+
+
+def update_ai_learning(user_id: str, original_reply: str, edited_reply: str, subject: str):
+    """Update AI learning based on reply edits."""
+    try:
+        # Save learning data to user knowledge base
+        learning_data = {
+            "timestamp": datetime.now().isoformat(),
+            "user_id": user_id,
+            "subject": subject,
+            "original_reply": original_reply,
+            "edited_reply": edited_reply,
+            "changes": "User edited AI-generated reply"
+        }
+        
+        # Append to learning file
+        learning_file = f"knowledge/user_learning_{user_id}.json"
+        os.makedirs("knowledge", exist_ok=True)
+        
+        if os.path.exists(learning_file):
+            with open(learning_file, "r", encoding='utf-8') as f:
+                learning_history = json.load(f)
+        else:
+            learning_history = []
+        
+        learning_history.append(learning_data)
+        
+        with open(learning_file, "w", encoding='utf-8') as f:
+            json.dump(learning_history, f, indent=2, ensure_ascii=False)
+        
+        st.success(" AI learning updated with your changes!")
+        st.session_state.processing_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}]  AI learning updated from user feedback")
+        
+    except Exception as e:
+        st.error(f" Error updating AI learning: {e}")
+        st.session_state.processing_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}]  Error updating AI learning: {e}")
+
+
+def process_emails(user_id: str, oauth_manager):
+    """Process emails using CrewAI (legacy function - calls new filtered version)."""
+    process_emails_with_filters(user_id, oauth_manager)
+
+
+def execute_email_action(user_id: str, oauth_manager: OAuth2Manager, email_row, action: str):
+    """Execute the approved action on an email."""
+    try:
+        email_id = email_row.get('email_id', 'unknown')
+        subject = email_row.get('subject', 'Unknown Subject')
+        
+        st.session_state.processing_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}]  Executing {action} on: {subject}")
+        
+        service = oauth_manager.get_gmail_service(user_id)
+        
+        if action == "Archive":
+            # Remove INBOX label to archive
+            service.users().messages().modify(
+                userId='me',
+                id=email_id,
+                body={'removeLabelIds': ['INBOX']}
+            ).execute()
+            st.success(f" Archived: {subject}")
+            
+        elif action == "Delete":
+            service.users().messages().trash(userId='me', id=email_id).execute()
+            st.success(f" Deleted: {subject}")
+            
+        elif action == "Star":
+            service.users().messages().modify(
+                userId='me',
+                id=email_id,
+                body={'addLabelIds': ['STARRED']}
+            ).execute()
+            st.success(f" Starred: {subject}")
+            
+        elif action == "Mark Important":
+            service.users().messages().modify(
+                userId='me',
+                id=email_id,
+                body={'addLabelIds': ['IMPORTANT']}
+            ).execute()
+            st.success(f" Marked Important: {subject}")
+            
+        else:
+            st.info(f"Action '{action}' is not yet implemented for: {subject}")
+        
+        st.session_state.processing_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}]  Action completed successfully")
+        
+    except Exception as e:
+        st.error(f" Error executing action '{action}': {e}")
+        st.session_state.processing_logs.append(f"[{datetime.now().strftime('%H:%M:%S')}]  Action failed: {e}")
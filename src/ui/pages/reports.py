@@ -0,0 +1,788 @@
+"""Reports, statistics and token usage pages."""
+
+import os
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from src.gmail_crew_ai.auth import OAuth2Manager
+from src.ui.common import get_report_dir
+
+
+def show_reports_tab(user_id: str, oauth_manager):
+    """Show processing reports and results."""
+    st.markdown("## 📊 Processing Reports")
+    st.markdown("View results from your email processing sessions")
+    
+    # Create tabs for different report types
+    report_tabs = st.tabs(["📋 Processing Reports", "💰 Token Usage", "📈 Analytics"])
+    
+    with report_tabs[0]:
+        # Show latest processing reports (existing functionality)
+        show_latest_processing_reports()
+    
+    with report_tabs[1]:
+        # Show token usage reports
+        show_token_usage_report(user_id)
+    
+    with report_tabs[2]:
+        # Show analytics and trends
+        show_processing_analytics(user_id)
+
+
+def show_email_stats_tab(user_id: str, oauth_manager: OAuth2Manager):
+    """Show email statistics and reports."""
+    st.markdown("##  Email Statistics & Reports")
+    
+    # Counts are cached per user; the Gmail service is only built on a cache miss
+    try:
+        from src.gmail_crew_ai.utils.mailbox_stats import mailbox_stats
+        
+        def service_factory():
+            return oauth_manager.get_gmail_service(user_id)
+        
+        overview = mailbox_stats.get_overview(user_id, service_factory)
+        total_count = overview['total']
+        unread_count = overview['unread']
+        
+        # Enhanced email metrics with clickable detailed views
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            if st.button(f" Total Emails\n{total_count:,}", use_container_width=True):
+                show_detailed_email_breakdown(user_id, service_factory, "total")
+        
+        with col2:
+            if st.button(f" Unread Emails\n{unread_count:,}", use_container_width=True):
+                show_detailed_email_breakdown(user_id, service_factory, "unread")
+        
+        with col3:
+            read_count = overview['read']
+            if st.button(f" Read Emails\n{read_count:,}", use_container_width=True):
+                show_detailed_email_breakdown(user_id, service_factory, "read")
+        
+        with col4:
+            if st.button(" Detailed Analytics", use_container_width=True):
+                show_advanced_email_analytics(user_id, service_factory)
+        
+        # Processing Reports Section
+        st.markdown("---")
+        st.markdown("###  Processing Reports")
+        
+        if os.path.exists(get_report_dir()):
+            # Create tabs for different report types
+            report_tabs = st.tabs([" Latest Reports", " Processing History", " Report Viewer"])
+            
+            with report_tabs[0]:
+                show_latest_processing_reports()
+            
+            with report_tabs[1]:
+                show_processing_history_enhanced()
+            
+            with report_tabs[2]:
+                show_interactive_report_viewer()
+        else:
+            st.info(" No processing reports available yet. Run email processing to generate reports.")
+    
+    except Exception as e:
+        st.error(f"Error fetching email stats: {e}")
+
+
+def show_detailed_email_breakdown(user_id: str, service_factory, email_type: str):
+    """Show detailed breakdown of emails by type."""
+    from src.gmail_crew_ai.utils.mailbox_stats import mailbox_stats
+    
+    st.markdown(f"###  Detailed {email_type.title()} Email Breakdown")
+    
+    try:
+        # Get emails by category (label counters, cached per user)
+        breakdown_data = mailbox_stats.get_category_breakdown(user_id, service_factory, email_type)
+        
+        # Display as chart
+        df_breakdown = pd.DataFrame(breakdown_data)
+        
+        col1, col2 = st.columns([1, 1])
+        
+        with col1:
+            st.dataframe(df_breakdown[['Category', 'Count']], use_container_width=True)
+        
+        with col2:
+            if not df_breakdown.empty:
+                st.bar_chart(df_breakdown.set_index('Category')['Count'])
+        
+    except Exception as e:
+        st.error(f"Error getting email breakdown: {e}")
+
+
+def show_advanced_email_analytics(user_id: str, service_factory):
+    """Show advanced email analytics."""
+    from src.gmail_crew_ai.utils.mailbox_stats import mailbox_stats
+    
+    st.markdown("###  Advanced Email Analytics")
+    
+    try:
+        # Get various email statistics in one batch, cached per user
+        analytics_results = mailbox_stats.get_advanced_analytics(user_id, service_factory)
+        
+        # Display analytics
+        df_analytics = pd.DataFrame(analytics_results)
+        
+        col1, col2 = st.columns([1, 1])
+        
+        with col1:
+            st.dataframe(df_analytics, use_container_width=True)
+        
+        with col2:
+            if not df_analytics.empty:
+                st.bar_chart(df_analytics.set_index('Metric')['Count'])
+        
+    except Exception as e:
+        st.error(f"Error getting analytics: {e}")
+
+
+def show_latest_processing_reports():
+    """Show the latest processing reports in a user-friendly format."""
+    st.markdown("####  Latest Processing Results")
+    
+    # Define report types and their descriptions
+    report_types = {
+        "categorization_report.json": {"title": " Email Categorization", "description": "AI categorization and prioritization results"},
+        "organization_report.json": {"title": " Email Organization", "description": "Labels and organization applied"},
+        "response_report.json": {"title": " Reply Drafts", "description": "AI-generated response drafts"},
+        "notification_report.json": {"title": " Notifications", "description": "Slack notifications sent"},
+        "cleanup_report.json": {"title": " Email Cleanup", "description": "Emails archived and deleted"}
+    }
+    
+    # Check which reports exist and show them (metadata only; content is read when viewed)
+    from src.gmail_crew_ai.utils.report_repository import report_info
+    report_dir = get_report_dir()
+    available_reports = []
+    for filename, info in report_types.items():
+        file_info = report_info(os.path.join(report_dir, filename))
+        if file_info:
+            available_reports.append({
+                "file": filename,
+                "title": info["title"],
+                "description": info["description"],
+                "modified": file_info.modified
+            })
+    
+    if available_reports:
+        # Sort by modification time (newest first)
+        available_reports.sort(key=lambda x: x["modified"], reverse=True)
+        
+        for report in available_reports:
+            with st.container():
+                col1, col2, col3 = st.columns([2, 2, 1])
+                
+                with col1:
+                    st.markdown(f"**{report['title']}**")
+                    st.markdown(f"*{report['description']}*")
+                
+                with col2:
+                    st.markdown(f" {report['modified'].strftime('%Y-%m-%d %H:%M:%S')}")
+                
+                with col3:
+                    if st.button(" View", key=f"view_{report['file']}", use_container_width=True):
+                        show_formatted_report(report['file'])
+                
+                st.divider()
+    else:
+        st.info(" No processing reports available yet.")
+
+
+def show_token_usage_report(user_id: str):
+    """Show token usage report for the user."""
+    st.markdown("### 💰 Token Usage & Costs")
+    
+    try:
+        # Try to import token tracker
+        from src.gmail_crew_ai.utils.token_tracker import token_tracker
+        
+        # Get usage summary
+        usage_summary = token_tracker.get_usage_summary(user_id)
+        
+        if usage_summary['total_sessions'] == 0:
+            st.info("No token usage data available yet. Process some emails to see usage statistics.")
+            return
+        
+        # Display overview metrics
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(
+                "Total Sessions",
+                f"{usage_summary['total_sessions']:,}",
+                help="Total number of email processing sessions"
+            )
+        
+        with col2:
+            st.metric(
+                "Total Tokens Used",
+                f"{usage_summary['total_tokens']:,}",
+                help="Total tokens consumed across all sessions"
+            )
+        
+        with col3:
+            st.metric(
+                "Total Cost",
+                f"${usage_summary['total_cost']:.4f}",
+                help="Estimated total cost based on model pricing"
+            )
+        
+        with col4:
+            st.metric(
+                "Avg Cost/Session",
+                f"${usage_summary['avg_cost_per_session']:.4f}",
+                help="Average cost per email processing session"
+            )
+        
+        # Show recent sessions
+        st.markdown("---")
+        st.markdown("#### Recent Sessions")
+        
+        recent_sessions = usage_summary.get('recent_sessions', [])
+        if recent_sessions:
+            # Create a dataframe for display
+            session_data = []
+            for session in recent_sessions[-10:]:  # Last 10 sessions
+                session_data.append({
+                    "Date": datetime.fromisoformat(session['start_time']).strftime("%Y-%m-%d %H:%M"),
+                    "Model": session.get('model', 'Unknown'),
+                    "Emails": session.get('emails_processed', 0),
+                    "Tokens": f"{session.get('total_tokens', 0):,}",
+                    "Cost": f"${session.get('total_cost', 0):.4f}",
+                    "Avg/Email": f"${session.get('avg_cost_per_email', 0):.4f}"
+                })
+            
+            df_sessions = pd.DataFrame(session_data)
+            st.dataframe(df_sessions, use_container_width=True, hide_index=True)
+            
+            # Show agent breakdown for the most recent session
+            if recent_sessions:
+                latest_session = recent_sessions[-1]
+                if latest_session.get('agents'):
+                    st.markdown("---")
+                    st.markdown("#### Latest Session Agent Breakdown")
+                    
+                    agent_data = []
+                    for agent_name, stats in latest_session['agents'].items():
+                        agent_data.append({
+                            "Agent": agent_name,
+                            "Calls": stats['calls'],
+                            "Input Tokens": f"{stats['input_tokens']:,}",
+                            "Output Tokens": f"{stats['output_tokens']:,}",
+                            "Total Tokens": f"{stats['total_tokens']:,}",
+                            "Cost": f"${stats['cost']:.4f}",
+                            "Avg Latency": f"{stats.get('avg_latency_ms', 0) / 1000:.1f}s"
+                        })
+                    
+                    df_agents = pd.DataFrame(agent_data)
+                    st.dataframe(df_agents, use_container_width=True, hide_index=True)
+        
+        # Rate limit warnings
+        st.markdown("---")
+        st.markdown("#### Rate Limit Information")
+        
+        model = os.getenv('MODEL', 'anthropic/claude-sonnet-4-20250514')
+        if 'claude' in model:
+            st.warning("""
+            **Anthropic Rate Limits:**
+            - 30,000-40,000 input tokens per minute
+            - Reduce email batch size if you encounter rate limits
+            - Consider upgrading your Anthropic plan for higher limits
+            """)
+        
+    except ImportError:
+        st.error("Token tracking module not available. Creating simple usage display...")
+        # Fallback display
+        st.info("Token usage tracking will be available in the next update.")
+    except Exception as e:
+        st.error(f"Error loading token usage data: {e}")
+
+
+def show_processing_analytics(user_id: str):
+    """Show analytics and trends for email processing."""
+    st.markdown("### 📈 Processing Analytics")
+    
+    # Check if we have any output files
+    report_dir = get_report_dir(user_id)
+    if not os.path.exists(report_dir):
+        st.info("No analytics data available yet. Process some emails to see trends.")
+        return
+    
+    try:
+        from src.gmail_crew_ai.utils.report_repository import report_repository
+        
+        # Analyze categorization trends
+        cat_file = os.path.join(report_dir, "categorization_report.json")
+        if os.path.exists(cat_file):
+            cat_data = report_repository.load(cat_file)
+            
+            if cat_data and 'emails' in cat_data:
+                # Count categories
+                categories = {}
+                priorities = {}
+                
+                for email in cat_data['emails']:
+                    cat = email.get('category', 'Unknown')
+                    categories[cat] = categories.get(cat, 0) + 1
+                    
+                    pri = email.get('priority', 'Unknown')
+                    priorities[pri] = priorities.get(pri, 0) + 1
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("#### Email Categories")
+                    cat_df = pd.DataFrame([
+                        {"Category": k, "Count": v} 
+                        for k, v in categories.items()
+                    ])
+                    if not cat_df.empty:
+                        st.bar_chart(cat_df.set_index('Category'))
+                
+                with col2:
+                    st.markdown("#### Priority Distribution")
+                    pri_df = pd.DataFrame([
+                        {"Priority": k, "Count": v} 
+                        for k, v in priorities.items()
+                    ])
+                    if not pri_df.empty:
+                        st.bar_chart(pri_df.set_index('Priority'))
+        
+        # Show cleanup statistics
+        cleanup_file = os.path.join(report_dir, "cleanup_report.json")
+        if os.path.exists(cleanup_file):
+            cleanup_data = report_repository.load(cleanup_file)
+            
+            st.markdown("---")
+            st.markdown("#### Cleanup Statistics")
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                deleted = len(cleanup_data.get('deleted_emails', []))
+                st.metric("Emails Deleted", deleted)
+            
+            with col2:
+                archived = len(cleanup_data.get('archived_emails', []))
+                st.metric("Emails Archived", archived)
+            
+            with col3:
+                total_cleaned = deleted + archived
+                st.metric("Total Cleaned", total_cleaned)
+    
+    except Exception as e:
+        st.error(f"Error loading analytics: {e}")
+
+
+def show_processing_history_enhanced():
+    """Show enhanced processing history with file management."""
+    st.markdown("####  Processing History")
+    
+    from src.gmail_crew_ai.utils.report_repository import report_repository
+    
+    report_dir = get_report_dir()
+    if os.path.exists(report_dir):
+        # Indexed by mtime and size, newest first
+        history_files = []
+        for report in report_repository.list_reports(report_dir):
+            history_files.append({
+                " File": report.name,
+                " Modified": report.modified.strftime("%Y-%m-%d %H:%M:%S"),
+                " Size": f"{round(report.size / 1024, 2)} KB",
+                "file_path": report.path
+            })
+        
+        if history_files:
+            
+            for i, file_info in enumerate(history_files):
+                col1, col2, col3, col4, col5 = st.columns([3, 2, 1, 1, 1])
+                
+                with col1:
+                    st.markdown(f"**{file_info[' File']}**")
+                
+                with col2:
+                    st.markdown(file_info[" Modified"])
+                
+                with col3:
+                    st.markdown(file_info[" Size"])
+                
+                with col4:
+                    if st.button("", key=f"view_history_{i}"):
+                        show_formatted_report(file_info[' File'])
+                
+                with col5:
+                    # Download button (content is reused until the file changes)
+                    file_content = report_repository.read_text(file_info['file_path'])
+                    
+                    st.download_button(
+                        "",
+                        file_content,
+                        file_name=file_info[' File'],
+                        mime="application/json",
+                        key=f"download_history_{i}",
+                    )
+    else:
+        st.info(" No output directory found.")
+
+
+def show_interactive_report_viewer():
+    """Show interactive report viewer with search and filtering."""
+    st.markdown("####  Interactive Report Viewer")
+    
+    from src.gmail_crew_ai.utils.report_repository import report_repository
+    
+    # File selector
+    output_files = [report.name for report in report_repository.list_reports(get_report_dir())]
+    
+    if output_files:
+        selected_file = st.selectbox(
+            "Select a report to view:",
+            output_files,
+            key="report_viewer_selector"
+        )
+        
+        if selected_file:
+            col1, col2 = st.columns([1, 3])
+            
+            with col1:
+                view_mode = st.radio(
+                    "View Mode:",
+                    [" Formatted", " Raw JSON"],
+                    key="report_view_mode"
+                )
+            
+            with col2:
+                if st.button(" Refresh Report", use_container_width=True):
+                    st.rerun()
+            
+            # Display the selected report
+            if view_mode == " Formatted":
+                show_formatted_report(selected_file)
+            else:
+                show_raw_json_report(selected_file)
+    else:
+        st.info(" No report files available.")
+
+
+def show_formatted_report(filename: str):
+    """Display a report in a user-friendly formatted way."""
+    filepath = os.path.join(get_report_dir(), filename)
+    
+    if not os.path.exists(filepath):
+        st.error(f" File not found: {filename}")
+        return
+    
+    try:
+        from src.gmail_crew_ai.utils.report_repository import report_repository
+        data = report_repository.load(filepath)
+        
+        st.markdown(f"###  Report: {filename}")
+        
+        # Format based on report type
+        if "categorization" in filename:
+            show_categorization_report_formatted(data)
+        elif "organization" in filename:
+            show_organization_report_formatted(data)
+        elif "response" in filename:
+            show_response_report_formatted(data)
+        elif "notification" in filename:
+            show_notification_report_formatted(data)
+        elif "cleanup" in filename:
+            show_cleanup_report_formatted(data)
+        elif "fetched_emails" in filename:
+            show_fetched_emails_formatted(data)
+        else:
+            # Generic JSON display for unknown formats
+            st.json(data)
+    
+    except Exception as e:
+        st.error(f" Error reading report: {e}")
+
+
+def show_report_page(count: int, key: str) -> slice:
+    """Show a page selector for long report sections and return the slice of records to render."""
+    from src.gmail_crew_ai.utils.report_repository import DEFAULT_PAGE_SIZE, page_slice
+    
+    if count <= DEFAULT_PAGE_SIZE:
+        return slice(0, count)
+    _, page_count = page_slice(count)
+    page = st.number_input(f"Page (1-{page_count})", min_value=1, max_value=page_count, value=1, key=f"page_{key}")
+    records, _ = page_slice(count, page - 1)
+    st.caption(f"Showing {records.start + 1}-{records.stop} of {count}")
+    return records
+
+
+def show_categorization_report_formatted(data):
+    """Show categorization report in a formatted way."""
+    if isinstance(data, dict) and 'emails' in data:
+        emails = data['emails']
+        
+        # Summary metrics
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(" Total Emails", len(emails))
+        
+        priorities = {}
+        categories = {}
+        
+        for email in emails:
+            priority = email.get('priority', 'Unknown')
+            category = email.get('category', 'Unknown')
+            priorities[priority] = priorities.get(priority, 0) + 1
+            categories[category] = categories.get(category, 0) + 1
+        
+        with col2:
+            high_priority = priorities.get('HIGH', 0)
+            st.metric(" High Priority", high_priority)
+        
+        with col3:
+            medium_priority = priorities.get('MEDIUM', 0)
+            st.metric(" Medium Priority", medium_priority)
+        
+        with col4:
+            low_priority = priorities.get('LOW', 0)
+            st.metric(" Low Priority", low_priority)
+        
+        # Category breakdown
+        if categories:
+            st.markdown("####  Category Breakdown")
+            cat_df = pd.DataFrame(list(categories.items()), columns=['Category', 'Count'])
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.dataframe(cat_df, use_container_width=True)
+            with col2:
+                st.bar_chart(cat_df.set_index('Category'))
+        
+        # Email details
+        st.markdown("####  Email Details")
+        if emails:
+            df = pd.DataFrame(emails[show_report_page(len(emails), "categorization")])
+            st.dataframe(df[['subject', 'sender', 'category', 'priority']], use_container_width=True)
+    else:
+        st.json(data)
+
+
+def show_organization_report_formatted(data):
+    """Show organization report in a formatted way."""
+    st.markdown("####  Organization Actions Applied")
+    
+    if isinstance(data, dict):
+        # Show summary
+        if 'summary' in data:
+            st.success(f" {data['summary']}")
+        
+        # Show organized emails if available
+        if 'organized_emails' in data and data['organized_emails']:
+            organized = data['organized_emails']
+            df = pd.DataFrame(organized[show_report_page(len(organized), "organization")])
+            st.dataframe(df, use_container_width=True)
+        
+        # Show any other data
+        for key, value in data.items():
+            if key not in ['summary', 'organized_emails']:
+                st.markdown(f"**{key.title()}:** {value}")
+    else:
+        st.json(data)
+
+
+def show_response_report_formatted(data):
+    """Show response report in a formatted way."""
+    st.markdown("####  AI-Generated Responses")
+    
+    if isinstance(data, dict) and 'responses' in data:
+        responses = data['responses']
+        
+        st.metric(" Responses Generated", len(responses))
+        
+        page = show_report_page(len(responses), "responses")
+        for i, response in enumerate(responses[page], page.start):
+            with st.expander(f"Response {i+1}: {response.get('subject', 'No Subject')[:50]}..."):
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("**Original Email:**")
+                    st.markdown(f"From: {response.get('original_sender', 'Unknown')}")
+                    st.markdown(f"Subject: {response.get('subject', 'No Subject')}")
+                
+                with col2:
+                    st.markdown("**AI Response:**")
+                    response_text = response.get('response', 'No response generated')
+                    st.text_area("Response", value=response_text, height=100, disabled=True, key=f"response_{i}")
+    else:
+        st.json(data)
+
+
+def show_notification_report_formatted(data):
+    """Show notification report in a formatted way."""
+    st.markdown("####  Notifications Sent")
+    
+    if isinstance(data, dict):
+        # Show summary metrics
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric(" Emails Processed", data.get('total_processed', 0))
+        
+        with col2:
+            st.metric(" Notifications Sent", data.get('notifications_sent', 0))
+        
+        with col3:
+            notifications = data.get('notifications', [])
+            st.metric(" High Priority Found", len(notifications))
+        
+        # Show notifications details
+        if notifications:
+            st.markdown("####  High Priority Notifications")
+            for notification in notifications:
+                st.warning(f" {notification.get('subject', 'No Subject')} - {notification.get('sender', 'Unknown Sender')}")
+        else:
+            st.info(" No high priority emails found for notification.")
+        
+        # Show summary
+        if 'summary' in data:
+            st.markdown("####  Summary")
+            st.info(data['summary'])
+    else:
+        st.json(data)
+
+
+def show_cleanup_report_formatted(data):
+    """Show cleanup report in a formatted way."""
+    st.markdown("####  Cleanup Results")
+    
+    if isinstance(data, dict):
+        # Show summary metrics
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(" Total Processed", data.get('total_processed', 0))
+        
+        with col2:
+            st.metric(" Deleted", data.get('deleted_count', 0))
+        
+        with col3:
+            st.metric(" Preserved", data.get('preserved_count', 0))
+        
+        with col4:
+            st.metric(" Trash Emptied", data.get('trash_messages_removed', 0))
+        
+        # Show processed emails
+        if 'processed_emails' in data and data['processed_emails']:
+            st.markdown("####  Email Actions")
+            
+            emails = data['processed_emails']
+            
+            # Separate deleted and preserved
+            deleted_emails = [e for e in emails if e.get('deleted', False)]
+            preserved_emails = [e for e in emails if not e.get('deleted', False)]
+            
+            tab1, tab2 = st.tabs([f" Deleted ({len(deleted_emails)})", f" Preserved ({len(preserved_emails)})"])
+            
+            with tab1:
+                if deleted_emails:
+                    for email in deleted_emails[show_report_page(len(deleted_emails), "cleanup_deleted")]:
+                        st.markdown(f" **{email.get('subject', 'No Subject')}** - {email.get('sender', 'Unknown')}")
+                        st.markdown(f"   *Reason: {email.get('reason', 'No reason given')}*")
+                else:
+                    st.info("No emails were deleted.")
+            
+            with tab2:
+                if preserved_emails:
+                    for email in preserved_emails[show_report_page(len(preserved_emails), "cleanup_preserved")]:
+                        st.markdown(f" **{email.get('subject', 'No Subject')}** - {email.get('sender', 'Unknown')}")
+                        st.markdown(f"   *Reason: {email.get('reason', 'No reason given')}*")
+                else:
+                    st.info("No emails were preserved.")
+        
+        # Show summary
+        if 'summary' in data:
+            st.markdown("####  Summary")
+            st.success(data['summary'])
+    else:
+        st.json(data)
+
+
+def show_fetched_emails_formatted(data):
+    """Show fetched emails in a formatted way."""
+    st.markdown("####  Fetched Emails")
+    
+    if isinstance(data, list):
+        # Expand the compact agent format (short keys) for display
+        from src.gmail_crew_ai.utils.email_wire import decode_email
+        data = [decode_email(email) if isinstance(email, dict) else email for email in data]
+        st.metric(" Total Fetched", len(data))
+        
+        if data:
+            # Convert to DataFrame for better display
+            df = pd.DataFrame(data)
+            
+            # Show summary by sender
+            if 'sender' in df.columns:
+                sender_counts = df['sender'].value_counts().head(10)
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("####  Top Senders")
+                    st.dataframe(sender_counts.to_frame('Count'), use_container_width=True)
+                
+                with col2:
+                    st.markdown("####  Sender Distribution")
+                    st.bar_chart(sender_counts)
+            
+            # Show email list with search
+            st.markdown("####  Email List")
+            
+            search_term = st.text_input(" Search emails:", placeholder="Enter subject, sender, or keywords...")
+            
+            if search_term:
+                mask = (
+                    df['subject'].str.contains(search_term, case=False, na=False) |
+                    df['sender'].str.contains(search_term, case=False, na=False)
+                )
+                filtered_df = df[mask]
+                st.markdown(f"Found {len(filtered_df)} emails matching '{search_term}'")
+            else:
+                filtered_df = df
+            
+            # Display emails
+            columns_to_show = ['subject', 'sender', 'date']
+            if 'age_days' in filtered_df.columns:
+                columns_to_show.append('age_days')
+            
+            page = show_report_page(len(filtered_df), "fetched_emails")
+            st.dataframe(
+                filtered_df[columns_to_show].iloc[page],
+                use_container_width=True
+            )
+    else:
+        st.json(data)
+
+
+def show_raw_json_report(filename: str):
+    """Show raw JSON report."""
+    filepath = os.path.join(get_report_dir(), filename)
+    
+    try:
+        from src.gmail_crew_ai.utils.report_repository import report_repository
+        data = report_repository.load(filepath)
+        
+        st.markdown(f"###  Raw JSON: {filename}")
+        st.json(data)
+        
+        # Add download option
+        st.download_button(
+            " Download JSON",
+            report_repository.read_text(filepath),
+            file_name=filename,
+            mime="application/json"
+        )
+        
+    except Exception as e:
+        st.error(f" Error reading file: {e}")
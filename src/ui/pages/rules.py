@@ -0,0 +1,195 @@
+"""Processing rules page."""
+
+import uuid
+from datetime import datetime
+
+import streamlit as st
+
+from src.gmail_crew_ai.auth import OAuth2Manager
+from src.ui.common import GmailSearchParser
+
+
+def show_rules_tab(user_id: str, oauth_manager: OAuth2Manager):
+    """Show email rules management interface."""
+    st.markdown("##  Email Rules")
+    
+    st.markdown("Create rules to automatically process emails that match specific criteria.")
+    
+    # Add new rule section
+    with st.expander(" Create New Rule", expanded=True):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            rule_name = st.text_input("Rule Name", placeholder="e.g., Newsletter Auto-Archive")
+            rule_description = st.text_area("Description", placeholder="What does this rule do?")
+            
+            # Gmail search condition
+            st.markdown("**Gmail Search Condition:**")
+            st.markdown("Use Gmail search syntax to define when this rule applies.")
+            
+            gmail_condition = st.text_input(
+                "Search Query",
+                placeholder="e.g., from:newsletter@company.com OR subject:unsubscribe",
+            )
+            
+            # Quick condition builders
+            st.markdown("**Quick Builders:**")
+            quick_row1_col1, quick_row1_col2 = st.columns(2)
+            quick_row2_col1, quick_row2_col2 = st.columns(2)
+            
+            # Row 1: From and To fields
+            with quick_row1_col1:
+                st.markdown("**📧 From Sender**")
+                sender_input = st.text_input("Sender email:", placeholder="sender@example.com", key="quick_sender")
+                if st.button("➕ Add From Filter", key="add_from", use_container_width=True):
+                    if sender_input:
+                        current = gmail_condition or ""
+                        new_condition = f"from:{sender_input}"
+                        gmail_condition = f"{current} {new_condition}".strip()
+                        st.success(f"Added: {new_condition}")
+            
+            with quick_row1_col2:
+                st.markdown("**📨 To Recipient**")
+                recipient_input = st.text_input("Recipient email:", placeholder="recipient@example.com", key="quick_recipient")
+                if st.button("➕ Add To Filter", key="add_to", use_container_width=True):
+                    if recipient_input:
+                        current = gmail_condition or ""
+                        new_condition = f"to:{recipient_input}"
+                        gmail_condition = f"{current} {new_condition}".strip()
+                        st.success(f"Added: {new_condition}")
+            
+            # Row 2: Subject and Label fields
+            with quick_row2_col1:
+                st.markdown("**📋 Subject**")
+                subject_input = st.text_input("Subject contains:", placeholder="keyword", key="quick_subject")
+                if st.button("➕ Add Subject Filter", key="add_subject", use_container_width=True):
+                    if subject_input:
+                        current = gmail_condition or ""
+                        new_condition = f"subject:{subject_input}"
+                        gmail_condition = f"{current} {new_condition}".strip()
+                        st.success(f"Added: {new_condition}")
+            
+            with quick_row2_col2:
+                st.markdown("**🏷️ Label**")
+                label_input = st.text_input("Label name:", placeholder="important", key="quick_label")
+                if st.button("➕ Add Label Filter", key="add_label", use_container_width=True):
+                    if label_input:
+                        current = gmail_condition or ""
+                        new_condition = f"label:{label_input}"
+                        gmail_condition = f"{current} {new_condition}".strip()
+                        st.success(f"Added: {new_condition}")
+        
+        with col2:
+            # Rule actions
+            st.markdown("**Actions:**")
+            action_type = st.selectbox("Action", [
+                "Archive",
+                "Delete", 
+                "Star",
+                "Apply Label",
+                "Mark as Read",
+                "Reply with Template",
+                "Forward to",
+                "Move to Trash",
+                "Mark as Important",
+                "Remove from Inbox"
+            ])
+            
+            action_value = ""
+            if action_type in ["Apply Label", "Reply with Template", "Forward to"]:
+                action_value = st.text_input("Action Value", placeholder="Enter label, template, or email")
+            
+            # Priority and AI instructions
+            rule_priority = st.selectbox("Priority", ["Low", "Medium", "High"])
+            ai_instructions = st.text_area(
+                "Additional AI Instructions",
+                placeholder="Special instructions for the AI when processing emails matching this rule...",
+            )
+            
+            # Test the Gmail search
+            if gmail_condition:
+                st.markdown("**Search Preview:**")
+                parser = GmailSearchParser()
+                parsed_filters = parser.parse_search(gmail_condition)
+                
+                if parsed_filters['from_sender']:
+                    st.write(f" From: {parsed_filters['from_sender']}")
+                if parsed_filters['to_recipient']:
+                    st.write(f" To: {parsed_filters['to_recipient']}")
+                if parsed_filters['subject_filter']:
+                    st.write(f" Subject: {parsed_filters['subject_filter']}")
+                if parsed_filters['unread_only']:
+                    st.write(" Unread emails only")
+                if parsed_filters['starred_only']:
+                    st.write(" Starred emails only")
+                if parsed_filters['has_attachment']:
+                    st.write(" Has attachments")
+        
+        if st.button(" Add Rule", type="primary"):
+            if rule_name and gmail_condition:
+                new_rule = {
+                    "id": str(uuid.uuid4()),
+                    "name": rule_name,
+                    "description": rule_description,
+                    "gmail_search": gmail_condition,
+                    "action_type": action_type,
+                    "action_value": action_value,
+                    "priority": rule_priority,
+                    "ai_instructions": ai_instructions,
+                    "enabled": True,
+                    "created": datetime.now().isoformat()
+                }
+                
+                st.session_state.email_rules.append(new_rule)
+                st.success(f" Rule '{rule_name}' created successfully!")
+                st.rerun()
+            else:
+                st.error(" Please fill in rule name and Gmail search condition")
+    
+    # Display existing rules
+    if st.session_state.email_rules:
+        st.markdown("---")
+        st.markdown("###  Existing Rules")
+        
+        for rule in st.session_state.email_rules:
+            with st.container():
+                col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+                
+                with col1:
+                    # Priority indicator
+                    priority_color = {"High": "", "Medium": "", "Low": ""}.get(rule.get('priority', 'Medium'), "")
+                    st.markdown(f"**{priority_color} {rule['name']}**")
+                    st.markdown(f"*{rule['description']}*")
+                    
+                    # Show Gmail search or old format for backward compatibility
+                    if 'gmail_search' in rule:
+                        st.markdown(f"**Search:** `{rule['gmail_search']}`")
+                    else:
+                        st.markdown(f"**Condition:** {rule.get('condition_field', 'email')} {rule.get('condition_operator', 'contains')} '{rule.get('condition_value', '')}'")
+                    
+                    st.markdown(f"**Action:** {rule['action_type']} {rule.get('action_value', '')}")
+                    
+                    if rule.get('ai_instructions'):
+                        st.markdown(f"**AI Instructions:** {rule['ai_instructions'][:100]}{'...' if len(rule['ai_instructions']) > 100 else ''}")
+                
+                with col2:
+                    enabled = st.checkbox(
+                        "Enabled",
+                        value=rule['enabled'],
+                        key=f"rule_enabled_{rule['id']}"
+                    )
+                    if enabled != rule['enabled']:
+                        rule['enabled'] = enabled
+                
+                with col3:
+                    if st.button(" Edit", key=f"edit_rule_{rule['id']}"):
+                        st.session_state[f"editing_rule_{rule['id']}"] = True
+                
+                with col4:
+                    if st.button(" Delete", key=f"delete_rule_{rule['id']}"):
+                        st.session_state.email_rules = [r for r in st.session_state.email_rules if r['id'] != rule['id']]
+                        st.rerun()
+                
+                st.divider()
+    else:
+        st.info(" No rules created yet. Create your first rule above!")
@@ -0,0 +1,483 @@
+"""Settings and help pages."""
+
+import os
+
+import streamlit as st
+
+from src.common.logger import get_logger
+from src.gmail_crew_ai.auth import OAuth2Manager
+from src.ui.session import session_manager
+
+log = get_logger(__name__)
+
+
+def show_settings_tab(user_id: str, oauth_manager: OAuth2Manager):
+    """Show settings interface."""
+    st.markdown("## ⚙️ Settings")
+    
+    # User info - get OAuth user ID from session state
+    oauth_user_id = st.session_state.get('current_user')
+    if oauth_user_id:
+        user_email = oauth_manager.get_user_email(oauth_user_id)
+    else:
+        user_email = "Unknown"
+    
+    # Compact user info display
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.markdown(f"**User:** {user_email} (`{user_id}`)")
+    
+    st.markdown("---")
+    
+    # Simple Model Selection
+    st.markdown("### 🤖 Model Selection")
+    
+    # Simple model options
+    models = [
+        "openai/gpt-4.1",
+        "anthropic/claude-opus-4-20250514",
+        "anthropic/claude-sonnet-4-20250514",
+        "anthropic/claude-3-7-sonnet-latest",
+        "anthropic/claude-3-5-sonnet-latest",
+        "anthropic/claude-3-5-haiku-latest",
+        "anthropic/claude-3-5-sonnet-20241022",
+        "openai/o4-mini",
+        "openai/o3-pro",
+        "openai/o3",
+        "openai/o3-mini",
+        "openai/gpt-4o",
+        "openai/gpt-4o-audio",
+        "openai/chatgpt-4o",
+        "openai/gpt-4o-mini"
+    ]
+    
+    # Initialize session state for model selection
+    if 'selected_model' not in st.session_state:
+        st.session_state.selected_model = os.getenv('MODEL', 'openai/gpt-4.1')
+    
+    # Simple model selection dropdown
+    current_index = 0
+    if st.session_state.selected_model in models:
+        current_index = models.index(st.session_state.selected_model)
+    
+    selected_model = st.selectbox(
+        "Select AI Model",
+        options=models,
+        index=current_index
+    )
+    
+    # Update model if changed
+    if selected_model != st.session_state.selected_model:
+        st.session_state.selected_model = selected_model
+        os.environ['MODEL'] = selected_model
+        st.rerun()
+    
+    # Set current model in environment if not already set
+    if not os.getenv('MODEL') or os.getenv('MODEL') != st.session_state.selected_model:
+        os.environ['MODEL'] = st.session_state.selected_model
+        log.debug(f"Environment MODEL updated to: {st.session_state.selected_model}")
+    
+    # Simplified API Key Configuration
+    user_manager = st.session_state.user_manager
+    current_user_id = st.session_state.authenticated_user_id
+    
+    # Create columns for API key inputs
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        # Get current Anthropic key status
+        user_anthropic_key = user_manager.get_user_api_key(current_user_id, 'anthropic')
+        env_anthropic_key = os.getenv('ANTHROPIC_API_KEY', '')
+        
+        if user_anthropic_key:
+            status = "🔑 Your key"
+        elif env_anthropic_key:
+            status = "🌐 Default key"
+        else:
+            status = "❌ Not configured"
+            
+        st.markdown(f"**Anthropic API Key** {status}")
+        
+        # Show current key if exists
+        current_key_display = ""
+        if user_anthropic_key:
+            if user_manager.api_key_manager:
+                current_key_display = user_manager.api_key_manager.mask_api_key(user_anthropic_key)
+            else:
+                current_key_display = user_anthropic_key[:8] + '...' + user_anthropic_key[-4:]
+        
+        # Use form for Enter key submission
+        with st.form(key="anthropic_form", clear_on_submit=True):
+            anthropic_key = st.text_input(
+                "API Key",
+                value=current_key_display,
+                type="password",
+                placeholder="sk-ant-api03-... (press Enter to save)",
+                label_visibility="collapsed"
+            )
+            # Hidden submit button (form still submits on Enter) 
+            submitted = st.form_submit_button("Save", disabled=False, use_container_width=False, type="primary")
+            # Hide the button with CSS
+            st.markdown("""
+            <style>
+            div[data-testid="stFormSubmitButton"] {
+                display: none;
+            }
+            </style>
+            """, unsafe_allow_html=True)
+            
+            if submitted and anthropic_key and anthropic_key != current_key_display:
+                if user_manager.set_user_api_key(current_user_id, 'anthropic', anthropic_key):
+                    st.success("✅ Anthropic API key saved!")
+                    st.rerun()
+                else:
+                    st.error("❌ Invalid API key format")
+    
+    with col2:
+        # Get current OpenAI key status
+        user_openai_key = user_manager.get_user_api_key(current_user_id, 'openai')
+        env_openai_key = os.getenv('OPENAI_API_KEY', '')
+        
+        if user_openai_key:
+            status = "🔑 Your key"
+        elif env_openai_key:
+            status = "🌐 Default key"
+        else:
+            status = "❌ Not configured"
+            
+        st.markdown(f"**OpenAI API Key** {status}")
+        
+        # Show current key if exists
+        current_key_display = ""
+        if user_openai_key:
+            if user_manager.api_key_manager:
+                current_key_display = user_manager.api_key_manager.mask_api_key(user_openai_key)
+            else:
+                current_key_display = user_openai_key[:8] + '...' + user_openai_key[-4:]
+        
+        # Use form for Enter key submission
+        with st.form(key="openai_form", clear_on_submit=True):
+            openai_key = st.text_input(
+                "API Key",
+                value=current_key_display,
+                type="password",
+                placeholder="sk-proj-... (press Enter to save)",
+                label_visibility="collapsed"
+            )
+            # Hidden submit button (form still submits on Enter) 
+            submitted = st.form_submit_button("Save", disabled=False, use_container_width=False, type="primary")
+            # Hide the button with CSS
+            st.markdown("""
+            <style>
+            div[data-testid="stFormSubmitButton"] {
+                display: none;
+            }
+            </style>
+            """, unsafe_allow_html=True)
+            
+            if submitted and openai_key and openai_key != current_key_display:
+                if user_manager.set_user_api_key(current_user_id, 'openai', openai_key):
+                    st.success("✅ OpenAI API key saved!")
+                    st.rerun()
+                else:
+                    st.error("❌ Invalid API key format")
+    
+    with col3:
+        # Get current DO AI key status
+        user_do_ai_key = user_manager.get_user_api_key(current_user_id, 'do_ai')
+        env_do_ai_key = os.getenv('DO_AI_API_KEY', '')
+        
+        if user_do_ai_key:
+            status = "🔑 Your key"
+        elif env_do_ai_key:
+            status = "🌐 Default key"
+        else:
+            status = "❌ Not configured"
+            
+        st.markdown(f"**Digital Ocean AI Key** {status}")
+        
+        # Show current key if exists
+        current_key_display = ""
+        if user_do_ai_key:
+            if user_manager.api_key_manager:
+                current_key_display = user_manager.api_key_manager.mask_api_key(user_do_ai_key)
+            else:
+                current_key_display = user_do_ai_key[:8] + '...' + user_do_ai_key[-4:]
+        
+        # Use form for Enter key submission
+        with st.form(key="do_ai_form", clear_on_submit=True):
+            do_ai_key = st.text_input(
+                "API Key",
+                value=current_key_display,
+                type="password",
+                placeholder="Lw_7A8P-... (press Enter to save)",
+                label_visibility="collapsed"
+            )
+            # Hidden submit button (form still submits on Enter) 
+            submitted = st.form_submit_button("Save", disabled=False, use_container_width=False, type="primary")
+            # Hide the button with CSS
+            st.markdown("""
+            <style>
+            div[data-testid="stFormSubmitButton"] {
+                display: none;
+            }
+            </style>
+            """, unsafe_allow_html=True)
+            
+            if submitted and do_ai_key and do_ai_key != current_key_display:
+                if user_manager.set_user_api_key(current_user_id, 'do_ai', do_ai_key):
+                    st.success("✅ DO AI API key saved!")
+                    st.rerun()
+                else:
+                    st.error("❌ Invalid API key format")
+    
+    st.markdown("---")
+    
+    # OAuth2 settings
+    st.markdown("### 🔐 Authentication Settings")
+    
+    if st.button(" Refresh Authentication"):
+        try:
+            # Get the actual OAuth user ID that matches this internal user ID
+            user_manager = st.session_state.user_manager
+            user_data = user_manager.get_user_by_id(st.session_state.authenticated_user_id)
+            user_email = user_data.get('email', '')
+            
+            # Find the OAuth user ID by matching email
+            authenticated_users = oauth_manager.list_authenticated_users()
+            oauth_user_id = None
+            for oid, email in authenticated_users.items():
+                if email == user_email:
+                    oauth_user_id = oid
+                    break
+            
+            if oauth_user_id:
+                # This will automatically refresh if needed
+                oauth_manager.get_gmail_service(oauth_user_id)
+                st.success(" Authentication refreshed successfully!")
+            else:
+                st.error(f" No OAuth credentials found for {user_email}. Please re-authenticate.")
+                
+        except Exception as e:
+            st.error(f"Error refreshing authentication: {e}")
+    
+    if st.button(" Clean Up OAuth Tokens"):
+        try:
+            removed_count = oauth_manager.cleanup_corrupted_tokens()
+            if removed_count > 0:
+                st.info(f"🧹 Cleaned up {removed_count} corrupted OAuth token(s)")
+            else:
+                st.info("✅ No corrupted tokens found")
+        except Exception as e:
+            st.error(f"Error cleaning up tokens: {e}")
+    
+    if st.button(" Remove This Account", type="secondary"):
+        confirm_remove = st.checkbox("I confirm I want to remove this account")
+        if confirm_remove and st.button("Confirm Removal", type="secondary"):
+            if oauth_manager.revoke_credentials(user_id):
+                st.success(" Account access removed successfully!")
+                
+                # Clear persistent session
+                browser_token = session_manager.get_browser_session()
+                if browser_token:
+                    session_manager.invalidate_session(browser_token)
+                session_manager.clear_browser_session()
+                
+                st.session_state.current_user = None
+                st.session_state.authentication_step = 'select_user'
+                st.rerun()
+    
+    st.markdown("---")
+    
+    # User Persona Management
+    st.markdown("###  User Persona Management")
+    
+    # Show current user facts status
+    from src.gmail_crew_ai.utils.knowledge_store import KnowledgeStore
+    knowledge_store = KnowledgeStore(user_id)
+    if knowledge_store.has_facts():
+        st.success(" User persona file exists and has content")
+        
+        # Show creation date
+        try:
+            content = knowledge_store.read_facts()
+            if "Last Updated:" in content:
+                last_updated = content.split("Last Updated:")[-1].split("\n")[0].strip()
+                st.info(f" Last updated: {last_updated}")
+        except Exception:
+            pass
+            
+        if st.button(" View Current User Persona"):
+            try:
+                facts_content = knowledge_store.read_facts()
+                st.text_area("Current User Persona:", facts_content, height=200, key="user_facts_display")
+            except Exception as e:
+                st.error(f"Error reading user facts: {e}")
+    else:
+        st.warning(" User persona file is empty or missing")
+        st.info(" User persona will be automatically created when you first process emails")
+    
+    # Persona management buttons
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button(" Rebuild User Persona"):
+            try:
+                from src.gmail_crew_ai.tools.gmail_oauth_tools import OAuth2GetSentEmailsTool, OAuth2UserPersonaAnalyzerTool
+                
+                with st.spinner(" Fetching sent emails for complete analysis..."):
+                    # Fetch sent emails
+                    sent_email_tool = OAuth2GetSentEmailsTool(user_id=user_id, oauth_manager=oauth_manager)
+                    sent_emails = sent_email_tool._run(max_emails=100)
+                    
+                    if sent_emails:
+                        st.info(f" Analyzing {len(sent_emails)} sent emails...")
+                        
+                        # Analyze emails and create persona
+                        analyzer_tool = OAuth2UserPersonaAnalyzerTool(user_id=user_id, oauth_manager=oauth_manager)
+                        result = analyzer_tool._run(sent_emails=sent_emails)
+                        
+                        st.success(" User persona rebuilt successfully!")
+                        st.info(result)
+                        
+                        # Show the new persona
+                        try:
+                            new_facts = knowledge_store.read_facts()
+                            st.text_area("Updated User Persona:", new_facts, height=200, key="updated_user_facts")
+                        except Exception as e:
+                            st.error(f"Error displaying updated persona: {e}")
+                    else:
+                        st.warning(" No sent emails found to analyze")
+                        
+            except Exception as e:
+                st.error(f"Error rebuilding user persona: {e}")
+    
+    with col2:
+        if st.button(" Update User Persona"):
+            try:
+                from src.gmail_crew_ai.tools.gmail_oauth_tools import OAuth2UserPersonaUpdaterTool
+                
+                with st.spinner(" Analyzing recent emails for persona updates..."):
+                    # Use the new updater tool
+                    updater_tool = OAuth2UserPersonaUpdaterTool(user_id=user_id, oauth_manager=oauth_manager)
+                    result = updater_tool._run(days_back=30)
+                    
+                    st.success(" User persona updated successfully!")
+                    st.info(result)
+                    
+                    # Show the updated persona
+                    try:
+                        updated_facts = knowledge_store.read_facts()
+                        st.text_area("Updated User Persona:", updated_facts, height=200, key="incremental_updated_user_facts")
+                    except Exception as e:
+                        st.error(f"Error displaying updated persona: {e}")
+                        
+            except Exception as e:
+                st.error(f"Error updating user persona: {e}")
+    
+    # Additional options for update period
+    st.markdown("---")
+    st.markdown("####  Custom Update Period")
+    
+    st.caption("Updates analyze sent mail since the last analysis; the period below applies when no previous analysis is recorded.")
+    days_back = st.slider(
+        "Days back to analyze for updates:",
+        min_value=7,
+        max_value=90,
+        value=30,
+        step=7,
+    )
+    
+    if st.button(" Custom Update"):
+        try:
+            from src.gmail_crew_ai.tools.gmail_oauth_tools import OAuth2UserPersonaUpdaterTool
+            
+            with st.spinner(f" Analyzing emails from last {days_back} days..."):
+                updater_tool = OAuth2UserPersonaUpdaterTool(user_id=user_id, oauth_manager=oauth_manager)
+                result = updater_tool._run(days_back=days_back)
+                
+                st.success(" User persona updated successfully!")
+                st.info(result)
+                
+                # Show the updated persona
+                try:
+                    updated_facts = knowledge_store.read_facts()
+                    st.text_area("Updated User Persona:", updated_facts, height=200, key=f"custom_updated_user_facts_{days_back}")
+                except Exception as e:
+                    st.error(f"Error displaying updated persona: {e}")
+                    
+        except Exception as e:
+            st.error(f"Error updating user persona: {e}")
+    
+    st.markdown("---")
+    
+    if st.button(" Clear User Persona", type="secondary"):
+        confirm_clear = st.checkbox("I confirm I want to clear the user persona")
+        if confirm_clear and st.button("Confirm Clear", type="secondary"):
+            try:
+                knowledge_store.clear_facts()
+                from src.gmail_crew_ai.utils.persona_state import PersonaState
+                PersonaState(user_id).clear()
+                st.success(" User persona cleared successfully!")
+                st.info(" A new persona will be automatically created next time you process emails")
+            except Exception as e:
+                st.error(f"Error clearing user persona: {e}")
+    
+    st.markdown("---")
+    
+    # File management
+    st.markdown("###  File Management")
+    
+    if st.button(" Clear Processing Cache"):
+        try:
+            from src.gmail_crew_ai.jobs import get_job_manager
+            from src.gmail_crew_ai.utils.run_workspace import remove_user_runs
+            job_manager = get_job_manager()
+            if job_manager.active_job(user_id):
+                st.warning(" Email processing is still running. Clear the cache after it finishes.")
+            else:
+                removed = remove_user_runs(user_id, protect=job_manager.active_output_dirs(user_id))
+                st.success(f" Processing cache cleared! Removed {removed} run workspace(s).")
+        except Exception as e:
+            st.error(f"Error clearing cache: {e}")
+
+
+def show_help_tab():
+    """Show help and documentation."""
+    st.markdown("##  Help & Documentation")
+    
+    st.markdown("""
+    ###  How Gmail CrewAI Works
+    
+    Gmail CrewAI uses AI agents to automatically process your emails:
+    
+    1. ** Fetcher Agent**: Retrieves unread emails from your Gmail
+    2. ** Categorizer Agent**: Categorizes emails by type and priority
+    3. ** Organizer Agent**: Applies Gmail labels and stars important emails
+    4. ** Response Agent**: Generates draft responses for important emails
+    5. ** Notification Agent**: Sends Slack notifications for high-priority emails
+    6. ** Cleanup Agent**: Archives or deletes low-priority emails
+    
+    ###  Security & Privacy
+    
+    - Your OAuth2 tokens are stored locally and encrypted
+    - No email content is stored permanently
+    - AI processing happens locally with your OpenAI API key
+    - You can revoke access at any time
+    
+    ###  Setup Requirements
+    
+    1. **Google OAuth2 Credentials**: Required for Gmail access
+    2. **OpenAI API Key**: Required for AI processing
+    3. **Slack Webhook** (Optional): For notifications
+    
+    ###  Troubleshooting
+    
+    - **Authentication Issues**: Try refreshing authentication in Settings
+    - **Processing Errors**: Check that all environment variables are set
+    - **Performance**: Processing time depends on number of emails
+    """)
+    
+    st.markdown("---")
+    st.markdown("###  Support")
+    st.markdown("For issues or questions, please check the project documentation or create an issue on GitHub.")
@@ -0,0 +1,391 @@
+"""Persistent browser sessions."""
+
+import json
+import os
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from src.common.logger import get_logger, exception_info
+
+log = get_logger(__name__)
+
+
+class SessionManager:
+    """Manages persistent user sessions with improved reliability."""
+    
+    def __init__(self):
+        self.sessions_file = "user_sessions.json"
+        self.session_duration = timedelta(days=7)
+        self.ensure_sessions_file()
+    
+    def ensure_sessions_file(self):
+        """Ensure sessions file exists."""
+        if not os.path.exists(self.sessions_file):
+            self.save_sessions({})
+    
+    def load_sessions(self) -> Dict:
+        """Load sessions from file."""
+        try:
+            with open(self.sessions_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    
+    def save_sessions(self, sessions: Dict):
+        """Save sessions to file."""
+        try:
+            with open(self.sessions_file, 'w', encoding='utf-8') as f:
+                json.dump(sessions, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            if 'exception_info' in globals():
+                exception_info(log, "Failed to save sessions")
+            else:
+                log.error("Failed to save sessions", exc_info=True)
+    
+    def create_session(self, user_id: str) -> str:
+        """Create a new session token for a user."""
+        session_token = secrets.token_urlsafe(32)
+        expiry_time = datetime.now() + self.session_duration
+        
+        sessions = self.load_sessions()
+        sessions[session_token] = {
+            'user_id': user_id,
+            'created_at': datetime.now().isoformat(),
+            'expires_at': expiry_time.isoformat(),
+            'last_accessed': datetime.now().isoformat()
+        }
+        
+        self.save_sessions(sessions)
+        return session_token
+    
+    def validate_session(self, session_token: str) -> Optional[str]:
+        """Validate a session token and return user_id if valid, None if invalid."""
+        if not session_token:
+            return None
+            
+        sessions = self.load_sessions()
+        
+        if session_token not in sessions:
+            return None
+        
+        session = sessions[session_token]
+        
+        # Check if session has expired
+        try:
+            expires_at = datetime.fromisoformat(session['expires_at'])
+            if datetime.now() > expires_at:
+                # Session expired, remove it
+                del sessions[session_token]
+                self.save_sessions(sessions)
+                return None
+        except Exception:
+            # Invalid date format, remove session
+            del sessions[session_token]
+            self.save_sessions(sessions)
+            return None
+        
+        # Update last accessed time
+        session['last_accessed'] = datetime.now().isoformat()
+        sessions[session_token] = session
+        self.save_sessions(sessions)
+        
+        return session['user_id']
+    
+    def invalidate_session(self, session_token: str):
+        """Invalidate a specific session token."""
+        sessions = self.load_sessions()
+        if session_token in sessions:
+            del sessions[session_token]
+            self.save_sessions(sessions)
+    
+    def cleanup_expired_sessions(self):
+        """Remove expired sessions from storage."""
+        sessions = self.load_sessions()
+        current_time = datetime.now()
+        expired_tokens = []
+        
+        for token, session in sessions.items():
+            try:
+                expires_at = datetime.fromisoformat(session['expires_at'])
+                if current_time > expires_at:
+                    expired_tokens.append(token)
+            except Exception:
+                expired_tokens.append(token)
+        
+        for token in expired_tokens:
+            del sessions[token]
+        
+        if expired_tokens:
+            self.save_sessions(sessions)
+    
+    def set_browser_session(self, session_token: str):
+        """Set session token for persistence across page refreshes using cookies."""
+        # Store in Streamlit's session state for immediate use
+        st.session_state.persistent_session_token = session_token
+        
+        # Set browser cookie with proper expiry
+        expiry_date = (datetime.now() + self.session_duration).strftime("%a, %d %b %Y %H:%M:%S GMT")
+        
+        # Use more reliable cookie setting approach
+        js_code = f"""
+        <script>
+        // Set browser cookie for persistent session
+        document.cookie = "gmail_crew_session={session_token}; expires={expiry_date}; path=/; SameSite=Lax";
+        console.log("Session cookie set: gmail_crew_session");
+        </script>
+        """
+        components.html(js_code, height=0)
+    
+    def get_browser_session(self) -> Optional[str]:
+        """Get session token using a more reliable approach."""
+        # Strategy 1: Check Streamlit session state first
+        if 'persistent_session_token' in st.session_state:
+            log.debug("Found session token in Streamlit session state")
+            return st.session_state.persistent_session_token
+        
+        # Strategy 2: Check URL parameters (from redirects)
+        query_params = st.query_params
+        if 'session_token' in query_params:
+            session_token = query_params['session_token']
+            log.debug("Found session token in URL parameters")
+            # Store it in session state for this session
+            st.session_state.persistent_session_token = session_token
+            # Clear the URL parameter to clean up the URL
+            try:
+                del st.query_params['session_token']
+            except:
+                pass
+            return session_token
+        
+        # Strategy 3: Try to find active session by checking all sessions for this user
+        # This is a fallback that works without cookies
+        try:
+            sessions = self.load_sessions()
+            current_time = datetime.now()
+            
+            # Look for any non-expired session for the primary user
+            for session_token, session_data in sessions.items():
+                try:
+                    expires_at = datetime.fromisoformat(session_data['expires_at'])
+                    user_id = session_data.get('user_id')
+                    
+                    if current_time < expires_at and user_id:
+                        # Check if this user is approved and primary
+                        user_manager = st.session_state.get('user_manager')
+                        if user_manager:
+                            users = user_manager.load_users()
+                            user_data = users.get(user_id, {})
+                            
+                            if (user_data.get('status') == 'approved' and 
+                                user_data.get('is_primary', False)):
+                                log.debug(f"Found active session for primary user {user_id}")
+                                # Store in session state for immediate use
+                                st.session_state.persistent_session_token = session_token
+                                return session_token
+                except Exception:
+                    continue
+        except Exception as e:
+            log.debug(f"Error in fallback session discovery: {e}")
+        
+        # Strategy 4: Use browser cookies only as final fallback
+        if not st.session_state.get('cookie_check_attempted', False):
+            st.session_state.cookie_check_attempted = True
+            
+            js_code = """
+            <script>
+            const cookies = document.cookie.split(';');
+            let sessionToken = null;
+            
+            for (let cookie of cookies) {
+                const [name, value] = cookie.trim().split('=');
+                if (name === 'gmail_crew_session') {
+                    sessionToken = value;
+                    break;
+                }
+            }
+            
+            if (sessionToken) {
+                console.log("Found session cookie, redirecting");
+                const currentUrl = new URL(window.location.href);
+                currentUrl.searchParams.set('session_token', sessionToken);
+                window.location.href = currentUrl.href;
+            }
+            </script>
+            """
+            components.html(js_code, height=0)
+            log.debug("Attempting cookie-based session recovery")
+        
+        return None
+    
+    def clear_browser_session(self):
+        """Clear session token from browser and session state."""
+        # Clear from Streamlit session state
+        for key in ['persistent_session_token', 'cookie_check_attempted']:
+            if key in st.session_state:
+                del st.session_state[key]
+        
+        # Clear browser cookie
+        js_code = """
+        <script>
+        // Clear the session cookie
+        document.cookie = "gmail_crew_session=; expires=Thu, 01 Jan 1970 00:00:00 GMT; path=/; SameSite=Lax";
+        console.log("Session cookie cleared");
+        </script>
+        """
+        components.html(js_code, height=0)
+
+
+# Global session manager instance
+session_manager = SessionManager()
+
+
+def check_persistent_session():
+    """Check for and validate persistent session from browser storage."""
+    try:
+        # Clean up expired sessions first
+        session_manager.cleanup_expired_sessions()
+        
+        # Strategy 1: Check if we have persistent user ID directly in session state
+        if st.session_state.get('persistent_user_id'):
+            user_id = st.session_state.persistent_user_id
+            log.debug(f"Found persistent user ID in session state: {user_id}")
+            
+            # Validate this user still exists and is approved
+            user_manager = st.session_state.user_manager
+            users = user_manager.load_users()
+            
+            if user_id in users and users[user_id].get('status') == 'approved':
+                log.info(f"Direct session state restoration for user {user_id}")
+                
+                # Restore full session
+                st.session_state.authenticated_user_id = user_id
+                oauth_manager = st.session_state.oauth_manager
+                user_email = users[user_id].get('email', '')
+                
+                # Find OAuth token for this user
+                try:
+                    authenticated_users = oauth_manager.list_authenticated_users()
+                    oauth_user_id = None
+                    
+                    for oid, email in authenticated_users.items():
+                        if email.lower() == user_email.lower():
+                            oauth_user_id = oid
+                            break
+                    
+                    if not oauth_user_id and len(authenticated_users) == 1:
+                        oauth_user_id = list(authenticated_users.keys())[0]
+                        
+                except Exception:
+                    oauth_user_id = None
+                
+                st.session_state.current_user = oauth_user_id
+                st.session_state.authentication_step = 'dashboard'
+                user_manager.update_last_login(user_id)
+                
+                log.info(f"Session restored from session state for user: {user_id}")
+                return True
+        
+        # Strategy 2: Try to get session token from various sources
+        browser_session_token = session_manager.get_browser_session()
+        
+        # Enhanced debug output
+        if browser_session_token:
+            log.debug(f"Persistent session token found (length: {len(browser_session_token)})")
+            
+            # Validate the session
+            user_id = session_manager.validate_session(browser_session_token)
+            log.debug(f"Session validation result: user_id={user_id}")
+            
+            if user_id:
+                # Check if user still exists and is approved
+                user_manager = st.session_state.user_manager
+                users = user_manager.load_users()
+                
+                if user_id in users and users[user_id].get('status') == 'approved':
+                    log.info(f"User {user_id} found and approved, restoring session")
+                    
+                    # Restore session state completely
+                    st.session_state.authenticated_user_id = user_id
+                    oauth_manager = st.session_state.oauth_manager
+                    user_email = users[user_id].get('email', '')
+                    
+                    # Try to find ANY valid OAuth token for this user's email
+                    oauth_user_id = None
+                    authenticated_users = {}
+                    
+                    # More robust OAuth token discovery
+                    try:
+                        authenticated_users = oauth_manager.list_authenticated_users()
+                        log.debug(f"Found {len(authenticated_users)} OAuth tokens available")
+                        
+                        # Strategy 1: Find by exact email match
+                        for oid, email in authenticated_users.items():
+                            if email.lower() == user_email.lower():
+                                oauth_user_id = oid
+                                log.debug(f"Found OAuth token by email match: {oid}")
+                                break
+                        
+                        # Strategy 2: Find by user_id prefix (fallback)
+                        if not oauth_user_id:
+                            for oid in authenticated_users.keys():
+                                if oid.startswith(user_id):
+                                    oauth_user_id = oid
+                                    log.debug(f"Found OAuth token by user_id prefix: {oid}")
+                                    break
+                        
+                        # Strategy 3: Use any token if user has only one (super fallback)
+                        if not oauth_user_id and len(authenticated_users) == 1:
+                            oauth_user_id = list(authenticated_users.keys())[0]
+                            log.debug(f"Using single available OAuth token: {oauth_user_id}")
+                            
+                    except Exception as e:
+                        log.debug(f"Error discovering OAuth tokens: {e}")
+                    
+                    # Set session state for successful restoration
+                    st.session_state.current_user = oauth_user_id
+                    st.session_state.authentication_step = 'dashboard'
+                    
+                    # Clear any login-related state
+                    for key in ['oauth_result', 'oauth_error', 'oauth_processing']:
+                        if key in st.session_state:
+                            del st.session_state[key]
+                    
+                    # Update last login time
+                    user_manager.update_last_login(user_id)
+                    
+                    if oauth_user_id:
+                        log.info(f"Session successfully restored for user: {user_id} with OAuth: {oauth_user_id}")
+                    else:
+                        log.info(f"Session restored for user: {user_id} (OAuth will be prompted if needed)")
+                    
+                    return True
+                else:
+                    log.warning(f"User {user_id} not found or not approved, clearing session")
+                    # User no longer exists or not approved, clear session
+                    session_manager.invalidate_session(browser_session_token)
+                    session_manager.clear_browser_session()
+            else:
+                log.warning("Invalid session token, clearing browser session")
+                # Invalid session, clear browser storage
+                session_manager.clear_browser_session()
+        else:
+            log.debug("No persistent session token found")
+        
+        # No valid session found, ensure we're in login state
+        if st.session_state.get('authentication_step') != 'login':
+            log.debug("Setting authentication step to login")
+            st.session_state.authentication_step = 'login'
+        
+    except Exception as e:
+        if 'exception_info' in globals():
+            exception_info(log, "Error checking persistent session")
+        else:
+            log.error("Error checking persistent session", exc_info=True)
+        # On error, ensure we're in login state
+        st.session_state.authentication_step = 'login'
+    
+    return False
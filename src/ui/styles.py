@@ -0,0 +1,699 @@
+"""Global page styling."""
+
+import streamlit as st
+
+from src.common.logger import get_logger
+
+log = get_logger(__name__)
+
+
+def inject_shadcn_css():
+    """Inject shadcn-inspired CSS styling."""
+    st.markdown("""
+    <style>
+    /* Import Inter font */
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+    
+    /* CSS Variables - shadcn/ui inspired design tokens */
+    :root {
+        --background: 0 0% 100%;
+        --foreground: 222.2 84% 4.9%;
+        --card: 0 0% 100%;
+        --card-foreground: 222.2 84% 4.9%;
+        --popover: 0 0% 100%;
+        --popover-foreground: 222.2 84% 4.9%;
+        --primary: 221.2 83.2% 53.3%;
+        --primary-foreground: 210 40% 98%;
+        --secondary: 210 40% 96%;
+        --secondary-foreground: 222.2 84% 4.9%;
+        --muted: 210 40% 96%;
+        --muted-foreground: 215.4 16.3% 46.9%;
+        --accent: 210 40% 96%;
+        --accent-foreground: 222.2 84% 4.9%;
+        --destructive: 0 84.2% 60.2%;
+        --destructive-foreground: 210 40% 98%;
+        --border: 214.3 31.8% 91.4%;
+        --input: 214.3 31.8% 91.4%;
+        --ring: 221.2 83.2% 53.3%;
+        --radius: 0.75rem;
+    }
+
+    /* Dark mode variables */
+    .dark {
+        --background: 222.2 84% 4.9%;
+        --foreground: 210 40% 98%;
+        --card: 222.2 84% 4.9%;
+        --card-foreground: 210 40% 98%;
+        --popover: 222.2 84% 4.9%;
+        --popover-foreground: 210 40% 98%;
+        --primary: 217.2 91.2% 59.8%;
+        --primary-foreground: 222.2 84% 4.9%;
+        --secondary: 217.2 32.6% 17.5%;
+        --secondary-foreground: 210 40% 98%;
+        --muted: 217.2 32.6% 17.5%;
+        --muted-foreground: 215 20.2% 65.1%;
+        --accent: 217.2 32.6% 17.5%;
+        --accent-foreground: 210 40% 98%;
+        --destructive: 0 62.8% 30.6%;
+        --destructive-foreground: 210 40% 98%;
+        --border: 217.2 32.6% 17.5%;
+        --input: 217.2 32.6% 17.5%;
+        --ring: 224.3 76.3% 94.1%;
+    }
+
+    /* Global styles */
+    .main .block-container {
+        padding-top: 0rem !important;
+        padding-bottom: 2rem;
+        max-width: 95%;
+    }
+
+    /* Remove top padding from app container */
+    .block-container {
+        padding-top: 0rem !important;
+    }
+
+    /* Remove top margin from main content */
+    .stApp > div:first-child {
+        padding-top: 0rem !important;
+    }
+
+    /* Compact button styles */
+    .stButton > button {
+        height: 2.5rem !important;
+        padding: 0.25rem 0.75rem !important;
+        margin: 0.125rem !important;
+    }
+
+    /* Icon-only filter buttons - uniform height, no borders, just icons */
+    /* Target buttons that contain just single emojis by their small width */
+    .stButton > button {
+        font-family: inherit !important;
+    }
+    
+    /* Target filter buttons only - very specific targeting to avoid affecting other UI elements */
+
+    /* Force filter buttons row to stay horizontal on mobile */
+    div[data-testid="column"]:has(.stButton > button[title*="emails"]) {
+        min-width: 2.8rem !important;
+        flex-shrink: 0 !important;
+    }
+    
+    /* Ensure the columns container doesn't wrap */
+    .stHorizontalBlock {
+        flex-wrap: nowrap !important;
+        overflow-x: auto !important;
+        -webkit-overflow-scrolling: touch !important;
+    }
+    
+    /* Very specific targeting for ONLY the 6 filter buttons */
+    .stButton > button[title="Unread emails (is:unread)"],
+    .stButton > button[title="Starred emails (is:starred)"],
+    .stButton > button[title="Emails with attachments (has:attachment)"],
+    .stButton > button[title="Important emails (is:important)"],
+    .stButton > button[title="Today's emails (newer_than:1d)"],
+    .stButton > button[title="Primary category (category:primary)"] {
+        width: 2.5rem !important;
+        height: 2.5rem !important;
+        min-height: 2.5rem !important;
+        min-width: 2.5rem !important;
+        border: none !important;
+        border-radius: 0.375rem !important;
+        padding: 0 !important;
+        margin: 0.125rem !important;
+        display: flex !important;
+        align-items: center !important;
+        justify-content: center !important;
+        font-size: 1.2rem !important;
+        background-color: hsl(var(--secondary)) !important;
+        color: hsl(var(--secondary-foreground)) !important;
+        box-shadow: none !important;
+        line-height: 1 !important;
+        flex-shrink: 0 !important;
+    }
+    
+    /* Mobile responsive adjustments - make buttons much smaller to fit 6 in one row */
+    @media (max-width: 768px) {
+        .stButton > button[title="Unread emails (is:unread)"],
+        .stButton > button[title="Starred emails (is:starred)"],
+        .stButton > button[title="Emails with attachments (has:attachment)"],
+        .stButton > button[title="Important emails (is:important)"],
+        .stButton > button[title="Today's emails (newer_than:1d)"],
+        .stButton > button[title="Primary category (category:primary)"] {
+            width: 1.7rem !important;
+            height: 1.7rem !important;
+            min-width: 1.7rem !important;
+            min-height: 1.7rem !important;
+            max-width: 1.7rem !important;
+            font-size: 0.85rem !important;
+            margin: 0.05rem !important;
+            padding: 0 !important;
+            border-radius: 0.25rem !important;
+        }
+        
+        /* Force columns to be very narrow on mobile */
+        div[data-testid="column"]:has(.stButton > button[title*="emails"]) {
+            min-width: 1.8rem !important;
+            max-width: 1.8rem !important;
+            flex-shrink: 0 !important;
+            flex-grow: 0 !important;
+        }
+        
+        /* Ensure the main container has proper spacing on mobile */
+        .main .block-container {
+            max-width: 100% !important;
+            padding-left: 0.5rem !important;
+            padding-right: 0.5rem !important;
+        }
+        
+        /* Make sure the horizontal block doesn't wrap and fits */
+        .stHorizontalBlock {
+            gap: 0.1rem !important;
+        }
+    }
+
+    /* Enhanced tooltip styling for better positioning and visibility */
+    .stButton > button[title*="emails"],
+    .stButton > button[title*="Start"],
+    .stButton > button[title*="Stop"],
+    .stButton > button[title*="Running"],
+    .stButton > button[title*="Processing"],
+    .stButton > button[title*="Logout"],
+    .stButton > button[title*="Clear"],
+    .stButton > button[title*="Refresh"],
+    .stButton > button[title*="Remove"],
+    .stButton > button[title*="Rebuild"],
+    .stButton > button[title*="Update"],
+    .stButton > button[title*="Download"],
+    .stButton > button[title*="View"] {
+        position: relative !important;
+        /* Disable default browser tooltips */
+        pointer-events: auto !important;
+    }
+
+    /* Custom tooltips that intelligently position to avoid overlapping */
+    .stButton > button[title*="emails"]:hover::after,
+    .stButton > button[title*="Start"]:hover::after,
+    .stButton > button[title*="Stop"]:hover::after,
+    .stButton > button[title*="Running"]:hover::after,
+    .stButton > button[title*="Processing"]:hover::after,
+    .stButton > button[title*="Logout"]:hover::after,
+    .stButton > button[title*="Clear"]:hover::after,
+    .stButton > button[title*="Refresh"]:hover::after,
+    .stButton > button[title*="Remove"]:hover::after,
+    .stButton > button[title*="Rebuild"]:hover::after,
+    .stButton > button[title*="Update"]:hover::after,
+    .stButton > button[title*="Download"]:hover::after,
+    .stButton > button[title*="View"]:hover::after {
+        content: attr(title) !important;
+        position: absolute !important;
+        bottom: calc(100% + 15px) !important; /* Always position above with clear gap */
+        left: 50% !important;
+        transform: translateX(-50%) !important;
+        background: linear-gradient(135deg, rgba(40, 44, 52, 0.98), rgba(33, 37, 43, 0.98)) !important;
+        color: #ffffff !important;
+        padding: 8px 12px !important;
+        border-radius: 6px !important;
+        font-size: 11px !important;
+        line-height: 1.4 !important;
+        white-space: nowrap !important;
+        max-width: 200px !important;
+        text-align: center !important;
+        z-index: 999999 !important; /* Highest z-index to ensure visibility */
+        font-weight: 400 !important;
+        box-shadow: 0 4px 16px rgba(0, 0, 0, 0.3), 0 2px 4px rgba(0, 0, 0, 0.1) !important;
+        border: 1px solid rgba(255, 255, 255, 0.1) !important;
+        pointer-events: none !important;
+        opacity: 0 !important;
+        animation: smoothTooltipFadeIn 0.2s cubic-bezier(0.4, 0, 0.2, 1) 0.5s forwards !important;
+        /* Prevent tooltip from being clipped */
+        clip-path: none !important;
+        overflow: visible !important;
+    }
+
+    /* Smart positioning for tooltips near screen edges */
+    .stButton > button[title*="emails"]:hover::after {
+        /* For filter buttons, ensure they don't overflow */
+        white-space: nowrap !important;
+        max-width: 180px !important;
+    }
+
+    /* Responsive tooltip positioning for mobile/small screens */
+    @media (max-width: 768px) {
+        .stButton > button[title*="emails"]:hover::after,
+        .stButton > button[title*="Start"]:hover::after,
+        .stButton > button[title*="Stop"]:hover::after,
+        .stButton > button[title*="Running"]:hover::after,
+        .stButton > button[title*="Processing"]:hover::after,
+        .stButton > button[title*="Logout"]:hover::after,
+        .stButton > button[title*="Clear"]:hover::after,
+        .stButton > button[title*="Refresh"]:hover::after,
+        .stButton > button[title*="Remove"]:hover::after,
+        .stButton > button[title*="Rebuild"]:hover::after,
+        .stButton > button[title*="Update"]:hover::after,
+        .stButton > button[title*="Download"]:hover::after,
+        .stButton > button[title*="View"]:hover::after {
+            /* On small screens, position tooltips more carefully */
+            max-width: 160px !important;
+            font-size: 10px !important;
+            padding: 6px 8px !important;
+            bottom: calc(100% + 12px) !important;
+            /* Prevent overflow on small screens */
+            white-space: normal !important;
+            word-wrap: break-word !important;
+        }
+    }
+
+    /* Special positioning for buttons in columns to prevent overflow */
+    [data-testid="column"] .stButton > button[title*="emails"]:hover::after {
+        /* Ensure filter button tooltips stay within their column bounds */
+        left: 50% !important;
+        transform: translateX(-50%) !important;
+        max-width: 150px !important;
+    }
+
+    /* Prevent tooltips from interfering with page layout */
+    .stButton:hover {
+        /* Ensure button container doesn't expand when tooltip shows */
+        overflow: visible !important;
+        position: relative !important;
+        z-index: 1 !important;
+    }
+
+    /* Tooltip arrow with better styling */
+    .stButton > button[title*="emails"]:hover::before,
+    .stButton > button[title*="Start"]:hover::before,
+    .stButton > button[title*="Stop"]:hover::before,
+    .stButton > button[title*="Running"]:hover::before,
+    .stButton > button[title*="Processing"]:hover::before,
+    .stButton > button[title*="Logout"]:hover::before,
+    .stButton > button[title*="Clear"]:hover::before,
+    .stButton > button[title*="Refresh"]:hover::before,
+    .stButton > button[title*="Remove"]:hover::before,
+    .stButton > button[title*="Rebuild"]:hover::before,
+    .stButton > button[title*="Update"]:hover::before,
+    .stButton > button[title*="Download"]:hover::before,
+    .stButton > button[title*="View"]:hover::before {
+        content: "" !important;
+        position: absolute !important;
+        bottom: calc(100% + 9px) !important; /* Position arrow just below tooltip */
+        left: 50% !important;
+        transform: translateX(-50%) !important;
+        width: 0 !important;
+        height: 0 !important;
+        border-left: 5px solid transparent !important;
+        border-right: 5px solid transparent !important;
+        border-top: 6px solid rgba(40, 44, 52, 0.98) !important;
+        z-index: 999998 !important;
+        pointer-events: none !important;
+        opacity: 0 !important;
+        animation: smoothTooltipFadeIn 0.2s cubic-bezier(0.4, 0, 0.2, 1) 0.5s forwards !important;
+    }
+
+    /* Smooth fade-in animation for tooltips */
+    @keyframes smoothTooltipFadeIn {
+        from {
+            opacity: 0;
+            transform: translateX(-50%) translateY(8px) scale(0.95);
+        }
+        to {
+            opacity: 1;
+            transform: translateX(-50%) translateY(0) scale(1);
+        }
+    }
+
+    /* Legacy animation for compatibility */
+    @keyframes tooltipFadeIn {
+        from {
+            opacity: 0;
+            transform: translateX(-50%) translateY(5px);
+        }
+        to {
+            opacity: 1;
+            transform: translateX(-50%) translateY(0);
+        }
+    }
+
+    /* Hover states for filter buttons - exact title matches only */
+    .stButton > button[title="Unread emails (is:unread)"]:hover,
+    .stButton > button[title="Starred emails (is:starred)"]:hover,
+    .stButton > button[title="Emails with attachments (has:attachment)"]:hover,
+    .stButton > button[title="Important emails (is:important)"]:hover,
+    .stButton > button[title="Today's emails (newer_than:1d)"]:hover,
+    .stButton > button[title="Primary category (category:primary)"]:hover {
+        background-color: hsl(var(--accent)) !important;
+        color: hsl(var(--accent-foreground)) !important;
+        transform: scale(1.05) !important;
+        box-shadow: 0 2px 4px 0 rgb(0 0 0 / 0.1) !important;
+    }
+
+    /* Compact metrics for stats row */
+    div[data-testid="metric-container"] {
+        background-color: #f8f9fa !important;
+        border: 1px solid #e9ecef !important;
+        padding: 0.5rem !important;
+        border-radius: 0.375rem !important;
+        margin: 0.25rem 0 !important;
+    }
+
+    div[data-testid="metric-container"] > div {
+        font-size: 0.875rem !important;
+    }
+
+    div[data-testid="metric-container"] label {
+        font-size: 0.75rem !important;
+        font-weight: 600 !important;
+        padding: 0.25rem !important;
+        font-size: 1.1rem !important;
+    }
+
+    /* Reduce spacing between elements */
+    .element-container {
+        margin-bottom: 0.5rem !important;
+    }
+
+    /* Hide Streamlit branding */
+    #MainMenu {visibility: hidden;}
+    footer {visibility: hidden;}
+    header {visibility: hidden;}
+    
+    /* Typography */
+    h1, h2, h3, h4, h5, h6, .stMarkdown, .stText {
+        font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif !important;
+    }
+
+    /* Main container styling */
+    .stApp {
+        background-color: hsl(var(--background));
+        color: hsl(var(--foreground));
+    }
+
+    /* Card component styling */
+    .dashboard-card {
+        background-color: hsl(var(--card));
+        border: 1px solid hsl(var(--border));
+        border-radius: var(--radius);
+        padding: 1.5rem;
+        margin-bottom: 1.5rem;
+        box-shadow: 0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1);
+        transition: all 0.2s ease-in-out;
+    }
+
+    .dashboard-card:hover {
+        box-shadow: 0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1);
+    }
+
+    /* Button styling - shadcn inspired */
+    .stButton > button {
+        background-color: hsl(var(--primary));
+        color: hsl(var(--primary-foreground));
+        border: none;
+        border-radius: var(--radius);
+        padding: 0.75rem 1.5rem;
+        font-weight: 500;
+        font-family: 'Inter', sans-serif;
+        font-size: 0.875rem;
+        transition: all 0.2s ease-in-out;
+        box-shadow: 0 1px 2px 0 rgb(0 0 0 / 0.05);
+    }
+
+    .stButton > button:hover {
+        background-color: hsl(var(--primary) / 0.9);
+        box-shadow: 0 2px 4px 0 rgb(0 0 0 / 0.1);
+    }
+
+    /* Secondary button styling */
+    .stButton > button[kind="secondary"] {
+        background-color: hsl(var(--secondary));
+        color: hsl(var(--secondary-foreground));
+        border: 1px solid hsl(var(--border));
+    }
+
+    .stButton > button[kind="secondary"]:hover {
+        background-color: hsl(var(--secondary) / 0.8);
+    }
+
+    /* Tab styling */
+    .stTabs [data-baseweb="tab-list"] {
+        background-color: hsl(var(--muted));
+        border-radius: var(--radius);
+        padding: 0.25rem;
+        margin-bottom: 1.5rem;
+    }
+
+    .stTabs [data-baseweb="tab"] {
+        background-color: transparent;
+        border-radius: calc(var(--radius) - 0.25rem);
+        color: hsl(var(--muted-foreground));
+        font-weight: 500;
+        padding: 0.75rem 1rem;
+        margin: 0 0.125rem;
+        transition: all 0.2s ease-in-out;
+    }
+
+    .stTabs [data-baseweb="tab"][aria-selected="true"] {
+        background-color: hsl(var(--card));
+        color: hsl(var(--card-foreground));
+        box-shadow: 0 1px 3px 0 rgb(0 0 0 / 0.1);
+    }
+
+    /* Input field styling */
+    .stTextInput > div > div > input,
+    .stTextArea > div > div > textarea,
+    .stSelectbox > div > div > select {
+        border: 1px solid hsl(var(--border));
+        border-radius: var(--radius);
+        background-color: hsl(var(--background));
+        color: hsl(var(--foreground));
+        font-family: 'Inter', sans-serif;
+        padding: 0.75rem;
+    }
+
+    .stTextInput > div > div > input:focus,
+    .stTextArea > div > div > textarea:focus,
+    .stSelectbox > div > div > select:focus {
+        border-color: hsl(var(--ring));
+        outline: none;
+        box-shadow: 0 0 0 2px hsl(var(--ring) / 0.2);
+    }
+
+    /* Metrics styling */
+    .metric-card {
+        background-color: hsl(var(--card));
+        border: 1px solid hsl(var(--border));
+        border-radius: var(--radius);
+        padding: 1.5rem;
+        text-align: center;
+        box-shadow: 0 1px 3px 0 rgb(0 0 0 / 0.1);
+    }
+
+    .metric-value {
+        font-size: 2.5rem;
+        font-weight: 700;
+        color: hsl(var(--primary));
+        margin-bottom: 0.5rem;
+    }
+
+    .metric-label {
+        font-size: 0.875rem;
+        color: hsl(var(--muted-foreground));
+        font-weight: 500;
+    }
+
+    /* Alert styling */
+    .stAlert {
+        border-radius: var(--radius);
+        border: 1px solid hsl(var(--border));
+    }
+
+    .stSuccess {
+        background-color: hsl(142 76% 96%);
+        border-color: hsl(142 76% 86%);
+        color: hsl(142 76% 26%);
+    }
+
+    .stError {
+        background-color: hsl(var(--destructive) / 0.1);
+        border-color: hsl(var(--destructive) / 0.3);
+        color: hsl(var(--destructive));
+    }
+
+    .stWarning {
+        background-color: hsl(48 96% 95%);
+        border-color: hsl(48 96% 85%);
+        color: hsl(48 96% 25%);
+    }
+
+    .stInfo {
+        background-color: hsl(var(--primary) / 0.1);
+        border-color: hsl(var(--primary) / 0.3);
+        color: hsl(var(--primary));
+    }
+
+    /* Sidebar styling */
+    .css-1d391kg {
+        background-color: hsl(var(--card));
+        border-right: 1px solid hsl(var(--border));
+    }
+
+    /* Header styling */
+    .dashboard-header {
+        background-color: hsl(var(--card));
+        border: 1px solid hsl(var(--border));
+        border-radius: var(--radius);
+        padding: 1.5rem;
+        margin-bottom: 2rem;
+        box-shadow: 0 1px 3px 0 rgb(0 0 0 / 0.1);
+    }
+
+    .dashboard-title {
+        font-size: 2rem;
+        font-weight: 700;
+        color: hsl(var(--foreground));
+        margin-bottom: 0.5rem;
+    }
+
+    .dashboard-subtitle {
+        color: hsl(var(--muted-foreground));
+        font-size: 1rem;
+    }
+
+    /* Stats grid */
+    .stats-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+        gap: 1.5rem;
+        margin-bottom: 2rem;
+    }
+
+    /* Table styling */
+    .stDataFrame {
+        border: 1px solid hsl(var(--border));
+        border-radius: var(--radius);
+        overflow: hidden;
+    }
+
+    /* Custom spacing utilities */
+    .space-y-4 > * + * {
+        margin-top: 1rem;
+    }
+
+    .space-y-6 > * + * {
+        margin-top: 1.5rem;
+    }
+
+    /* Login page specific styling */
+    .login-container {
+        max-width: 400px;
+        margin: 0 auto;
+        padding: 2rem;
+    }
+
+    .login-card {
+        background-color: hsl(var(--card));
+        border: 1px solid hsl(var(--border));
+        border-radius: var(--radius);
+        padding: 2rem;
+        box-shadow: 0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1);
+    }
+
+    .login-header {
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+
+    .login-title {
+        font-size: 1.875rem;
+        font-weight: 700;
+        color: hsl(var(--foreground));
+        margin-bottom: 0.5rem;
+    }
+
+    .login-subtitle {
+        color: hsl(var(--muted-foreground));
+        font-size: 1rem;
+    }
+
+    /* Dashboard layout */
+    .dashboard-layout {
+        display: grid;
+        grid-template-columns: 250px 1fr;
+        gap: 2rem;
+        min-height: 100vh;
+    }
+
+    .dashboard-sidebar {
+        background-color: hsl(var(--card));
+        border: 1px solid hsl(var(--border));
+        border-radius: var(--radius);
+        padding: 1.5rem;
+    }
+
+    .dashboard-main {
+        background-color: hsl(var(--background));
+    }
+
+    /* Navigation menu */
+    .nav-menu {
+        list-style: none;
+        padding: 0;
+        margin: 0;
+    }
+
+    .nav-item {
+        margin-bottom: 0.5rem;
+    }
+
+    .nav-link {
+        display: block;
+        padding: 0.75rem 1rem;
+        border-radius: calc(var(--radius) - 0.25rem);
+        color: hsl(var(--muted-foreground));
+        text-decoration: none;
+        font-weight: 500;
+        transition: all 0.2s ease-in-out;
+    }
+
+    .nav-link:hover {
+        background-color: hsl(var(--accent));
+        color: hsl(var(--accent-foreground));
+    }
+
+    .nav-link.active {
+        background-color: hsl(var(--primary));
+        color: hsl(var(--primary-foreground));
+    }
+
+    /* Responsive design */
+    @media (max-width: 768px) {
+        .dashboard-layout {
+            grid-template-columns: 1fr;
+        }
+        
+        .dashboard-sidebar {
+            order: 2;
+        }
+        
+        .main .block-container {
+            padding-left: 1rem;
+            padding-right: 1rem;
+        }
+    }
+    </style>
+    """, unsafe_allow_html=True)
+    
+    def clear_sensitive_session_data(self):
+        """Clear sensitive data from Streamlit session state."""
+        sensitive_keys = [
+            'user_api_keys',
+            'decrypted_keys', 
+            'anthropic_key',
+            'openai_key',
+            'api_key_input',
+            'temp_api_key',
+            'masked_keys'
+        ]
+        for key in sensitive_keys:
+            if key in st.session_state:
+                del st.session_state[key]
+                log.debug(f"Cleared sensitive session data: {key}")
@@ -0,0 +1,693 @@
+"""User accounts and account e-mail notifications."""
+
+import json
+import os
+import secrets
+from datetime import datetime
+from typing import Dict, List
+
+import streamlit as st
+
+from src.common.logger import get_logger, exception_info
+from src.common.security import APIKeyManager
+
+log = get_logger(__name__)
+
+
+class EmailService:
+    """Handles email notifications for user approvals."""
+    
+    def __init__(self):
+        self.approver_email = "articulatedesigns@gmail.com"
+        self.app_url = "http://localhost:8505"  # Default port for Streamlit app
+        self.approval_tokens_file = "approval_tokens.json"
+        self.ensure_tokens_file()
+    
+    def ensure_tokens_file(self):
+        """Ensure approval tokens file exists."""
+        if not os.path.exists(self.approval_tokens_file):
+            self.save_tokens({})
+    
+    def load_tokens(self) -> Dict:
+        """Load approval tokens from file."""
+        try:
+            with open(self.approval_tokens_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    
+    def save_tokens(self, tokens: Dict):
+        """Save approval tokens to file."""
+        try:
+            with open(self.approval_tokens_file, 'w', encoding='utf-8') as f:
+                json.dump(tokens, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            if 'exception_info' in globals():
+                exception_info(log, "Failed to save approval tokens")
+            else:
+                log.error("Failed to save approval tokens", exc_info=True)
+    
+    def generate_approval_token(self, user_id: str, email: str) -> str:
+        """Generate a unique approval token for a user."""
+        token = secrets.token_urlsafe(32)
+        tokens = self.load_tokens()
+        
+        tokens[token] = {
+            'user_id': user_id,
+            'email': email,
+            'created_at': datetime.now().isoformat(),
+            'used': False
+        }
+        
+        self.save_tokens(tokens)
+        return token
+    
+    def validate_approval_token(self, token: str) -> Dict:
+        """Validate an approval token and return user info."""
+        tokens = self.load_tokens()
+        
+        if token in tokens and not tokens[token]['used']:
+            return tokens[token]
+        
+        return {}
+    
+    def mark_token_used(self, token: str):
+        """Mark an approval token as used."""
+        tokens = self.load_tokens()
+        
+        if token in tokens:
+            tokens[token]['used'] = True
+            self.save_tokens(tokens)
+    
+    def send_approval_email(self, user_email: str, user_id: str) -> bool:
+        """Send approval email to the approver."""
+        try:
+            # Generate approval token
+            token = self.generate_approval_token(user_id, user_email)
+            
+            # Create approval URLs
+            approve_url = f"{self.app_url}?action=approve&token={token}"
+            reject_url = f"{self.app_url}?action=reject&token={token}"
+            
+            # Email content
+            subject = f"New User Registration Approval Required - {user_email}"
+            
+            html_body = f"""
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <style>
+                    body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+                    .header {{ background-color: #4CAF50; color: white; padding: 20px; text-align: center; }}
+                    .content {{ padding: 20px; background-color: #f9f9f9; }}
+                    .button {{ display: inline-block; padding: 12px 24px; margin: 10px 5px; text-decoration: none; border-radius: 5px; font-weight: bold; }}
+                    .approve {{ background-color: #4CAF50; color: white; }}
+                    .reject {{ background-color: #f44336; color: white; }}
+                    .user-info {{ background-color: white; padding: 15px; margin: 10px 0; border-left: 4px solid #4CAF50; }}
+                </style>
+            </head>
+            <body>
+                <div class="container">
+                    <div class="header">
+                        <h1> User Registration Approval</h1>
+                    </div>
+                    <div class="content">
+                        <h2>New User Registration Request</h2>
+                        <p>A new user has requested access to the Gmail CrewAI Automation system.</p>
+                        
+                        <div class="user-info">
+                            <h3>User Details:</h3>
+                            <p><strong>Email:</strong> {user_email}</p>
+                            <p><strong>User ID:</strong> {user_id}</p>
+                            <p><strong>Registration Time:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+                        </div>
+                        
+                        <p>Please review this registration request and choose an action:</p>
+                        
+                        <div style="text-align: center; margin: 30px 0;">
+                            <a href="{approve_url}" class="button approve"> APPROVE USER</a>
+                            <a href="{reject_url}" class="button reject"> REJECT USER</a>
+                        </div>
+                        
+                        <p><strong>Note:</strong> These links will expire and can only be used once. If you need to review the request later, please use the admin panel in the application.</p>
+                        
+                        <hr>
+                        <p style="font-size: 12px; color: #666;">
+                            This email was sent automatically from the Gmail CrewAI Automation system. 
+                            If you did not expect this email, please ignore it.
+                        </p>
+                    </div>
+                </div>
+            </body>
+            </html>
+            """
+            
+            # Try to send actual email first, fall back to storing for demo
+            if self.send_actual_email(subject, html_body):
+                log.info(f"Approval email sent successfully to {self.approver_email}")
+                # Also store for admin panel display
+                self.store_approval_email(user_email, user_id, html_body, approve_url, reject_url)
+                return True
+            else:
+                log.warning("Failed to send actual email, storing for demo purposes")
+                # Store for display in admin panel
+                self.store_approval_email(user_email, user_id, html_body, approve_url, reject_url)
+                return True  # Still return True so user gets feedback
+            
+        except Exception as e:
+            if 'exception_info' in globals():
+                exception_info(log, "Error sending approval email")
+            else:
+                log.error("Error sending approval email", exc_info=True)
+            return False
+    
+    def send_actual_email(self, subject: str, html_body: str) -> bool:
+        """Send actual email using SMTP."""
+        try:
+            import smtplib
+            from email.mime.multipart import MIMEMultipart
+            from email.mime.text import MIMEText
+            
+            # Get SMTP settings from environment variables
+            smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+            smtp_port = int(os.getenv('SMTP_PORT', '587'))
+            smtp_username = os.getenv('SMTP_USERNAME', os.getenv('EMAIL_ADDRESS'))
+            smtp_password = os.getenv('SMTP_PASSWORD', os.getenv('APP_PASSWORD'))
+            
+            if not smtp_username or not smtp_password:
+                log.warning("SMTP credentials not found in environment variables")
+                log.warning("Set SMTP_USERNAME and SMTP_PASSWORD (or EMAIL_ADDRESS and APP_PASSWORD)")
+                return False
+            
+            # Create message
+            msg = MIMEMultipart('alternative')
+            msg['From'] = smtp_username
+            msg['To'] = self.approver_email
+            msg['Subject'] = subject
+            
+            # Attach HTML body
+            html_part = MIMEText(html_body, 'html')
+            msg.attach(html_part)
+            
+            # Send email
+            with smtplib.SMTP(smtp_server, smtp_port) as server:
+                server.starttls()
+                server.login(smtp_username, smtp_password)
+                server.send_message(msg)
+            
+            return True
+            
+        except Exception as e:
+            log.error(f"Failed to send email via SMTP: {e}")
+            return False
+    
+    def store_approval_email(self, user_email: str, user_id: str, html_body: str, approve_url: str, reject_url: str):
+        """Store approval email info for display in admin panel."""
+        approval_info = {
+            'user_email': user_email,
+            'user_id': user_id,
+            'html_body': html_body,
+            'approve_url': approve_url,
+            'reject_url': reject_url,
+            'created_at': datetime.now().isoformat()
+        }
+        
+        # Store in session state for display
+        if 'pending_approval_emails' not in st.session_state:
+            st.session_state.pending_approval_emails = []
+        
+        st.session_state.pending_approval_emails.append(approval_info)
+    
+    def send_approval_email_with_oauth(self, user_email: str, user_id: str, primary_user: Dict) -> bool:
+        """Send approval email using the primary user's OAuth2 connection."""
+        try:
+            # Check if primary user has OAuth2 authentication
+            if not primary_user or not primary_user.get('user_id'):
+                log.warning("No primary user found for sending approval emails")
+                return False
+            
+            # Get OAuth manager
+            oauth_manager = st.session_state.get('oauth_manager')
+            if not oauth_manager:
+                log.warning("OAuth manager not available")
+                return False
+            
+            # Check if primary user is authenticated
+            primary_user_id = primary_user['user_id']
+            if not oauth_manager.is_authenticated(primary_user_id):
+                log.warning(f"Primary user {primary_user['email']} is not authenticated with OAuth2")
+                return False
+            
+            # Generate approval URLs
+            approve_token = self.generate_approval_token(user_id, user_email)
+            approve_url = f"{self.app_url}?action=approve&token={approve_token}"
+            reject_url = f"{self.app_url}?action=reject&token={approve_token}"
+            
+            # Create email content
+            subject = f" New User Registration Request - {user_email}"
+            
+            html_body = f"""
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <meta charset="utf-8">
+                <style>
+                    body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; }}
+                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+                    .header {{ background: #f8f9fa; padding: 20px; border-radius: 8px; text-align: center; }}
+                    .content {{ padding: 20px 0; }}
+                    .button {{ display: inline-block; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: 500; margin: 0 10px; }}
+                    .approve {{ background: #22c55e; color: white; }}
+                    .reject {{ background: #ef4444; color: white; }}
+                </style>
+            </head>
+            <body>
+                <div class="container">
+                    <div class="header">
+                        <h1> New User Registration Request</h1>
+                    </div>
+                    
+                    <div class="content">
+                        <p><strong>Email:</strong> {user_email}</p>
+                        <p><strong>User ID:</strong> {user_id}</p>
+                        <p><strong>Registration Time:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+                        
+                        <p>A new user has requested access to the Gmail CrewAI system. Please review and approve or reject this request:</p>
+                        
+                        <div style="text-align: center; margin: 30px 0;">
+                            <a href="{approve_url}" class="button approve"> APPROVE USER</a>
+                            <a href="{reject_url}" class="button reject"> REJECT USER</a>
+                        </div>
+                        
+                        <p><strong>Note:</strong> These links will expire and can only be used once.</p>
+                    </div>
+                </div>
+            </body>
+            </html>
+            """
+            
+            # Try to send via OAuth2 Gmail API
+            if self.send_email_via_oauth2(oauth_manager, primary_user_id, primary_user['email'], subject, html_body):
+                log.info(f"Approval email sent successfully via OAuth2 to {primary_user['email']}")
+                # Also store for admin panel display
+                self.store_approval_email(user_email, user_id, html_body, approve_url, reject_url)
+                return True
+            else:
+                log.warning("Failed to send via OAuth2, storing for admin panel")
+                self.store_approval_email(user_email, user_id, html_body, approve_url, reject_url)
+                return True  # Still return True so user gets feedback
+            
+        except Exception as e:
+            if 'exception_info' in globals():
+                exception_info(log, "Error sending approval email with OAuth2")
+            else:
+                log.error("Error sending approval email with OAuth2", exc_info=True)
+            return False
+    
+    def send_email_via_oauth2(self, oauth_manager, user_id: str, to_email: str, subject: str, html_body: str) -> bool:
+        """Send email using OAuth2 Gmail API."""
+        try:
+            from email.mime.multipart import MIMEMultipart
+            from email.mime.text import MIMEText
+            import base64
+            
+            # Get Gmail service
+            service = oauth_manager.get_gmail_service(user_id)
+            
+            # Create message
+            msg = MIMEMultipart('alternative')
+            msg['From'] = to_email  # Sending from the authenticated user
+            msg['To'] = to_email    # Sending to themselves for admin review
+            msg['Subject'] = subject
+            
+            # Attach HTML body
+            html_part = MIMEText(html_body, 'html')
+            msg.attach(html_part)
+            
+            # Encode message
+            raw_message = base64.urlsafe_b64encode(msg.as_bytes()).decode('utf-8')
+            
+            # Send via Gmail API
+            service.users().messages().send(
+                userId='me',
+                body={'raw': raw_message}
+            ).execute()
+            
+            return True
+            
+        except Exception as e:
+            log.error(f"Failed to send email via OAuth2 Gmail API: {e}")
+            return False
+
+
+class UserManager:
+    """Manages user registration, approval, and authentication."""
+    
+    def __init__(self):
+        self.users_file = "users.json"
+        self.email_service = EmailService()
+        # Initialize secure API key manager
+        try:
+            self.api_key_manager = APIKeyManager()
+        except Exception as e:
+            log.warning(f"Could not initialize API key encryption: {e}")
+            self.api_key_manager = None
+        self.ensure_users_file()
+    
+    def ensure_users_file(self):
+        """Ensure users file exists."""
+        if not os.path.exists(self.users_file):
+            # Start with empty users file - no default admin
+            self.save_users({})
+    
+    def load_users(self) -> Dict:
+        """Load users from file."""
+        try:
+            with open(self.users_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    
+    def save_users(self, users: Dict):
+        """Save users to file."""
+        try:
+            with open(self.users_file, 'w', encoding='utf-8') as f:
+                json.dump(users, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            if 'exception_info' in globals():
+                exception_info(log, "Failed to save users")
+            else:
+                log.error("Failed to save users", exc_info=True)
+            st.error(f"Error saving users: {e}")
+    
+    def register_user(self, email: str, google_id: str = "") -> bool:
+        """Register a new user (auto-approved if first user, otherwise pending approval)."""
+        users = self.load_users()
+        
+        # Check if user already exists
+        for user_id, user_data in users.items():
+            if user_data['email'] == email:
+                return False  # User already exists
+        
+        # Check if this is the first user (primary owner)
+        is_first_user = len(users) == 0
+        
+        # Create new user
+        user_id = f"user_{secrets.token_urlsafe(8)}"
+        
+        if is_first_user:
+            # First user becomes the primary owner - auto-approved, admin role
+            users[user_id] = {
+                "email": email,
+                "status": "approved",
+                "role": "owner",  # Special role for primary user
+                "created_at": datetime.now().isoformat(),
+                "approved_at": datetime.now().isoformat(),
+                "google_id": google_id,
+                "last_login": None,
+                "is_primary": True
+            }
+            log.info(f"Registered first user as primary owner: {email}")
+        else:
+            # Subsequent users need approval
+            users[user_id] = {
+                "email": email,
+                "status": "pending",
+                "role": "user",
+                "created_at": datetime.now().isoformat(),
+                "approved_at": None,
+                "google_id": google_id,
+                "last_login": None,
+                "is_primary": False
+            }
+            
+            # Only send approval email if we have a primary user to send it
+            primary_user = self.get_primary_user()
+            if primary_user:
+                try:
+                    self.email_service.send_approval_email_with_oauth(email, user_id, primary_user)
+                except Exception as e:
+                    log.error(f"Failed to send approval email: {e}")
+        
+        self.save_users(users)
+        
+        
+        return True
+    
+    def resend_approval_email(self, email: str) -> bool:
+        """Resend approval email for a pending user."""
+        user_id, user_data = self.get_user_by_email(email)
+        
+        if not user_data or not user_id:
+            return False  # User not found
+        
+        if user_data['status'] != 'pending':
+            return False  # User is not pending approval
+        
+        # Get primary user to send the email
+        primary_user = self.get_primary_user()
+        if not primary_user:
+            return False  # No primary user to send email
+        
+        # Send approval email using OAuth2 if possible
+        try:
+            self.email_service.send_approval_email_with_oauth(email, user_id, primary_user)
+            return True
+        except Exception as e:
+            log.error(f"Failed to resend approval email: {e}")
+            return False
+    
+    def approve_user(self, user_id: str) -> bool:
+        """Approve a pending user."""
+        users = self.load_users()
+        
+        if user_id in users and users[user_id]['status'] == 'pending':
+            users[user_id]['status'] = 'approved'
+            users[user_id]['approved_at'] = datetime.now().isoformat()
+            self.save_users(users)
+            return True
+        
+        return False
+    
+    def reject_user(self, user_id: str) -> bool:
+        """Reject and remove a pending user."""
+        users = self.load_users()
+        
+        if user_id in users and users[user_id]['status'] == 'pending':
+            del users[user_id]
+            self.save_users(users)
+            return True
+        
+        return False
+    
+    def get_user_by_email(self, email: str) -> tuple:
+        """Get user by email. Returns (user_id, user_data) or (None, None)."""
+        users = self.load_users()
+        
+        for user_id, user_data in users.items():
+            if user_data['email'] == email:
+                return user_id, user_data
+        
+        return None, None
+    
+    def get_user_by_id(self, user_id: str) -> Dict:
+        """Get user by ID."""
+        users = self.load_users()
+        return users.get(user_id, {})
+    
+    def update_last_login(self, user_id: str):
+        """Update user's last login time."""
+        users = self.load_users()
+        
+        if user_id in users:
+            users[user_id]['last_login'] = datetime.now().isoformat()
+            self.save_users(users)
+    
+    def get_pending_users(self) -> List[Dict]:
+        """Get all pending users."""
+        users = self.load_users()
+        pending = []
+        
+        for user_id, user_data in users.items():
+            if user_data['status'] == 'pending':
+                pending.append({**user_data, 'user_id': user_id})
+        
+        return pending
+    
+    def get_all_users(self) -> List[Dict]:
+        """Get all users."""
+        users = self.load_users()
+        all_users = []
+        
+        for user_id, user_data in users.items():
+            all_users.append({**user_data, 'user_id': user_id})
+        
+        return all_users
+    
+    def is_admin(self, user_id: str) -> bool:
+        """Check if user is admin or owner."""
+        user_data = self.get_user_by_id(user_id)
+        if not user_data:
+            return False
+        role = user_data.get('role', '')
+        return role in ['admin', 'owner']
+    
+    def get_primary_user(self) -> Dict:
+        """Get the primary/owner user."""
+        users = self.load_users()
+        for user_id, user_data in users.items():
+            if user_data.get('is_primary', False) or user_data.get('role') == 'owner':
+                return {**user_data, 'user_id': user_id}
+        return {}
+    
+    def make_user_admin(self, email: str) -> bool:
+        """Make a user an admin by email address."""
+        users = self.load_users()
+        
+        for user_id, user_data in users.items():
+            if user_data['email'] == email:
+                user_data['role'] = 'admin'
+                users[user_id] = user_data
+            self.save_users(users)
+            log.info(f"Made {email} an admin user")
+            return True
+        
+        log.warning(f"User {email} not found")
+        return False
+    
+    def initialize_admin_user(self, email: str) -> bool:
+        """Initialize an admin user if they don't exist."""
+        user_id, user_data = self.get_user_by_email(email)
+        
+        if user_data:
+            # User exists, make them admin
+            return self.make_user_admin(email)
+        else:
+            # User doesn't exist, create them as admin
+            users = self.load_users()
+            user_id = f"user_{secrets.token_urlsafe(8)}"
+            
+            users[user_id] = {
+                "email": email,
+                "status": "approved",
+                "role": "admin",
+                "created_at": datetime.now().isoformat(),
+                "approved_at": datetime.now().isoformat(),
+                "google_id": "",
+                "last_login": None,
+                "is_primary": False
+            }
+            
+            self.save_users(users)
+            log.info(f"Created and made {email} an admin user")
+            return True
+    
+    def has_primary_user(self) -> bool:
+        """Check if there's a primary user."""
+        return bool(self.get_primary_user())
+    
+    def delete_user(self, user_id: str) -> bool:
+        """Delete a user."""
+        users = self.load_users()
+        
+        if user_id in users:
+            del users[user_id]
+            self.save_users(users)
+            return True
+        
+        return False
+    
+    def set_user_api_key(self, user_id: str, api_key_type: str, api_key: str) -> bool:
+        """Set an API key for a specific user with encryption."""
+        try:
+            users = self.load_users()
+            if user_id not in users:
+                return False
+            
+            # Initialize api_keys dict if it doesn't exist
+            if 'api_keys' not in users[user_id]:
+                users[user_id]['api_keys'] = {}
+            
+            # Encrypt and store the API key
+            if self.api_key_manager:
+                try:
+                    encrypted_key = self.api_key_manager.store_api_key(f"{user_id}_{api_key_type}", api_key)
+                    users[user_id]['api_keys'][api_key_type] = encrypted_key
+                    # Mark as encrypted for future identification
+                    users[user_id]['api_keys'][f"{api_key_type}_encrypted"] = True
+                except ValueError as e:
+                    log.error(f"Invalid API key format for {api_key_type}: {e}")
+                    return False
+            else:
+                # Fallback to plain storage if encryption not available
+                log.warning("API key encryption not available, storing in plain text")
+                users[user_id]['api_keys'][api_key_type] = api_key
+                users[user_id]['api_keys'][f"{api_key_type}_encrypted"] = False
+            
+            self.save_users(users)
+            log.info(f"API key set for user {user_id}, type: {api_key_type}")
+            return True
+        except Exception as e:
+            if 'exception_info' in globals():
+                exception_info(log, f"Error setting API key for user {user_id}")
+            else:
+                log.error(f"Error setting API key for user {user_id}: {e}", exc_info=True)
+            return False
+    
+    def get_user_api_key(self, user_id: str, api_key_type: str) -> str:
+        """Get an API key for a specific user with decryption, fallback to environment."""
+        try:
+            users = self.load_users()
+            if user_id in users and 'api_keys' in users[user_id]:
+                encrypted_key = users[user_id]['api_keys'].get(api_key_type)
+                if encrypted_key:
+                    # Check if key is encrypted
+                    is_encrypted = users[user_id]['api_keys'].get(f"{api_key_type}_encrypted", True)
+                    
+                    if is_encrypted and self.api_key_manager:
+                        # Decrypt the key
+                        try:
+                            decrypted_key = self.api_key_manager.retrieve_api_key(encrypted_key)
+                            if decrypted_key:
+                                return decrypted_key
+                            else:
+                                log.warning(f"Could not decrypt API key for user {user_id}, type {api_key_type}")
+                        except Exception as e:
+                            log.error(f"Decryption failed for user {user_id} API key {api_key_type}: {e}")
+                    else:
+                        # Return plain text key (legacy or fallback)
+                        return encrypted_key
+            
+            # Fallback to environment variable
+            env_key = os.getenv(f"{api_key_type.upper()}_API_KEY", '')
+            return env_key
+        except Exception as e:
+            log.error(f"Error getting API key for user {user_id}: {e}")
+            # Fallback to environment variable
+            return os.getenv(f"{api_key_type.upper()}_API_KEY", '')
+    
+    def has_user_api_key(self, user_id: str, api_key_type: str) -> bool:
+        """Check if user has their own API key (not using fallback)."""
+        try:
+            users = self.load_users()
+            if user_id in users and 'api_keys' in users[user_id]:
+                return api_key_type in users[user_id]['api_keys']
+            return False
+        except Exception as e:
+            print(f"Error checking user API key for {user_id}: {e}")
+            return False
+    
+    def remove_user_api_key(self, user_id: str, api_key_type: str) -> bool:
+        """Remove a user's API key (will fallback to environment)."""
+        try:
+            users = self.load_users()
+            if user_id in users and 'api_keys' in users[user_id]:
+                if api_key_type in users[user_id]['api_keys']:
+                    del users[user_id]['api_keys'][api_key_type]
+                    self.save_users(users)
+                    return True
+            return False
+        except Exception as e:
+            print(f"Error removing API key for user {user_id}: {e}")
+            return False
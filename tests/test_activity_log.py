@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the bounded activity log.
+
+Run with: pytest tests/test_activity_log.py -v
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.utils.activity_log import ActivityLog
+
+
+class TestActivityLog:
+    """Test ring buffer capacity, incremental reads and job event conversion."""
+
+    def test_capacity_is_fixed_and_reads_are_incremental(self):
+        """Old events are dropped and since() returns only what is new and still buffered."""
+        log = ActivityLog(capacity=3)
+        for index in range(5):
+            log.append(f"line {index}")
+
+        assert len(log) == 3
+        assert log.dropped == 2
+        assert [event.message for event in log.since(0)] == ['line 2', 'line 3', 'line 4']
+        assert [event.message for event in log.since(4)] == ['line 4']
+        assert log.since(log.last_seq) == []
+        assert log.lines(limit=1)[0].endswith('ℹ️ line 4')
+
+        log.clear()
+        assert log.since(0) == [] and not log
+        assert log.append("after clear").seq == 6
+
+    def test_job_events_become_typed_entries(self):
+        """Status and log events sent by a worker keep their time, kind and job."""
+        log = ActivityLog()
+        status = log.add_job_event({'job_id': 'j1', 'time': 0.0, 'kind': 'status', 'status': 'failed', 'message': 'boom'})
+        line = log.add_job_event({'job_id': 'j1', 'time': 1.0, 'kind': 'log', 'message': 'Fetched 3 emails'})
+
+        assert (status.kind, status.message, status.icon) == ('status', 'Job failed: boom', '❌')
+        assert status.data == {'job_id': 'j1', 'status': 'failed'}
+        assert line.kind == 'info' and line.time == 1.0
+        assert line.format().endswith('ℹ️ Fetched 3 emails')
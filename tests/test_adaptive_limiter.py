@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Regression tests for provider-header driven rate limiting and model backoff.
+
+Run with: pytest tests/test_adaptive_limiter.py -v
+"""
+
+import sys
+import os
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.utils.adaptive_limiter import (
+    FALLBACK_MODEL,
+    AdaptiveRateLimitHandler,
+    get_retry_after,
+    is_rate_limit_error,
+    parse_rate_limit_headers,
+    parse_retry_after,
+    select_model,
+)
+from gmail_crew_ai.utils.rate_limiter import RateLimiter
+
+MODEL = 'anthropic/claude-test'
+
+
+class FakeRateLimitError(Exception):
+    """Provider 429 carrying its response headers the way LiteLLM does."""
+
+    def __init__(self, headers=None, message="429 Too Many Requests"):
+        super().__init__(message)
+        self.status_code = 429
+        self.litellm_response_headers = headers or {}
+
+
+class TestHeaderParsing:
+    """Test the OpenAI and Anthropic rate-limit header families."""
+
+    def test_openai_headers(self):
+        """x-ratelimit-* limits, remaining counts and duration resets are parsed."""
+        limits = parse_rate_limit_headers({
+            'X-RateLimit-Limit-Requests': '500',
+            'x-ratelimit-remaining-requests': '499',
+            'x-ratelimit-reset-requests': '120ms',
+            'llm_provider-x-ratelimit-limit-tokens': '30000',
+            'x-ratelimit-remaining-tokens': '1200',
+            'x-ratelimit-reset-tokens': '1m30s',
+        })
+        assert limits['rpm_limit'] == 500 and limits['rpm_remaining'] == 499
+        assert limits['rpm_reset'] == pytest.approx(0.12)
+        assert limits['tpm_limit'] == 30000 and limits['tpm_remaining'] == 1200
+        assert limits['tpm_reset'] == pytest.approx(90.0)
+        assert limits['retry_after'] is None
+
+    def test_anthropic_headers(self):
+        """anthropic-ratelimit-* headers with RFC 3339 reset times are parsed."""
+        reset_at = (datetime.now(timezone.utc) + timedelta(seconds=30)).isoformat().replace('+00:00', 'Z')
+        limits = parse_rate_limit_headers({
+            'anthropic-ratelimit-requests-limit': '50',
+            'anthropic-ratelimit-requests-remaining': '0',
+            'anthropic-ratelimit-requests-reset': reset_at,
+            'anthropic-ratelimit-input-tokens-limit': '20000',
+            'anthropic-ratelimit-input-tokens-remaining': 'n/a',
+        })
+        assert limits['rpm_limit'] == 50 and limits['rpm_remaining'] == 0
+        assert 28 <= limits['rpm_reset'] <= 30
+        assert limits['tpm_limit'] == 20000 and limits['tpm_remaining'] is None
+
+    def test_retry_after(self):
+        """retry-after accepts seconds, milliseconds and HTTP dates."""
+        assert parse_retry_after({'retry-after': '7'}) == 7.0
+        assert parse_retry_after({'retry-after-ms': '1500', 'retry-after': '7'}) == 1.5
+        retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=20), usegmt=True)
+        assert 18 <= parse_retry_after({'retry-after': retry_at}) <= 20
+        assert parse_retry_after({'retry-after': 'soon'}) is None
+        assert parse_retry_after({}) is None
+
+    def test_rate_limit_errors(self):
+        """429s are recognised directly or through the exception chain, with their retry-after."""
+        error = FakeRateLimitError({'Retry-After': '12'})
+        assert is_rate_limit_error(error)
+        assert get_retry_after(error) == 12.0
+
+        try:
+            try:
+                raise FakeRateLimitError()
+            except FakeRateLimitError as inner:
+                raise RuntimeError("crew failed") from inner
+        except RuntimeError as wrapped:
+            assert is_rate_limit_error(wrapped)
+        assert not is_rate_limit_error(ValueError("bad input"))
+
+        response_error = Exception("server said no")
+        response_error.response = SimpleNamespace(headers={'retry-after': '3'})
+        assert get_retry_after(response_error) == 3.0
+
+
+class TestBackoff:
+    """Test per-model backoff, the LiteLLM callbacks and the fallback model."""
+
+    @pytest.fixture(autouse=True)
+    def setup_limiter(self, tmp_path):
+        """Create a limiter on a temporary database."""
+        self.limiter = RateLimiter(db_path=str(tmp_path / 'rate_limiter.db'), default_model=MODEL)
+        self.handler = AdaptiveRateLimitHandler(self.limiter)
+
+    def test_record_rate_limit_backs_off_exponentially(self):
+        """Consecutive 429s double the delay; the provider's retry-after wins; other models are unaffected."""
+        assert self.limiter.record_rate_limit(MODEL, base_delay=5) == 5
+        assert self.limiter.record_rate_limit(MODEL, base_delay=5) == 10
+        remaining, failures = self.limiter.get_backoff(MODEL)
+        assert failures == 2 and 9 < remaining <= 10
+
+        assert self.limiter.record_rate_limit(MODEL, retry_after=2) == 2
+        assert self.limiter.record_rate_limit(MODEL, retry_after=9999, max_delay=60) == 60
+        assert self.limiter.get_backoff('openai/gpt-4o') == (0.0, 0)
+        assert not self.limiter.can_make_request(1, MODEL)
+
+    def test_failure_callback_applies_headers_and_retry_after(self):
+        """A 429 from LiteLLM lowers the budget and backs off only that model."""
+        error = FakeRateLimitError({
+            'retry-after': '4',
+            'anthropic-ratelimit-tokens-limit': '8000',
+            'anthropic-ratelimit-tokens-remaining': '100',
+        })
+        self.handler.log_failure_event({'model': 'claude-test', 'custom_llm_provider': 'anthropic',
+                                        'exception': error}, None, None, None)
+
+        remaining, failures = self.limiter.get_backoff(MODEL)
+        assert failures == 1 and 3 < remaining <= 4
+        stats = self.limiter.get_usage_stats(MODEL)
+        assert stats['max_limit'] == 8000 and stats['current_usage'] == pytest.approx(8000, abs=5)
+
+    def test_success_callback_reconciles_reservation(self):
+        """The pre-call reservation is replaced by actual usage and exhausted budgets pause the model."""
+        self.limiter.set_limits(MODEL, rpm=50, tpm=20000)
+        kwargs = {'model': MODEL, 'litellm_call_id': 'call-1', 'optional_params': {'max_tokens': 1000}}
+        self.handler.log_pre_api_call(MODEL, [{'role': 'user', 'content': 'x' * 4000}], kwargs)
+        assert self.limiter.get_usage_stats(MODEL)['current_usage'] == pytest.approx(2000, abs=5)
+
+        response = SimpleNamespace(usage=SimpleNamespace(total_tokens=300), _hidden_params={
+            'additional_headers': {'x-ratelimit-remaining-requests': '0', 'x-ratelimit-reset-requests': '20s'},
+        })
+        self.handler.log_success_event(kwargs, response, None, None)
+        assert self.limiter.get_usage_stats(MODEL)['current_usage'] == pytest.approx(300, abs=5)
+        assert self.handler._reservations == {}
+        remaining, failures = self.limiter.get_backoff(MODEL)
+        assert failures == 0 and 19 < remaining <= 20
+
+    def test_fallback_model_after_repeated_rate_limits(self):
+        """Anthropic models switch to the fallback after two 429s; other models never do."""
+        self.limiter.record_rate_limit(MODEL)
+        assert select_model(MODEL, self.limiter) == MODEL
+        self.limiter.record_rate_limit(MODEL)
+        assert select_model(MODEL, self.limiter) == FALLBACK_MODEL
+
+        self.limiter.record_rate_limit('openai/gpt-4o')
+        self.limiter.record_rate_limit('openai/gpt-4o')
+        assert select_model('openai/gpt-4o', self.limiter) == 'openai/gpt-4o'
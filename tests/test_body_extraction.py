@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Regression tests for shared email body extraction.
+
+Run with: pytest tests/test_body_extraction.py -v
+"""
+
+import base64
+import importlib.util
+import os
+
+# Load the module by path; the tools package imports CrewAI on import
+MODULE_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'gmail_crew_ai', 'tools', 'body_extraction.py')
+spec = importlib.util.spec_from_file_location('body_extraction', MODULE_PATH)
+body_extraction = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(body_extraction)
+
+
+class TestCleanEmailBody:
+    """Test HTML-to-text cleanup and its output budget."""
+
+    def test_visible_text_only(self):
+        """Head, style and script content are dropped; entities are decoded."""
+        html = ("<html><head><title>Issue 5</title><style>.a{color:red}</style></head>"
+                "<body><script>track()</script><p>Hello&nbsp;there</p><div>World &amp; more</div></body></html>")
+
+        assert body_extraction.clean_email_body(html, max_length=200) == "Hello there World & more"
+
+    def test_truncates_with_marker(self):
+        """Long text is cut to max_length and marked as truncated."""
+        text = body_extraction.clean_email_body("<p>" + "word " * 500 + "</p>", max_length=50)
+
+        assert text.endswith(body_extraction.TRUNCATION_MARKER)
+        assert len(text) == 50 + len(body_extraction.TRUNCATION_MARKER)
+
+    def test_parsing_stops_after_budget(self, monkeypatch):
+        """Markup far beyond the budget is never fed to the parser."""
+        fed = []
+        original_feed = body_extraction._VisibleTextParser.feed
+
+        def counting_feed(self, data):
+            fed.append(len(data))
+            return original_feed(self, data)
+
+        monkeypatch.setattr(body_extraction._VisibleTextParser, 'feed', counting_feed)
+        html = "<p>Intro paragraph with enough text to fill the budget.</p>" * 20 + "<td>x</td>" * 100000
+        body_extraction.clean_email_body(html, max_length=100)
+
+        assert sum(fed) <= body_extraction.FEED_CHUNK_SIZE
+
+
+def encode(text, charset='utf-8'):
+    """Encode text as Gmail API base64url part data."""
+    return base64.urlsafe_b64encode(text.encode(charset)).decode('ascii')
+
+
+def text_part(mime_type, text, charset='utf-8'):
+    """Build a Gmail API leaf part."""
+    return {
+        'mimeType': mime_type,
+        'headers': [{'name': 'Content-Type', 'value': f'{mime_type}; charset="{charset}"'}],
+        'body': {'data': encode(text, charset)},
+    }
+
+
+class TestExtractPayloadContent:
+    """Test the recursive MIME walk used for every fetched message."""
+
+    def test_nested_alternative_prefers_plain_text(self):
+        """multipart/alternative inside multipart/mixed yields the plain part only."""
+        payload = {
+            'mimeType': 'multipart/mixed',
+            'parts': [
+                {'mimeType': 'multipart/alternative', 'parts': [
+                    text_part('text/plain', 'Plain version'),
+                    text_part('text/html', '<p>HTML version</p>'),
+                ]},
+                {'mimeType': 'application/pdf', 'filename': 'invoice.pdf',
+                 'body': {'attachmentId': 'abc', 'size': 1000}},
+            ],
+        }
+
+        body, has_attachment = body_extraction.extract_payload_content(payload)
+
+        assert body == 'Plain version'
+        assert has_attachment is True
+
+    def test_html_only_alternative_and_part_charset(self):
+        """HTML is used when there is no plain part, decoded with the declared charset."""
+        payload = {'mimeType': 'multipart/alternative', 'parts': [
+            {'mimeType': 'multipart/related', 'parts': [
+                text_part('text/html', '<p>Café crème</p>', charset='iso-8859-1'),
+            ]},
+        ]}
+
+        body, has_attachment = body_extraction.extract_payload_content(payload)
+
+        assert body == 'Café crème'
+        assert has_attachment is False
+
+    def test_large_plain_part_is_decoded_only_up_to_budget(self, monkeypatch):
+        """Only a bounded prefix of a huge part is base64-decoded."""
+        data = encode('a' * 200000)
+        text, truncated = body_extraction.decode_text_prefix(data, 'utf-8', 200)
+
+        assert text == 'a' * 200
+        assert truncated is True
+
+        decoded = []
+        original = body_extraction.base64.urlsafe_b64decode
+
+        def counting_decode(chunk):
+            decoded.append(len(chunk))
+            return original(chunk)
+
+        monkeypatch.setattr(body_extraction.base64, 'urlsafe_b64decode', counting_decode)
+        body, _ = body_extraction.extract_payload_content(
+            {'mimeType': 'multipart/mixed', 'parts': [{'mimeType': 'text/plain', 'body': {'data': data}}]})
+
+        assert body == 'a' * 200 + body_extraction.PART_TRUNCATION_MARKER
+        assert sum(decoded) < 2000
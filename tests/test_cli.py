@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the headless command-line runner.
+
+Run with: pytest tests/test_cli.py -v
+"""
+
+import sys
+import os
+import json
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.cli import EXIT_OK, EXIT_RUN_FAILED, EXIT_USAGE, main, resolve_users, user_api_keys
+
+
+USERS = {
+    'user_a': {'email': 'a@example.com', 'status': 'approved',
+               'api_keys': {'openai': 'sk-plain', 'openai_encrypted': False}},
+    'user_b': {'email': 'b@example.com', 'status': 'approved'},
+    'user_c': {'email': 'c@example.com', 'status': 'pending'},
+}
+
+
+def fake_target(spec, reporter):
+    """Crew stand-in that prints like a verbose crew, fails for user_b and echoes the spec otherwise."""
+    reporter.log(f"processing {spec.user_id}")
+    print(f"crew output for {spec.user_id}")
+    if spec.user_id == 'user_b':
+        raise RuntimeError("no credentials")
+    return {'query': spec.search_query, 'limit': spec.max_emails, 'model': spec.model,
+            'keys': sorted(spec.user_api_keys)}
+
+
+def write_users(tmp_path):
+    path = tmp_path / 'users.json'
+    path.write_text(json.dumps(USERS))
+    return str(path)
+
+
+class TestCli:
+    """Test user selection, JSON output and exit codes."""
+
+    def test_user_selection(self):
+        """Users are matched by ID or email; unknown and unapproved users are rejected."""
+        assert resolve_users(USERS, ['B@example.com', 'user_a']) == ['user_b', 'user_a']
+        assert resolve_users(USERS, ['user_b'], all_approved=True) == ['user_b', 'user_a']
+        for requested in (['nobody'], ['user_c'], []):
+            try:
+                resolve_users(USERS, requested)
+            except Exception as e:
+                assert type(e).__name__ == 'CliError'
+            else:
+                raise AssertionError(f"{requested} should be rejected")
+
+        assert user_api_keys(USERS['user_a']) == {'openai': 'sk-plain'}
+        assert user_api_keys({'api_keys': {'anthropic': 'encrypted'}}) == {}
+
+    def test_runs_report_json_and_exit_codes(self, tmp_path, capsys):
+        """Every selected user is run with the flags; any failure makes the exit code non-zero."""
+        users_file = write_users(tmp_path)
+
+        code = main(['--user', 'user_a', '--query', 'is:starred', '--limit', '3', '--model', 'openai/gpt-4o',
+                     '--users-file', users_file, '--quiet'], target=fake_target)
+        summary = json.loads(capsys.readouterr().out)
+        assert code == EXIT_OK
+        assert summary['completed'] == 1 and summary['failed'] == 0
+        assert summary['runs'][0]['result'] == {'query': 'is:starred', 'limit': 3, 'model': 'openai/gpt-4o',
+                                               'keys': ['openai']}
+        assert summary['runs'][0]['seconds'] >= 0
+
+        code = main(['--all-approved', '--users-file', users_file], target=fake_target)
+        captured = capsys.readouterr()
+        summary = json.loads(captured.out)
+        assert code == EXIT_RUN_FAILED
+        assert [run['status'] for run in summary['runs']] == ['completed', 'failed']
+        assert summary['runs'][1]['error'] == 'no credentials'
+        assert 'processing user_a' in captured.err
+        # Whatever the crew prints goes to stderr, keeping stdout valid JSON
+        assert 'crew output for user_a' in captured.err and 'crew output' not in captured.out
+
+        assert main(['--user', 'user_c', '--users-file', users_file], target=fake_target) == EXIT_USAGE
+        assert main(['--user', 'user_a', '--users-file', str(tmp_path / 'missing.json')]) == EXIT_USAGE
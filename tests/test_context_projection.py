@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Regression tests for per-task context projection of agent input files.
+
+Run with: pytest tests/test_context_projection.py -v
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.utils.context_projection import get_task_projection, project_json, read_projected
+
+
+TASKS_YAML = os.path.join(os.path.dirname(__file__), '..', 'src', 'gmail_crew_ai', 'config', 'tasks.yaml')
+
+REPORT = {
+    'emails': [
+        {'email_id': 'm1', 'subject': 'Sale', 'sender': 'shop@example.com', 'category': 'PROMOTION',
+         'priority': 'LOW', 'reasoning': 'Marketing email with a discount code and a long explanation.'},
+    ],
+    'summary': 'One promotion found.',
+}
+
+
+class TestContextProjection:
+    """Test field projection and the projection-aware read path."""
+
+    def test_report_records_are_reduced_to_declared_fields(self):
+        """Records in the emails array keep only declared fields; unlisted top-level keys are dropped."""
+        projected = project_json(REPORT, ['email_id', 'category', 'priority'])
+
+        assert projected == {'emails': [{'email_id': 'm1', 'category': 'PROMOTION', 'priority': 'LOW'}]}
+
+    def test_read_matches_paths_and_strips_code_fences(self, tmp_path, monkeypatch):
+        """A fenced report read through './output/...' is projected; other files are untouched."""
+        monkeypatch.chdir(tmp_path)
+        os.makedirs('output')
+        with open('output/categorization_report.json', 'w', encoding='utf-8') as f:
+            f.write("```json\n" + json.dumps(REPORT) + "\n```")
+        with open('output/notes.txt', 'w', encoding='utf-8') as f:
+            f.write("plain text")
+
+        projection = get_task_projection({'context_projection': {
+            'output/categorization_report.json': ['email_id', 'priority']}})
+
+        content = read_projected('./output/categorization_report.json', projection)
+        assert json.loads(content) == {'emails': [{'email_id': 'm1', 'priority': 'LOW'}]}
+        assert read_projected(str(tmp_path / 'output' / 'categorization_report.json'), projection) == content
+        assert read_projected('output/notes.txt', projection) == "plain text"
+
+    def test_tasks_yaml_declares_projections(self):
+        """The cleaner never sees bodies or reasoning text."""
+        yaml = pytest.importorskip('yaml')
+        with open(TASKS_YAML, 'r', encoding='utf-8') as f:
+            tasks = yaml.safe_load(f)
+
+        cleanup = get_task_projection(tasks['cleanup_task'])
+        assert 'reasoning' not in cleanup['output/categorization_report.json']
+        assert cleanup['output/fetched_emails.json'] == ['id', 'age']
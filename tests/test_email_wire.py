@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the compact fetched_emails.json format.
+
+Run with: pytest tests/test_email_wire.py -v
+"""
+
+import sys
+import os
+import json
+from datetime import datetime, timezone
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.utils.email_wire import decode_email, dumps_compact, encode_email, encode_emails
+
+
+NOW = datetime(2024, 3, 11, 12, 0, tzinfo=timezone.utc)
+
+
+def fetched_email(**overrides):
+    """Build an email tuple as returned by OAuth2GetUnreadEmailsTool."""
+    thread_info = {
+        'message_id': '<abc@mail.example.com>', 'date': 'Fri, 08 Mar 2024 09:30:00 +0000',
+        'raw_date': 'Fri, 08 Mar 2024 09:30:00 +0000', 'email_id': 'm1', 'thread_id': 't1',
+        'in_reply_to': '', 'references': '', 'is_starred': True, 'is_important': False,
+        'is_unread': True, 'is_inbox': True, 'is_sent': False, 'is_draft': False,
+        'is_spam': False, 'is_trash': False, 'has_attachment': False,
+        'labels': ['INBOX', 'UNREAD', 'STARRED'], 'custom_labels': [],
+    }
+    thread_info.update(overrides)
+    return ('Lunch?', 'Jane <jane@example.com>', 'Are you free on Tuesday?', 'm1', thread_info)
+
+
+class TestEmailWire:
+    """Test encoding, size reporting and decoding for the UI."""
+
+    def test_false_flags_and_redundant_fields_are_dropped(self):
+        """Only true flags and non-empty fields are written."""
+        wire = encode_email(fetched_email(), now=NOW)
+
+        assert wire == {
+            'id': 'm1', 'subj': 'Lunch?', 'from': 'Jane <jane@example.com>',
+            'date': '2024-03-08', 'age': 3, 'body': 'Are you free on Tuesday?',
+            'flags': ['unread', 'starred'], 'tid': 't1', 'mid': '<abc@mail.example.com>',
+        }
+
+    def test_report_shows_smaller_prompt(self):
+        """The compact form is well under the previous indented form."""
+        emails, report = encode_emails([fetched_email(), fetched_email(custom_labels=['Label_7'])], now=NOW)
+
+        assert [entry['email_id'] for entry in report] == ['m1', 'm1']
+        assert emails[1]['labels'] == ['Label_7']
+        for entry in report:
+            assert entry['tokens'] * 3 < entry['verbose_tokens']
+        assert json.loads(dumps_compact(emails)) == emails
+
+    def test_decode_restores_long_names(self):
+        """The UI sees subject/sender/flags under their long names; old files pass through."""
+        decoded = decode_email(encode_email(fetched_email(has_attachment=True), now=NOW))
+
+        assert decoded['subject'] == 'Lunch?'
+        assert decoded['age_days'] == 3
+        assert decoded['thread_info']['has_attachment'] is True
+        assert decoded['thread_info']['is_important'] is False
+
+        legacy = {'email_id': 'm2', 'subject': 'Old format'}
+        assert decode_email(legacy) is legacy
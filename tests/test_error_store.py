@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the append-only error store.
+
+Run with: pytest tests/test_error_store.py -v
+"""
+
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from common.error_store import ErrorLogStore
+
+
+class TestErrorLogStore:
+    """Test appending, paging and maintenance of the JSONL error log."""
+
+    @pytest.fixture(autouse=True)
+    def setup_store(self, tmp_path):
+        """Create a store in an isolated directory."""
+        self.log_file = str(tmp_path / 'error_logs.jsonl')
+        self.store = ErrorLogStore(self.log_file)
+        self.tmp_path = tmp_path
+
+    def test_append_writes_one_line_per_error(self):
+        """Each error is a single appended JSON line."""
+        self.store.append("System", "first")
+        self.store.append("Agent", "second", "details", "user_1")
+
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+
+        assert len(lines) == 2
+        assert json.loads(lines[1])['message'] == "second"
+
+    def test_query_pages_newest_first_with_filters(self):
+        """Paging returns newest entries first and respects type filters."""
+        for i in range(25):
+            self.store.append("System" if i % 2 else "Agent", f"error {i}")
+
+        page, has_more = self.store.query(limit=10)
+        assert [e['message'] for e in page[:2]] == ["error 24", "error 23"]
+        assert has_more
+
+        agent_errors, _ = self.store.query(error_type="Agent", limit=100)
+        assert len(agent_errors) == 13
+        assert all(e['type'] == "Agent" for e in agent_errors)
+
+        last_page, has_more = self.store.query(offset=20, limit=10)
+        assert len(last_page) == 5
+        assert not has_more
+
+    def test_resolved_and_deleted_state_lives_in_index(self):
+        """Resolving and deleting do not rewrite the log file."""
+        resolved = self.store.append("System", "resolve me")
+        deleted = self.store.append("System", "delete me")
+        size_before = os.path.getsize(self.log_file)
+
+        self.store.mark_resolved(resolved['id'])
+        self.store.delete(deleted['id'])
+
+        assert os.path.getsize(self.log_file) == size_before
+        assert self.store.query(include_resolved=False)[0] == []
+
+        visible, _ = self.store.query(include_resolved=True)
+        assert [e['id'] for e in visible] == [resolved['id']]
+        assert visible[0]['resolved'] is True
+
+        stats = self.store.stats()
+        assert stats['total'] == 1
+        assert stats['resolved'] == 1
+        assert stats['unresolved'] == 0
+        assert stats['last_24h'] == 1
+
+    def test_legacy_json_is_migrated(self):
+        """An existing error_logs.json array is converted to the JSONL log."""
+        legacy_file = self.tmp_path / 'legacy_logs.json'
+        legacy = [
+            {"id": "b", "timestamp": datetime.now().isoformat(), "type": "System",
+             "message": "newer", "details": "", "user_id": "", "resolved": True},
+            {"id": "a", "timestamp": datetime.now().isoformat(), "type": "System",
+             "message": "older", "details": "", "user_id": "", "resolved": False},
+        ]
+        legacy_file.write_text(json.dumps(legacy), encoding='utf-8')
+
+        store = ErrorLogStore(str(self.tmp_path / 'legacy_logs.jsonl'))
+
+        assert not legacy_file.exists()
+        errors, _ = store.query(include_resolved=True)
+        assert [e['id'] for e in errors] == ["b", "a"]
+        assert errors[0]['resolved'] is True
+
+    def backdate_log(self, days: int):
+        """Rewrite every entry currently in the log as written ``days`` ago."""
+        day = (datetime.now() - timedelta(days=days)).date().isoformat()
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f]
+        with open(self.log_file, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                entry['timestamp'] = day + entry['timestamp'][10:]
+                f.write(json.dumps(entry) + "\n")
+
+    def test_maintenance_rotates_previous_day_and_applies_retention(self):
+        """Rotation archives yesterday's entries and retention removes old archives."""
+        entry = self.store.append("System", "yesterday")
+        self.store.delete(self.store.append("System", "deleted")['id'])
+        self.backdate_log(1)
+
+        old_archive = self.tmp_path / f"error_logs_{(datetime.now() - timedelta(days=40)).strftime('%Y%m%d')}.json"
+        old_archive.write_text("[]", encoding='utf-8')
+
+        removed = self.store.run_maintenance()
+
+        rotated = self.tmp_path / f"error_logs_{(datetime.now() - timedelta(days=1)).strftime('%Y%m%d')}.jsonl"
+        assert rotated.exists()
+        assert [json.loads(line)['id'] for line in rotated.read_text(encoding='utf-8').splitlines()] == [entry['id']]
+        assert not os.path.exists(self.log_file)
+        assert not old_archive.exists()
+        assert removed == 1
+        assert self.store.schedule_daily_maintenance() is False
+
+    def test_rotation_uses_entry_dates_not_mtime(self):
+        """Yesterday's entries are rotated even after an append today; today's entries stay."""
+        old = self.store.append("System", "yesterday")
+        self.store.mark_resolved(old['id'])
+        self.backdate_log(1)
+        fresh = self.store.append("System", "today")
+        self.store.mark_resolved(fresh['id'])
+
+        self.store.run_maintenance()
+
+        rotated = self.tmp_path / f"error_logs_{(datetime.now() - timedelta(days=1)).strftime('%Y%m%d')}.jsonl"
+        archived = [json.loads(line) for line in rotated.read_text(encoding='utf-8').splitlines()]
+        assert [(e['id'], e['resolved']) for e in archived] == [(old['id'], True)]
+
+        errors, _ = self.store.query(include_resolved=True)
+        assert [(e['id'], e['resolved']) for e in errors] == [(fresh['id'], True)]
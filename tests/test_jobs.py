@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Regression tests for background crew jobs.
+
+Run with: pytest tests/test_jobs.py -v
+"""
+
+import sys
+import os
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.jobs import CANCELLED, COMPLETED, FAILED, JobManager, JobSpec, format_event
+
+
+def echo_target(spec, reporter):
+    """Worker target that reports progress and echoes its spec."""
+    print(f"processing {spec.max_emails} emails")
+    reporter.log(f"model {spec.model}")
+    if spec.search_query == 'fail':
+        raise RuntimeError("boom")
+    return {'user_id': spec.user_id, 'search_query': spec.search_query}
+
+
+def slow_target(spec, reporter):
+    """Worker target that runs until cancelled."""
+    for _ in range(200):
+        reporter.check_cancelled()
+        time.sleep(0.05)
+    return {}
+
+
+def wait_for(manager, job_id, timeout=60):
+    """Wait until a job reaches a terminal state."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in (COMPLETED, FAILED, CANCELLED):
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+class TestJobs:
+    """Test job specs and the worker-backed job manager."""
+
+    def test_spec_round_trip(self):
+        """Specs survive the trip to the worker and ignore unknown keys."""
+        spec = JobSpec(user_id='user_1', model='anthropic/claude', search_query='is:starred', max_emails=5,
+                       user_api_keys={'openai': 'sk-test'})
+        data = spec.to_dict()
+        data['unknown'] = True
+
+        assert JobSpec.from_dict(data) == spec
+        assert spec.job_id != JobSpec(user_id='user_1').job_id
+        assert spec.output_dir.endswith(f"/user_1/{spec.run_id}")
+
+    def test_events_carry_current_agent_and_task(self):
+        """Progress events are tagged with the agent and task running when they were sent."""
+        import queue
+        from gmail_crew_ai.jobs import _JobReporter
+
+        events = queue.Queue()
+        reporter = _JobReporter('job1', events, {})
+        reporter.emit('agent', 'Categorizer started', agent='Categorizer', state='started')
+        reporter.emit('task', 'Task started: sort', task='sort', state='started')
+        reporter.emit('tool', 'gmail in 0.2s', tool='gmail', latency_ms=200)
+        reporter.emit('agent', 'Categorizer finished', agent='Categorizer', state='finished')
+        reporter.emit('llm', 'LLM call', model='m')
+
+        received = [events.get_nowait() for _ in range(5)]
+        assert received[2]['agent'] == 'Categorizer' and received[2]['task'] == 'sort'
+        assert 'agent' not in received[4] and received[4]['task'] == 'sort'
+
+    def test_jobs_run_in_workers_and_report_progress(self):
+        """Results, errors, output lines and cancellation all reach the manager."""
+        manager = JobManager(max_workers=1, target=echo_target)
+        try:
+            done = manager.submit(JobSpec(user_id='user_1', search_query='is:unread', max_emails=4,
+                                          capture_output=True))
+            failed = manager.submit(JobSpec(user_id='user_2', search_query='fail', max_emails=1))
+
+            job = wait_for(manager, done)
+            assert job['result'] == {'user_id': 'user_1', 'search_query': 'is:unread'}
+            job = wait_for(manager, failed)
+            assert job['status'] == FAILED and job['error'] == 'boom'
+
+            # Let the event pump drain the queue
+            time.sleep(1)
+            events, cursor = manager.events_since(done)
+            messages = [event['message'] for event in events]
+            assert 'processing 4 emails' in messages
+            assert 'model openai/gpt-4.1' in messages
+            assert manager.events_since(done, cursor) == ([], cursor)
+            # Output is only forwarded when the spec asks for it
+            assert 'processing 1 emails' not in [event['message'] for event in manager.events_since(failed)[0]]
+            assert 'Job completed' in format_event(events[-1])
+            assert manager.active_job('user_1') is None
+        finally:
+            manager.shutdown()
+
+        manager = JobManager(max_workers=1, target=slow_target)
+        try:
+            running_spec, queued_spec = JobSpec(user_id='user_1'), JobSpec(user_id='user_2')
+            running = manager.submit(running_spec)
+            queued = manager.submit(queued_spec)
+            assert manager.active_job('user_2') == queued
+            # Workspaces of active jobs are known up front so cleanup can skip them
+            assert manager.active_output_dirs() == [running_spec.output_dir, queued_spec.output_dir]
+            assert manager.active_output_dirs('user_2') == [queued_spec.output_dir]
+
+            time.sleep(1)
+            assert manager.cancel(queued)
+            assert manager.cancel(running)
+            assert wait_for(manager, running)['status'] == CANCELLED
+            assert wait_for(manager, queued)['status'] == CANCELLED
+        finally:
+            manager.shutdown()
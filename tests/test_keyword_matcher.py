@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the single-pass keyword matcher used by the persona tools.
+
+Run with: pytest tests/test_keyword_matcher.py -v
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.utils.keyword_matcher import KeywordMatcher
+
+
+class TestKeywordMatcher:
+    """Test that one scan matches the old per-keyword substring checks."""
+
+    def setup_method(self):
+        self.matcher = KeywordMatcher({
+            'formal': ['dear', 'regards', 'best regards'],
+            'closings': ['thanks', 'regards', 'best'],
+            'interests': ['AI', 'artificial intelligence'],
+            'family': ['son', 'family'],
+        })
+
+    def test_overlapping_keywords_are_all_credited(self):
+        """Keywords sharing a prefix or nested in a longer keyword are all found."""
+        scan = self.matcher.scan("Best Regards, and thanks for the AI demo")
+
+        assert scan.matched('formal') == ['regards', 'best regards']
+        assert scan.matched('closings') == ['thanks', 'regards', 'best']
+        assert scan.matched('interests') == ['AI']
+        assert not scan.has_any('family')
+
+    def test_matching_is_substring_based_like_the_old_checks(self):
+        """'son' inside 'person' still counts, as it did with ``in`` checks."""
+        text = "Ask the person in charge"
+        scan = self.matcher.scan(text)
+
+        assert scan.has('son') == ('son' in text.lower())
+        assert scan.count('son') == 1
+
+    def test_sentence_lookup_matches_split_on_periods(self):
+        """Sentences come from splitting on '.', honouring the minimum length."""
+        text = "My son. Spent the weekend with my son and family. Bye"
+        scan = self.matcher.scan(text)
+
+        assert scan.sentence('son') == "My son"
+        assert scan.sentence('son', min_length=10) == "Spent the weekend with my son and family"
+        assert scan.sentence('dear') is None
+
+    def test_matches_restricted_to_a_range(self):
+        """Range queries only report occurrences fully inside the range."""
+        text = "Hello\nthanks\nbest"
+        scan = self.matcher.scan(text)
+
+        assert scan.matched_between('closings', 0, 6) == []
+        assert scan.matched_between('closings', 6, len(text)) == ['thanks', 'best']
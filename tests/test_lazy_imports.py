@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Regression tests for lazily imported tools and authentication modules.
+
+Run with: pytest tests/test_lazy_imports.py -v
+"""
+
+import sys
+import os
+import json
+import subprocess
+
+# Add src to path for imports
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+sys.path.insert(0, SRC)
+
+from gmail_crew_ai.auth import oauth2_manager
+
+
+def modules_after_import(code):
+    """Top-level modules loaded by ``code`` in a fresh interpreter."""
+    script = f"import sys\n{code}\nimport json\nprint(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    completed = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                               env=dict(os.environ, PYTHONPATH=SRC), check=True)
+    return set(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+
+class TestLazyImports:
+    """Test that package imports defer CrewAI, Streamlit and the Google client."""
+
+    def test_packages_load_nothing_until_used(self):
+        """Importing the packages and the OAuth2 manager skips UI and API client libraries."""
+        loaded = modules_after_import(
+            "import gmail_crew_ai.tools, gmail_crew_ai.auth\n"
+            "from gmail_crew_ai.auth import OAuth2Manager")
+        assert not loaded & {'crewai', 'streamlit', 'googleapiclient', 'google_auth_oauthlib', 'pydantic'}
+
+        import gmail_crew_ai.tools as tools
+        assert 'DateCalculationTool' in dir(tools)
+        try:
+            tools.NotATool
+        except AttributeError:
+            pass
+        else:
+            raise AssertionError("Unknown tools must raise AttributeError")
+
+    def test_oauth_manager_works_without_streamlit(self, tmp_path, monkeypatch, capsys):
+        """Flows are kept on the manager and messages printed when there is no web app."""
+        monkeypatch.setitem(sys.modules, 'streamlit', None)
+        monkeypatch.chdir(tmp_path)
+        manager = oauth2_manager.OAuth2Manager()
+
+        manager._store_flow('oauth_flow_u1', 'flow')
+        assert manager._get_flow('oauth_flow_u1') == 'flow'
+        manager._drop_flow('oauth_flow_u1')
+        assert manager._get_flow('oauth_flow_u1') is None
+
+        oauth2_manager._notify('error', 'Authentication failed')
+        assert 'Authentication failed' in capsys.readouterr().out
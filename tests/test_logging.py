@@ -24,7 +24,7 @@ import pytest
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from common.logger import get_logger, exception_info
+from common.logger import get_logger, exception_info, flush_logging
 
 
 class TestLoggingSystem:
@@ -77,6 +77,9 @@ class TestLoggingSystem:
             # Log the exception using our logging system
             logger.exception("Regression test: dummy exception occurred")
         
+        # Records are written by a background thread
+        flush_logging()
+        
         # Verify app.log was created and has new content
         assert os.path.exists(self.app_log_path), "logs/app.log should be created"
         
@@ -253,6 +256,7 @@ class TestLoggingSystem:
                 
             except Exception:
                 exception_info(logger, "Integrated test: both app.log and error_logs.json should be updated")
+        flush_logging()
         
         # Verify both systems captured the exception
         
@@ -288,6 +292,7 @@ class TestLoggingSystem:
         
         # Test logging level
         logger.info("Configuration test message")
+        flush_logging()
         
         # Verify the log file exists and contains our message
         assert os.path.exists(self.app_log_path), "app.log should be created by configuration"
@@ -299,6 +304,113 @@ class TestLoggingSystem:
         assert "config_test_logger" in log_content  # Logger name should appear
 
 
+class TestAsyncLogging:
+    """Test the queue-based writer and the rate-limited Streamlit handler."""
+    
+    def test_writer_batches_records_off_the_calling_thread(self):
+        """Records are routed by logger, keep their traceback and are flushed per batch."""
+        import io
+        import logging
+        import queue
+        from common import logger as logger_module
+        
+        log_queue = queue.SimpleQueue()
+        app_stream, crew_stream = io.StringIO(), io.StringIO()
+        routes = {}
+        for route, stream in (('app', app_stream), ('crew', crew_stream)):
+            handler = logging.StreamHandler(stream)
+            handler.setFormatter(logging.Formatter('%(name)s: %(message)s'))
+            routes[route] = [handler]
+        
+        test_logger = logging.getLogger('async_test_logger')
+        test_logger.propagate = False
+        test_logger.addHandler(logger_module._RouteQueueHandler(log_queue, 'app'))
+        crew_logger = logging.getLogger('async_test_crew')
+        crew_logger.propagate = False
+        crew_logger.addHandler(logger_module._RouteQueueHandler(log_queue, 'crew'))
+        
+        try:
+            raise ValueError("queued traceback")
+        except ValueError:
+            test_logger.exception("failed %s", "step")
+        crew_logger.warning("crew only")
+        
+        # Nothing is written until the writer runs
+        assert app_stream.getvalue() == ""
+        
+        writer = logger_module._LogWriter(log_queue, routes)
+        request = logger_module._FlushRequest()
+        log_queue.put(request)
+        writer.start()
+        assert request.done.wait(5)
+        
+        assert "async_test_logger: failed step" in app_stream.getvalue()
+        assert "ValueError: queued traceback" in app_stream.getvalue()
+        assert "crew only" not in app_stream.getvalue()
+        assert "async_test_crew: crew only" in crew_stream.getvalue()
+    
+    def test_streamlit_handler_is_rate_limited(self, capsys):
+        """Only a few messages per window reach the UI; the next one reports the rest."""
+        import logging
+        from common.logger import StreamlitHandler
+        
+        handler = StreamlitHandler(max_messages=2, window_seconds=60)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        record = logging.LogRecord('ui', logging.ERROR, __file__, 1, "boom", None, None)
+        for _ in range(5):
+            handler.handle(record)
+        
+        assert handler.suppressed == 3
+        handler._shown.clear()
+        handler.handle(record)
+        assert "3 more log messages not shown" in capsys.readouterr().out
+        assert handler.suppressed == 0
+
+
+class TestStructuredLogging:
+    """Test the JSON formatter, correlation context and DEBUG sampling."""
+    
+    def make_record(self, level, message, **extra):
+        import logging
+        from common.logger import _ContextFilter
+        
+        record = logging.LogRecord('crew', level, __file__, 1, message, None, None)
+        record.__dict__.update(extra)
+        _ContextFilter().filter(record)
+        return record
+    
+    def test_json_records_carry_context_and_extra_fields(self):
+        """Context fields nest and reset; extra= data becomes JSON fields."""
+        import logging
+        from common.logger import JsonFormatter, get_log_context, log_context
+        
+        with log_context(run_id='job1', user_id='user_1'):
+            with log_context(agent='Categorizer', task=None):
+                record = self.make_record(logging.INFO, "Tool done", tool='gmail', latency_ms=12.5)
+                assert get_log_context() == {'run_id': 'job1', 'user_id': 'user_1', 'agent': 'Categorizer'}
+            outer = self.make_record(logging.WARNING, "Outer", agent='Responder')
+        assert get_log_context() == {}
+        
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry['message'] == "Tool done" and entry['level'] == 'INFO' and entry['logger'] == 'crew'
+        assert entry['run_id'] == 'job1' and entry['user_id'] == 'user_1' and entry['agent'] == 'Categorizer'
+        assert entry['tool'] == 'gmail' and entry['latency_ms'] == 12.5
+        assert 'task' not in entry and 'args' not in entry
+        
+        entry = json.loads(JsonFormatter().format(outer))
+        assert entry['agent'] == 'Responder' and entry['run_id'] == 'job1'
+    
+    def test_debug_sampling(self):
+        """Sampling drops DEBUG records only."""
+        import logging
+        from common.logger import _DebugSampler
+        
+        sampler = _DebugSampler(0.0)
+        assert not sampler.filter(self.make_record(logging.DEBUG, "noise"))
+        assert sampler.filter(self.make_record(logging.INFO, "kept"))
+        assert _DebugSampler(1.0).filter(self.make_record(logging.DEBUG, "kept"))
+
+
 class TestPSReadLineFix:
     """Test PSReadLine PowerShell profile fix (manual verification required)."""
     
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Regression tests for cached mailbox statistics.
+
+Run with: pytest tests/test_mailbox_stats.py -v
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.utils.mailbox_stats import MailboxStatsService
+
+
+LABELS = {
+    'UNREAD': {'messagesTotal': 40, 'messagesUnread': 40},
+    'STARRED': {'messagesTotal': 7, 'messagesUnread': 1},
+    'IMPORTANT': {'messagesTotal': 25, 'messagesUnread': 3},
+    'CATEGORY_PROMOTIONS': {'messagesTotal': 300, 'messagesUnread': 30},
+}
+
+
+class FakeRequest:
+    def __init__(self, service, kind, key):
+        self.service, self.kind, self.key = service, kind, key
+
+    def execute(self):
+        self.service.executed.append((self.kind, self.key))
+        if self.kind == 'label':
+            return LABELS.get(self.key, {'messagesTotal': 0, 'messagesUnread': 0})
+        if self.kind == 'profile':
+            return {'messagesTotal': 1000}
+        return {'resultSizeEstimate': len(self.key)}
+
+
+class FakeBatch:
+    def __init__(self, service, callback):
+        self.service, self.callback, self.requests = service, callback, []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batches += 1
+        for request_id, request in self.requests:
+            self.callback(request_id, request.execute(), None)
+
+
+class FakeGmail:
+    """Just enough of the Gmail API service for the statistics queries."""
+
+    def __init__(self, batching=True):
+        self.executed = []
+        self.batches = 0
+        if batching:
+            self.new_batch_http_request = lambda callback: FakeBatch(self, callback)
+
+    def users(self):
+        return self
+
+    def labels(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, userId, id):
+        return FakeRequest(self, 'label', id)
+
+    def list(self, userId, q, maxResults):
+        return FakeRequest(self, 'query', q)
+
+    def getProfile(self, userId):
+        return FakeRequest(self, 'profile', 'me')
+
+
+class TestMailboxStats:
+    """Test label-counter statistics, batching and per-user caching."""
+
+    def test_counts_come_from_one_batch_and_are_cached(self):
+        """Overview and breakdown use label counters; reruns reuse the cached values."""
+        service = FakeGmail()
+        built = []
+
+        def factory():
+            built.append(1)
+            return service
+
+        stats = MailboxStatsService(ttl_seconds=60)
+        assert stats.get_overview('user_1', factory) == {'total': 1000, 'unread': 40, 'read': 960}
+        assert stats.get_overview('user_1', factory)['total'] == 1000
+        assert len(built) == 1 and service.batches == 1
+
+        rows = {row['Category']: row for row in stats.get_category_breakdown('user_1', factory, 'read')}
+        assert rows['Promotions'] == {'Category': 'Promotions', 'Count': 270, 'Query': 'category:promotions is:read'}
+        assert stats.get_category_breakdown('user_1', factory, 'unread')[0]['Count'] == 30
+        assert len(built) == 2 and service.batches == 2
+        assert all(kind == 'label' for kind, _ in service.executed if _ != 'me')
+
+        stats.invalidate('user_1')
+        stats.get_overview('user_1', factory)
+        assert len(built) == 3
+
+    def test_analytics_fall_back_to_search_estimates_without_batching(self):
+        """Metrics without a label use messages.list; services without batch support still work."""
+        service = FakeGmail(batching=False)
+        rows = {row['Metric']: row['Count'] for row in MailboxStatsService().get_advanced_analytics('u', lambda: service)}
+
+        assert rows[' Starred'] == 7
+        assert rows[' Important'] == 25
+        assert rows[' Last 7 Days'] == len('newer_than:7d')
+        assert ('query', 'has:attachment') in service.executed
+        assert ('query', 'is:starred') not in service.executed
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the shared Gmail message representation.
+
+Run with: pytest tests/test_parsed_message.py -v
+"""
+
+import importlib.util
+import os
+
+# Load the module by path; the tools package imports CrewAI on import
+MODULE_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'gmail_crew_ai', 'tools', 'parsed_message.py')
+spec = importlib.util.spec_from_file_location('parsed_message', MODULE_PATH)
+parsed_message = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(parsed_message)
+
+
+def gmail_message(headers, label_ids=None, internal_date='1700000000000'):
+    """Build a Gmail API message resource."""
+    return {
+        'id': 'm1',
+        'threadId': 't1',
+        'labelIds': label_ids or [],
+        'internalDate': internal_date,
+        'payload': {'headers': [{'name': name, 'value': value} for name, value in headers]},
+    }
+
+
+class TestParsedMessage:
+    """Test header indexing, address parsing and label flags."""
+
+    def test_headers_are_case_insensitive_and_first_wins(self):
+        """Header lookups ignore case; a repeated header keeps its first value."""
+        message = parsed_message.ParsedMessage(gmail_message([
+            ('SUBJECT', 'Quarterly report'),
+            ('Received', 'first hop'),
+            ('received', 'second hop'),
+        ]))
+
+        assert message.subject == 'Quarterly report'
+        assert message.header('Received') == 'first hop'
+        assert message.header('In-Reply-To') == ''
+        assert message.internal_date == 1700000000000
+
+    def test_addresses_are_decoded(self):
+        """Quoted commas do not split addresses and encoded display names are decoded."""
+        message = parsed_message.ParsedMessage(gmail_message([
+            ('From', '=?utf-8?q?Ren=C3=A9e?= <renee@example.com>'),
+            ('To', '"Doe, Jane" <jane@example.com>, bob@corp.io, undisclosed-recipients:;'),
+        ]))
+
+        assert message.addresses('from') == [('Renée', 'renee@example.com')]
+        assert message.sender_address == 'renee@example.com'
+        assert message.to_addresses == ['jane@example.com', 'bob@corp.io']
+        assert message.cc_addresses == []
+
+    def test_labels_fold_into_flags(self):
+        """System labels set flags; other labels are kept as custom labels."""
+        message = parsed_message.ParsedMessage(gmail_message(
+            [], label_ids=['INBOX', 'UNREAD', 'CATEGORY_UPDATES', 'Label_42']))
+
+        assert message.has_label(parsed_message.UNREAD)
+        assert message.has_label(parsed_message.INBOX)
+        assert not message.has_label(parsed_message.STARRED)
+        assert message.custom_labels == ['Label_42']
+
+    def test_timestamp_falls_back_to_date_header(self):
+        """Messages without internalDate sort by their Date header."""
+        message = parsed_message.ParsedMessage(gmail_message(
+            [('Date', 'Tue, 14 Nov 2023 22:13:20 +0000')], internal_date=None))
+
+        assert message.internal_date == 0
+        assert message.timestamp_ms == 1700000000000
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the incremental persona statistics and per-user knowledge files.
+
+Run with: pytest tests/test_persona_state.py -v
+"""
+
+import sys
+import os
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.utils.persona_state import PersonaState, parse_recipient_addresses
+from gmail_crew_ai.utils.knowledge_store import KnowledgeStore
+
+
+def sent_email(email_id, internal_date, to, subject="Project update", body="Hi Sam\nThe project meeting moved.\nBest regards"):
+    """Build a sent email in the tool tuple format."""
+    thread_info = {'to': to, 'cc': '', 'internal_date': internal_date}
+    return (subject, 'me@example.com', body, email_id, thread_info)
+
+
+class TestPersonaState:
+    """Test incremental updates, persistence and rendering of persona state."""
+
+    @pytest.fixture(autouse=True)
+    def setup_state(self, tmp_path):
+        """Create a state backed by a temporary file."""
+        self.state_file = str(tmp_path / 'persona_state.json')
+        self.state = PersonaState('user_1', state_file=self.state_file)
+
+    def test_recipients_are_parsed_and_normalized(self):
+        """Display names with commas do not split addresses."""
+        addresses = parse_recipient_addresses('"Doe, Jane" <Jane@Example.com>, bob@corp.io', 'jane@example.com')
+
+        assert addresses == ['jane@example.com', 'bob@corp.io']
+
+    def test_contacts_ranked_across_to_and_cc(self):
+        """Every To/Cc recipient counts once per email; display names and the user's own address are handled."""
+        emails = [
+            ('Plan', 'me@example.com', 'Hello', 'a',
+             {'to': '"Doe, Jane" <Jane@Example.com>, Bob <bob@corp.io>', 'cc': 'Me <ME@example.com>',
+              'internal_date': 1000}),
+            ('Plan', 'me@example.com', 'Hello', 'b',
+             {'to': 'jane@example.com', 'cc': 'carol@corp.io, "Bob (work)" <BOB@corp.io>',
+              'internal_date': 2000}),
+            ('Plan', 'me@example.com', 'Hello', 'c',
+             {'to': 'Jane <jane@example.com>, jane@example.com', 'cc': '', 'internal_date': 3000}),
+        ]
+        assert self.state.rebuild(emails, 'Me@Example.com') == 3
+
+        data = self.state.data
+        assert data['recipients'].most_common() == [
+            ('jane@example.com', 3), ('bob@corp.io', 2), ('carol@corp.io', 1)]
+        assert data['domains'].most_common() == [('example.com', 3), ('corp.io', 3)]
+        assert 'me@example.com' not in data['recipients']
+
+        facts = self.state.render_facts()
+        contacts = facts.split('Frequent Email Contacts:\n', 1)[1].split('\n\n', 1)[0]
+        assert contacts == "- jane@example.com\n- bob@corp.io\n- carol@corp.io"
+
+    def test_only_mail_newer_than_watermark_is_added(self):
+        """Re-feeding analyzed mail leaves the counts unchanged."""
+        first = [sent_email('a', 1000, 'jane@example.com'), sent_email('b', 2000, 'bob@corp.io')]
+        assert self.state.rebuild(first, 'me@example.com') == 2
+        assert self.state.watermark_seconds == 2
+
+        newer = first + [sent_email('c', 3000, 'Jane <jane@example.com>, me@example.com')]
+        assert self.state.add_emails(newer) == 1
+
+        data = self.state.data
+        assert data['total_emails'] == 3
+        assert data['recipients'].most_common(1) == [('jane@example.com', 2)]
+        assert 'me@example.com' not in data['recipients']
+        assert data['style']['professional_count'] == 3
+        assert data['last_update']['emails'] == 1
+        assert data['last_update']['new_contacts'] == []
+
+    def test_update_accumulates_across_batches(self):
+        """An update fed in several batches reports every email, not just the last batch."""
+        self.state.rebuild([sent_email('a', 1000, 'jane@example.com')], 'me@example.com')
+        emails = [sent_email(f'n{index}', 2000 + index * 1000, f'contact{index}@corp.io') for index in range(250)]
+
+        update = self.state.new_update()
+        for start in range(0, len(emails), 100):
+            assert self.state.add_emails(emails[start:start + 100], update=update) == len(emails[start:start + 100])
+        assert self.state.data['last_update'] is None
+        self.state.record_update(update)
+
+        last_update = self.state.data['last_update']
+        assert last_update['emails'] == 250
+        assert len(last_update['new_contacts']) == 250
+        assert last_update['style']['professional_count'] == 250
+        assert "Recent Emails Analyzed: 250" in self.state.render_facts()
+
+    def test_state_round_trips_and_renders_facts(self):
+        """Saved counters are reloaded and rendered into the persona text."""
+        self.state.rebuild([sent_email('a', 1000, 'jane@example.com')], 'me@example.com')
+        self.state.save()
+
+        reloaded = PersonaState('user_1', state_file=self.state_file)
+        facts = reloaded.render_facts()
+
+        assert reloaded.has_data()
+        assert "Email Address: me@example.com" in facts
+        assert "- jane@example.com" in facts
+        assert "- Project: mentioned 2 times" in facts
+        assert "Total Emails Analyzed: 1" in facts
+        assert "RECENT UPDATES" not in facts
+
+
+class TestPersonaUpdaterTool:
+    """Test the updater tool's batched refresh against a fake Gmail listing."""
+
+    def test_update_larger_than_one_batch(self, tmp_path, monkeypatch):
+        """More new mail than one batch is analyzed oldest first and summarized as one update."""
+        pytest.importorskip('crewai')
+        from types import SimpleNamespace
+        from gmail_crew_ai.tools import gmail_oauth_tools
+
+        monkeypatch.chdir(tmp_path)
+        state = PersonaState('user_1')
+        state.rebuild([sent_email('old', 1000, 'jane@example.com')], 'me@example.com')
+        state.save()
+
+        total = gmail_oauth_tools.PERSONA_UPDATE_BATCH_SIZE * 2 + 50
+        newest_first = [f'm{index}' for index in range(total, 0, -1)]
+        fetched = []
+
+        def fetch_emails(tool, message_ids):
+            fetched.append(list(message_ids))
+            return [sent_email(message_id, 1000 + int(message_id[1:]) * 1000, f'{message_id}@corp.io')
+                    for message_id in message_ids]
+
+        monkeypatch.setattr(gmail_oauth_tools.OAuth2GetSentEmailsTool, 'list_message_ids',
+                            lambda tool, after_timestamp=None, limit=None: list(newest_first))
+        monkeypatch.setattr(gmail_oauth_tools.OAuth2GetSentEmailsTool, 'fetch_emails', fetch_emails)
+        oauth_manager = SimpleNamespace(get_user_email=lambda user_id: 'me@example.com')
+
+        tool = gmail_oauth_tools.OAuth2UserPersonaUpdaterTool(user_id='user_1', oauth_manager=oauth_manager)
+        message = tool._run()
+
+        assert f"{total} new sent emails" in message
+        assert fetched[0][0] == 'm1' and len(fetched) == 3
+        last_update = PersonaState('user_1').data['last_update']
+        assert last_update['emails'] == total
+        assert f"Recent Emails Analyzed: {total}" in KnowledgeStore('user_1').read_facts()
+
+
+class TestKnowledgeStore:
+    """Test per-user persona files and the cached reader."""
+
+    def test_users_do_not_share_facts(self, tmp_path):
+        """Each user reads only their own persona."""
+        alice = KnowledgeStore('alice', str(tmp_path / 'alice'))
+        bob = KnowledgeStore('bob', str(tmp_path / 'bob'))
+
+        alice.write_facts("Alice persona")
+
+        assert alice.read_facts() == "Alice persona"
+        assert bob.read_facts() == ""
+
+    def test_cache_follows_persona_changes(self, tmp_path):
+        """A changed persona file is re-read; an unchanged one is served from cache."""
+        store = KnowledgeStore('alice', str(tmp_path / 'alice'))
+        store.write_facts("first")
+        assert store.read_facts() == "first"
+
+        with open(store.facts_file, 'w', encoding='utf-8') as f:
+            f.write("second version")
+        assert store.read_facts() == "second version"
+
+        store.clear_facts()
+        assert store.read_facts() == ""
+
+    def test_legacy_shared_persona(self, tmp_path, monkeypatch):
+        """Single-user crews read the shared persona file, which also marks users as having a persona."""
+        monkeypatch.chdir(tmp_path)
+        alice = KnowledgeStore('alice', str(tmp_path / 'alice'))
+        assert not alice.has_legacy_facts()
+
+        (tmp_path / 'knowledge').mkdir()
+        (tmp_path / 'knowledge' / 'user_facts.txt').write_text("Shared persona", encoding='utf-8')
+
+        assert KnowledgeStore.legacy().read_facts() == "Shared persona"
+        assert alice.read_facts() == ""
+        assert alice.has_legacy_facts()
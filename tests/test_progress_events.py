@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Regression tests for typed progress events.
+
+Run with: pytest tests/test_progress_events.py -v
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.utils.activity_log import ActivityLog
+from gmail_crew_ai.utils.progress_events import ProgressCallbackHandler, emit_progress, progress_sink
+
+
+class TestProgressEvents:
+    """Test the progress sink and the LiteLLM callback."""
+
+    def test_events_reach_the_active_sink_only(self):
+        """Events are dropped without a sink and delivered with their data inside progress_sink."""
+        received = []
+        emit_progress('agent', 'Categorizer started')
+
+        with progress_sink(lambda kind, message, **data: received.append((kind, message, data))):
+            emit_progress('tool', 'OAuth2GetUnreadEmailsTool in 0.4s', tool='OAuth2GetUnreadEmailsTool', latency_ms=412.0)
+        emit_progress('agent', 'Categorizer finished')
+
+        assert received == [('tool', 'OAuth2GetUnreadEmailsTool in 0.4s',
+                             {'tool': 'OAuth2GetUnreadEmailsTool', 'latency_ms': 412.0})]
+
+    def test_llm_calls_report_tokens_and_latency(self):
+        """A completed LiteLLM call becomes an 'llm' activity event with usage data."""
+        log = ActivityLog()
+        response = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=1200, completion_tokens=300), model='gpt-4.1')
+        start = datetime(2025, 1, 1, 12, 0, 0)
+
+        with progress_sink(lambda kind, message, **data: log.add_job_event({'kind': kind, 'message': message, **data})):
+            ProgressCallbackHandler().log_success_event({'model': 'openai/gpt-4.1'}, response,
+                                                       start, start + timedelta(seconds=2))
+
+        event = log.since(0)[0]
+        assert event.kind == 'llm' and event.icon == ''
+        assert event.message == 'LLM call openai/gpt-4.1: 1200+300 tokens in 2.0s'
+        assert event.data == {'model': 'openai/gpt-4.1', 'input_tokens': 1200, 'output_tokens': 300, 'latency_ms': 2000.0}
+        assert '🧠' in event.format()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the shared token-bucket rate limiter.
+
+Run with: pytest tests/test_rate_limiter.py -v
+"""
+
+import sys
+import os
+import sqlite3
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.utils import rate_limiter as rate_limiter_module
+from gmail_crew_ai.utils.rate_limiter import RateLimiter, WAITER_TIMEOUT_SECONDS
+
+MODEL = 'openai/test-model'
+
+
+class FakeClock:
+    """Stand-in for time.time that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class TestRateLimiter:
+    """Test bucket refill, usage reconciliation, FIFO waiters and lazy storage."""
+
+    @pytest.fixture(autouse=True)
+    def setup_limiter(self, tmp_path, monkeypatch):
+        """Create a limiter on a temporary database with a controllable clock."""
+        self.clock = FakeClock()
+        monkeypatch.setattr(rate_limiter_module.time, 'time', self.clock)
+        self.limiter = RateLimiter(db_path=str(tmp_path / 'rate_limiter.db'), default_model=MODEL)
+        self.limiter.set_limits(MODEL, rpm=60, tpm=600)
+
+    def test_bucket_refills_over_time(self):
+        """Spent budget comes back linearly over a minute, capped at capacity."""
+        assert self.limiter.try_acquire(600, MODEL)
+        assert not self.limiter.try_acquire(300, MODEL)
+
+        self.clock.advance(30)
+        assert self.limiter.try_acquire(300, MODEL)
+        assert not self.limiter.can_make_request(1, MODEL)
+
+        self.clock.advance(600)
+        stats = self.limiter.get_usage_stats(MODEL)
+        assert stats['current_usage'] == 0 and stats['max_limit'] == 600
+        assert stats['requests_in_window'] == 0
+
+    def test_record_usage_can_leave_negative_debt(self):
+        """Usage above the reservation drives the bucket below zero until the refill repays it."""
+        assert self.limiter.try_acquire(100, MODEL)
+        self.limiter.record_usage(700, estimated_tokens=100, model=MODEL)
+        assert self.limiter.get_usage_stats(MODEL)['current_usage'] == 700
+
+        self.clock.advance(10)  # refills 100 tokens: back to zero
+        assert not self.limiter.can_make_request(1, MODEL)
+        self.clock.advance(1)
+        assert self.limiter.can_make_request(10, MODEL)
+
+        # Usage below the reservation hands the difference back
+        before = self.limiter.get_usage_stats(MODEL)['current_usage']
+        assert self.limiter.try_acquire(10, MODEL)
+        self.limiter.record_usage(0, estimated_tokens=10, model=MODEL)
+        assert self.limiter.get_usage_stats(MODEL)['current_usage'] == before
+
+    def test_waiters_are_served_in_fifo_order(self):
+        """Only the head of the queue may take budget, even when a later waiter would fit."""
+        assert self.limiter.try_acquire(600, MODEL)
+        key = self.limiter._bucket_key(MODEL)
+        first = self.limiter._enqueue(key, 250)
+        second = self.limiter._enqueue(key, 10)
+
+        self.clock.advance(5)  # 50 tokens: enough for the second waiter only
+        assert not self.limiter._attempt(key, 250, first)[0]
+        granted, wait = self.limiter._attempt(key, 10, second)
+        assert not granted and wait > 0
+        assert not self.limiter.try_acquire(10, MODEL)
+
+        self.clock.advance(26)  # 310 tokens: the first waiter, then the second
+        assert self.limiter._attempt(key, 250, first) == (True, 0.0)
+        assert self.limiter._attempt(key, 10, second) == (True, 0.0)
+        assert self.limiter.get_usage_stats(MODEL)['waiting'] == 0
+
+    def test_abandoned_tickets_expire(self):
+        """A waiter that stops polling is dropped from the queue after the timeout."""
+        key = self.limiter._bucket_key(MODEL)
+        self.limiter._enqueue(key, 10)
+        assert not self.limiter.try_acquire(10, MODEL)
+        assert self.limiter.get_usage_stats(MODEL)['waiting'] == 1
+
+        self.clock.advance(WAITER_TIMEOUT_SECONDS + 1)
+        assert self.limiter.try_acquire(10, MODEL)
+        assert self.limiter.get_usage_stats(MODEL)['waiting'] == 0
+
+    def test_wait_for_capacity_does_not_reserve(self):
+        """Waiting for capacity leaves the budget for the call that follows."""
+        assert self.limiter.wait_for_capacity(600, MODEL, timeout=0)
+        self.limiter.wait_if_needed(600, MODEL)
+        assert self.limiter.get_usage_stats(MODEL)['current_usage'] == 0
+
+        assert self.limiter.try_acquire(600, MODEL)
+        assert not self.limiter.wait_for_capacity(100, MODEL, timeout=0)
+
+    def test_database_is_created_on_first_use(self, tmp_path, monkeypatch):
+        """Constructing a limiter creates no files; the first call does, at an absolute path."""
+        workdir = tmp_path / 'workdir'
+        workdir.mkdir()
+        monkeypatch.chdir(workdir)
+        monkeypatch.delenv('RATE_LIMITER_DB', raising=False)
+        monkeypatch.setattr(rate_limiter_module.os.path, 'exists',
+                            lambda path: False if path == '/app/data' else os.path.lexists(path))
+        limiter = RateLimiter(default_model=MODEL)
+        assert not (workdir / 'rate_limiter.db').exists()
+
+        assert limiter.try_acquire(1, MODEL)
+        assert limiter.db_path == str(workdir / 'rate_limiter.db')
+        with sqlite3.connect(limiter.db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM buckets").fetchone()[0] == 1
+
+        configured = tmp_path / 'data' / 'limits.db'
+        configured.parent.mkdir()
+        monkeypatch.setenv('RATE_LIMITER_DB', str(configured))
+        assert RateLimiter().db_path == str(configured)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the report repository.
+
+Run with: pytest tests/test_report_repository.py -v
+"""
+
+import sys
+import os
+import json
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.utils.report_repository import ReportRepository, page_slice
+
+
+def write_report(path, data, mtime):
+    """Write a JSON report with a fixed modification time."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.utime(path, (mtime, mtime))
+
+
+class TestReportRepository:
+    """Test report indexing, memoization and paging."""
+
+    def test_reports_are_parsed_once_until_they_change(self, tmp_path):
+        """Reruns reuse parsed content; a rewritten file is parsed again."""
+        repository = ReportRepository()
+        path = str(tmp_path / 'categorization_report.json')
+        write_report(path, {'emails': [{'email_id': 'm1'}]}, 1000)
+
+        assert repository.load(path) == {'emails': [{'email_id': 'm1'}]}
+        assert repository.load(path) is repository.load(path)
+        assert repository.parse_count == 1
+
+        write_report(path, {'emails': [{'email_id': 'm1'}, {'email_id': 'm2'}]}, 2000)
+        assert len(repository.load(path)['emails']) == 2
+        assert repository.parse_count == 2
+        assert repository.load_optional(str(tmp_path / 'missing.json')) is None
+
+    def test_listing_and_downloads_do_not_parse(self, tmp_path):
+        """Reports are listed newest first from metadata; raw text is served without parsing."""
+        repository = ReportRepository()
+        write_report(str(tmp_path / 'old.json'), [], 1000)
+        write_report(str(tmp_path / 'new.json'), {'summary': 'ok'}, 2000)
+        (tmp_path / 'notes.txt').write_text('ignored')
+
+        reports = repository.list_reports(str(tmp_path))
+        assert [report.name for report in reports] == ['new.json', 'old.json']
+        assert reports[0].size == len('{"summary": "ok"}')
+        assert json.loads(repository.read_text(reports[0].path)) == {'summary': 'ok'}
+        assert repository.parse_count == 0
+        assert repository.list_reports(str(tmp_path / 'missing')) == []
+
+    def test_page_slices_are_clamped(self):
+        """Pages cover all records and out-of-range pages fall back to the nearest one."""
+        assert page_slice(120, 0, 50) == (slice(0, 50), 3)
+        assert page_slice(120, 2, 50) == (slice(100, 120), 3)
+        assert page_slice(120, 9, 50) == (slice(100, 120), 3)
+        assert page_slice(0) == (slice(0, 0), 1)
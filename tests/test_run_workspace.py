@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Regression tests for per-run output workspaces.
+
+Run with: pytest tests/test_run_workspace.py -v
+"""
+
+import sys
+import os
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from gmail_crew_ai.utils.run_workspace import (
+    RunWorkspace, collect_garbage, latest_run_dir, list_runs, remove_user_runs,
+)
+from gmail_crew_ai.utils.context_projection import get_task_projection
+
+
+def make_run(root, user_id, run_id, age_days=0.0, files=('fetched_emails.json',)):
+    """Create a workspace with files and a modification time in the past."""
+    workspace = RunWorkspace(user_id, run_id, root=root).create()
+    for name in files:
+        with open(workspace.path(name), 'w', encoding='utf-8') as f:
+            f.write('[]')
+    stamp = time.time() - age_days * 86400
+    os.utime(workspace.dir, (stamp, stamp))
+    return workspace
+
+
+class TestRunWorkspace:
+    """Test workspace layout, lookup and garbage collection."""
+
+    def test_runs_are_isolated_per_user_and_run(self, tmp_path):
+        """Two runs never share a directory and placeholders resolve per run."""
+        root = str(tmp_path / 'runs')
+        first = RunWorkspace('user_1', root=root)
+        second = RunWorkspace('user_1', root=root)
+        other = RunWorkspace('../user_2', 'r1', root=root)
+
+        assert first.dir != second.dir
+        assert other.dir == f"{root}/_user_2/r1"
+        assert first.resolve("Read '{output_dir}/fetched_emails.json'") == f"Read '{first.dir}/fetched_emails.json'"
+
+        projection = get_task_projection(
+            {'context_projection': {'{output_dir}/fetched_emails.json': ['id', 'age']}}, 'output/runs/u/r1')
+        assert projection == {'output/runs/u/r1/fetched_emails.json': ['id', 'age']}
+
+    def test_latest_run_prefers_runs_with_reports(self, tmp_path):
+        """The UI shows the newest run that produced reports."""
+        root = str(tmp_path / 'runs')
+        finished = make_run(root, 'user_1', 'r1', age_days=1, files=('fetched_emails.json', 'categorization_report.json'))
+        in_progress = make_run(root, 'user_1', 'r2')
+
+        assert list_runs('user_1', root) == [in_progress.dir, finished.dir]
+        assert latest_run_dir('user_1', root, required_file='categorization_report.json') == finished.dir
+        assert latest_run_dir('user_2', root) is None
+
+    def test_garbage_collection_keeps_recent_and_protected_runs(self, tmp_path):
+        """Runs past the per-user limit or age are removed; the newest and protected ones stay."""
+        root = str(tmp_path / 'runs')
+        runs = [make_run(root, 'user_1', f'r{index}', age_days=index) for index in range(5)]
+        stale = make_run(root, 'user_2', 'old', age_days=30)
+        stale_protected = make_run(root, 'user_2', 'older', age_days=40)
+        newest = make_run(root, 'user_2', 'new')
+
+        removed = collect_garbage(root, keep_per_user=2, max_age_days=14, protect=[stale_protected.dir])
+
+        assert removed == 4
+        assert list_runs('user_1', root) == [runs[0].dir, runs[1].dir]
+        assert list_runs('user_2', root) == [newest.dir, stale_protected.dir]
+        assert not os.path.exists(stale.dir)
+
+    def test_remove_user_runs_skips_protected_runs(self, tmp_path):
+        """Clearing a user's cache leaves active runs and other users alone."""
+        root = str(tmp_path / 'runs')
+        old = make_run(root, 'user_1', 'old', age_days=1)
+        active = make_run(root, 'user_1', 'active')
+        other = make_run(root, 'user_2', 'other')
+
+        assert remove_user_runs('user_1', root, protect=[active.dir]) == 1
+        assert list_runs('user_1', root) == [active.dir]
+        assert list_runs('user_2', root) == [other.dir]
+        assert not os.path.exists(old.dir)
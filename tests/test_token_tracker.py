@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Regression tests for token usage accounting.
+
+Run with: pytest tests/test_token_tracker.py -v
+"""
+
+import sys
+import os
+import subprocess
+import pytest
+
+# Add src to path for imports
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, SRC)
+
+from gmail_crew_ai.utils.token_tracker import TokenUsageTracker
+
+# The utils package re-exports the tracker instance under the module's name
+token_tracker_module = sys.modules[TokenUsageTracker.__module__]
+
+
+class TestTokenUsageTracker:
+    """Test session attribution and the summary consumed by the usage report."""
+
+    @pytest.fixture(autouse=True)
+    def setup_tracker(self, tmp_path):
+        """Create a tracker backed by a temporary database."""
+        self.tracker = TokenUsageTracker(str(tmp_path / 'token_usage.db'))
+
+    def test_summary_is_empty_without_sessions(self):
+        """A user without sessions gets zeroed totals."""
+        summary = self.tracker.get_usage_summary('nobody')
+
+        assert summary['total_sessions'] == 0
+        assert summary['total_tokens'] == 0
+        assert summary['recent_sessions'] == []
+
+    def test_calls_are_attributed_to_session_and_agent(self):
+        """Calls made inside a session roll up per agent and per user."""
+        with self.tracker.session('user_1', 'anthropic/claude') as session:
+            self.tracker.set_agent('Categorizer')
+            self.tracker.record_call('claude', 1000, 200, cost=0.01, latency_ms=800)
+            self.tracker.set_agent('Cleaner')
+            self.tracker.record_call('claude', 300, 50, cost=0.002, latency_ms=200)
+            self.tracker.record_call('claude', 300, 50, cost=0.002, latency_ms=400)
+            session['emails_processed'] = 7
+
+        summary = self.tracker.get_usage_summary('user_1')
+
+        assert summary['total_sessions'] == 1
+        assert summary['total_tokens'] == 1900
+        assert summary['total_cost'] == pytest.approx(0.014)
+
+        latest = summary['recent_sessions'][-1]
+        assert latest['model'] == 'anthropic/claude'
+        assert latest['emails_processed'] == 7
+        assert latest['avg_cost_per_email'] == pytest.approx(0.002)
+        assert latest['agents']['Categorizer']['total_tokens'] == 1200
+        assert latest['agents']['Cleaner']['calls'] == 2
+        assert latest['agents']['Cleaner']['avg_latency_ms'] == pytest.approx(300)
+
+    def test_calls_outside_a_session_are_not_attributed_to_a_user(self):
+        """Calls after a session ends do not count towards that user."""
+        with self.tracker.session('user_1'):
+            self.tracker.record_call('gpt-4o', 10, 10)
+        self.tracker.record_call('gpt-4o', 500, 500)
+
+        assert self.tracker.get_usage_summary('user_1')['total_tokens'] == 20
+
+
+class TestTrackerStorage:
+    """Test that the database is only created when the tracker is used."""
+
+    def test_importing_utils_creates_no_files(self, tmp_path):
+        """Importing the utils package, and with it the global tracker, leaves the directory empty."""
+        subprocess.run([sys.executable, '-c', 'import gmail_crew_ai.utils.activity_log'], cwd=tmp_path,
+                       env=dict(os.environ, PYTHONPATH=SRC), check=True)
+        assert os.listdir(tmp_path) == []
+
+    def test_database_is_created_on_first_use(self, tmp_path, monkeypatch):
+        """The default database is created at an absolute path by the first call."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(token_tracker_module.os.path, 'exists',
+                            lambda path: False if path == '/app/data' else os.path.lexists(path))
+        tracker = TokenUsageTracker()
+        assert not (tmp_path / 'token_usage.db').exists()
+
+        tracker.start_session('user_1', 'openai/gpt-4o')
+        assert tracker.db_path == str(tmp_path / 'token_usage.db')
+        assert tracker.get_usage_summary('user_1')['total_sessions'] == 1
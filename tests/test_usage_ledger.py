@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the append-only usage ledger.
+
+Run with: pytest tests/test_usage_ledger.py -v
+"""
+
+import importlib.util
+import json
+import os
+import sys
+from datetime import datetime, date
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Load the module by path; the billing package imports Stripe on import
+MODULE_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'gmail_crew_ai', 'billing', 'usage_ledger.py')
+spec = importlib.util.spec_from_file_location('usage_ledger', MODULE_PATH)
+usage_ledger = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(usage_ledger)
+
+UsageLedger = usage_ledger.UsageLedger
+
+
+class TestUsageLedger:
+    """Test event appends, rollup checkpoints, log replay and legacy import."""
+
+    @pytest.fixture(autouse=True)
+    def setup_paths(self, tmp_path):
+        """Keep the event log and checkpoint in a temporary directory."""
+        self.events_file = str(tmp_path / 'usage_events.jsonl')
+        self.rollups_file = str(tmp_path / 'usage_rollups.json')
+
+    def make_ledger(self):
+        return UsageLedger(self.events_file, self.rollups_file, flush_interval=3600)
+
+    def test_append_writes_events_and_rolls_up(self):
+        """Each event is one JSON line and lands in the daily and monthly totals."""
+        ledger = self.make_ledger()
+        ledger.append('user_1', emails=3, tokens=100, model='claude', timestamp=datetime(2025, 3, 1, 9))
+        ledger.append('user_1', emails=2, tokens=50, model='gpt', timestamp=datetime(2025, 3, 1, 17))
+        ledger.append('user_1', emails=4, timestamp=datetime(2025, 3, 2, 8))
+
+        with open(self.events_file, encoding='utf-8') as f:
+            events = [json.loads(line) for line in f]
+        assert [event['emails'] for event in events] == [3, 2, 4]
+
+        daily = ledger.get_daily('user_1', '2025-03-01')
+        assert daily['emails'] == 5 and daily['tokens'] == 150 and daily['events'] == 2
+        assert daily['models'] == {'claude': 100, 'gpt': 50}
+        assert daily['first_ts'].startswith('2025-03-01T09') and daily['last_ts'].startswith('2025-03-01T17')
+        assert ledger.get_monthly('user_1', '2025-03') == {'emails': 9, 'tokens': 150, 'events': 3}
+        assert [day['date'] for day in ledger.get_daily_history('user_1')] == ['2025-03-01', '2025-03-02']
+        assert ledger.get_daily('user_2', '2025-03-01') is None
+
+    def test_checkpoint_then_replay_log_tail(self):
+        """A reloaded ledger starts from the checkpoint offset and replays only later events."""
+        ledger = self.make_ledger()
+        ledger.append('user_1', emails=3, timestamp=datetime(2025, 3, 1, 9))
+        ledger.flush()
+
+        with open(self.rollups_file, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        assert checkpoint['offset'] == os.path.getsize(self.events_file)
+        assert checkpoint['users']['user_1']['daily']['2025-03-01']['emails'] == 3
+
+        # Appended after the checkpoint, e.g. by another process, and never checkpointed
+        ledger.append('user_1', emails=2, timestamp=datetime(2025, 3, 1, 10))
+        ledger.append('user_2', emails=7, timestamp=datetime(2025, 3, 1, 11))
+
+        reloaded = self.make_ledger()
+        assert reloaded._offset == os.path.getsize(self.events_file)
+        assert reloaded.get_daily('user_1', '2025-03-01')['emails'] == 5
+        assert reloaded.get_daily('user_2', '2025-03-01')['emails'] == 7
+
+        # A checkpoint beyond the end of the log is discarded and the log replayed in full
+        with open(self.rollups_file, 'w', encoding='utf-8') as f:
+            json.dump({'offset': 10 ** 9, 'users': {'user_1': {'daily': {}, 'monthly': {}}}}, f)
+        rebuilt = self.make_ledger()
+        assert rebuilt.get_monthly('user_1', '2025-03')['emails'] == 5
+
+    def test_partial_line_is_picked_up_later(self):
+        """A line still being written is left for the next catch-up."""
+        ledger = self.make_ledger()
+        ledger.append('user_1', emails=1, timestamp=datetime(2025, 3, 1, 9))
+        line = json.dumps({'user_id': 'user_1', 'ts': '2025-03-01T10:00:00', 'emails': 2})
+        with open(self.events_file, 'a', encoding='utf-8') as f:
+            f.write(line[:10])
+        assert ledger.get_daily('user_1', '2025-03-01')['emails'] == 1
+
+        with open(self.events_file, 'a', encoding='utf-8') as f:
+            f.write(line[10:] + '\n')
+        assert ledger.get_daily('user_1', '2025-03-01')['emails'] == 3
+
+    def test_import_legacy_usage(self, tmp_path):
+        """Legacy usage.json days become events and a checkpoint."""
+        legacy_file = tmp_path / 'usage.json'
+        legacy_file.write_text(json.dumps({
+            'user_1': {
+                '2025-02-27': {'emails_processed': 4, 'plan_type': 'basic', 'daily_limit': 100,
+                               'created_at': '2025-02-27T08:30:00'},
+                '2025-02-28': {'emails_processed': 6, 'plan_type': 'basic', 'daily_limit': 100},
+            },
+        }))
+
+        ledger = self.make_ledger()
+        assert ledger.is_empty()
+        assert ledger.import_legacy_usage(str(legacy_file)) == 2
+        assert not ledger.is_empty()
+        assert os.path.exists(self.rollups_file)
+
+        reloaded = self.make_ledger()
+        first = reloaded.get_daily('user_1', '2025-02-27')
+        assert first['emails'] == 4 and first['plan_type'] == 'basic' and first['daily_limit'] == 100
+        assert first['first_ts'] == '2025-02-27T08:30:00'
+        assert reloaded.get_daily('user_1', '2025-02-28')['first_ts'] == '2025-02-28T00:00:00'
+        assert reloaded.get_monthly('user_1', '2025-02')['emails'] == 10
+        assert ledger.import_legacy_usage(str(tmp_path / 'missing.json')) == 0
+
+
+class TestUsageTrackerLimits:
+    """Test daily limit checks on top of the ledger."""
+
+    def test_new_user_falls_back_to_free_limit(self, tmp_path, monkeypatch):
+        """Without usage today the FREE plan limit applies; recorded usage counts against the day's limit."""
+        pytest.importorskip('stripe')
+        monkeypatch.chdir(tmp_path)  # no legacy usage.json to import
+        from gmail_crew_ai.billing.models import PlanType
+        from gmail_crew_ai.billing.usage_tracker import UsageTracker
+
+        ledger = UsageLedger(str(tmp_path / 'events.jsonl'), str(tmp_path / 'rollups.json'))
+        tracker = UsageTracker(ledger=ledger)
+        free_limit = tracker.determine_daily_limit(PlanType.FREE)
+
+        assert tracker.can_process_more_emails('user_1')
+        assert tracker.get_usage_for_today('user_1').daily_limit == free_limit
+
+        tracker.record_usage('user_1', PlanType.FREE, free_limit - 1)
+        assert tracker.can_process_more_emails('user_1')
+        tracker.record_usage('user_1', PlanType.FREE, 1)
+        assert not tracker.can_process_more_emails('user_1')
+        assert ledger.get_daily('user_1', date.today().isoformat())['emails'] == free_limit